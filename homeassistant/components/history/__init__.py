@@ -1,12 +1,14 @@
 """Provide pre-made queries on top of the recorder component."""
 from __future__ import annotations
 
-from collections.abc import Iterable
+import asyncio
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterable
 from datetime import datetime as dt, timedelta
 from http import HTTPStatus
 import logging
+import threading
 import time
-from typing import cast
+from typing import Any, TypeVar, cast
 
 from aiohttp import web
 import voluptuous as vol
@@ -18,32 +20,54 @@ from homeassistant.components.recorder import (
     history,
     websocket_api as recorder_ws,
 )
+from homeassistant.components.recorder.downsample import MIN_MAX_POINTS
 from homeassistant.components.recorder.filters import (
     Filters,
     sqlalchemy_filter_from_include_exclude_conf,
 )
 from homeassistant.components.recorder.util import session_scope
 from homeassistant.components.websocket_api import messages
-from homeassistant.core import HomeAssistant
+from homeassistant.const import CONTENT_TYPE_JSON
+from homeassistant.core import HomeAssistant, State, callback
 import homeassistant.helpers.config_validation as cv
 from homeassistant.helpers.entityfilter import INCLUDE_EXCLUDE_BASE_FILTER_SCHEMA
-from homeassistant.helpers.json import JSON_DUMP
+from homeassistant.helpers.json import JSON_DUMP, json_bytes
 from homeassistant.helpers.typing import ConfigType
 import homeassistant.util.dt as dt_util
 
+from .cache import (
+    DEFAULT_MAX_STATES,
+    CachedHistory,
+    RecentHistoryCache,
+    get_significant_states_with_cache,
+)
+
 _LOGGER = logging.getLogger(__name__)
 
 DOMAIN = "history"
 HISTORY_FILTERS = "history_filters"
 HISTORY_USE_INCLUDE_ORDER = "history_use_include_order"
+HISTORY_CACHE = "history_cache"
 
 CONF_ORDER = "use_include_order"
+CONF_CACHE_MAX_STATES = "cache_max_states"
+
+# The number of serialized chunks of states that can be waiting
+# to be sent when a client reads a stream slower than the database
+STREAM_MAX_PENDING_CHUNKS = 4
+
+_T = TypeVar("_T")
 
 
 CONFIG_SCHEMA = vol.Schema(
     {
         DOMAIN: INCLUDE_EXCLUDE_BASE_FILTER_SCHEMA.extend(
-            {vol.Optional(CONF_ORDER, default=False): cv.boolean}
+            {
+                vol.Optional(CONF_ORDER, default=False): cv.boolean,
+                vol.Optional(
+                    CONF_CACHE_MAX_STATES, default=DEFAULT_MAX_STATES
+                ): cv.positive_int,
+            }
         )
     },
     extra=vol.ALLOW_EXTRA,
@@ -59,6 +83,11 @@ async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
     )
     hass.data[HISTORY_USE_INCLUDE_ORDER] = use_include_order = conf.get(CONF_ORDER)
 
+    hass.data[HISTORY_CACHE] = None
+    if cache_max_states := conf.get(CONF_CACHE_MAX_STATES, DEFAULT_MAX_STATES):
+        hass.data[HISTORY_CACHE] = cache = RecentHistoryCache(hass, cache_max_states)
+        cache.async_start()
+
     hass.http.register_view(HistoryPeriodView(filters, use_include_order))
     frontend.async_register_built_in_panel(hass, "history", "history", "hass:chart-box")
     websocket_api.async_register_command(hass, ws_get_statistics_during_period)
@@ -119,20 +148,42 @@ def _ws_get_significant_states(
     significant_changes_only: bool,
     minimal_response: bool,
     no_attributes: bool,
+    max_points: int | None,
+    resolution: timedelta | None,
+    cached: dict[str, CachedHistory] | None,
 ) -> str:
     """Fetch history significant_states and convert them to json in the executor."""
-    states = history.get_significant_states(
-        hass,
-        start_time,
-        end_time,
-        entity_ids,
-        filters,
-        include_start_time_state,
-        significant_changes_only,
-        minimal_response,
-        no_attributes,
-        True,
-    )
+    if entity_ids and cached is not None:
+        states = get_significant_states_with_cache(
+            hass,
+            cached,
+            [entity_id for entity_id in entity_ids if entity_id not in cached],
+            entity_ids,
+            start_time,
+            end_time,
+            include_start_time_state,
+            significant_changes_only,
+            minimal_response,
+            no_attributes,
+            True,
+            max_points,
+            resolution,
+        )
+    else:
+        states = history.get_significant_states(
+            hass,
+            start_time,
+            end_time,
+            entity_ids,
+            filters,
+            include_start_time_state,
+            significant_changes_only,
+            minimal_response,
+            no_attributes,
+            True,
+            max_points,
+            resolution,
+        )
 
     if not use_include_order or not filters:
         return JSON_DUMP(messages.result_message(msg_id, states))
@@ -160,6 +211,11 @@ def _ws_get_significant_states(
         vol.Optional("significant_changes_only", default=True): bool,
         vol.Optional("minimal_response", default=False): bool,
         vol.Optional("no_attributes", default=False): bool,
+        vol.Optional("stream", default=False): bool,
+        vol.Optional("max_points"): vol.All(int, vol.Range(min=MIN_MAX_POINTS)),
+        vol.Optional("resolution"): vol.All(
+            vol.Coerce(float), vol.Range(min=0, min_included=False)
+        ),
     }
 )
 @websocket_api.async_response
@@ -203,9 +259,47 @@ async def ws_get_history_during_period(
     significant_changes_only = msg["significant_changes_only"]
     no_attributes = msg["no_attributes"]
     minimal_response = msg["minimal_response"]
+    max_points = msg.get("max_points")
+    resolution = None
+    if "resolution" in msg:
+        resolution = timedelta(seconds=msg["resolution"])
+
+    if msg["stream"]:
+        msg_id = msg["id"]
+
+        def _event_message(entity_id: str, states: list[State | dict[str, Any]]) -> str:
+            return JSON_DUMP(
+                messages.event_message(msg_id, {"states": {entity_id: states}})
+            )
 
+        async for _, message in _async_stream_significant_states(
+            hass,
+            _event_message,
+            start_time,
+            end_time,
+            entity_ids,
+            hass.data[HISTORY_FILTERS],
+            include_start_time_state,
+            significant_changes_only,
+            minimal_response,
+            no_attributes,
+            True,
+            max_points,
+            resolution,
+        ):
+            connection.send_message(message)
+        connection.send_result(msg_id)
+        return
+
+    cached, add_executor_job = _async_get_cached_history(
+        hass,
+        entity_ids,
+        start_time,
+        end_time,
+        include_start_time_state,
+    )
     connection.send_message(
-        await get_instance(hass).async_add_executor_job(
+        await add_executor_job(
             _ws_get_significant_states,
             hass,
             msg["id"],
@@ -218,6 +312,9 @@ async def ws_get_history_during_period(
             significant_changes_only,
             minimal_response,
             no_attributes,
+            max_points,
+            resolution,
+            cached,
         )
     )
 
@@ -272,6 +369,23 @@ class HistoryPeriodView(HomeAssistantView):
         minimal_response = "minimal_response" in request.query
         no_attributes = "no_attributes" in request.query
 
+        max_points = None
+        if max_points_str := request.query.get("max_points"):
+            try:
+                max_points = int(max_points_str)
+            except ValueError:
+                max_points = 0
+            if max_points < MIN_MAX_POINTS:
+                return self.json_message("Invalid max_points", HTTPStatus.BAD_REQUEST)
+        resolution = None
+        if resolution_str := request.query.get("resolution"):
+            try:
+                resolution = timedelta(seconds=float(resolution_str))
+            except (ValueError, OverflowError):
+                resolution = timedelta(0)
+            if resolution <= timedelta(0):
+                return self.json_message("Invalid resolution", HTTPStatus.BAD_REQUEST)
+
         hass = request.app["hass"]
 
         if (
@@ -281,9 +395,31 @@ class HistoryPeriodView(HomeAssistantView):
         ):
             return self.json([])
 
+        if "stream" in request.query:
+            return await self._async_stream_significant_states_json(
+                request,
+                hass,
+                start_time,
+                end_time,
+                entity_ids,
+                include_start_time_state,
+                significant_changes_only,
+                minimal_response,
+                no_attributes,
+                max_points,
+                resolution,
+            )
+
+        cached, add_executor_job = _async_get_cached_history(
+            hass,
+            entity_ids,
+            start_time,
+            end_time,
+            include_start_time_state,
+        )
         return cast(
             web.Response,
-            await get_instance(hass).async_add_executor_job(
+            await add_executor_job(
                 self._sorted_significant_states_json,
                 hass,
                 start_time,
@@ -293,9 +429,68 @@ class HistoryPeriodView(HomeAssistantView):
                 significant_changes_only,
                 minimal_response,
                 no_attributes,
+                max_points,
+                resolution,
+                cached,
             ),
         )
 
+    async def _async_stream_significant_states_json(
+        self,
+        request: web.Request,
+        hass: HomeAssistant,
+        start_time: dt,
+        end_time: dt,
+        entity_ids: list[str] | None,
+        include_start_time_state: bool,
+        significant_changes_only: bool,
+        minimal_response: bool,
+        no_attributes: bool,
+        max_points: int | None,
+        resolution: timedelta | None,
+    ) -> web.StreamResponse:
+        """Stream significant states from the database as json.
+
+        The states of each entity are written as soon as they are read
+        from the database. The entities are not reordered by the
+        include order since that would require holding all of them.
+        """
+        response = web.StreamResponse(headers={"Content-Type": CONTENT_TYPE_JSON})
+        response.enable_compression()
+        await response.prepare(request)
+
+        def _states_json(entity_id: str, states: list[State | dict[str, Any]]) -> bytes:
+            # Strip the brackets so chunks of the same entity
+            # can be joined into a single list
+            return json_bytes(states)[1:-1]
+
+        current_entity_id: str | None = None
+        await response.write(b"[")
+        async for entity_id, states_json in _async_stream_significant_states(
+            hass,
+            _states_json,
+            start_time,
+            end_time,
+            entity_ids,
+            self.filters,
+            include_start_time_state,
+            significant_changes_only,
+            minimal_response,
+            no_attributes,
+            False,
+            max_points,
+            resolution,
+        ):
+            if entity_id == current_entity_id:
+                await response.write(b"," + states_json)
+                continue
+            prefix = b"[" if current_entity_id is None else b"],["
+            current_entity_id = entity_id
+            await response.write(prefix + states_json)
+        await response.write(b"]" if current_entity_id is None else b"]]")
+        await response.write_eof()
+        return response
+
     def _sorted_significant_states_json(
         self,
         hass: HomeAssistant,
@@ -306,23 +501,45 @@ class HistoryPeriodView(HomeAssistantView):
         significant_changes_only: bool,
         minimal_response: bool,
         no_attributes: bool,
+        max_points: int | None,
+        resolution: timedelta | None,
+        cached: dict[str, CachedHistory] | None,
     ) -> web.Response:
         """Fetch significant stats from the database as json."""
         timer_start = time.perf_counter()
 
-        with session_scope(hass=hass) as session:
-            states = history.get_significant_states_with_session(
+        if entity_ids and cached is not None:
+            states = get_significant_states_with_cache(
                 hass,
-                session,
+                cached,
+                [entity_id for entity_id in entity_ids if entity_id not in cached],
+                entity_ids,
                 start_time,
                 end_time,
-                entity_ids,
-                self.filters,
                 include_start_time_state,
                 significant_changes_only,
                 minimal_response,
                 no_attributes,
+                False,
+                max_points,
+                resolution,
             )
+        else:
+            with session_scope(hass=hass) as session:
+                states = history.get_significant_states_with_session(
+                    hass,
+                    session,
+                    start_time,
+                    end_time,
+                    entity_ids,
+                    self.filters,
+                    include_start_time_state,
+                    significant_changes_only,
+                    minimal_response,
+                    no_attributes,
+                    max_points=max_points,
+                    resolution=resolution,
+                )
 
         if _LOGGER.isEnabledFor(logging.DEBUG):
             elapsed = time.perf_counter() - timer_start
@@ -344,6 +561,96 @@ class HistoryPeriodView(HomeAssistantView):
         return self.json(sorted_result)
 
 
+async def _async_stream_significant_states(
+    hass: HomeAssistant,
+    serialize: Callable[[str, list[State | dict[str, Any]]], _T],
+    start_time: dt,
+    end_time: dt | None,
+    entity_ids: list[str] | None,
+    filters: Filters | None,
+    include_start_time_state: bool,
+    significant_changes_only: bool,
+    minimal_response: bool,
+    no_attributes: bool,
+    compressed_state_format: bool,
+    max_points: int | None,
+    resolution: timedelta | None,
+) -> AsyncIterator[tuple[str, _T]]:
+    """Yield the entity_id and the serialized chunks of significant states.
+
+    The chunks are read and serialized in the recorder read pool and
+    handed over through a small queue. When the client reads slower
+    than the database the executor job waits for the queue so only
+    a few chunks are held in memory at any time.
+    """
+    queue: asyncio.Queue[tuple[str, _T] | None] = asyncio.Queue(
+        STREAM_MAX_PENDING_CHUNKS
+    )
+    cancel = threading.Event()
+
+    def _put(item: tuple[str, _T] | None) -> None:
+        asyncio.run_coroutine_threadsafe(queue.put(item), hass.loop).result()
+
+    def _stream_significant_states() -> None:
+        try:
+            with session_scope(hass=hass) as session:
+                for entity_id, states in history.stream_significant_states_with_session(
+                    hass,
+                    session,
+                    start_time,
+                    end_time,
+                    entity_ids,
+                    filters,
+                    include_start_time_state,
+                    significant_changes_only,
+                    minimal_response,
+                    no_attributes,
+                    compressed_state_format,
+                    max_points,
+                    resolution,
+                ):
+                    if cancel.is_set():
+                        return
+                    _put((entity_id, serialize(entity_id, states)))
+        finally:
+            _put(None)
+
+    job = get_instance(hass).async_add_read_executor_job(_stream_significant_states)
+    try:
+        while (item := await queue.get()) is not None:
+            yield item
+    finally:
+        # Stop the job if the consumer went away and make room
+        # in the queue so it is not blocked on a put
+        cancel.set()
+        while not queue.empty():
+            queue.get_nowait()
+    await job
+
+
+@callback
+def _async_get_cached_history(
+    hass: HomeAssistant,
+    entity_ids: list[str] | None,
+    start_time: dt,
+    end_time: dt | None,
+    include_start_time_state: bool,
+) -> tuple[dict[str, CachedHistory] | None, Callable[..., Awaitable[Any]]]:
+    """Return the cached history of the entities and how to fetch the rest.
+
+    The states are only fetched in the recorder read pool when some of
+    them have to be read from the database.
+    """
+    if not entity_ids or (cache := hass.data[HISTORY_CACHE]) is None:
+        return None, get_instance(hass).async_add_read_executor_job
+    cached, not_cached = cache.async_get(
+        entity_ids, start_time, end_time, include_start_time_state
+    )
+    if not_cached:
+        return cached, get_instance(hass).async_add_read_executor_job
+    return cached, hass.async_add_executor_job
+
+
 def _entities_may_have_state_changes_after(
     hass: HomeAssistant, entity_ids: Iterable, start_time: dt
 ) -> bool:
@@ -0,0 +1,322 @@
+"""In memory cache of the recent history of the recorded entities.
+
+Every state change that is recorded passes through the event bus first,
+so the most recent states of each entity are kept in memory and requests
+for recent periods are answered without querying the database. The
+entities whose states before the period were not cached, because they
+were recorded before the cache was started or were evicted, are read
+from the database.
+"""
+from __future__ import annotations
+
+from bisect import bisect_left, bisect_right
+from collections.abc import Callable, MutableMapping
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any
+
+from homeassistant.components.recorder import Recorder, get_instance, history
+from homeassistant.components.recorder.const import (
+    ALL_DOMAIN_EXCLUDE_ATTRS,
+    DATA_INSTANCE,
+    EXCLUDE_ATTRIBUTES,
+)
+from homeassistant.components.recorder.util import session_scope
+from homeassistant.const import EVENT_STATE_CHANGED
+from homeassistant.core import Event, HomeAssistant, State, callback, split_entity_id
+from homeassistant.helpers.json import json_dumps
+import homeassistant.util.dt as dt_util
+
+DEFAULT_MAX_STATES = 100000
+MAX_STATES_PER_ENTITY = 10000
+
+# The states of an entity can grow by this fraction over the
+# limit before they are trimmed so the lists of states are not
+# shifted every time a state is added
+TRIM_SLACK = 0.25
+
+
+class _EntityHistory:
+    """The recent states of an entity sorted by last_updated."""
+
+    __slots__ = ("timestamps", "states")
+
+    def __init__(self) -> None:
+        """Init the entity history."""
+        self.timestamps: list[float] = []
+        self.states: list[State] = []
+
+
+@dataclass
+class CachedHistory:
+    """The cached states of an entity for a period."""
+
+    initial_state: State | None
+    states: list[State]
+
+
+class _StateRow:
+    """Expose a cached state like a row of the significant states query."""
+
+    __slots__ = (
+        "entity_id",
+        "state",
+        "last_changed_ts",
+        "last_updated_ts",
+        "attributes",
+        "_state",
+        "_exclude_attrs",
+    )
+
+    def __init__(
+        self,
+        state: State,
+        include_last_changed: bool,
+        exclude_attrs: set[str] | None,
+    ) -> None:
+        """Init the row."""
+        self.entity_id = state.entity_id
+        self.state = state.state
+        self.last_updated_ts = dt_util.utc_to_timestamp(state.last_updated)
+        self.last_changed_ts: float | None = None
+        if include_last_changed:
+            self.last_changed_ts = dt_util.utc_to_timestamp(state.last_changed)
+        self.attributes = None
+        self._state = state
+        self._exclude_attrs = exclude_attrs
+
+    @property
+    def shared_attrs(self) -> str | None:
+        """Return the attributes as they are recorded."""
+        if (exclude_attrs := self._exclude_attrs) is None:
+            return None
+        return json_dumps(
+            {
+                key: value
+                for key, value in self._state.attributes.items()
+                if key not in exclude_attrs
+            }
+        )
+
+
+class RecentHistoryCache:
+    """Keep the recent states of the recorded entities in memory."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        max_states: int = DEFAULT_MAX_STATES,
+        max_states_per_entity: int = MAX_STATES_PER_ENTITY,
+    ) -> None:
+        """Init the cache."""
+        self.hass = hass
+        self.max_states = max_states
+        self.max_states_per_entity = min(max_states_per_entity, max_states)
+        self.states_count = 0
+        self.hits = 0
+        self.misses = 0
+        self._entities: dict[str, _EntityHistory] = {}
+        self._entity_filter: Callable[[str], bool] = lambda entity_id: True
+        self._instance: Recorder | None = None
+
+    @callback
+    def async_start(self) -> None:
+        """Start caching the state changes the recorder records."""
+        if DATA_INSTANCE not in self.hass.data:
+            return
+        instance = get_instance(self.hass)
+        if EVENT_STATE_CHANGED in instance.exclude_t:
+            return
+        self._instance = instance
+        self._entity_filter = instance.entity_filter
+        self.hass.bus.async_listen(EVENT_STATE_CHANGED, self._async_state_changed)
+
+    @callback
+    def _async_state_changed(self, event: Event) -> None:
+        """Add a new state to the history of its entity."""
+        instance = self._instance
+        assert instance is not None
+        if not instance.enabled or not instance.recording:
+            # The states are not written to the database, the cached
+            # states would no longer match the recorded history
+            if self._entities:
+                self._entities.clear()
+                self.states_count = 0
+            return
+        entity_id: str = event.data["entity_id"]
+        new_state: State | None = event.data.get("new_state")
+        if new_state is None:
+            # The cached states cannot tell when the entity
+            # was removed, it is read from the database again
+            if entity_history := self._entities.pop(entity_id, None):
+                self.states_count -= len(entity_history.states)
+            return
+        if not self._entity_filter(entity_id):
+            return
+
+        if (entity_history := self._entities.get(entity_id)) is None:
+            entity_history = self._entities[entity_id] = _EntityHistory()
+        entity_history.timestamps.append(
+            dt_util.utc_to_timestamp(new_state.last_updated)
+        )
+        entity_history.states.append(new_state)
+        self.states_count += 1
+
+        if len(entity_history.states) > self.max_states_per_entity * (1 + TRIM_SLACK):
+            self._trim(entity_history, self.max_states_per_entity)
+        while self.states_count > self.max_states:
+            self._evict()
+
+    def _trim(self, entity_history: _EntityHistory, keep: int) -> None:
+        """Drop the oldest states of an entity."""
+        drop = len(entity_history.states) - keep
+        del entity_history.timestamps[:drop]
+        del entity_history.states[:drop]
+        self.states_count -= drop
+
+    def _evict(self) -> None:
+        """Make room by halving the history of the entity with the most states.
+
+        The oldest entity is dropped once every entity is down to its
+        last state since that state is needed to know the state at the
+        start of a period.
+        """
+        largest = max(self._entities.values(), key=lambda item: len(item.states))
+        if (count := len(largest.states)) > 1:
+            self._trim(largest, count // 2)
+            return
+        oldest = next(iter(self._entities))
+        self.states_count -= len(self._entities.pop(oldest).states)
+
+    @callback
+    def async_get(
+        self,
+        entity_ids: list[str],
+        start_time: datetime,
+        end_time: datetime | None,
+        include_start_time_state: bool,
+    ) -> tuple[dict[str, CachedHistory], list[str]]:
+        """Return the cached states of the entities and the entities not cached.
+
+        The states are selected the same way as the database query does,
+        the states of the period are updated after start_time and before
+        end_time and the state at the start is the last one updated
+        before start_time. The entities are not cached when the cache
+        does not cover the start of the period.
+        """
+        start_ts = dt_util.utc_to_timestamp(start_time)
+        end_ts = None if end_time is None else dt_util.utc_to_timestamp(end_time)
+        cached: dict[str, CachedHistory] = {}
+        not_cached: list[str] = []
+        for entity_id in entity_ids:
+            if (entity_history := self._entities.get(entity_id)) is None:
+                self.misses += 1
+                not_cached.append(entity_id)
+                continue
+            timestamps = entity_history.timestamps
+            if timestamps[0] >= start_ts:
+                self.misses += 1
+                not_cached.append(entity_id)
+                continue
+            end = len(timestamps) if end_ts is None else bisect_left(timestamps, end_ts)
+            self.hits += 1
+            cached[entity_id] = CachedHistory(
+                entity_history.states[bisect_left(timestamps, start_ts) - 1]
+                if include_start_time_state
+                else None,
+                entity_history.states[bisect_right(timestamps, start_ts) : end],
+            )
+        return cached, not_cached
+
+    def stats(self) -> dict[str, int]:
+        """Return the size and hit rate of the cache."""
+        return {
+            "entities": len(self._entities),
+            "states": self.states_count,
+            "max_states": self.max_states,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+def get_significant_states_with_cache(
+    hass: HomeAssistant,
+    cached: dict[str, CachedHistory],
+    not_cached: list[str],
+    entity_ids: list[str],
+    start_time: datetime,
+    end_time: datetime | None,
+    include_start_time_state: bool,
+    significant_changes_only: bool,
+    minimal_response: bool,
+    no_attributes: bool,
+    compressed_state_format: bool,
+    max_points: int | None,
+    resolution: timedelta | None,
+) -> MutableMapping[str, list[State | dict[str, Any]]]:
+    """Return the significant states of the entities from the cache and database.
+
+    The result is the same as get_significant_states of the recorder
+    history with the entity_ids given. The database is only queried
+    for the entities that are not cached.
+    """
+    exclude_attrs_by_domain: dict[str, set[str]] = hass.data.get(EXCLUDE_ATTRIBUTES, {})
+    states: dict[str, list[State | dict[str, Any]]] = {}
+    if not_cached:
+        with session_scope(hass=hass) as session:
+            states.update(
+                history.get_significant_states_with_session(
+                    hass,
+                    session,
+                    start_time,
+                    end_time,
+                    not_cached,
+                    None,
+                    include_start_time_state,
+                    significant_changes_only,
+                    minimal_response,
+                    no_attributes,
+                    compressed_state_format,
+                    max_points,
+                    resolution,
+                )
+            )
+
+    for entity_id, cached_history in cached.items():
+        domain = split_entity_id(entity_id)[0]
+        exclude_attrs = None
+        if not no_attributes:
+            exclude_attrs = (
+                exclude_attrs_by_domain.get(domain, set()) | ALL_DOMAIN_EXCLUDE_ATTRS
+            )
+        cached_states = cached_history.states
+        if significant_changes_only and domain not in history.SIGNIFICANT_DOMAINS:
+            cached_states = [
+                state
+                for state in cached_states
+                if state.last_changed == state.last_updated
+            ]
+        initial_row = None
+        if cached_history.initial_state is not None:
+            initial_row = _StateRow(cached_history.initial_state, True, exclude_attrs)
+        states[entity_id] = list(
+            history.entity_states_from_rows(
+                entity_id,
+                [
+                    _StateRow(state, not significant_changes_only, exclude_attrs)
+                    for state in cached_states
+                ],
+                initial_row,
+                start_time,
+                minimal_response,
+                compressed_state_format,
+                max_points,
+                resolution,
+            )
+        )
+
+    return {
+        entity_id: states[entity_id]
+        for entity_id in entity_ids
+        if states.get(entity_id)
+    }
@@ -1,13 +1,26 @@
 """Static file handling for HTTP component."""
 from __future__ import annotations
 
+import asyncio
 from collections.abc import Mapping
+from dataclasses import dataclass, field
+import hashlib
+import mimetypes
+import os
 from pathlib import Path
-from typing import Final
+import stat
+import time
+from typing import IO, Any, Final
 
 from aiohttp import hdrs
-from aiohttp.web import FileResponse, Request, StreamResponse
-from aiohttp.web_exceptions import HTTPForbidden, HTTPNotFound
+from aiohttp.abc import AbstractStreamWriter
+from aiohttp.web import BaseRequest, FileResponse, Request, StreamResponse
+from aiohttp.web_exceptions import (
+    HTTPForbidden,
+    HTTPNotFound,
+    HTTPPartialContent,
+    HTTPRequestRangeNotSatisfiable,
+)
 from aiohttp.web_urldispatcher import StaticResource
 from lru import LRU  # pylint: disable=no-name-in-module
 
@@ -19,7 +32,65 @@ CACHE_TIME: Final = 31 * 86400  # = 1 month
 CACHE_HEADERS: Final[Mapping[str, str]] = {
     hdrs.CACHE_CONTROL: f"public, max-age={CACHE_TIME}"
 }
-PATH_CACHE = LRU(512)
+# Number of files indexed per static directory
+INDEX_MAX_FILES: Final = 4096
+# Seconds before an indexed file is checked for changes again
+INDEX_REFRESH_INTERVAL: Final = 10
+# Files larger than this get an ETag from their modification time
+# and size instead of one hashed from their content
+ETAG_HASH_MAX_SIZE: Final = 1024 * 1024
+# Pre-compressed variants of the files by content encoding, in order of preference
+PRECOMPRESSED_SUFFIXES: Final = {"br": ".br", "gzip": ".gz"}
+
+
+@dataclass
+class _StaticVariant:
+    """A file, or one of its pre-compressed variants, of the static index."""
+
+    path: Path
+    size: int
+    mtime_ns: int
+    etag: str | None = None
+
+
+@dataclass
+class _StaticFile:
+    """A file of the static index."""
+
+    variant: _StaticVariant
+    mtime: float
+    content_type: str
+    signature: tuple[tuple[int, int] | None, ...]
+    encodings: dict[str, _StaticVariant] = field(default_factory=dict)
+    checked: float = field(default_factory=time.monotonic)
+
+    def select(self, accept_encoding: str) -> tuple[str | None, _StaticVariant]:
+        """Return the content encoding and variant to send for a request."""
+        if self.encodings:
+            accepted = _parse_accept_encoding(accept_encoding)
+            for encoding, variant in self.encodings.items():
+                if accepted.get(encoding, accepted.get("*", 0.0)) > 0.0:
+                    return encoding, variant
+        return None, self.variant
+
+
+def _parse_accept_encoding(accept_encoding: str) -> dict[str, float]:
+    """Return the quality value of each coding of an Accept-Encoding header."""
+    accepted: dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        coding, *params = part.split(";")
+        if not (coding := coding.strip().lower()):
+            continue
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[coding] = quality
+    return accepted
 
 
 def _get_file_path(
@@ -36,8 +107,342 @@ def _get_file_path(
     raise FileNotFoundError
 
 
+def _stat_signature(st: os.stat_result | None) -> tuple[int, int] | None:
+    """Return what changes when a file changes."""
+    if st is None or not stat.S_ISREG(st.st_mode):
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def _stat_or_none(path: Path) -> os.stat_result | None:
+    """Return the stat of a path or None when it does not exist."""
+    try:
+        return path.stat()
+    except OSError:
+        return None
+
+
+def _get_variant_path(
+    filepath: Path, suffix: str, directory: Path, follow_symlinks: bool
+) -> Path | None:
+    """Return the path of a pre-compressed variant of a file.
+
+    None is returned when the variant is a link outside of the directory.
+    """
+    path = filepath.with_name(filepath.name + suffix)
+    if follow_symlinks:
+        return path
+    path = path.resolve()
+    try:
+        path.relative_to(directory)
+    except ValueError:
+        return None
+    return path
+
+
+def _variant_signature(path: Path | None) -> tuple[int, int] | None:
+    """Return the signature of a variant or None when there is none."""
+    return None if path is None else _stat_signature(_stat_or_none(path))
+
+
+def _file_signature(
+    filepath: Path, directory: Path, follow_symlinks: bool
+) -> tuple[tuple[int, int] | None, ...]:
+    """Return the signature of a file and of its pre-compressed variants."""
+    return (
+        _stat_signature(_stat_or_none(filepath)),
+        *(
+            _variant_signature(
+                _get_variant_path(filepath, suffix, directory, follow_symlinks)
+            )
+            for suffix in PRECOMPRESSED_SUFFIXES.values()
+        ),
+    )
+
+
+def _index_file(filepath: Path, directory: Path, follow_symlinks: bool) -> _StaticFile:
+    """Index a file and its pre-compressed variants.
+
+    The ETags are only set when the file is first sent.
+    """
+    st = filepath.stat()
+    encodings: dict[str, _StaticVariant] = {}
+    signature: list[tuple[int, int] | None] = [_stat_signature(st)]
+    for encoding, suffix in PRECOMPRESSED_SUFFIXES.items():
+        path = _get_variant_path(filepath, suffix, directory, follow_symlinks)
+        signature.append(variant_signature := _variant_signature(path))
+        if path is not None and variant_signature is not None:
+            mtime_ns, size = variant_signature
+            encodings[encoding] = _StaticVariant(path, size, mtime_ns)
+    return _StaticFile(
+        _StaticVariant(filepath, st.st_size, st.st_mtime_ns),
+        st.st_mtime,
+        mimetypes.guess_type(str(filepath))[0] or "application/octet-stream",
+        tuple(signature),
+        encodings,
+    )
+
+
+def _hash_content(fobj: IO[bytes]) -> str:
+    """Return the hash of the content of an open file."""
+    digest = hashlib.blake2b(digest_size=16)
+    while chunk := fobj.read(256 * 1024):
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _variant_etag(variant: _StaticVariant, fobj: IO[bytes] | None = None) -> str:
+    """Return the ETag of a variant.
+
+    The ETag is hashed from the content, read from fobj when the variant
+    is already open, unless the variant is larger than ETAG_HASH_MAX_SIZE.
+    """
+    if variant.size > ETAG_HASH_MAX_SIZE:
+        return f"{variant.mtime_ns:x}-{variant.size:x}"
+    if fobj is None:
+        with variant.path.open("rb") as fobj:
+            return _hash_content(fobj)
+    etag = _hash_content(fobj)
+    fobj.seek(0)
+    return etag
+
+
+def _hash_etags(static_file: _StaticFile) -> None:
+    """Set the ETags of a file and of its pre-compressed variants."""
+    for variant in (static_file.variant, *static_file.encodings.values()):
+        if variant.etag is None:
+            variant.etag = _variant_etag(variant)
+
+
+def _get_static_file(
+    filename: Path, directory: Path, follow_symlinks: bool
+) -> _StaticFile | None:
+    """Index a file requested from a static directory.
+
+    None is returned for directories.
+    """
+    if (filepath := _get_file_path(filename, directory, follow_symlinks)) is None:
+        return None
+    static_file = _index_file(filepath, directory, follow_symlinks)
+    _hash_etags(static_file)
+    return static_file
+
+
+def _refresh_static_file(
+    static_file: _StaticFile, directory: Path, follow_symlinks: bool
+) -> _StaticFile:
+    """Reindex a file when it changed."""
+    filepath = static_file.variant.path
+    if _file_signature(filepath, directory, follow_symlinks) != static_file.signature:
+        static_file = _index_file(filepath, directory, follow_symlinks)
+    _hash_etags(static_file)
+    static_file.checked = time.monotonic()
+    return static_file
+
+
+def _is_variant_name(name: str, names: set[str]) -> bool:
+    """Return if a file name is a pre-compressed variant of another file."""
+    return any(
+        name.endswith(suffix) and name[: -len(suffix)] in names
+        for suffix in PRECOMPRESSED_SUFFIXES.values()
+    )
+
+
+def _build_index(directory: Path, follow_symlinks: bool) -> dict[Path, _StaticFile]:
+    """Index the files of a static directory.
+
+    The pre-compressed variants are indexed with the file they belong to.
+    """
+    index: dict[Path, _StaticFile] = {}
+    for root, _, files in os.walk(directory, followlinks=follow_symlinks):
+        names = set(files)
+        for name in files:
+            if len(index) >= INDEX_MAX_FILES:
+                return index
+            if _is_variant_name(name, names):
+                continue
+            filename = Path(root, name).relative_to(directory)
+            try:
+                if filepath := _get_file_path(filename, directory, follow_symlinks):
+                    index[filename] = _index_file(filepath, directory, follow_symlinks)
+            except (ValueError, OSError):
+                continue
+    return index
+
+
+def _open_variant(variant: _StaticVariant) -> tuple[IO[Any], _StaticVariant]:
+    """Open a variant.
+
+    A new variant with its own ETag is returned with the open file when
+    the file changed since it was indexed.
+    """
+    fobj = variant.path.open("rb")
+    try:
+        st = os.fstat(fobj.fileno())
+        if st.st_size != variant.size or st.st_mtime_ns != variant.mtime_ns:
+            variant = _StaticVariant(variant.path, st.st_size, st.st_mtime_ns)
+            variant.etag = _variant_etag(variant, fobj)
+    except OSError:
+        fobj.close()
+        raise
+    return fobj, variant
+
+
+def _if_range_matches(request: BaseRequest, etag: str, mtime: float) -> bool:
+    """Return if the Range of a request applies to the current representation."""
+    if (if_range := request.headers.get(hdrs.IF_RANGE)) is None:
+        return True
+    if if_range.startswith('"'):
+        return if_range == f'"{etag}"'
+    if if_range.startswith("W/"):
+        # Weak entity tags never match
+        return False
+    return (date := request.if_range) is not None and mtime <= date.timestamp()
+
+
+def _byte_range(http_range: slice, size: int) -> tuple[int, int] | None:
+    """Return the offset and length of a byte range of a file.
+
+    None is returned when the range cannot be satisfied.
+    """
+    start: int = http_range.start
+    if start < 0 and http_range.stop is None:
+        # The last bytes of the file
+        start = max(start + size, 0)
+        count = size - start
+    else:
+        stop = size if http_range.stop is None else min(http_range.stop, size)
+        count = stop - start
+    if start >= size:
+        return None
+    return start, count
+
+
+class IndexedFileResponse(FileResponse):
+    """File response sending a file of the static index.
+
+    The file is sent without looking it up on disk again, and conditional
+    and range requests are answered with the ETag from the index.
+    """
+
+    def __init__(
+        self,
+        static_file: _StaticFile,
+        chunk_size: int = 256 * 1024,
+        headers: Mapping[str, str] | None = None,
+    ) -> None:
+        """Initialize the response."""
+        super().__init__(static_file.variant.path, chunk_size, headers=headers)
+        self._static_file = static_file
+
+    async def prepare(self, request: BaseRequest) -> AbstractStreamWriter | None:
+        """Send the headers and the file."""
+        static_file = self._static_file
+        encoding, variant = static_file.select(
+            request.headers.get(hdrs.ACCEPT_ENCODING, "")
+        )
+        etag = variant.etag
+        assert etag is not None
+        mtime = static_file.mtime
+        if static_file.encodings:
+            self.headers[hdrs.VARY] = hdrs.ACCEPT_ENCODING
+
+        # https://www.rfc-editor.org/rfc/rfc9110#section-13.2.2
+        if (ifmatch := request.if_match) is not None:
+            if not self._strong_etag_match(etag, ifmatch):
+                return await self._precondition_failed(request)
+        elif (
+            unmodsince := request.if_unmodified_since
+        ) is not None and mtime > unmodsince.timestamp():
+            return await self._precondition_failed(request)
+
+        if (ifnonematch := request.if_none_match) is not None:
+            if self._strong_etag_match(etag, ifnonematch):
+                return await self._not_modified(request, etag, mtime)
+        elif (
+            modsince := request.if_modified_since
+        ) is not None and mtime <= modsince.timestamp():
+            return await self._not_modified(request, etag, mtime)
+
+        byte_range: tuple[int, int] | None = None
+        if hdrs.RANGE in request.headers and _if_range_matches(request, etag, mtime):
+            try:
+                http_range = request.http_range
+            except ValueError:
+                return await self._range_not_satisfiable(request, variant.size)
+            if http_range.start is not None or http_range.stop is not None:
+                if (byte_range := _byte_range(http_range, variant.size)) is None:
+                    return await self._range_not_satisfiable(request, variant.size)
+        start, count = byte_range or (0, variant.size)
+
+        fobj = None
+        loop = asyncio.get_running_loop()
+        if count and request.method != hdrs.METH_HEAD:
+            fobj, opened = await loop.run_in_executor(None, _open_variant, variant)
+            if opened is not variant:
+                # The file changed since it was indexed, send it whole
+                static_file.checked = 0.0
+                variant = opened
+                assert variant.etag is not None
+                etag = variant.etag
+                mtime = variant.mtime_ns / 1_000_000_000
+                byte_range = None
+                start, count = 0, variant.size
+
+        self.content_type = static_file.content_type
+        if encoding is not None:
+            self.headers[hdrs.CONTENT_ENCODING] = encoding
+        self.etag = etag  # type: ignore[assignment]
+        self.last_modified = mtime  # type: ignore[assignment]
+        self.content_length = count
+        self.headers[hdrs.ACCEPT_RANGES] = "bytes"
+        if byte_range is not None:
+            self.set_status(HTTPPartialContent.status_code)
+            self.headers[
+                hdrs.CONTENT_RANGE
+            ] = f"bytes {start}-{start + count - 1}/{variant.size}"
+
+        if fobj is None:
+            return await StreamResponse.prepare(self, request)
+        try:
+            return await self._sendfile(request, fobj, start, count)
+        finally:
+            await loop.run_in_executor(None, fobj.close)
+
+    async def _range_not_satisfiable(
+        self, request: BaseRequest, size: int
+    ) -> AbstractStreamWriter | None:
+        """Send a Range Not Satisfiable response."""
+        self.headers[hdrs.CONTENT_RANGE] = f"bytes */{size}"
+        self.set_status(HTTPRequestRangeNotSatisfiable.status_code)
+        self.content_length = 0
+        return await StreamResponse.prepare(self, request)
+
+
 class CachingStaticResource(StaticResource):
-    """Static Resource handler that will add cache headers."""
+    """Static Resource handler that will add cache headers.
+
+    The files are served from an index of their size, modification time,
+    ETag and pre-compressed variants, so they are not looked up on disk for
+    every request. The index is built in the background from the first
+    request, the files requested before it is ready are indexed one by one,
+    and the indexed files are checked for changes every INDEX_REFRESH_INTERVAL.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        """Initialize the resource."""
+        super().__init__(*args, **kwargs)
+        self._index = LRU(INDEX_MAX_FILES)
+        self._index_task: asyncio.Task[None] | None = None
+
+    async def async_build_index(self, hass: HomeAssistant) -> None:
+        """Index the files of the directory."""
+        index = await hass.async_add_executor_job(
+            _build_index, self._directory, self._follow_symlinks
+        )
+        for filename, static_file in index.items():
+            if filename not in self._index:
+                self._index[filename] = static_file
 
     async def _handle(self, request: Request) -> StreamResponse:
         rel_url = request.match_info["filename"]
@@ -48,23 +453,36 @@ class CachingStaticResource(StaticResource):
             # /static/\\machine_name\c$ or /static/D:\path
             # where the static dir is totally different
             raise HTTPForbidden()
+        if self._index_task is None:
+            self._index_task = hass.async_create_task(self.async_build_index(hass))
         try:
-            key = (filename, self._directory, self._follow_symlinks)
-            if (filepath := PATH_CACHE.get(key)) is None:
-                filepath = PATH_CACHE[key] = await hass.async_add_executor_job(
-                    _get_file_path, filename, self._directory, self._follow_symlinks
+            if filename not in self._index:
+                static_file = self._index[filename] = await hass.async_add_executor_job(
+                    _get_static_file, filename, self._directory, self._follow_symlinks
+                )
+            elif (static_file := self._index[filename]) is not None and (
+                static_file.variant.etag is None
+                or time.monotonic() - static_file.checked > INDEX_REFRESH_INTERVAL
+            ):
+                static_file = self._index[filename] = await hass.async_add_executor_job(
+                    _refresh_static_file,
+                    static_file,
+                    self._directory,
+                    self._follow_symlinks,
                 )
         except (ValueError, FileNotFoundError) as error:
             # relatively safe
+            self._index.pop(filename, None)
             raise HTTPNotFound() from error
         except Exception as error:
             # perm error or other kind!
+            self._index.pop(filename, None)
             request.app.logger.exception(error)
             raise HTTPNotFound() from error
 
-        if filepath:
-            return FileResponse(
-                filepath,
+        if static_file:
+            return IndexedFileResponse(
+                static_file,
                 chunk_size=self._chunk_size,
                 headers=CACHE_HEADERS,
             )
@@ -9,26 +9,38 @@ from homeassistant.components.recorder.filters import Filters
 from homeassistant.helpers.json import json_dumps
 
 from .all import all_stmt
+from .common import states_entity_id_column
 from .devices import devices_stmt
 from .entities import entities_stmt
 from .entities_and_devices import entities_devices_stmt
 
 
 def statement_for_request(
-    start_day: dt,
-    end_day: dt,
+    start_day_dt: dt,
+    end_day_dt: dt,
     event_types: tuple[str, ...],
     entity_ids: list[str] | None = None,
     device_ids: list[str] | None = None,
     filters: Filters | None = None,
-    context_id: str | None = None,
+    context_id_bin: bytes | None = None,
+    migrated: bool = True,
 ) -> StatementLambdaElement:
-    """Generate the logbook statement for a logbook request."""
+    """Generate the logbook statement for a logbook request.
+
+    migrated is False while rows may still only have the legacy
+    entity_id, event_type and datetime columns set.
+    """
+    start_day = start_day_dt.timestamp()
+    end_day = end_day_dt.timestamp()
 
     # No entities: logbook sends everything for the timeframe
     # limited by the context_id and the yaml configured filter
     if not entity_ids and not device_ids:
-        states_entity_filter = filters.states_entity_filter() if filters else None
+        states_entity_filter = (
+            filters.states_entity_filter(states_entity_id_column(migrated))
+            if filters
+            else None
+        )
         events_entity_filter = filters.events_entity_filter() if filters else None
         return all_stmt(
             start_day,
@@ -36,7 +48,8 @@ def statement_for_request(
             event_types,
             states_entity_filter,
             events_entity_filter,
-            context_id,
+            context_id_bin,
+            migrated,
         )
 
     # sqlalchemy caches object quoting, the
@@ -55,6 +68,7 @@ def statement_for_request(
             entity_ids,
             json_quoted_entity_ids,
             json_quoted_device_ids,
+            migrated,
         )
 
     # entities: logbook sends everything for the timeframe for the entities
@@ -66,6 +80,7 @@ def statement_for_request(
             event_types,
             entity_ids,
             json_quoted_entity_ids,
+            migrated,
         )
 
     # devices: logbook sends everything for the timeframe for the devices
@@ -76,4 +91,5 @@ def statement_for_request(
         end_day,
         event_types,
         json_quoted_device_ids,
+        migrated,
     )
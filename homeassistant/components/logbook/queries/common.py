@@ -1,25 +1,30 @@
 """Queries for logbook."""
 from __future__ import annotations
 
-from datetime import datetime as dt
-
 import sqlalchemy
 from sqlalchemy import select
 from sqlalchemy.orm import Query
-from sqlalchemy.sql.elements import ClauseList
+from sqlalchemy.sql.elements import ClauseList, ColumnElement
 from sqlalchemy.sql.expression import literal
 from sqlalchemy.sql.selectable import Select
 
 from homeassistant.components.recorder.db_schema import (
-    EVENTS_CONTEXT_ID_INDEX,
+    EVENTS_CONTEXT_ID_BIN_INDEX,
+    LEGACY_EVENTS_EVENT_TYPE,
+    LEGACY_EVENTS_TIME_FIRED_TS,
+    LEGACY_STATES_ENTITY_ID,
+    LEGACY_STATES_LAST_CHANGED_TS,
+    LEGACY_STATES_LAST_UPDATED_TS,
     OLD_FORMAT_ATTRS_JSON,
     OLD_STATE,
     SHARED_ATTRS_JSON,
-    STATES_CONTEXT_ID_INDEX,
+    STATES_CONTEXT_ID_BIN_INDEX,
     EventData,
     Events,
+    EventTypes,
     StateAttributes,
     States,
+    StatesMeta,
 )
 from homeassistant.components.recorder.filters import like_domain_matchers
 
@@ -43,48 +48,97 @@ PSUEDO_EVENT_STATE_CHANGED = None
 # since it avoids another column being sent
 # in the payload
 
-EVENT_COLUMNS = (
-    Events.event_id.label("event_id"),
-    Events.event_type.label("event_type"),
-    Events.event_data.label("event_data"),
-    Events.time_fired.label("time_fired"),
-    Events.context_id.label("context_id"),
-    Events.context_user_id.label("context_user_id"),
-    Events.context_parent_id.label("context_parent_id"),
-)
 
-STATE_COLUMNS = (
-    States.state_id.label("state_id"),
-    States.state.label("state"),
-    States.entity_id.label("entity_id"),
-    SHARED_ATTRS_JSON["icon"].as_string().label("icon"),
-    OLD_FORMAT_ATTRS_JSON["icon"].as_string().label("old_format_icon"),
-)
+def _events_event_type_column(migrated: bool) -> ColumnElement:
+    """Return the column holding the event_type of the events.
 
-STATE_CONTEXT_ONLY_COLUMNS = (
-    States.state_id.label("state_id"),
-    States.state.label("state"),
-    States.entity_id.label("entity_id"),
-    literal(value=None, type_=sqlalchemy.String).label("icon"),
-    literal(value=None, type_=sqlalchemy.String).label("old_format_icon"),
-)
+    Until the event_types migration is done some events
+    still only have the legacy event_type column set.
+    """
+    return EventTypes.event_type if migrated else LEGACY_EVENTS_EVENT_TYPE
+
+
+def states_entity_id_column(migrated: bool) -> ColumnElement:
+    """Return the column holding the entity_id of the states.
+
+    Until the states_meta migration is done some states
+    still only have the legacy entity_id column set.
+    """
+    return StatesMeta.entity_id if migrated else LEGACY_STATES_ENTITY_ID
+
+
+def _events_time_fired_ts_column(migrated: bool) -> ColumnElement:
+    """Return the column holding the time_fired timestamp of the events.
+
+    Until the timestamp migration is done some events
+    still only have the legacy time_fired column set.
+    """
+    return Events.time_fired_ts if migrated else LEGACY_EVENTS_TIME_FIRED_TS
+
+
+def _states_last_updated_ts_column(migrated: bool) -> ColumnElement:
+    """Return the column holding the last_updated timestamp of the states.
+
+    Until the timestamp migration is done some states
+    still only have the legacy last_updated column set.
+    """
+    return States.last_updated_ts if migrated else LEGACY_STATES_LAST_UPDATED_TS
+
+
+def _states_last_changed_ts_column(migrated: bool) -> ColumnElement:
+    return States.last_changed_ts if migrated else LEGACY_STATES_LAST_CHANGED_TS
+
+
+def _event_columns(migrated: bool) -> tuple[ColumnElement, ...]:
+    return (
+        Events.event_id.label("event_id"),
+        _events_event_type_column(migrated).label("event_type"),
+        Events.event_data.label("event_data"),
+        _events_time_fired_ts_column(migrated).label("time_fired_ts"),
+        Events.context_id_bin.label("context_id_bin"),
+        Events.context_user_id_bin.label("context_user_id_bin"),
+        Events.context_parent_id_bin.label("context_parent_id_bin"),
+    )
+
+
+def _state_columns(migrated: bool) -> tuple[ColumnElement, ...]:
+    return (
+        States.state_id.label("state_id"),
+        States.state.label("state"),
+        states_entity_id_column(migrated).label("entity_id"),
+        SHARED_ATTRS_JSON["icon"].as_string().label("icon"),
+        OLD_FORMAT_ATTRS_JSON["icon"].as_string().label("old_format_icon"),
+    )
+
+
+def _state_context_only_columns(migrated: bool) -> tuple[ColumnElement, ...]:
+    return (
+        States.state_id.label("state_id"),
+        States.state.label("state"),
+        states_entity_id_column(migrated).label("entity_id"),
+        literal(value=None, type_=sqlalchemy.String).label("icon"),
+        literal(value=None, type_=sqlalchemy.String).label("old_format_icon"),
+    )
+
+
+def _event_columns_for_state_select(migrated: bool) -> tuple[ColumnElement, ...]:
+    return (
+        literal(value=None, type_=sqlalchemy.Text).label("event_id"),
+        # We use PSUEDO_EVENT_STATE_CHANGED aka None for
+        # state_changed events since it takes up less
+        # space in the response and every row has to be
+        # marked with the event_type
+        literal(value=PSUEDO_EVENT_STATE_CHANGED, type_=sqlalchemy.String).label(
+            "event_type"
+        ),
+        literal(value=None, type_=sqlalchemy.Text).label("event_data"),
+        _states_last_updated_ts_column(migrated).label("time_fired_ts"),
+        States.context_id_bin.label("context_id_bin"),
+        States.context_user_id_bin.label("context_user_id_bin"),
+        States.context_parent_id_bin.label("context_parent_id_bin"),
+        literal(value=None, type_=sqlalchemy.Text).label("shared_data"),
+    )
 
-EVENT_COLUMNS_FOR_STATE_SELECT = [
-    literal(value=None, type_=sqlalchemy.Text).label("event_id"),
-    # We use PSUEDO_EVENT_STATE_CHANGED aka None for
-    # state_changed events since it takes up less
-    # space in the response and every row has to be
-    # marked with the event_type
-    literal(value=PSUEDO_EVENT_STATE_CHANGED, type_=sqlalchemy.String).label(
-        "event_type"
-    ),
-    literal(value=None, type_=sqlalchemy.Text).label("event_data"),
-    States.last_updated.label("time_fired"),
-    States.context_id.label("context_id"),
-    States.context_user_id.label("context_user_id"),
-    States.context_parent_id.label("context_parent_id"),
-    literal(value=None, type_=sqlalchemy.Text).label("shared_data"),
-]
 
 EMPTY_STATE_COLUMNS = (
     literal(value=0, type_=sqlalchemy.Integer).label("state_id"),
@@ -95,11 +149,13 @@ EMPTY_STATE_COLUMNS = (
 )
 
 
-EVENT_ROWS_NO_STATES = (
-    *EVENT_COLUMNS,
-    EventData.shared_data.label("shared_data"),
-    *EMPTY_STATE_COLUMNS,
-)
+def _event_rows_no_states(migrated: bool) -> tuple[ColumnElement, ...]:
+    return (
+        *_event_columns(migrated),
+        EventData.shared_data.label("shared_data"),
+        *EMPTY_STATE_COLUMNS,
+    )
+
 
 # Virtual column to tell logbook if it should avoid processing
 # the event as its only used to link contexts
@@ -108,86 +164,124 @@ NOT_CONTEXT_ONLY = literal(None).label("context_only")
 
 
 def select_events_context_id_subquery(
-    start_day: dt,
-    end_day: dt,
+    start_day: float,
+    end_day: float,
     event_types: tuple[str, ...],
+    migrated: bool,
 ) -> Select:
     """Generate the select for a context_id subquery."""
     return (
-        select(Events.context_id)
-        .where((Events.time_fired > start_day) & (Events.time_fired < end_day))
-        .where(Events.event_type.in_(event_types))
+        select(Events.context_id_bin)
+        .where(_events_time_fired_matcher(start_day, end_day, migrated))
+        .where(event_type_id_matcher(event_types, migrated))
         .outerjoin(EventData, (Events.data_id == EventData.data_id))
     )
 
 
-def select_events_context_only() -> Select:
+def event_type_id_matcher(event_types: tuple[str, ...], migrated: bool) -> ClauseList:
+    """Match the event_type_ids for the event_types."""
+    matcher = Events.event_type_id.in_(
+        select(EventTypes.event_type_id).where(EventTypes.event_type.in_(event_types))
+    )
+    if migrated:
+        return matcher
+    return matcher | Events.event_type.in_(event_types)
+
+
+def states_metadata_id_matcher(entity_ids: list[str], migrated: bool) -> ClauseList:
+    """Match the metadata_ids for the entity_ids."""
+    matcher = States.metadata_id.in_(
+        select(StatesMeta.metadata_id).where(StatesMeta.entity_id.in_(entity_ids))
+    )
+    if migrated:
+        return matcher
+    return matcher | States.entity_id.in_(entity_ids)
+
+
+def apply_event_types_join(query: Query) -> Query:
+    """Join the event_types table to resolve the event_type of each event."""
+    return query.outerjoin(
+        EventTypes, (Events.event_type_id == EventTypes.event_type_id)
+    )
+
+
+def apply_states_meta_join(query: Query) -> Query:
+    """Join the states_meta table to resolve the entity_id of each state."""
+    return query.outerjoin(StatesMeta, (States.metadata_id == StatesMeta.metadata_id))
+
+
+def select_events_context_only(migrated: bool) -> Select:
     """Generate an events query that mark them as for context_only.
 
     By marking them as context_only we know they are only for
     linking context ids and we can avoid processing them.
     """
-    return select(*EVENT_ROWS_NO_STATES, CONTEXT_ONLY)
+    return select(*_event_rows_no_states(migrated), CONTEXT_ONLY)
 
 
-def select_states_context_only() -> Select:
+def select_states_context_only(migrated: bool) -> Select:
     """Generate an states query that mark them as for context_only.
 
     By marking them as context_only we know they are only for
     linking context ids and we can avoid processing them.
     """
     return select(
-        *EVENT_COLUMNS_FOR_STATE_SELECT, *STATE_CONTEXT_ONLY_COLUMNS, CONTEXT_ONLY
+        *_event_columns_for_state_select(migrated),
+        *_state_context_only_columns(migrated),
+        CONTEXT_ONLY,
     )
 
 
 def select_events_without_states(
-    start_day: dt, end_day: dt, event_types: tuple[str, ...]
+    start_day: float, end_day: float, event_types: tuple[str, ...], migrated: bool
 ) -> Select:
     """Generate an events select that does not join states."""
     return (
-        select(*EVENT_ROWS_NO_STATES, NOT_CONTEXT_ONLY)
-        .where((Events.time_fired > start_day) & (Events.time_fired < end_day))
-        .where(Events.event_type.in_(event_types))
+        select(*_event_rows_no_states(migrated), NOT_CONTEXT_ONLY)
+        .where(_events_time_fired_matcher(start_day, end_day, migrated))
+        .where(event_type_id_matcher(event_types, migrated))
         .outerjoin(EventData, (Events.data_id == EventData.data_id))
+        .outerjoin(EventTypes, (Events.event_type_id == EventTypes.event_type_id))
     )
 
 
-def select_states() -> Select:
+def select_states(migrated: bool) -> Select:
     """Generate a states select that formats the states table as event rows."""
     return select(
-        *EVENT_COLUMNS_FOR_STATE_SELECT,
-        *STATE_COLUMNS,
+        *_event_columns_for_state_select(migrated),
+        *_state_columns(migrated),
         NOT_CONTEXT_ONLY,
     )
 
 
 def legacy_select_events_context_id(
-    start_day: dt, end_day: dt, context_id: str
+    start_day: float, end_day: float, context_id_bin: bytes, migrated: bool
 ) -> Select:
     """Generate a legacy events context id select that also joins states."""
     # This can be removed once we no longer have event_ids in the states table
     return (
         select(
-            *EVENT_COLUMNS,
+            *_event_columns(migrated),
             literal(value=None, type_=sqlalchemy.String).label("shared_data"),
-            *STATE_COLUMNS,
+            *_state_columns(migrated),
             NOT_CONTEXT_ONLY,
         )
         .outerjoin(States, (Events.event_id == States.event_id))
-        .where(
-            (States.last_updated == States.last_changed) | States.last_changed.is_(None)
-        )
-        .where(_not_continuous_entity_matcher())
+        .outerjoin(EventTypes, (Events.event_type_id == EventTypes.event_type_id))
+        .outerjoin(StatesMeta, (States.metadata_id == StatesMeta.metadata_id))
+        .where(_last_updated_matches_last_changed_matcher(migrated))
+        .where(_not_continuous_entity_matcher(migrated))
         .outerjoin(
             StateAttributes, (States.attributes_id == StateAttributes.attributes_id)
         )
-        .where((Events.time_fired > start_day) & (Events.time_fired < end_day))
-        .where(Events.context_id == context_id)
+        .where(_events_time_fired_matcher(start_day, end_day, migrated))
+        .where(Events.context_id_bin == context_id_bin)
     )
 
 
-def apply_states_filters(query: Query, start_day: dt, end_day: dt) -> Query:
+def apply_states_filters(
+    query: Query, start_day: float, end_day: float, migrated: bool
+) -> Query:
     """Filter states by time range.
 
     Filters states that do not have an old state or new state (added / removed)
@@ -195,21 +289,42 @@ def apply_states_filters(query: Query, start_day: dt, end_day: dt) -> Query:
     Filters states that do not have matching last_updated and last_changed.
     """
     return (
-        query.filter(
-            (States.last_updated > start_day) & (States.last_updated < end_day)
-        )
+        query.filter(states_last_updated_matcher(start_day, end_day, migrated))
         .outerjoin(OLD_STATE, (States.old_state_id == OLD_STATE.state_id))
+        .outerjoin(StatesMeta, (States.metadata_id == StatesMeta.metadata_id))
         .where(_missing_state_matcher())
-        .where(_not_continuous_entity_matcher())
-        .where(
-            (States.last_updated == States.last_changed) | States.last_changed.is_(None)
-        )
+        .where(_not_continuous_entity_matcher(migrated))
+        .where(_last_updated_matches_last_changed_matcher(migrated))
         .outerjoin(
             StateAttributes, (States.attributes_id == StateAttributes.attributes_id)
         )
     )
 
 
+def _events_time_fired_matcher(
+    start_day: float, end_day: float, migrated: bool
+) -> ClauseList:
+    """Match the events fired in the time range."""
+    time_fired_ts = _events_time_fired_ts_column(migrated)
+    return (time_fired_ts > start_day) & (time_fired_ts < end_day)
+
+
+def states_last_updated_matcher(
+    start_day: float, end_day: float, migrated: bool
+) -> ClauseList:
+    """Match the states updated in the time range."""
+    last_updated_ts = _states_last_updated_ts_column(migrated)
+    return (last_updated_ts > start_day) & (last_updated_ts < end_day)
+
+
+def _last_updated_matches_last_changed_matcher(migrated: bool) -> ClauseList:
+    """Match the states where the state changed when it was updated."""
+    last_changed_ts = _states_last_changed_ts_column(migrated)
+    return (
+        _states_last_updated_ts_column(migrated) == last_changed_ts
+    ) | last_changed_ts.is_(None)
+
+
 def _missing_state_matcher() -> sqlalchemy.and_:
     # The below removes state change events that do not have
     # and old_state or the old_state is missing (newly added entities)
@@ -221,20 +336,24 @@ def _missing_state_matcher() -> sqlalchemy.and_:
     )
 
 
-def _not_continuous_entity_matcher() -> sqlalchemy.or_:
+def _not_continuous_entity_matcher(migrated: bool) -> sqlalchemy.or_:
     """Match non continuous entities."""
+    entity_id = states_entity_id_column(migrated)
     return sqlalchemy.or_(
         # First exclude domains that may be continuous
-        _not_possible_continuous_domain_matcher(),
+        _not_possible_continuous_domain_matcher(entity_id),
         # But let in the entities in the possible continuous domains
         # that are not actually continuous sensors because they lack a UOM
         sqlalchemy.and_(
-            _conditionally_continuous_domain_matcher, _not_uom_attributes_matcher()
+            _conditionally_continuous_domain_matcher(entity_id),
+            _not_uom_attributes_matcher(),
         ).self_group(),
     )
 
 
-def _not_possible_continuous_domain_matcher() -> sqlalchemy.and_:
+def _not_possible_continuous_domain_matcher(
+    entity_id: ColumnElement,
+) -> sqlalchemy.and_:
     """Match not continuous domains.
 
     This matches domain that are always considered continuous
@@ -243,7 +362,7 @@ def _not_possible_continuous_domain_matcher() -> sqlalchemy.and_:
     """
     return sqlalchemy.and_(
         *[
-            ~States.entity_id.like(entity_domain)
+            ~entity_id.like(entity_domain)
             for entity_domain in (
                 *ALWAYS_CONTINUOUS_ENTITY_ID_LIKE,
                 *CONDITIONALLY_CONTINUOUS_ENTITY_ID_LIKE,
@@ -252,7 +371,9 @@ def _not_possible_continuous_domain_matcher() -> sqlalchemy.and_:
     ).self_group()
 
 
-def _conditionally_continuous_domain_matcher() -> sqlalchemy.or_:
+def _conditionally_continuous_domain_matcher(
+    entity_id: ColumnElement,
+) -> sqlalchemy.or_:
     """Match conditionally continuous domains.
 
     This matches domain that are only considered
@@ -260,7 +381,7 @@ def _conditionally_continuous_domain_matcher() -> sqlalchemy.or_:
     """
     return sqlalchemy.or_(
         *[
-            States.entity_id.like(entity_domain)
+            entity_id.like(entity_domain)
             for entity_domain in CONDITIONALLY_CONTINUOUS_ENTITY_ID_LIKE
         ],
     ).self_group()
@@ -276,12 +397,12 @@ def _not_uom_attributes_matcher() -> ClauseList:
 def apply_states_context_hints(query: Query) -> Query:
     """Force mysql to use the right index on large context_id selects."""
     return query.with_hint(
-        States, f"FORCE INDEX ({STATES_CONTEXT_ID_INDEX})", dialect_name="mysql"
+        States, f"FORCE INDEX ({STATES_CONTEXT_ID_BIN_INDEX})", dialect_name="mysql"
     )
 
 
 def apply_events_context_hints(query: Query) -> Query:
     """Force mysql to use the right index on large context_id selects."""
     return query.with_hint(
-        Events, f"FORCE INDEX ({EVENTS_CONTEXT_ID_INDEX})", dialect_name="mysql"
+        Events, f"FORCE INDEX ({EVENTS_CONTEXT_ID_BIN_INDEX})", dialect_name="mysql"
     )
@@ -2,7 +2,6 @@
 from __future__ import annotations
 
 from collections.abc import Iterable
-from datetime import datetime as dt
 
 import sqlalchemy
 from sqlalchemy import lambda_stmt, select, union_all
@@ -12,7 +11,7 @@ from sqlalchemy.sql.selectable import CTE, CompoundSelect
 
 from homeassistant.components.recorder.db_schema import (
     ENTITY_ID_IN_EVENT,
-    ENTITY_ID_LAST_UPDATED_INDEX,
+    METADATA_ID_LAST_UPDATED_INDEX_TS,
     OLD_ENTITY_ID_IN_EVENT,
     EventData,
     Events,
@@ -20,43 +19,49 @@ from homeassistant.components.recorder.db_schema import (
 )
 
 from .common import (
+    apply_event_types_join,
     apply_events_context_hints,
     apply_states_context_hints,
     apply_states_filters,
+    apply_states_meta_join,
     select_events_context_id_subquery,
     select_events_context_only,
     select_events_without_states,
     select_states,
     select_states_context_only,
+    states_last_updated_matcher,
+    states_metadata_id_matcher,
 )
 
 
 def _select_entities_context_ids_sub_query(
-    start_day: dt,
-    end_day: dt,
+    start_day: float,
+    end_day: float,
     event_types: tuple[str, ...],
     entity_ids: list[str],
     json_quoted_entity_ids: list[str],
+    migrated: bool,
 ) -> CompoundSelect:
     """Generate a subquery to find context ids for multiple entities."""
     union = union_all(
-        select_events_context_id_subquery(start_day, end_day, event_types).where(
-            apply_event_entity_id_matchers(json_quoted_entity_ids)
-        ),
-        apply_entities_hints(select(States.context_id))
-        .filter((States.last_updated > start_day) & (States.last_updated < end_day))
-        .where(States.entity_id.in_(entity_ids)),
+        select_events_context_id_subquery(
+            start_day, end_day, event_types, migrated
+        ).where(apply_event_entity_id_matchers(json_quoted_entity_ids)),
+        apply_entities_hints(select(States.context_id_bin))
+        .filter(states_last_updated_matcher(start_day, end_day, migrated))
+        .where(states_metadata_id_matcher(entity_ids, migrated)),
     )
-    return select(union.c.context_id).group_by(union.c.context_id)
+    return select(union.c.context_id_bin).group_by(union.c.context_id_bin)
 
 
 def _apply_entities_context_union(
     query: Query,
-    start_day: dt,
-    end_day: dt,
+    start_day: float,
+    end_day: float,
     event_types: tuple[str, ...],
     entity_ids: list[str],
     json_quoted_entity_ids: list[str],
+    migrated: bool,
 ) -> CompoundSelect:
     """Generate a CTE to find the entity and device context ids and a query to find linked row."""
     entities_cte: CTE = _select_entities_context_ids_sub_query(
@@ -65,6 +70,7 @@ def _apply_entities_context_union(
         event_types,
         entity_ids,
         json_quoted_entity_ids,
+        migrated,
     ).cte()
     # We used to optimize this to exclude rows we already in the union with
     # a States.entity_id.not_in(entity_ids) but that made the
@@ -72,49 +78,60 @@ def _apply_entities_context_union(
     # in the python code anyways since they will have context_only
     # set on them the impact is minimal.
     return query.union_all(
-        states_query_for_entity_ids(start_day, end_day, entity_ids),
-        apply_events_context_hints(
-            select_events_context_only()
-            .select_from(entities_cte)
-            .outerjoin(Events, entities_cte.c.context_id == Events.context_id)
-        ).outerjoin(EventData, (Events.data_id == EventData.data_id)),
-        apply_states_context_hints(
-            select_states_context_only()
-            .select_from(entities_cte)
-            .outerjoin(States, entities_cte.c.context_id == States.context_id)
+        states_query_for_entity_ids(start_day, end_day, entity_ids, migrated),
+        apply_event_types_join(
+            apply_events_context_hints(
+                select_events_context_only(migrated)
+                .select_from(entities_cte)
+                .outerjoin(
+                    Events, entities_cte.c.context_id_bin == Events.context_id_bin
+                )
+            ).outerjoin(EventData, (Events.data_id == EventData.data_id))
+        ),
+        apply_states_meta_join(
+            apply_states_context_hints(
+                select_states_context_only(migrated)
+                .select_from(entities_cte)
+                .outerjoin(
+                    States, entities_cte.c.context_id_bin == States.context_id_bin
+                )
+            )
         ),
     )
 
 
 def entities_stmt(
-    start_day: dt,
-    end_day: dt,
+    start_day: float,
+    end_day: float,
     event_types: tuple[str, ...],
     entity_ids: list[str],
     json_quoted_entity_ids: list[str],
+    migrated: bool = True,
 ) -> StatementLambdaElement:
     """Generate a logbook query for multiple entities."""
     return lambda_stmt(
         lambda: _apply_entities_context_union(
-            select_events_without_states(start_day, end_day, event_types).where(
-                apply_event_entity_id_matchers(json_quoted_entity_ids)
-            ),
+            select_events_without_states(
+                start_day, end_day, event_types, migrated
+            ).where(apply_event_entity_id_matchers(json_quoted_entity_ids)),
             start_day,
             end_day,
             event_types,
             entity_ids,
             json_quoted_entity_ids,
-        ).order_by(Events.time_fired)
+            migrated,
+        ).order_by(Events.time_fired_ts),
+        track_on=[migrated],
     )
 
 
 def states_query_for_entity_ids(
-    start_day: dt, end_day: dt, entity_ids: list[str]
+    start_day: float, end_day: float, entity_ids: list[str], migrated: bool
 ) -> Query:
     """Generate a select for states from the States table for specific entities."""
     return apply_states_filters(
-        apply_entities_hints(select_states()), start_day, end_day
-    ).where(States.entity_id.in_(entity_ids))
+        apply_entities_hints(select_states(migrated)), start_day, end_day, migrated
+    ).where(states_metadata_id_matcher(entity_ids, migrated))
 
 
 def apply_event_entity_id_matchers(
@@ -136,5 +153,7 @@ def apply_event_entity_id_matchers(
 def apply_entities_hints(query: Query) -> Query:
     """Force mysql to use the right index on large selects."""
     return query.with_hint(
-        States, f"FORCE INDEX ({ENTITY_ID_LAST_UPDATED_INDEX})", dialect_name="mysql"
+        States,
+        f"FORCE INDEX ({METADATA_ID_LAST_UPDATED_INDEX_TS})",
+        dialect_name="mysql",
     )
@@ -2,7 +2,6 @@
 from __future__ import annotations
 
 from collections.abc import Iterable
-from datetime import datetime as dt
 
 import sqlalchemy
 from sqlalchemy import lambda_stmt, select, union_all
@@ -13,12 +12,16 @@ from sqlalchemy.sql.selectable import CTE, CompoundSelect
 from homeassistant.components.recorder.db_schema import EventData, Events, States
 
 from .common import (
+    apply_event_types_join,
     apply_events_context_hints,
     apply_states_context_hints,
+    apply_states_meta_join,
     select_events_context_id_subquery,
     select_events_context_only,
     select_events_without_states,
     select_states_context_only,
+    states_last_updated_matcher,
+    states_metadata_id_matcher,
 )
 from .devices import apply_event_device_id_matchers
 from .entities import (
@@ -29,35 +32,39 @@ from .entities import (
 
 
 def _select_entities_device_id_context_ids_sub_query(
-    start_day: dt,
-    end_day: dt,
+    start_day: float,
+    end_day: float,
     event_types: tuple[str, ...],
     entity_ids: list[str],
     json_quoted_entity_ids: list[str],
     json_quoted_device_ids: list[str],
+    migrated: bool,
 ) -> CompoundSelect:
     """Generate a subquery to find context ids for multiple entities and multiple devices."""
     union = union_all(
-        select_events_context_id_subquery(start_day, end_day, event_types).where(
+        select_events_context_id_subquery(
+            start_day, end_day, event_types, migrated
+        ).where(
             _apply_event_entity_id_device_id_matchers(
                 json_quoted_entity_ids, json_quoted_device_ids
             )
         ),
-        apply_entities_hints(select(States.context_id))
-        .filter((States.last_updated > start_day) & (States.last_updated < end_day))
-        .where(States.entity_id.in_(entity_ids)),
+        apply_entities_hints(select(States.context_id_bin))
+        .filter(states_last_updated_matcher(start_day, end_day, migrated))
+        .where(states_metadata_id_matcher(entity_ids, migrated)),
     )
-    return select(union.c.context_id).group_by(union.c.context_id)
+    return select(union.c.context_id_bin).group_by(union.c.context_id_bin)
 
 
 def _apply_entities_devices_context_union(
     query: Query,
-    start_day: dt,
-    end_day: dt,
+    start_day: float,
+    end_day: float,
     event_types: tuple[str, ...],
     entity_ids: list[str],
     json_quoted_entity_ids: list[str],
     json_quoted_device_ids: list[str],
+    migrated: bool,
 ) -> CompoundSelect:
     devices_entities_cte: CTE = _select_entities_device_id_context_ids_sub_query(
         start_day,
@@ -66,6 +73,7 @@ def _apply_entities_devices_context_union(
         entity_ids,
         json_quoted_entity_ids,
         json_quoted_device_ids,
+        migrated,
     ).cte()
     # We used to optimize this to exclude rows we already in the union with
     # a States.entity_id.not_in(entity_ids) but that made the
@@ -73,32 +81,45 @@ def _apply_entities_devices_context_union(
     # in the python code anyways since they will have context_only
     # set on them the impact is minimal.
     return query.union_all(
-        states_query_for_entity_ids(start_day, end_day, entity_ids),
-        apply_events_context_hints(
-            select_events_context_only()
-            .select_from(devices_entities_cte)
-            .outerjoin(Events, devices_entities_cte.c.context_id == Events.context_id)
-        ).outerjoin(EventData, (Events.data_id == EventData.data_id)),
-        apply_states_context_hints(
-            select_states_context_only()
-            .select_from(devices_entities_cte)
-            .outerjoin(States, devices_entities_cte.c.context_id == States.context_id)
+        states_query_for_entity_ids(start_day, end_day, entity_ids, migrated),
+        apply_event_types_join(
+            apply_events_context_hints(
+                select_events_context_only(migrated)
+                .select_from(devices_entities_cte)
+                .outerjoin(
+                    Events,
+                    devices_entities_cte.c.context_id_bin == Events.context_id_bin,
+                )
+            ).outerjoin(EventData, (Events.data_id == EventData.data_id))
+        ),
+        apply_states_meta_join(
+            apply_states_context_hints(
+                select_states_context_only(migrated)
+                .select_from(devices_entities_cte)
+                .outerjoin(
+                    States,
+                    devices_entities_cte.c.context_id_bin == States.context_id_bin,
+                )
+            )
         ),
     )
 
 
 def entities_devices_stmt(
-    start_day: dt,
-    end_day: dt,
+    start_day: float,
+    end_day: float,
     event_types: tuple[str, ...],
     entity_ids: list[str],
     json_quoted_entity_ids: list[str],
     json_quoted_device_ids: list[str],
+    migrated: bool = True,
 ) -> StatementLambdaElement:
     """Generate a logbook query for multiple entities."""
     stmt = lambda_stmt(
         lambda: _apply_entities_devices_context_union(
-            select_events_without_states(start_day, end_day, event_types).where(
+            select_events_without_states(
+                start_day, end_day, event_types, migrated
+            ).where(
                 _apply_event_entity_id_device_id_matchers(
                     json_quoted_entity_ids, json_quoted_device_ids
                 )
@@ -109,7 +130,9 @@ def entities_devices_stmt(
             entity_ids,
             json_quoted_entity_ids,
             json_quoted_device_ids,
-        ).order_by(Events.time_fired)
+            migrated,
+        ).order_by(Events.time_fired_ts),
+        track_on=[migrated],
     )
     return stmt
 
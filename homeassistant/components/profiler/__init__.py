@@ -12,12 +12,15 @@ from typing import Any, cast
 import voluptuous as vol
 
 from homeassistant.components import persistent_notification
+from homeassistant.components.websocket_api.http import async_get_write_queue_stats
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_SCAN_INTERVAL, CONF_TYPE
 from homeassistant.core import HomeAssistant, ServiceCall
 import homeassistant.helpers.config_validation as cv
+from homeassistant.helpers.entity_platform import async_get_polling_scheduler
 from homeassistant.helpers.event import async_track_time_interval
 from homeassistant.helpers.service import async_register_admin_service
+from homeassistant.helpers.template import compiled_template_cache_info
 
 from .const import DOMAIN
 
@@ -28,6 +31,9 @@ SERVICE_STOP_LOG_OBJECTS = "stop_log_objects"
 SERVICE_DUMP_LOG_OBJECTS = "dump_log_objects"
 SERVICE_LOG_THREAD_FRAMES = "log_thread_frames"
 SERVICE_LOG_EVENT_LOOP_SCHEDULED = "log_event_loop_scheduled"
+SERVICE_LOG_TEMPLATE_CACHE = "log_template_cache"
+SERVICE_LOG_POLLING_LATENCY = "log_polling_latency"
+SERVICE_LOG_WEBSOCKET_QUEUES = "log_websocket_queues"
 
 
 SERVICES = (
@@ -38,6 +44,9 @@ SERVICES = (
     SERVICE_DUMP_LOG_OBJECTS,
     SERVICE_LOG_THREAD_FRAMES,
     SERVICE_LOG_EVENT_LOOP_SCHEDULED,
+    SERVICE_LOG_TEMPLATE_CACHE,
+    SERVICE_LOG_POLLING_LATENCY,
+    SERVICE_LOG_WEBSOCKET_QUEUES,
 )
 
 DEFAULT_SCAN_INTERVAL = timedelta(seconds=30)
@@ -146,6 +155,21 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
             arepr.maxstring = original_maxstring
             arepr.maxother = original_maxother
 
+    async def _async_log_template_cache(call: ServiceCall) -> None:
+        """Log the statistics of the compiled template cache."""
+        _LOGGER.critical("Compiled template cache: %s", compiled_template_cache_info())
+
+    async def _async_log_polling_latency(call: ServiceCall) -> None:
+        """Log the update latency histograms of the polled platforms."""
+        latencies = async_get_polling_scheduler(hass).async_latencies()
+        for platform, histogram in latencies.items():
+            _LOGGER.critical("Polling latency of %s: %s", platform, histogram)
+
+    async def _async_log_websocket_queues(call: ServiceCall) -> None:
+        """Log the write queues of the websocket connections."""
+        for connid, stats in async_get_write_queue_stats(hass).items():
+            _LOGGER.critical("Websocket write queue of %s: %s", connid, stats)
+
     async_register_admin_service(
         hass,
         DOMAIN,
@@ -209,6 +233,27 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         _async_dump_scheduled,
     )
 
+    async_register_admin_service(
+        hass,
+        DOMAIN,
+        SERVICE_LOG_TEMPLATE_CACHE,
+        _async_log_template_cache,
+    )
+
+    async_register_admin_service(
+        hass,
+        DOMAIN,
+        SERVICE_LOG_POLLING_LATENCY,
+        _async_log_polling_latency,
+    )
+
+    async_register_admin_service(
+        hass,
+        DOMAIN,
+        SERVICE_LOG_WEBSOCKET_QUEUES,
+        _async_log_websocket_queues,
+    )
+
     return True
 
 
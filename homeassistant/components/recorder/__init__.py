@@ -28,7 +28,7 @@ from .const import (
     EXCLUDE_ATTRIBUTES,
     SQLITE_URL_PREFIX,
 )
-from .core import Recorder
+from .core import EVENT_DATA_ID_CACHE_SIZE, STATE_ATTRIBUTES_ID_CACHE_SIZE, Recorder
 from .services import async_register_services
 from .tasks import AddRecorderPlatformTask
 from .util import get_instance
@@ -41,17 +41,27 @@ DEFAULT_DB_FILE = "home-assistant_v2.db"
 DEFAULT_DB_INTEGRITY_CHECK = True
 DEFAULT_DB_MAX_RETRIES = 10
 DEFAULT_DB_RETRY_WAIT = 3
+DEFAULT_DB_READ_POOL_SIZE = 2
 DEFAULT_COMMIT_INTERVAL = 1
+DEFAULT_BULK_INSERT = False
+DEFAULT_VERIFY_STATISTICS = False
+DEFAULT_STATISTICS_ROLLUPS = False
 
 CONF_AUTO_PURGE = "auto_purge"
 CONF_AUTO_REPACK = "auto_repack"
 CONF_DB_URL = "db_url"
 CONF_DB_MAX_RETRIES = "db_max_retries"
 CONF_DB_RETRY_WAIT = "db_retry_wait"
+CONF_DB_READ_POOL_SIZE = "db_read_pool_size"
 CONF_PURGE_KEEP_DAYS = "purge_keep_days"
 CONF_PURGE_INTERVAL = "purge_interval"
 CONF_EVENT_TYPES = "event_types"
 CONF_COMMIT_INTERVAL = "commit_interval"
+CONF_BULK_INSERT = "bulk_insert"
+CONF_STATE_ATTRIBUTES_CACHE_SIZE = "state_attributes_cache_size"
+CONF_EVENT_DATA_CACHE_SIZE = "event_data_cache_size"
+CONF_VERIFY_STATISTICS = "verify_statistics"
+CONF_STATISTICS_ROLLUPS = "statistics_rollups"
 
 
 EXCLUDE_SCHEMA = INCLUDE_EXCLUDE_FILTER_SCHEMA_INNER.extend(
@@ -92,15 +102,34 @@ CONFIG_SCHEMA = vol.Schema(
                     vol.Optional(
                         CONF_COMMIT_INTERVAL, default=DEFAULT_COMMIT_INTERVAL
                     ): cv.positive_int,
+                    vol.Optional(
+                        CONF_BULK_INSERT, default=DEFAULT_BULK_INSERT
+                    ): cv.boolean,
+                    vol.Optional(
+                        CONF_STATE_ATTRIBUTES_CACHE_SIZE,
+                        default=STATE_ATTRIBUTES_ID_CACHE_SIZE,
+                    ): vol.All(vol.Coerce(int), vol.Range(min=1)),
+                    vol.Optional(
+                        CONF_EVENT_DATA_CACHE_SIZE, default=EVENT_DATA_ID_CACHE_SIZE
+                    ): vol.All(vol.Coerce(int), vol.Range(min=1)),
                     vol.Optional(
                         CONF_DB_MAX_RETRIES, default=DEFAULT_DB_MAX_RETRIES
                     ): cv.positive_int,
                     vol.Optional(
                         CONF_DB_RETRY_WAIT, default=DEFAULT_DB_RETRY_WAIT
                     ): cv.positive_int,
+                    vol.Optional(
+                        CONF_DB_READ_POOL_SIZE, default=DEFAULT_DB_READ_POOL_SIZE
+                    ): cv.positive_int,
                     vol.Optional(
                         CONF_DB_INTEGRITY_CHECK, default=DEFAULT_DB_INTEGRITY_CHECK
                     ): cv.boolean,
+                    vol.Optional(
+                        CONF_VERIFY_STATISTICS, default=DEFAULT_VERIFY_STATISTICS
+                    ): cv.boolean,
+                    vol.Optional(
+                        CONF_STATISTICS_ROLLUPS, default=DEFAULT_STATISTICS_ROLLUPS
+                    ): cv.boolean,
                 }
             ),
         )
@@ -131,8 +160,14 @@ async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
     auto_repack = conf[CONF_AUTO_REPACK]
     keep_days = conf[CONF_PURGE_KEEP_DAYS]
     commit_interval = conf[CONF_COMMIT_INTERVAL]
+    bulk_insert = conf[CONF_BULK_INSERT]
+    state_attributes_cache_size = conf[CONF_STATE_ATTRIBUTES_CACHE_SIZE]
+    event_data_cache_size = conf[CONF_EVENT_DATA_CACHE_SIZE]
     db_max_retries = conf[CONF_DB_MAX_RETRIES]
     db_retry_wait = conf[CONF_DB_RETRY_WAIT]
+    db_read_pool_size = conf[CONF_DB_READ_POOL_SIZE]
+    verify_statistics = conf[CONF_VERIFY_STATISTICS]
+    statistics_rollups = conf[CONF_STATISTICS_ROLLUPS]
     db_url = conf.get(CONF_DB_URL) or DEFAULT_URL.format(
         hass_config_path=hass.config.path(DEFAULT_DB_FILE)
     )
@@ -155,6 +190,12 @@ async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
         entity_filter=entity_filter,
         exclude_t=exclude_t,
         exclude_attributes_by_domain=exclude_attributes_by_domain,
+        bulk_insert=bulk_insert,
+        state_attributes_cache_size=state_attributes_cache_size,
+        event_data_cache_size=event_data_cache_size,
+        db_read_pool_size=db_read_pool_size,
+        verify_statistics=verify_statistics,
+        statistics_rollups=statistics_rollups,
     )
     instance.async_initialize()
     instance.async_register()
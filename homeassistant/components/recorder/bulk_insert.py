@@ -0,0 +1,233 @@
+"""Bulk insert write path for the recorder.
+
+The default write path creates an ORM object for every event and state
+and relies on the session's unit of work to flush them. The bulk insert
+write path accumulates plain rows between commits instead and writes
+them with core insert statements, which avoids most of the per object
+overhead of the ORM.
+"""
+from __future__ import annotations
+
+from typing import Any
+
+from sqlalchemy import Column, func, insert, select
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm.session import Session
+
+from .db_schema import (
+    EventData,
+    Events,
+    EventTypes,
+    StateAttributes,
+    States,
+    StatesMeta,
+)
+
+EVENTS_INSERT = insert(Events)
+EVENT_DATA_INSERT = insert(EventData)
+EVENT_TYPES_INSERT = insert(EventTypes)
+STATES_INSERT = insert(States)
+STATE_ATTRIBUTES_INSERT = insert(StateAttributes)
+STATES_META_INSERT = insert(StatesMeta)
+
+
+class PendingState:
+    """A states row waiting to be inserted at the next commit.
+
+    Mirrors the parts of the States model the recorder relies on to
+    chain old_state_id; state_id is only set once the row is committed.
+    """
+
+    __slots__ = ("row", "state_id", "old_state", "entity_id", "shared_attrs")
+
+    def __init__(self, row: dict[str, Any]) -> None:
+        """Init the pending state."""
+        self.row = row
+        self.state_id: int | None = None
+        # Set when the previous state of the entity is in the same commit
+        self.old_state: PendingState | None = None
+        # Set when the states_meta row is in the same commit
+        self.entity_id: str | None = None
+        # Set when the state_attributes row is in the same commit
+        self.shared_attrs: str | None = None
+
+
+class BulkInserter:
+    """Accumulate rows between commits and insert them in bulk."""
+
+    def __init__(self) -> None:
+        """Init the bulk inserter."""
+        self.states: list[PendingState] = []
+        # event row, pending event_type, pending shared_data
+        self.events: list[tuple[dict[str, Any], str | None, str | None]] = []
+        # shared_attrs -> hash
+        self.state_attributes: dict[str, int] = {}
+        # shared_data -> hash
+        self.event_data: dict[str, int] = {}
+        self.states_meta: set[str] = set()
+        self.event_types: set[str] = set()
+        # Ids assigned by the last write, loaded into
+        # the recorder's id caches once it is committed
+        self.attributes_ids: dict[str, int] = {}
+        self.data_ids: dict[str, int] = {}
+        self.metadata_ids: dict[str, int] = {}
+        self.event_type_ids: dict[str, int] = {}
+        self._state_ids: list[int] = []
+
+    @property
+    def has_pending_writes(self) -> bool:
+        """Return if there are rows waiting to be written."""
+        return bool(self.states or self.events)
+
+    def clear(self) -> None:
+        """Drop all pending rows."""
+        self._clear_pending()
+        self.attributes_ids = {}
+        self.data_ids = {}
+        self.metadata_ids = {}
+        self.event_type_ids = {}
+
+    def _clear_pending(self) -> None:
+        """Clear the rows waiting to be written."""
+        self.states = []
+        self.events = []
+        self.state_attributes = {}
+        self.event_data = {}
+        self.states_meta = set()
+        self.event_types = set()
+        self._state_ids = []
+
+    def write(self, session: Session) -> None:
+        """Insert all pending rows using the connection of the session.
+
+        The ids are only assigned to the pending states once the
+        transaction is committed and mark_committed is called so this
+        can be retried after a rollback.
+        """
+        conn = session.connection()
+        self.metadata_ids = _insert_many_by_key(
+            conn,
+            StatesMeta.metadata_id,
+            STATES_META_INSERT,
+            {entity_id: {"entity_id": entity_id} for entity_id in self.states_meta},
+        )
+        self.event_type_ids = _insert_many_by_key(
+            conn,
+            EventTypes.event_type_id,
+            EVENT_TYPES_INSERT,
+            {event_type: {"event_type": event_type} for event_type in self.event_types},
+        )
+        self.attributes_ids = _insert_many_by_key(
+            conn,
+            StateAttributes.attributes_id,
+            STATE_ATTRIBUTES_INSERT,
+            {
+                shared_attrs: {"shared_attrs": shared_attrs, "hash": attr_hash}
+                for shared_attrs, attr_hash in self.state_attributes.items()
+            },
+        )
+        self.data_ids = _insert_many_by_key(
+            conn,
+            EventData.data_id,
+            EVENT_DATA_INSERT,
+            {
+                shared_data: {"shared_data": shared_data, "hash": data_hash}
+                for shared_data, data_hash in self.event_data.items()
+            },
+        )
+
+        if self.events:
+            event_rows: list[dict[str, Any]] = []
+            for row, event_type, shared_data in self.events:
+                if event_type is not None:
+                    row["event_type_id"] = self.event_type_ids[event_type]
+                if shared_data is not None:
+                    row["data_id"] = self.data_ids[shared_data]
+                event_rows.append(row)
+            conn.execute(EVENTS_INSERT, event_rows)
+
+        # A state can only be inserted once the state_id of the previous
+        # state of the same entity is known, so the states are split into
+        # generations by how many earlier states of the entity are in this
+        # commit and each generation is inserted with a single executemany.
+        generations: list[list[PendingState]] = []
+        depths: dict[int, int] = {}
+        for pending in self.states:
+            depth = 0
+            if (old_state := pending.old_state) is not None:
+                depth = depths[id(old_state)] + 1
+            depths[id(pending)] = depth
+            if depth == len(generations):
+                generations.append([])
+            generations[depth].append(pending)
+
+        state_ids: dict[int, int] = {}
+        for generation in generations:
+            rows: list[dict[str, Any]] = []
+            for pending in generation:
+                row = pending.row
+                if pending.entity_id is not None:
+                    row["metadata_id"] = self.metadata_ids[pending.entity_id]
+                if pending.shared_attrs is not None:
+                    row["attributes_id"] = self.attributes_ids[pending.shared_attrs]
+                if (old_state := pending.old_state) is not None:
+                    row["old_state_id"] = state_ids[id(old_state)]
+                rows.append(row)
+            for pending, state_id in zip(
+                generation, _insert_many(conn, States.state_id, STATES_INSERT, rows)
+            ):
+                state_ids[id(pending)] = state_id
+        self._state_ids = [state_ids[id(pending)] for pending in self.states]
+
+    def mark_committed(self) -> None:
+        """Assign the state_ids of the committed rows and clear pending rows."""
+        for pending, state_id in zip(self.states, self._state_ids):
+            pending.state_id = state_id
+            pending.old_state = None
+        self._clear_pending()
+
+
+def _insert_one(conn: Connection, stmt: Any, row: dict[str, Any]) -> int:
+    """Insert a single row and return its primary key.
+
+    Dialects that support it (PostgreSQL) use INSERT ... RETURNING,
+    the others use the cursor lastrowid.
+    """
+    return int(conn.execute(stmt, row).inserted_primary_key[0])
+
+
+def _insert_many(
+    conn: Connection, primary_key: Column, stmt: Any, rows: list[dict[str, Any]]
+) -> list[int]:
+    """Insert rows with a single executemany and return their primary keys.
+
+    The recorder is the only writer so the new rows are the ones with
+    a primary key above the highest one before the insert, and they are
+    assigned in insertion order, which lets the keys be selected back
+    by range instead of inserting the rows one by one.
+    """
+    if not rows:
+        return []
+    if len(rows) == 1:
+        return [_insert_one(conn, stmt, rows[0])]
+    max_id = conn.execute(select(func.max(primary_key))).scalar() or 0
+    conn.execute(stmt, rows)
+    ids = [
+        int(row_id)
+        for row_id in conn.execute(
+            select(primary_key).where(primary_key > max_id).order_by(primary_key)
+        ).scalars()
+    ]
+    if len(ids) != len(rows):
+        raise RuntimeError(
+            f"Expected {len(rows)} new rows in {primary_key.table.name}"
+            f" but found {len(ids)}"
+        )
+    return ids
+
+
+def _insert_many_by_key(
+    conn: Connection, primary_key: Column, stmt: Any, rows: dict[str, dict[str, Any]]
+) -> dict[str, int]:
+    """Insert the rows keyed by their unique value and map it to the primary key."""
+    return dict(zip(rows, _insert_many(conn, primary_key, stmt, list(rows.values()))))
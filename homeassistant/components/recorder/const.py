@@ -23,7 +23,16 @@ MAX_QUEUE_BACKLOG = 40000
 # have upgraded their sqlite version
 MAX_ROWS_TO_PURGE = 998
 
+# The maximum number of rows we convert in one batch
+# during a live migration of existing rows
+MAX_ROWS_TO_MIGRATE = 998
+
+# The maximum number of ids we look up in one select,
+# limited by the same sqlite3 bind variable limit
+MAX_IDS_TO_SELECT = 998
+
 DB_WORKER_PREFIX = "DbWorker"
+DB_READER_PREFIX = "DbReader"
 
 ALL_DOMAIN_EXCLUDE_ATTRS = {ATTR_ATTRIBUTION, ATTR_RESTORED, ATTR_SUPPORTED_FEATURES}
 
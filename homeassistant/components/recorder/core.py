@@ -42,10 +42,13 @@ from homeassistant.helpers.typing import UNDEFINED, UndefinedType
 import homeassistant.util.dt as dt_util
 
 from . import migration, statistics
+from .bulk_insert import BulkInserter, PendingState
 from .const import (
+    DB_READER_PREFIX,
     DB_WORKER_PREFIX,
     DOMAIN,
     KEEPALIVE_TIME,
+    MAX_IDS_TO_SELECT,
     MAX_QUEUE_BACKLOG,
     MYSQLDB_URL_PREFIX,
     SQLITE_URL_PREFIX,
@@ -56,11 +59,14 @@ from .db_schema import (
     Base,
     EventData,
     Events,
+    EventTypes,
     StateAttributes,
     States,
+    StatesMeta,
     StatisticsRuns,
 )
 from .executor import DBInterruptibleThreadPoolExecutor
+from .id_cache import IdCache
 from .models import (
     StatisticData,
     StatisticMetaData,
@@ -68,19 +74,35 @@ from .models import (
     process_timestamp,
 )
 from .pool import POOL_SIZE, MutexPool, RecorderPool
-from .queries import find_shared_attributes_id, find_shared_data_id
+from .queries import (
+    find_event_type_ids,
+    find_recent_states_attributes_ids,
+    find_shared_attributes,
+    find_shared_attributes_id,
+    find_shared_data_id,
+    find_states_metadata_ids,
+)
 from .run_history import RunHistory
+from .statistics_buffer import HourlyStatisticsBuffer, StatesBuffer
 from .tasks import (
     AdjustStatisticsTask,
     ClearStatisticsTask,
     CommitTask,
+    CompileMissingRollupsTask,
     DatabaseLockTask,
+    EntityIDMigrationTask,
+    EventsContextIDMigrationTask,
+    EventsTimestampMigrationTask,
     EventTask,
+    EventTypeIDMigrationTask,
     ImportStatisticsTask,
     KeepAliveTask,
     PerodicCleanupTask,
+    PrewarmStateAttributesIDsTask,
     PurgeTask,
     RecorderTask,
+    StatesContextIDMigrationTask,
+    StatesTimestampMigrationTask,
     StatisticsTask,
     StopTask,
     SynchronizeTask,
@@ -91,6 +113,7 @@ from .util import (
     build_mysqldb_conv,
     dburl_to_path,
     end_incomplete_runs,
+    execute_on_connection,
     is_second_sunday,
     move_away_broken_database,
     session_scope,
@@ -118,6 +141,17 @@ EXPIRE_AFTER_COMMITS = 120
 STATE_ATTRIBUTES_ID_CACHE_SIZE = 2048
 EVENT_DATA_ID_CACHE_SIZE = 2048
 
+# How far back to look for recently used attribute ids
+# to load into the cache when the recorder starts
+STATE_ATTRIBUTES_PREWARM_WINDOW = timedelta(hours=1)
+
+# The number of entity_id and event_type ids to cache in memory
+#
+# Based on the number of entities and event types
+# a large install will have
+STATES_META_ID_CACHE_SIZE = 8192
+EVENT_TYPE_ID_CACHE_SIZE = 2048
+
 SHUTDOWN_TASK = object()
 
 COMMIT_TASK = CommitTask()
@@ -153,6 +187,12 @@ class Recorder(threading.Thread):
         entity_filter: Callable[[str], bool],
         exclude_t: list[str],
         exclude_attributes_by_domain: dict[str, set[str]],
+        bulk_insert: bool,
+        state_attributes_cache_size: int,
+        event_data_cache_size: int,
+        db_read_pool_size: int,
+        verify_statistics: bool,
+        statistics_rollups: bool,
     ) -> None:
         """Initialize the recorder."""
         threading.Thread.__init__(self, name="Recorder")
@@ -167,6 +207,7 @@ class Recorder(threading.Thread):
         self.db_url = uri
         self.db_max_retries = db_max_retries
         self.db_retry_wait = db_retry_wait
+        self.db_read_pool_size = db_read_pool_size
         self.engine_version: AwesomeVersion | None = None
         # Database connection is ready, but non-live migration may be in progress
         db_connected: asyncio.Future[bool] = hass.data[DOMAIN].db_connected
@@ -178,26 +219,57 @@ class Recorder(threading.Thread):
         self._queue_watch = threading.Event()
         self.engine: Engine | None = None
         self.run_history = RunHistory()
+        # Recent sensor states and short-term statistics, so
+        # compiling statistics does not have to query them
+        self.statistics_states = StatesBuffer(self.run_history.recording_start)
+        self.hourly_statistics = HourlyStatisticsBuffer()
+        # When set, the statistics compiled from the buffers
+        # are compared with the ones compiled from the database
+        self.verify_statistics = verify_statistics
+        # When set, the days and months of long term statistics are
+        # rolled up so daily and monthly statistics are not reduced
+        # from the hourly statistics every time they are read
+        self.statistics_rollups = statistics_rollups
 
         self.entity_filter = entity_filter
         self.exclude_t = exclude_t
 
         self.schema_version = 0
         self._commits_without_expire = 0
-        self._old_states: dict[str, States] = {}
-        self._state_attributes_ids: LRU = LRU(STATE_ATTRIBUTES_ID_CACHE_SIZE)
-        self._event_data_ids: LRU = LRU(EVENT_DATA_ID_CACHE_SIZE)
+        self._old_states: dict[str, States | PendingState] = {}
+        self._state_attributes_ids = IdCache(state_attributes_cache_size)
+        self._event_data_ids = IdCache(event_data_cache_size)
+        self._states_meta_ids: LRU = LRU(STATES_META_ID_CACHE_SIZE)
+        self._event_type_ids: LRU = LRU(EVENT_TYPE_ID_CACHE_SIZE)
         self._pending_state_attributes: dict[str, StateAttributes] = {}
         self._pending_event_data: dict[str, EventData] = {}
+        self._pending_states_meta: dict[str, StatesMeta] = {}
+        self._pending_event_types: dict[str, EventTypes] = {}
         self._pending_expunge: list[States] = []
+        # When set, events and states are written as plain rows
+        # instead of through the ORM unit of work
+        self._bulk_inserter: BulkInserter | None = (
+            BulkInserter() if bulk_insert else None
+        )
         self.event_session: Session | None = None
         self._get_session: Callable[[], Session] | None = None
         self._completed_first_database_setup: bool | None = None
         self.async_migration_event = asyncio.Event()
         self.migration_in_progress = False
         self.migration_is_live = False
+        # Set by the background migrations once no rows use the
+        # legacy entity_id and event_type columns anymore
+        self.states_meta_migrated = False
+        self.event_types_migrated = False
+        # Set by the background migrations once no rows use the
+        # legacy last_updated and time_fired datetime columns anymore
+        self.states_timestamps_migrated = False
+        self.events_timestamps_migrated = False
         self._database_lock_task: DatabaseLockTask | None = None
         self._db_executor: DBInterruptibleThreadPoolExecutor | None = None
+        self._db_read_executor: DBInterruptibleThreadPoolExecutor | None = None
+        # Jobs added to the read executor that have not finished yet
+        self.read_backlog = 0
         self._exclude_attributes_by_domain = exclude_attributes_by_domain
 
         self._event_listener: CALLBACK_TYPE | None = None
@@ -213,6 +285,14 @@ class Recorder(threading.Thread):
         """Return the number of items in the recorder backlog."""
         return self._queue.qsize()
 
+    @property
+    def id_cache_stats(self) -> dict[str, dict[str, int]]:
+        """Return the size and counters of the attributes and data id caches."""
+        return {
+            "state_attributes": self._state_attributes_ids.stats(),
+            "event_data": self._event_data_ids.stats(),
+        }
+
     @property
     def dialect_name(self) -> SupportedDialect | None:
         """Return the dialect the recorder uses."""
@@ -254,6 +334,12 @@ class Recorder(threading.Thread):
             max_workers=MAX_DB_EXECUTOR_WORKERS,
             shutdown_hook=self._shutdown_pool,
         )
+        if self.db_read_pool_size:
+            self._db_read_executor = DBInterruptibleThreadPoolExecutor(
+                thread_name_prefix=DB_READER_PREFIX,
+                max_workers=self.db_read_pool_size,
+                shutdown_hook=self._shutdown_pool,
+            )
 
     def _shutdown_pool(self) -> None:
         """Close the dbpool connections in the current thread."""
@@ -295,8 +381,33 @@ class Recorder(threading.Thread):
         """Add an executor job from within the event loop."""
         return self.hass.loop.run_in_executor(self._db_executor, target, *args)
 
+    @callback
+    def async_add_read_executor_job(
+        self, target: Callable[..., T], *args: Any
+    ) -> asyncio.Future[T]:
+        """Add an executor job that only reads from the database.
+
+        The jobs run in the read pool so they do not have to wait
+        for other executor jobs. With SQLite the connections of
+        the read pool are query only so the job must not write.
+        """
+        if self._db_read_executor is None:
+            return self.async_add_executor_job(target, *args)
+        self.read_backlog += 1
+        future = self.hass.loop.run_in_executor(self._db_read_executor, target, *args)
+        future.add_done_callback(self._async_read_job_done)
+        return future
+
+    @callback
+    def _async_read_job_done(self, future: asyncio.Future[Any]) -> None:
+        """Remove a finished job from the read backlog."""
+        self.read_backlog -= 1
+
     def _stop_executor(self) -> None:
-        """Stop the executor."""
+        """Stop the executors."""
+        if self._db_read_executor is not None:
+            self._db_read_executor.shutdown()
+            self._db_read_executor = None
         if self._db_executor is None:
             return
         self._db_executor.shutdown()
@@ -616,9 +727,25 @@ class Recorder(threading.Thread):
 
         self.hass.add_job(self.async_set_db_ready)
 
+        # Load the attributes ids of the states that changed recently
+        # so the first states after a restart do not all miss the cache
+        self.queue_task(PrewarmStateAttributesIDsTask())
+
+        # Migrate any rows that still use the entity_id and event_type
+        # columns, the datetime columns or the string context id columns;
+        # this is a no-op once all the rows are migrated
+        self.queue_task(EntityIDMigrationTask())
+        self.queue_task(EventTypeIDMigrationTask())
+        self.queue_task(StatesTimestampMigrationTask())
+        self.queue_task(EventsTimestampMigrationTask())
+        self.queue_task(StatesContextIDMigrationTask())
+        self.queue_task(EventsContextIDMigrationTask())
+
         # Catch up with missed statistics
         with session_scope(session=self.get_session()) as session:
             self._schedule_compile_missing_statistics(session)
+        if self.statistics_rollups:
+            self.queue_task(CompileMissingRollupsTask())
 
         _LOGGER.debug("Recorder processing the queue")
         self.hass.add_job(self._async_set_recorder_ready_migration_done)
@@ -742,7 +869,12 @@ class Recorder(threading.Thread):
     def _process_one_event(self, event: Event) -> None:
         if not self.enabled:
             return
-        if event.event_type == EVENT_STATE_CHANGED:
+        if self._bulk_inserter is not None:
+            if event.event_type == EVENT_STATE_CHANGED:
+                self._process_state_changed_event_into_rows(event)
+            else:
+                self._process_non_state_changed_event_into_rows(event)
+        elif event.event_type == EVENT_STATE_CHANGED:
             self._process_state_changed_event_into_session(event)
         else:
             self._process_non_state_changed_event_into_session(event)
@@ -750,6 +882,37 @@ class Recorder(threading.Thread):
         if not self.commit_interval:
             self._commit_event_session_or_retry()
 
+    def _prewarm_state_attributes_ids(self) -> None:
+        """Load the most recently used attributes ids into the cache."""
+        cache = self._state_attributes_ids
+        start_time_ts = (dt_util.utcnow() - STATE_ATTRIBUTES_PREWARM_WINDOW).timestamp()
+        shared_attrs_by_id: dict[int, str] = {}
+        with session_scope(session=self.get_session()) as session:
+            # Most recently used first
+            attributes_ids: list[int] = [
+                attributes_id
+                for (attributes_id,) in session.execute(
+                    find_recent_states_attributes_ids(start_time_ts, cache.get_size())
+                )
+            ]
+            for idx in range(0, len(attributes_ids), MAX_IDS_TO_SELECT):
+                shared_attrs_by_id.update(
+                    session.execute(
+                        find_shared_attributes(
+                            attributes_ids[idx : idx + MAX_IDS_TO_SELECT]
+                        )
+                    ).all()
+                )
+        # Add the least recently used first so the most recently used
+        # are the last to be evicted. Anything already in the cache
+        # was used by a state since the recorder started and is kept.
+        for attributes_id in reversed(attributes_ids):
+            if (
+                shared_attrs := shared_attrs_by_id.get(attributes_id)
+            ) is not None and shared_attrs not in cache:
+                cache[shared_attrs] = attributes_id
+        _LOGGER.debug("Loaded %s recently used attributes ids", len(shared_attrs_by_id))
+
     def _find_shared_attr_in_db(self, attr_hash: int, shared_attrs: str) -> int | None:
         """Find shared attributes in the db from the hash and shared_attrs."""
         #
@@ -786,10 +949,50 @@ class Recorder(threading.Thread):
                 return cast(int, data_id[0])
         return None
 
+    def _find_states_metadata_id_in_db(self, entity_id: str) -> int | None:
+        """Find the metadata_id of an entity_id in the db."""
+        # See _find_shared_attr_in_db for why we avoid the flush
+        assert self.event_session is not None
+        with self.event_session.no_autoflush:
+            if metadata_id := self.event_session.execute(
+                find_states_metadata_ids((entity_id,))
+            ).first():
+                return cast(int, metadata_id[0])
+        return None
+
+    def _find_event_type_id_in_db(self, event_type: str) -> int | None:
+        """Find the event_type_id of an event_type in the db."""
+        # See _find_shared_attr_in_db for why we avoid the flush
+        assert self.event_session is not None
+        with self.event_session.no_autoflush:
+            if event_type_id := self.event_session.execute(
+                find_event_type_ids((event_type,))
+            ).first():
+                return cast(int, event_type_id[0])
+        return None
+
     def _process_non_state_changed_event_into_session(self, event: Event) -> None:
         """Process any event into the session except state changed."""
         assert self.event_session is not None
         dbevent = Events.from_event(event)
+        event_type = event.event_type
+        # Matching event type found in the pending commit
+        if pending_event_types := self._pending_event_types.get(event_type):
+            dbevent.event_type_rel = pending_event_types
+        # Matching event_type_id found in the cache
+        elif event_type_id := self._event_type_ids.get(event_type):
+            dbevent.event_type_id = event_type_id
+        # Matching event_type_id found in the database
+        elif event_type_id := self._find_event_type_id_in_db(event_type):
+            self._event_type_ids[event_type] = dbevent.event_type_id = event_type_id
+        # No matching event type found, save it in the DB
+        else:
+            dbevent_type = EventTypes(event_type=event_type)
+            dbevent.event_type_rel = self._pending_event_types[
+                event_type
+            ] = dbevent_type
+            self.event_session.add(dbevent_type)
+
         if not event.data:
             self.event_session.add(dbevent)
             return
@@ -838,6 +1041,24 @@ class Recorder(threading.Thread):
             )
             return
 
+        entity_id: str = event.data["entity_id"]
+        # Matching states meta found in the pending commit
+        if pending_states_meta := self._pending_states_meta.get(entity_id):
+            dbstate.states_meta_rel = pending_states_meta
+        # Matching metadata_id found in the cache
+        elif metadata_id := self._states_meta_ids.get(entity_id):
+            dbstate.metadata_id = metadata_id
+        # Matching metadata_id found in the database
+        elif metadata_id := self._find_states_metadata_id_in_db(entity_id):
+            self._states_meta_ids[entity_id] = dbstate.metadata_id = metadata_id
+        # No matching states meta found, save it in the DB
+        else:
+            dbstates_meta = StatesMeta(entity_id=entity_id)
+            dbstate.states_meta_rel = self._pending_states_meta[
+                entity_id
+            ] = dbstates_meta
+            self.event_session.add(dbstates_meta)
+
         shared_attrs = shared_attrs_bytes.decode("utf-8")
         dbstate.attributes = None
         # Matching attributes found in the pending commit
@@ -861,17 +1082,132 @@ class Recorder(threading.Thread):
                 self._pending_state_attributes[shared_attrs] = dbstate_attributes
                 self.event_session.add(dbstate_attributes)
 
-        if old_state := self._old_states.pop(dbstate.entity_id, None):
+        if old_state := self._old_states.pop(entity_id, None):
             if old_state.state_id:
                 dbstate.old_state_id = old_state.state_id
             else:
                 dbstate.old_state = old_state
         if event.data.get("new_state"):
-            self._old_states[dbstate.entity_id] = dbstate
+            self._old_states[entity_id] = dbstate
             self._pending_expunge.append(dbstate)
         else:
             dbstate.state = None
         self.event_session.add(dbstate)
+        self.statistics_states.add_event(event)
+
+    def _process_non_state_changed_event_into_rows(self, event: Event) -> None:
+        """Process any event into the pending bulk rows except state changed."""
+        bulk = self._bulk_inserter
+        assert bulk is not None
+        row = Events.row_from_event(event)
+        row["event_type_id"] = row["data_id"] = None
+        pending_event_type: str | None = None
+        pending_shared_data: str | None = None
+        event_type = event.event_type
+        # Matching event type found in the pending commit
+        if event_type in bulk.event_types:
+            pending_event_type = event_type
+        # Matching event_type_id found in the cache
+        elif event_type_id := self._event_type_ids.get(event_type):
+            row["event_type_id"] = event_type_id
+        # Matching event_type_id found in the database
+        elif event_type_id := self._find_event_type_id_in_db(event_type):
+            self._event_type_ids[event_type] = row["event_type_id"] = event_type_id
+        # No matching event type found, save it in the DB
+        else:
+            bulk.event_types.add(event_type)
+            pending_event_type = event_type
+
+        if event.data:
+            try:
+                shared_data_bytes = EventData.shared_data_bytes_from_event(event)
+            except JSON_ENCODE_EXCEPTIONS as ex:
+                _LOGGER.warning("Event is not JSON serializable: %s: %s", event, ex)
+                return
+
+            shared_data = shared_data_bytes.decode("utf-8")
+            # Matching attributes found in the pending commit
+            if shared_data in bulk.event_data:
+                pending_shared_data = shared_data
+            # Matching attributes id found in the cache
+            elif data_id := self._event_data_ids.get(shared_data):
+                row["data_id"] = data_id
+            else:
+                data_hash = EventData.hash_shared_data_bytes(shared_data_bytes)
+                # Matching attributes found in the database
+                if data_id := self._find_shared_data_in_db(data_hash, shared_data):
+                    self._event_data_ids[shared_data] = row["data_id"] = data_id
+                # No matching attributes found, save them in the DB
+                else:
+                    bulk.event_data[shared_data] = data_hash
+                    pending_shared_data = shared_data
+
+        bulk.events.append((row, pending_event_type, pending_shared_data))
+
+    def _process_state_changed_event_into_rows(self, event: Event) -> None:
+        """Process a state_changed event into the pending bulk rows."""
+        bulk = self._bulk_inserter
+        assert bulk is not None
+        try:
+            row = States.row_from_event(event)
+            shared_attrs_bytes = StateAttributes.shared_attrs_bytes_from_event(
+                event, self._exclude_attributes_by_domain
+            )
+        except JSON_ENCODE_EXCEPTIONS as ex:
+            _LOGGER.warning(
+                "State is not JSON serializable: %s: %s",
+                event.data.get("new_state"),
+                ex,
+            )
+            return
+
+        row["metadata_id"] = row["attributes_id"] = row["old_state_id"] = None
+        pending_state = PendingState(row)
+        entity_id: str = event.data["entity_id"]
+        # Matching states meta found in the pending commit
+        if entity_id in bulk.states_meta:
+            pending_state.entity_id = entity_id
+        # Matching metadata_id found in the cache
+        elif metadata_id := self._states_meta_ids.get(entity_id):
+            row["metadata_id"] = metadata_id
+        # Matching metadata_id found in the database
+        elif metadata_id := self._find_states_metadata_id_in_db(entity_id):
+            self._states_meta_ids[entity_id] = row["metadata_id"] = metadata_id
+        # No matching states meta found, save it in the DB
+        else:
+            bulk.states_meta.add(entity_id)
+            pending_state.entity_id = entity_id
+
+        shared_attrs = shared_attrs_bytes.decode("utf-8")
+        # Matching attributes found in the pending commit
+        if shared_attrs in bulk.state_attributes:
+            pending_state.shared_attrs = shared_attrs
+        # Matching attributes id found in the cache
+        elif attributes_id := self._state_attributes_ids.get(shared_attrs):
+            row["attributes_id"] = attributes_id
+        else:
+            attr_hash = StateAttributes.hash_shared_attrs_bytes(shared_attrs_bytes)
+            # Matching attributes found in the database
+            if attributes_id := self._find_shared_attr_in_db(attr_hash, shared_attrs):
+                self._state_attributes_ids[shared_attrs] = attributes_id
+                row["attributes_id"] = attributes_id
+            # No matching attributes found, save them in the DB
+            else:
+                bulk.state_attributes[shared_attrs] = attr_hash
+                pending_state.shared_attrs = shared_attrs
+
+        if old_state := self._old_states.pop(entity_id, None):
+            if old_state.state_id:
+                row["old_state_id"] = old_state.state_id
+            else:
+                assert isinstance(old_state, PendingState)
+                pending_state.old_state = old_state
+        if event.data.get("new_state"):
+            self._old_states[entity_id] = pending_state
+        else:
+            row["state"] = None
+        bulk.states.append(pending_state)
+        self.statistics_states.add_event(event)
 
     def _handle_database_error(self, err: Exception) -> bool:
         """Handle a database error that may result in moving away the corrupt db."""
@@ -884,6 +1220,8 @@ class Recorder(threading.Thread):
         return False
 
     def _event_session_has_pending_writes(self) -> bool:
+        if self._bulk_inserter is not None and self._bulk_inserter.has_pending_writes:
+            return True
         return bool(
             self.event_session and (self.event_session.new or self.event_session.dirty)
         )
@@ -914,7 +1252,18 @@ class Recorder(threading.Thread):
         assert self.event_session is not None
         self._commits_without_expire += 1
 
-        self.event_session.commit()
+        if (bulk := self._bulk_inserter) is not None and bulk.has_pending_writes:
+            # The bulk rows are committed with the rest of the session
+            try:
+                bulk.write(self.event_session)
+                self.event_session.commit()
+            except SQLAlchemyError:
+                # Rollback so the rows can be written again on retry
+                self.event_session.rollback()
+                raise
+            self._load_bulk_ids(bulk)
+        else:
+            self.event_session.commit()
         if self._pending_expunge:
             for dbstate in self._pending_expunge:
                 # Expunge the state so its not expired
@@ -935,6 +1284,12 @@ class Recorder(threading.Thread):
         for event_data in self._pending_event_data.values():
             self._event_data_ids[event_data.shared_data] = event_data.data_id
         self._pending_event_data = {}
+        for states_meta in self._pending_states_meta.values():
+            self._states_meta_ids[states_meta.entity_id] = states_meta.metadata_id
+        self._pending_states_meta = {}
+        for event_type in self._pending_event_types.values():
+            self._event_type_ids[event_type.event_type] = event_type.event_type_id
+        self._pending_event_types = {}
 
         # Expire is an expensive operation (frequently more expensive
         # than the flush and commit itself) so we only
@@ -943,6 +1298,22 @@ class Recorder(threading.Thread):
             self._commits_without_expire = 0
             self.event_session.expire_all()
 
+    def _load_bulk_ids(self, bulk: BulkInserter) -> None:
+        """Mark the bulk rows committed and load their new ids."""
+        bulk.mark_committed()
+
+        # We just committed the rows and we now know their ids.
+        # We can save many selects for matching rows by loading
+        # them into the LRU caches now.
+        for shared_attrs, attributes_id in bulk.attributes_ids.items():
+            self._state_attributes_ids[shared_attrs] = attributes_id
+        for shared_data, data_id in bulk.data_ids.items():
+            self._event_data_ids[shared_data] = data_id
+        for entity_id, metadata_id in bulk.metadata_ids.items():
+            self._states_meta_ids[entity_id] = metadata_id
+        for event_type, event_type_id in bulk.event_type_ids.items():
+            self._event_type_ids[event_type] = event_type_id
+
     def _handle_sqlite_corruption(self) -> None:
         """Handle the sqlite3 database being corrupt."""
         self._close_event_session()
@@ -955,10 +1326,18 @@ class Recorder(threading.Thread):
     def _close_event_session(self) -> None:
         """Close the event session."""
         self._old_states = {}
-        self._state_attributes_ids = {}
-        self._event_data_ids = {}
+        # The states that were not committed are rolled back
+        self.statistics_states.clear(dt_util.utcnow())
+        self._state_attributes_ids.clear()
+        self._event_data_ids.clear()
+        self._states_meta_ids.clear()
+        self._event_type_ids.clear()
         self._pending_state_attributes = {}
         self._pending_event_data = {}
+        self._pending_states_meta = {}
+        self._pending_event_types = {}
+        if self._bulk_inserter is not None:
+            self._bulk_inserter.clear()
 
         if not self.event_session:
             return
@@ -1082,6 +1461,12 @@ class Recorder(threading.Thread):
             ):
                 self.engine_version = version
             self._completed_first_database_setup = True
+            if self._using_file_sqlite and threading.current_thread().name.startswith(
+                DB_READER_PREFIX
+            ):
+                # The read pool never writes so its connections can
+                # never hold the write lock the recorder thread needs
+                execute_on_connection(dbapi_connection, "PRAGMA query_only=ON")
 
         if self.db_url == SQLITE_URL_PREFIX or ":memory:" in self.db_url:
             kwargs["connect_args"] = {"check_same_thread": False}
@@ -1090,6 +1475,8 @@ class Recorder(threading.Thread):
             kwargs["pool_reset_on_return"] = None
         elif self.db_url.startswith(SQLITE_URL_PREFIX):
             kwargs["poolclass"] = RecorderPool
+            # Each thread of the read pool keeps its own connection
+            kwargs["pool_size"] = POOL_SIZE + self.db_read_pool_size
         elif self.db_url.startswith(MYSQLDB_URL_PREFIX):
             # If they have configured MySQLDB but don't have
             # the MySQLDB module installed this will throw
@@ -1125,6 +1512,7 @@ class Recorder(threading.Thread):
             end_incomplete_runs(session, self.run_history.recording_start)
             self.run_history.start(session)
 
+        self.statistics_states.clear(self.run_history.recording_start)
         self._open_event_session()
 
     def _schedule_compile_missing_statistics(self, session: Session) -> None:
@@ -4,6 +4,7 @@ from __future__ import annotations
 from collections.abc import Callable
 from datetime import datetime, timedelta
 import logging
+import time
 from typing import Any, TypeVar, cast
 
 import ciso8601
@@ -19,16 +20,21 @@ from sqlalchemy import (
     Identity,
     Index,
     Integer,
+    LargeBinary,
     SmallInteger,
     String,
     Text,
     distinct,
+    func,
     type_coerce,
 )
 from sqlalchemy.dialects import mysql, oracle, postgresql, sqlite
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.ext.declarative import declared_attr
 from sqlalchemy.orm import aliased, declarative_base, relationship
 from sqlalchemy.orm.session import Session
+from sqlalchemy.sql.compiler import SQLCompiler
+from sqlalchemy.sql.expression import FunctionElement
 
 from homeassistant.const import (
     MAX_LENGTH_EVENT_CONTEXT_ID,
@@ -47,13 +53,33 @@ from homeassistant.helpers.json import (
 import homeassistant.util.dt as dt_util
 
 from .const import ALL_DOMAIN_EXCLUDE_ATTRS
-from .models import StatisticData, StatisticMetaData, process_timestamp
+from .models import (
+    StatisticData,
+    StatisticMetaData,
+    bytes_to_ulid_or_none,
+    bytes_to_uuid_hex_or_none,
+    process_timestamp,
+    ulid_to_bytes_or_none,
+    uuid_hex_to_bytes_or_none,
+)
 
 # SQLAlchemy Schema
 # pylint: disable=invalid-name
 Base = declarative_base()
 
-SCHEMA_VERSION = 30
+SCHEMA_VERSION = 33
+
+# The first schema version where entity_ids and event_types
+# are stored in the states_meta and event_types tables
+STATES_META_SCHEMA_VERSION = 31
+
+# The first schema version where the states and events
+# times are stored as epoch timestamps in the *_ts columns
+TIMESTAMP_SCHEMA_VERSION = 32
+
+# The first schema version where the context ids
+# are stored as packed binary in the *_bin columns
+CONTEXT_ID_AS_BINARY_SCHEMA_VERSION = 33
 
 _StatisticsBaseSelfT = TypeVar("_StatisticsBaseSelfT", bound="StatisticsBase")
 
@@ -61,26 +87,36 @@ _LOGGER = logging.getLogger(__name__)
 
 TABLE_EVENTS = "events"
 TABLE_EVENT_DATA = "event_data"
+TABLE_EVENT_TYPES = "event_types"
 TABLE_STATES = "states"
 TABLE_STATE_ATTRIBUTES = "state_attributes"
+TABLE_STATES_META = "states_meta"
 TABLE_RECORDER_RUNS = "recorder_runs"
 TABLE_SCHEMA_CHANGES = "schema_changes"
 TABLE_STATISTICS = "statistics"
 TABLE_STATISTICS_META = "statistics_meta"
 TABLE_STATISTICS_RUNS = "statistics_runs"
 TABLE_STATISTICS_SHORT_TERM = "statistics_short_term"
+TABLE_STATISTICS_DAY = "statistics_day"
+TABLE_STATISTICS_MONTH = "statistics_month"
+TABLE_STATISTICS_ROLLUP_RUNS = "statistics_rollup_runs"
 
 ALL_TABLES = [
     TABLE_STATES,
     TABLE_STATE_ATTRIBUTES,
+    TABLE_STATES_META,
     TABLE_EVENTS,
     TABLE_EVENT_DATA,
+    TABLE_EVENT_TYPES,
     TABLE_RECORDER_RUNS,
     TABLE_SCHEMA_CHANGES,
     TABLE_STATISTICS,
     TABLE_STATISTICS_META,
     TABLE_STATISTICS_RUNS,
     TABLE_STATISTICS_SHORT_TERM,
+    TABLE_STATISTICS_DAY,
+    TABLE_STATISTICS_MONTH,
+    TABLE_STATISTICS_ROLLUP_RUNS,
 ]
 
 TABLES_TO_CHECK = [
@@ -90,10 +126,28 @@ TABLES_TO_CHECK = [
     TABLE_SCHEMA_CHANGES,
 ]
 
-LAST_UPDATED_INDEX = "ix_states_last_updated"
-ENTITY_ID_LAST_UPDATED_INDEX = "ix_states_entity_id_last_updated"
-EVENTS_CONTEXT_ID_INDEX = "ix_events_context_id"
-STATES_CONTEXT_ID_INDEX = "ix_states_context_id"
+LAST_UPDATED_INDEX_TS = "ix_states_last_updated_ts"
+METADATA_ID_LAST_UPDATED_INDEX_TS = "ix_states_metadata_id_last_updated_ts"
+EVENT_TYPE_ID_TIME_FIRED_INDEX_TS = "ix_events_event_type_id_time_fired_ts"
+# Legacy indexes, dropped once the entity_id and event_type
+# columns have been migrated to states_meta and event_types
+LEGACY_ENTITY_ID_LAST_UPDATED_INDEX = "ix_states_entity_id_last_updated"
+LEGACY_EVENT_TYPE_TIME_FIRED_INDEX = "ix_events_event_type_time_fired"
+# Legacy indexes, dropped once the datetime columns
+# have been migrated to the *_ts timestamp columns
+LEGACY_LAST_UPDATED_INDEX = "ix_states_last_updated"
+LEGACY_TIME_FIRED_INDEX = "ix_events_time_fired"
+LEGACY_METADATA_ID_LAST_UPDATED_INDEX = "ix_states_metadata_id_last_updated"
+LEGACY_EVENT_TYPE_ID_TIME_FIRED_INDEX = "ix_events_event_type_id_time_fired"
+EVENTS_CONTEXT_ID_BIN_INDEX = "ix_events_context_id_bin"
+STATES_CONTEXT_ID_BIN_INDEX = "ix_states_context_id_bin"
+# Legacy indexes, dropped once the context ids
+# have been migrated to the *_bin columns
+LEGACY_EVENTS_CONTEXT_ID_INDEX = "ix_events_context_id"
+LEGACY_STATES_CONTEXT_ID_INDEX = "ix_states_context_id"
+
+# A ULID or a uuid packed as bytes
+CONTEXT_ID_BIN_MAX_LENGTH = 16
 
 
 class FAST_PYSQLITE_DATETIME(sqlite.DATETIME):  # type: ignore[misc]
@@ -121,6 +175,10 @@ DOUBLE_TYPE = (
     .with_variant(oracle.DOUBLE_PRECISION(), "oracle")
     .with_variant(postgresql.DOUBLE_PRECISION(), "postgresql")
 )
+TIMESTAMP_TYPE = DOUBLE_TYPE
+CONTEXT_BINARY_TYPE = LargeBinary(CONTEXT_ID_BIN_MAX_LENGTH).with_variant(
+    oracle.RAW(CONTEXT_ID_BIN_MAX_LENGTH), "oracle"
+)
 
 
 class JSONLiteral(JSON):  # type: ignore[misc]
@@ -136,6 +194,47 @@ class JSONLiteral(JSON):  # type: ignore[misc]
         return process
 
 
+class DatetimeToTimestamp(FunctionElement):  # type: ignore[misc]
+    """Convert a legacy datetime column to an epoch timestamp."""
+
+    type = TIMESTAMP_TYPE
+    name = "datetime_to_timestamp"
+    inherit_cache = True
+
+
+@compiles(DatetimeToTimestamp)
+def _compile_datetime_to_timestamp(
+    element: DatetimeToTimestamp, compiler: SQLCompiler, **kw: Any
+) -> str:
+    """Compile the datetime to timestamp conversion for PostgreSQL."""
+    return f"EXTRACT(EPOCH FROM {compiler.process(element.clauses, **kw)})"
+
+
+@compiles(DatetimeToTimestamp, "sqlite")
+def _compile_datetime_to_timestamp_sqlite(
+    element: DatetimeToTimestamp, compiler: SQLCompiler, **kw: Any
+) -> str:
+    """Compile the datetime to timestamp conversion for SQLite.
+
+    The datetimes are stored as text with the microseconds
+    after the 19 characters of the seconds.
+    """
+    column = compiler.process(element.clauses, **kw)
+    return (
+        f"(CAST(strftime('%s', {column}) AS INTEGER)"
+        f" + CAST(substr({column}, 20) AS REAL))"
+    )
+
+
+@compiles(DatetimeToTimestamp, "mysql")
+def _compile_datetime_to_timestamp_mysql(
+    element: DatetimeToTimestamp, compiler: SQLCompiler, **kw: Any
+) -> str:
+    """Compile the datetime to timestamp conversion for MySQL."""
+    column = compiler.process(element.clauses, **kw)
+    return f"(TIMESTAMPDIFF(MICROSECOND, '1970-01-01 00:00:00', {column}) / 1000000.0)"
+
+
 EVENT_ORIGIN_ORDER = [EventOrigin.local, EventOrigin.remote]
 EVENT_ORIGIN_TO_IDX = {origin: idx for idx, origin in enumerate(EVENT_ORIGIN_ORDER)}
 
@@ -146,59 +245,103 @@ class Events(Base):  # type: ignore[misc,valid-type]
     __table_args__ = (
         # Used for fetching events at a specific time
         # see logbook
-        Index("ix_events_event_type_time_fired", "event_type", "time_fired"),
+        Index(EVENT_TYPE_ID_TIME_FIRED_INDEX_TS, "event_type_id", "time_fired_ts"),
+        Index(
+            EVENTS_CONTEXT_ID_BIN_INDEX,
+            "context_id_bin",
+            mysql_length=CONTEXT_ID_BIN_MAX_LENGTH,
+            mariadb_length=CONTEXT_ID_BIN_MAX_LENGTH,
+        ),
         {"mysql_default_charset": "utf8mb4", "mysql_collate": "utf8mb4_unicode_ci"},
     )
     __tablename__ = TABLE_EVENTS
     event_id = Column(Integer, Identity(), primary_key=True)
-    event_type = Column(String(MAX_LENGTH_EVENT_EVENT_TYPE))
+    event_type = Column(String(MAX_LENGTH_EVENT_EVENT_TYPE))  # no longer used
     event_data = Column(Text().with_variant(mysql.LONGTEXT, "mysql"))
     origin = Column(String(MAX_LENGTH_EVENT_ORIGIN))  # no longer used for new rows
     origin_idx = Column(SmallInteger)
-    time_fired = Column(DATETIME_TYPE, index=True)
-    context_id = Column(String(MAX_LENGTH_EVENT_CONTEXT_ID), index=True)
-    context_user_id = Column(String(MAX_LENGTH_EVENT_CONTEXT_ID))
-    context_parent_id = Column(String(MAX_LENGTH_EVENT_CONTEXT_ID))
+    time_fired = Column(DATETIME_TYPE)  # no longer used for new rows
+    time_fired_ts = Column(TIMESTAMP_TYPE, index=True)
+    context_id = Column(  # no longer used
+        String(MAX_LENGTH_EVENT_CONTEXT_ID), index=True
+    )
+    context_user_id = Column(String(MAX_LENGTH_EVENT_CONTEXT_ID))  # no longer used
+    context_parent_id = Column(String(MAX_LENGTH_EVENT_CONTEXT_ID))  # no longer used
     data_id = Column(Integer, ForeignKey("event_data.data_id"), index=True)
+    event_type_id = Column(Integer, ForeignKey("event_types.event_type_id"))
+    context_id_bin = Column(CONTEXT_BINARY_TYPE)
+    context_user_id_bin = Column(CONTEXT_BINARY_TYPE)
+    context_parent_id_bin = Column(CONTEXT_BINARY_TYPE)
     event_data_rel = relationship("EventData")
+    event_type_rel = relationship("EventTypes")
 
     def __repr__(self) -> str:
         """Return string representation of instance for debugging."""
         return (
             f"<recorder.Events("
-            f"id={self.event_id}, type='{self.event_type}', "
-            f"origin_idx='{self.origin_idx}', time_fired='{self.time_fired}'"
+            f"id={self.event_id}, type_id={self.event_type_id}, "
+            f"origin_idx='{self.origin_idx}', time_fired='{self._time_fired_isotime()}'"
             f", data_id={self.data_id})>"
         )
 
+    def _time_fired_isotime(self) -> str | None:
+        """Return time_fired as an isotime string."""
+        date_time: datetime | None
+        if self.time_fired_ts is not None:
+            date_time = dt_util.utc_from_timestamp(self.time_fired_ts)
+        else:
+            date_time = process_timestamp(self.time_fired)
+        if date_time is None:
+            return None
+        return date_time.isoformat(sep=" ", timespec="seconds")
+
+    @staticmethod
+    def row_from_event(event: Event) -> dict[str, Any]:
+        """Create an events table row from a native event."""
+        context = event.context
+        return {
+            "origin_idx": EVENT_ORIGIN_TO_IDX.get(event.origin),
+            "time_fired_ts": dt_util.utc_to_timestamp(event.time_fired),
+            "context_id_bin": ulid_to_bytes_or_none(context.id),
+            "context_user_id_bin": uuid_hex_to_bytes_or_none(context.user_id),
+            "context_parent_id_bin": ulid_to_bytes_or_none(context.parent_id),
+        }
+
     @staticmethod
     def from_event(event: Event) -> Events:
         """Create an event database object from a native event."""
         return Events(
-            event_type=event.event_type,
+            event_type=None,
             event_data=None,
-            origin_idx=EVENT_ORIGIN_TO_IDX.get(event.origin),
-            time_fired=event.time_fired,
-            context_id=event.context.id,
-            context_user_id=event.context.user_id,
-            context_parent_id=event.context.parent_id,
+            time_fired=None,
+            context_id=None,
+            context_user_id=None,
+            context_parent_id=None,
+            **Events.row_from_event(event),
         )
 
     def to_native(self, validate_entity_id: bool = True) -> Event | None:
         """Convert to a native HA Event."""
         context = Context(
-            id=self.context_id,
-            user_id=self.context_user_id,
-            parent_id=self.context_parent_id,
+            id=bytes_to_ulid_or_none(self.context_id_bin) or self.context_id,
+            user_id=bytes_to_uuid_hex_or_none(self.context_user_id_bin)
+            or self.context_user_id,
+            parent_id=bytes_to_ulid_or_none(self.context_parent_id_bin)
+            or self.context_parent_id,
         )
+        event_type = self.event_type
+        if event_type is None and self.event_type_rel is not None:
+            event_type = self.event_type_rel.event_type
         try:
             return Event(
-                self.event_type,
+                event_type,
                 json_loads(self.event_data) if self.event_data else {},
                 EventOrigin(self.origin)
                 if self.origin
                 else EVENT_ORIGIN_ORDER[self.origin_idx],
-                process_timestamp(self.time_fired),
+                dt_util.utc_from_timestamp(self.time_fired_ts)
+                if self.time_fired_ts is not None
+                else process_timestamp(self.time_fired),
                 context=context,
             )
         except JSON_DECODE_EXCEPTIONS:
@@ -255,18 +398,43 @@ class EventData(Base):  # type: ignore[misc,valid-type]
             return {}
 
 
+class EventTypes(Base):  # type: ignore[misc,valid-type]
+    """Event type history."""
+
+    __table_args__ = (
+        {"mysql_default_charset": "utf8mb4", "mysql_collate": "utf8mb4_unicode_ci"},
+    )
+    __tablename__ = TABLE_EVENT_TYPES
+    event_type_id = Column(Integer, Identity(), primary_key=True)
+    event_type = Column(String(MAX_LENGTH_EVENT_EVENT_TYPE), index=True, unique=True)
+
+    def __repr__(self) -> str:
+        """Return string representation of instance for debugging."""
+        return (
+            f"<recorder.EventTypes("
+            f"id={self.event_type_id}, event_type='{self.event_type}'"
+            f")>"
+        )
+
+
 class States(Base):  # type: ignore[misc,valid-type]
     """State change history."""
 
     __table_args__ = (
         # Used for fetching the state of entities at a specific time
         # (get_states in history.py)
-        Index(ENTITY_ID_LAST_UPDATED_INDEX, "entity_id", "last_updated"),
+        Index(METADATA_ID_LAST_UPDATED_INDEX_TS, "metadata_id", "last_updated_ts"),
+        Index(
+            STATES_CONTEXT_ID_BIN_INDEX,
+            "context_id_bin",
+            mysql_length=CONTEXT_ID_BIN_MAX_LENGTH,
+            mariadb_length=CONTEXT_ID_BIN_MAX_LENGTH,
+        ),
         {"mysql_default_charset": "utf8mb4", "mysql_collate": "utf8mb4_unicode_ci"},
     )
     __tablename__ = TABLE_STATES
     state_id = Column(Integer, Identity(), primary_key=True)
-    entity_id = Column(String(MAX_LENGTH_STATE_ENTITY_ID))
+    entity_id = Column(String(MAX_LENGTH_STATE_ENTITY_ID))  # no longer used
     state = Column(String(MAX_LENGTH_STATE_STATE))
     attributes = Column(
         Text().with_variant(mysql.LONGTEXT, "mysql")
@@ -274,66 +442,98 @@ class States(Base):  # type: ignore[misc,valid-type]
     event_id = Column(  # no longer used for new rows
         Integer, ForeignKey("events.event_id", ondelete="CASCADE"), index=True
     )
-    last_changed = Column(DATETIME_TYPE)
-    last_updated = Column(DATETIME_TYPE, default=dt_util.utcnow, index=True)
+    last_changed = Column(DATETIME_TYPE)  # no longer used for new rows
+    last_changed_ts = Column(TIMESTAMP_TYPE)
+    last_updated = Column(DATETIME_TYPE)  # no longer used for new rows
+    last_updated_ts = Column(TIMESTAMP_TYPE, default=time.time, index=True)
     old_state_id = Column(Integer, ForeignKey("states.state_id"), index=True)
     attributes_id = Column(
         Integer, ForeignKey("state_attributes.attributes_id"), index=True
     )
-    context_id = Column(String(MAX_LENGTH_EVENT_CONTEXT_ID), index=True)
-    context_user_id = Column(String(MAX_LENGTH_EVENT_CONTEXT_ID))
-    context_parent_id = Column(String(MAX_LENGTH_EVENT_CONTEXT_ID))
+    context_id = Column(  # no longer used
+        String(MAX_LENGTH_EVENT_CONTEXT_ID), index=True
+    )
+    context_user_id = Column(String(MAX_LENGTH_EVENT_CONTEXT_ID))  # no longer used
+    context_parent_id = Column(String(MAX_LENGTH_EVENT_CONTEXT_ID))  # no longer used
     origin_idx = Column(SmallInteger)  # 0 is local, 1 is remote
+    metadata_id = Column(Integer, ForeignKey("states_meta.metadata_id"))
+    context_id_bin = Column(CONTEXT_BINARY_TYPE)
+    context_user_id_bin = Column(CONTEXT_BINARY_TYPE)
+    context_parent_id_bin = Column(CONTEXT_BINARY_TYPE)
     old_state = relationship("States", remote_side=[state_id])
     state_attributes = relationship("StateAttributes")
+    states_meta_rel = relationship("StatesMeta")
 
     def __repr__(self) -> str:
         """Return string representation of instance for debugging."""
         return (
             f"<recorder.States("
-            f"id={self.state_id}, entity_id='{self.entity_id}', "
+            f"id={self.state_id}, metadata_id={self.metadata_id}, "
             f"state='{self.state}', event_id='{self.event_id}', "
-            f"last_updated='{self.last_updated.isoformat(sep=' ', timespec='seconds')}', "
+            f"last_updated='{self._last_updated_isotime()}', "
             f"old_state_id={self.old_state_id}, attributes_id={self.attributes_id}"
             f")>"
         )
 
+    def _last_updated_isotime(self) -> str | None:
+        """Return last_updated as an isotime string."""
+        date_time: datetime | None
+        if self.last_updated_ts is not None:
+            date_time = dt_util.utc_from_timestamp(self.last_updated_ts)
+        else:
+            date_time = process_timestamp(self.last_updated)
+        if date_time is None:
+            return None
+        return date_time.isoformat(sep=" ", timespec="seconds")
+
     @staticmethod
-    def from_event(event: Event) -> States:
-        """Create object from a state_changed event."""
-        entity_id = event.data["entity_id"]
+    def row_from_event(event: Event) -> dict[str, Any]:
+        """Create a states table row from a state_changed event."""
         state: State | None = event.data.get("new_state")
-        dbstate = States(
-            entity_id=entity_id,
-            attributes=None,
-            context_id=event.context.id,
-            context_user_id=event.context.user_id,
-            context_parent_id=event.context.parent_id,
-            origin_idx=EVENT_ORIGIN_TO_IDX.get(event.origin),
-        )
+        context = event.context
+        row: dict[str, Any] = {
+            "context_id_bin": ulid_to_bytes_or_none(context.id),
+            "context_user_id_bin": uuid_hex_to_bytes_or_none(context.user_id),
+            "context_parent_id_bin": ulid_to_bytes_or_none(context.parent_id),
+            "origin_idx": EVENT_ORIGIN_TO_IDX.get(event.origin),
+        }
 
         # None state means the state was removed from the state machine
         if state is None:
-            dbstate.state = ""
-            dbstate.last_updated = event.time_fired
-            dbstate.last_changed = None
-            return dbstate
+            row["state"] = ""
+            row["last_updated_ts"] = dt_util.utc_to_timestamp(event.time_fired)
+            row["last_changed_ts"] = None
+            return row
 
-        dbstate.state = state.state
-        dbstate.last_updated = state.last_updated
+        row["state"] = state.state
+        row["last_updated_ts"] = dt_util.utc_to_timestamp(state.last_updated)
         if state.last_updated == state.last_changed:
-            dbstate.last_changed = None
+            row["last_changed_ts"] = None
         else:
-            dbstate.last_changed = state.last_changed
+            row["last_changed_ts"] = dt_util.utc_to_timestamp(state.last_changed)
 
-        return dbstate
+        return row
+
+    @staticmethod
+    def from_event(event: Event) -> States:
+        """Create object from a state_changed event."""
+        return States(
+            entity_id=None,
+            attributes=None,
+            context_id=None,
+            context_user_id=None,
+            context_parent_id=None,
+            **States.row_from_event(event),
+        )
 
     def to_native(self, validate_entity_id: bool = True) -> State | None:
         """Convert to an HA state object."""
         context = Context(
-            id=self.context_id,
-            user_id=self.context_user_id,
-            parent_id=self.context_parent_id,
+            id=bytes_to_ulid_or_none(self.context_id_bin) or self.context_id,
+            user_id=bytes_to_uuid_hex_or_none(self.context_user_id_bin)
+            or self.context_user_id,
+            parent_id=bytes_to_ulid_or_none(self.context_parent_id_bin)
+            or self.context_parent_id,
         )
         try:
             attrs = json_loads(self.attributes) if self.attributes else {}
@@ -341,13 +541,27 @@ class States(Base):  # type: ignore[misc,valid-type]
             # When json_loads fails
             _LOGGER.exception("Error converting row to state: %s", self)
             return None
-        if self.last_changed is None or self.last_changed == self.last_updated:
-            last_changed = last_updated = process_timestamp(self.last_updated)
+        entity_id = self.entity_id
+        if entity_id is None and self.states_meta_rel is not None:
+            entity_id = self.states_meta_rel.entity_id
+        if self.last_updated_ts is None:
+            # Legacy row that has not been migrated to timestamps yet
+            if self.last_changed is None or self.last_changed == self.last_updated:
+                last_changed = last_updated = process_timestamp(self.last_updated)
+            else:
+                last_updated = process_timestamp(self.last_updated)
+                last_changed = process_timestamp(self.last_changed)
+        elif (
+            self.last_changed_ts is None or self.last_changed_ts == self.last_updated_ts
+        ):
+            last_changed = last_updated = dt_util.utc_from_timestamp(
+                self.last_updated_ts
+            )
         else:
-            last_updated = process_timestamp(self.last_updated)
-            last_changed = process_timestamp(self.last_changed)
+            last_updated = dt_util.utc_from_timestamp(self.last_updated_ts)
+            last_changed = dt_util.utc_from_timestamp(self.last_changed_ts)
         return State(
-            self.entity_id,
+            entity_id,
             self.state,
             # Join the state_attributes table on attributes_id to get the attributes
             # for newer states
@@ -402,6 +616,9 @@ class StateAttributes(Base):  # type: ignore[misc,valid-type]
         exclude_attrs = (
             exclude_attrs_by_domain.get(domain, set()) | ALL_DOMAIN_EXCLUDE_ATTRS
         )
+        if exclude_attrs.isdisjoint(state.attributes):
+            # Nothing to exclude, the cached JSON of the state can be used
+            return state.attributes_json()
         return json_bytes(
             {k: v for k, v in state.attributes.items() if k not in exclude_attrs}
         )
@@ -421,6 +638,25 @@ class StateAttributes(Base):  # type: ignore[misc,valid-type]
             return {}
 
 
+class StatesMeta(Base):  # type: ignore[misc,valid-type]
+    """Metadata for states."""
+
+    __table_args__ = (
+        {"mysql_default_charset": "utf8mb4", "mysql_collate": "utf8mb4_unicode_ci"},
+    )
+    __tablename__ = TABLE_STATES_META
+    metadata_id = Column(Integer, Identity(), primary_key=True)
+    entity_id = Column(String(MAX_LENGTH_STATE_ENTITY_ID), index=True, unique=True)
+
+    def __repr__(self) -> str:
+        """Return string representation of instance for debugging."""
+        return (
+            f"<recorder.StatesMeta("
+            f"id={self.metadata_id}, entity_id='{self.entity_id}'"
+            f")>"
+        )
+
+
 class StatisticsBase:
     """Statistics base class."""
 
@@ -484,6 +720,31 @@ class StatisticsShortTerm(Base, StatisticsBase):  # type: ignore[misc,valid-type
     __tablename__ = TABLE_STATISTICS_SHORT_TERM
 
 
+class StatisticsDay(Base, StatisticsBase):  # type: ignore[misc,valid-type]
+    """Long term statistics rolled up per day in the local time zone."""
+
+    __table_args__ = (
+        Index(
+            "ix_statistics_day_statistic_id_start", "metadata_id", "start", unique=True
+        ),
+    )
+    __tablename__ = TABLE_STATISTICS_DAY
+
+
+class StatisticsMonth(Base, StatisticsBase):  # type: ignore[misc,valid-type]
+    """Long term statistics rolled up per month in the local time zone."""
+
+    __table_args__ = (
+        Index(
+            "ix_statistics_month_statistic_id_start",
+            "metadata_id",
+            "start",
+            unique=True,
+        ),
+    )
+    __tablename__ = TABLE_STATISTICS_MONTH
+
+
 class StatisticsMeta(Base):  # type: ignore[misc,valid-type]
     """Statistics meta data."""
 
@@ -540,14 +801,20 @@ class RecorderRuns(Base):  # type: ignore[misc,valid-type]
 
         assert session is not None, "RecorderRuns need to be persisted"
 
-        query = session.query(distinct(States.entity_id)).filter(
-            States.last_updated >= self.start
+        query = (
+            session.query(distinct(StatesMeta.entity_id))
+            .join(States, States.metadata_id == StatesMeta.metadata_id)
+            .filter(States.last_updated_ts >= dt_util.utc_to_timestamp(self.start))
         )
 
         if point_in_time is not None:
-            query = query.filter(States.last_updated < point_in_time)
+            query = query.filter(
+                States.last_updated_ts < dt_util.utc_to_timestamp(point_in_time)
+            )
         elif self.end is not None:
-            query = query.filter(States.last_updated < self.end)
+            query = query.filter(
+                States.last_updated_ts < dt_util.utc_to_timestamp(self.end)
+            )
 
         return [row[0] for row in query]
 
@@ -590,6 +857,27 @@ class StatisticsRuns(Base):  # type: ignore[misc,valid-type]
         )
 
 
+class StatisticsRollupRuns(Base):  # type: ignore[misc,valid-type]
+    """Representation of a day or month of statistics that was rolled up."""
+
+    __table_args__ = (
+        Index("ix_statistics_rollup_runs_period_start", "period", "start"),
+    )
+    __tablename__ = TABLE_STATISTICS_ROLLUP_RUNS
+    run_id = Column(Integer, Identity(), primary_key=True)
+    period = Column(String(8))
+    start = Column(DATETIME_TYPE)
+    end = Column(DATETIME_TYPE)
+
+    def __repr__(self) -> str:
+        """Return string representation of instance for debugging."""
+        return (
+            f"<recorder.StatisticsRollupRuns("
+            f"id={self.run_id}, period='{self.period}', start='{self.start}', "
+            f"end='{self.end}')>"
+        )
+
+
 EVENT_DATA_JSON = type_coerce(
     EventData.shared_data.cast(JSONB_VARIANT_CAST), JSONLiteral(none_as_null=True)
 )
@@ -608,3 +896,20 @@ ENTITY_ID_IN_EVENT: Column = EVENT_DATA_JSON["entity_id"]
 OLD_ENTITY_ID_IN_EVENT: Column = OLD_FORMAT_EVENT_DATA_JSON["entity_id"]
 DEVICE_ID_IN_EVENT: Column = EVENT_DATA_JSON["device_id"]
 OLD_STATE = aliased(States, name="old_state")
+
+# The entity_id and event_type of rows that may still use the legacy columns
+# because they have not been migrated to states_meta and event_types yet
+LEGACY_STATES_ENTITY_ID = func.coalesce(StatesMeta.entity_id, States.entity_id)
+LEGACY_EVENTS_EVENT_TYPE = func.coalesce(EventTypes.event_type, Events.event_type)
+
+# The times of rows that may still use the legacy datetime columns
+# because they have not been migrated to the timestamp columns yet
+LEGACY_STATES_LAST_UPDATED_TS = func.coalesce(
+    States.last_updated_ts, DatetimeToTimestamp(States.last_updated)
+)
+LEGACY_STATES_LAST_CHANGED_TS = func.coalesce(
+    States.last_changed_ts, DatetimeToTimestamp(States.last_changed)
+)
+LEGACY_EVENTS_TIME_FIRED_TS = func.coalesce(
+    Events.time_fired_ts, DatetimeToTimestamp(Events.time_fired)
+)
@@ -0,0 +1,157 @@
+"""Downsample the history of an entity.
+
+Graphs cannot show more points than they are pixels wide, so the
+history of high frequency sensors is thinned out before it is turned
+into states. The functions work on the rows of a single entity, sorted
+by last_updated_ts. Rows with a state that is not numeric (like
+unavailable) are always kept so gaps still show up in the graphs.
+"""
+from __future__ import annotations
+
+from collections.abc import Iterable, Iterator
+from datetime import timedelta
+from itertools import chain
+import math
+from typing import Any
+
+from sqlalchemy.engine.row import Row
+
+# The first and last point are always kept and
+# there must be at least one bucket in between
+MIN_MAX_POINTS = 3
+
+
+def _float_or_none(state: Any) -> float | None:
+    """Return the state as a float or None if it is not numeric."""
+    try:
+        value = float(state)
+    except (TypeError, ValueError):
+        return None
+    return value if math.isfinite(value) else None
+
+
+def downsample_rows(
+    rows: Iterable[Row],
+    max_points: int | None,
+    resolution: timedelta | None,
+    first_row: Row | None = None,
+) -> Iterator[Row]:
+    """Downsample the rows of a single entity.
+
+    With a resolution the rows with the lowest and highest state of
+    each period of that length are kept. max_points then caps the
+    number of rows with largest triangle three buckets.
+
+    first_row is always yielded first and counts toward max_points,
+    but is not part of the resolution buckets.
+    """
+    if resolution is not None:
+        rows = min_max_buckets(rows, resolution.total_seconds())
+    if first_row is not None:
+        if max_points is not None:
+            # Largest triangle three buckets always keeps the first row
+            return iter(largest_triangle_three_buckets([first_row, *rows], max_points))
+        return chain((first_row,), rows)
+    if max_points is not None:
+        return iter(largest_triangle_three_buckets(list(rows), max_points))
+    return iter(rows)
+
+
+def min_max_buckets(rows: Iterable[Row], resolution: float) -> Iterator[Row]:
+    """Yield the rows with the lowest and highest state of each time bucket.
+
+    The last row is always yielded so the graph ends on the current value.
+    """
+    bucket = 0.0
+    low: Row | None = None
+    high: Row | None = None
+    last: Row | None = None
+    low_value = high_value = 0.0
+    for row in rows:
+        value = _float_or_none(row.state)
+        row_bucket = row.last_updated_ts // resolution
+        if low is not None and (value is None or row_bucket != bucket):
+            yield from _in_order(low, high)
+            low = high = None
+        if value is None:
+            last = None
+            yield row
+            continue
+        last = row
+        if low is None:
+            bucket = row_bucket
+            low = high = row
+            low_value = high_value = value
+        elif value < low_value:
+            low, low_value = row, value
+        elif value > high_value:
+            high, high_value = row, value
+    if low is not None:
+        yield from _in_order(low, high, last)
+
+
+def _in_order(*rows: Row | None) -> list[Row]:
+    """Return the distinct rows sorted by last_updated_ts."""
+    return sorted(
+        {id(row): row for row in rows if row is not None}.values(),
+        key=lambda row: row.last_updated_ts,
+    )
+
+
+def largest_triangle_three_buckets(rows: list[Row], max_points: int) -> list[Row]:
+    """Return at most max_points rows that keep the shape of the graph.
+
+    Implements the Largest-Triangle-Three-Buckets algorithm. The numeric
+    rows are split in max_points - 2 buckets and from each bucket the row
+    that forms the largest triangle with the row picked from the previous
+    bucket and the average of the next bucket is kept.
+
+    Rows that are not numeric are kept in addition to the picked rows,
+    so more than max_points rows are returned when there are more of
+    them than can fit.
+    """
+    if len(rows) <= max_points:
+        return rows
+    points: list[tuple[int, float, float]] = []
+    for index, row in enumerate(rows):
+        if (value := _float_or_none(row.state)) is not None:
+            points.append((index, row.last_updated_ts, value))
+    threshold = max(max_points - (len(rows) - len(points)), MIN_MAX_POINTS)
+    if len(points) <= threshold:
+        return rows
+
+    keep = set(range(len(rows))) - {point[0] for point in points}
+    keep.update(_lttb_indexes(points, threshold))
+    return [rows[index] for index in sorted(keep)]
+
+
+def _lttb_indexes(
+    points: list[tuple[int, float, float]], threshold: int
+) -> Iterator[int]:
+    """Yield the row index of the points picked by LTTB."""
+    every = (len(points) - 2) / (threshold - 2)
+    picked = 0
+    yield points[0][0]
+    for bucket in range(threshold - 2):
+        # The average of the next bucket is the third point of the triangle
+        avg_start = int((bucket + 1) * every) + 1
+        avg_end = min(int((bucket + 2) * every) + 1, len(points))
+        avg_length = avg_end - avg_start
+        avg_x = sum(point[1] for point in points[avg_start:avg_end]) / avg_length
+        avg_y = sum(point[2] for point in points[avg_start:avg_end]) / avg_length
+
+        _, picked_x, picked_y = points[picked]
+        max_area = -1.0
+        next_picked = start = int(bucket * every) + 1
+        for current in range(start, int((bucket + 1) * every) + 1):
+            _, x, y = points[current]
+            area = abs(
+                (picked_x - avg_x) * (y - picked_y)
+                - (picked_x - x) * (avg_y - picked_y)
+            )
+            if area > max_area:
+                max_area = area
+                next_picked = current
+        picked = next_picked
+        yield points[picked][0]
+    yield points[-1][0]
@@ -3,8 +3,8 @@ from __future__ import annotations
 
 from collections import defaultdict
 from collections.abc import Callable, Iterable, Iterator, MutableMapping
-from datetime import datetime
-from itertools import groupby
+from datetime import datetime, timedelta
+from itertools import groupby, islice
 import logging
 import time
 from typing import Any, cast
@@ -13,6 +13,7 @@ from sqlalchemy import Column, Text, and_, func, lambda_stmt, or_, select
 from sqlalchemy.engine.row import Row
 from sqlalchemy.orm.query import Query
 from sqlalchemy.orm.session import Session
+from sqlalchemy.sql.elements import ColumnElement
 from sqlalchemy.sql.expression import literal
 from sqlalchemy.sql.lambdas import StatementLambdaElement
 from sqlalchemy.sql.selectable import Subquery
@@ -25,22 +26,32 @@ from homeassistant.core import HomeAssistant, State, split_entity_id
 import homeassistant.util.dt as dt_util
 
 from .. import recorder
-from .db_schema import RecorderRuns, StateAttributes, States
-from .filters import Filters
-from .models import (
-    LazyState,
-    process_datetime_to_timestamp,
-    process_timestamp,
-    process_timestamp_to_utc_isoformat,
-    row_to_compressed_state,
+from .db_schema import (
+    LEGACY_STATES_ENTITY_ID,
+    LEGACY_STATES_LAST_CHANGED_TS,
+    LEGACY_STATES_LAST_UPDATED_TS,
+    TIMESTAMP_SCHEMA_VERSION,
+    RecorderRuns,
+    StateAttributes,
+    States,
+    StatesMeta,
 )
+from .downsample import downsample_rows
+from .filters import Filters
+from .models import LazyState, process_timestamp, row_to_compressed_state
+from .queries import find_states_metadata_ids
 from .util import execute_stmt_lambda_element, session_scope
 
 _LOGGER = logging.getLogger(__name__)
 
+_utc_from_timestamp = dt_util.utc_from_timestamp
+
 STATE_KEY = "state"
 LAST_CHANGED_KEY = "last_changed"
 
+# The maximum number of states of an entity in each streamed chunk
+STREAM_CHUNK_SIZE = 1000
+
 SIGNIFICANT_DOMAINS = {
     "climate",
     "device_tracker",
@@ -59,49 +70,12 @@ NEED_ATTRIBUTE_DOMAINS = {
     "water_heater",
 }
 
-BASE_STATES = [
-    States.entity_id,
-    States.state,
-    States.last_changed,
-    States.last_updated,
-]
-BASE_STATES_NO_LAST_CHANGED = [
-    States.entity_id,
-    States.state,
-    literal(value=None, type_=Text).label("last_changed"),
-    States.last_updated,
-]
+NO_LAST_CHANGED = literal(value=None).label("last_changed_ts")
 QUERY_STATE_NO_ATTR = [
-    *BASE_STATES,
     literal(value=None, type_=Text).label("attributes"),
     literal(value=None, type_=Text).label("shared_attrs"),
 ]
-QUERY_STATE_NO_ATTR_NO_LAST_CHANGED = [
-    *BASE_STATES_NO_LAST_CHANGED,
-    literal(value=None, type_=Text).label("attributes"),
-    literal(value=None, type_=Text).label("shared_attrs"),
-]
-# Remove QUERY_STATES_PRE_SCHEMA_25
-# and the migration_in_progress check
-# once schema 26 is created
-QUERY_STATES_PRE_SCHEMA_25 = [
-    *BASE_STATES,
-    States.attributes,
-    literal(value=None, type_=Text).label("shared_attrs"),
-]
-QUERY_STATES_PRE_SCHEMA_25_NO_LAST_CHANGED = [
-    *BASE_STATES_NO_LAST_CHANGED,
-    States.attributes,
-    literal(value=None, type_=Text).label("shared_attrs"),
-]
 QUERY_STATES = [
-    *BASE_STATES,
-    # Remove States.attributes once all attributes are in StateAttributes.shared_attrs
-    States.attributes,
-    StateAttributes.shared_attrs,
-]
-QUERY_STATES_NO_LAST_CHANGED = [
-    *BASE_STATES_NO_LAST_CHANGED,
     # Remove States.attributes once all attributes are in StateAttributes.shared_attrs
     States.attributes,
     StateAttributes.shared_attrs,
@@ -112,43 +86,108 @@ def _schema_version(hass: HomeAssistant) -> int:
     return recorder.get_instance(hass).schema_version
 
 
+def _states_migrated(hass: HomeAssistant) -> bool:
+    instance = recorder.get_instance(hass)
+    return instance.states_meta_migrated and instance.states_timestamps_migrated
+
+
+def _entity_id_column(states_migrated: bool) -> ColumnElement:
+    """Return the column holding the entity_id of the states."""
+    return StatesMeta.entity_id if states_migrated else LEGACY_STATES_ENTITY_ID
+
+
+def _entity_key_column(states_migrated: bool) -> ColumnElement:
+    """Return the column to group and sort the states of each entity by."""
+    return States.metadata_id if states_migrated else LEGACY_STATES_ENTITY_ID
+
+
+def _last_updated_ts_column(states_migrated: bool) -> ColumnElement:
+    """Return the column holding the last_updated timestamp of the states."""
+    return States.last_updated_ts if states_migrated else LEGACY_STATES_LAST_UPDATED_TS
+
+
+def _last_changed_ts_column(states_migrated: bool) -> ColumnElement:
+    """Return the column holding the last_changed timestamp of the states."""
+    return States.last_changed_ts if states_migrated else LEGACY_STATES_LAST_CHANGED_TS
+
+
 def lambda_stmt_and_join_attributes(
-    schema_version: int, no_attributes: bool, include_last_changed: bool = True
+    no_attributes: bool,
+    include_last_changed: bool = True,
+    states_migrated: bool = True,
 ) -> tuple[StatementLambdaElement, bool]:
     """Return the lambda_stmt and if StateAttributes should be joined.
 
     Because these are lambda_stmt the values inside the lambdas need
     to be explicitly written out to avoid caching the wrong values.
+
+    The entity_id is looked up from the states_meta table by
+    joining on the integer metadata_id. Until all the states are
+    migrated to states_meta and the timestamp columns, the legacy
+    entity_id and datetime columns are used for the states that
+    have not been migrated yet.
     """
+    entity_id = _entity_id_column(states_migrated).label("entity_id")
+    last_updated_ts = _last_updated_ts_column(states_migrated).label("last_updated_ts")
+    last_changed_ts = (
+        _last_changed_ts_column(states_migrated).label("last_changed_ts")
+        if include_last_changed
+        else NO_LAST_CHANGED
+    )
     # If no_attributes was requested we do the query
     # without the attributes fields and do not join the
     # state_attributes table
     if no_attributes:
-        if include_last_changed:
-            return lambda_stmt(lambda: select(*QUERY_STATE_NO_ATTR)), False
-        return (
-            lambda_stmt(lambda: select(*QUERY_STATE_NO_ATTR_NO_LAST_CHANGED)),
-            False,
-        )
-    # If we in the process of migrating schema we do
-    # not want to join the state_attributes table as we
-    # do not know if it will be there yet
-    if schema_version < 25:
-        if include_last_changed:
-            return (
-                lambda_stmt(lambda: select(*QUERY_STATES_PRE_SCHEMA_25)),
-                False,
+        stmt = lambda_stmt(
+            lambda: select(
+                entity_id,
+                States.state,
+                last_changed_ts,
+                last_updated_ts,
+                *QUERY_STATE_NO_ATTR,
             )
-        return (
-            lambda_stmt(lambda: select(*QUERY_STATES_PRE_SCHEMA_25_NO_LAST_CHANGED)),
-            False,
         )
-    # Finally if no migration is in progress and no_attributes
-    # was not requested, we query both attributes columns and
+    # Otherwise we query both attributes columns and
     # join state_attributes
-    if include_last_changed:
-        return lambda_stmt(lambda: select(*QUERY_STATES)), True
-    return lambda_stmt(lambda: select(*QUERY_STATES_NO_LAST_CHANGED)), True
+    else:
+        stmt = lambda_stmt(
+            lambda: select(
+                entity_id, States.state, last_changed_ts, last_updated_ts, *QUERY_STATES
+            )
+        )
+    if states_migrated:
+        stmt += lambda q: q.join(
+            StatesMeta, States.metadata_id == StatesMeta.metadata_id
+        )
+    else:
+        stmt += lambda q: q.outerjoin(
+            StatesMeta, States.metadata_id == StatesMeta.metadata_id
+        )
+    return stmt, not no_attributes
+
+
+def _filter_entity_ids(
+    stmt: StatementLambdaElement,
+    entity_ids: list[str],
+    metadata_ids: list[int],
+    states_migrated: bool,
+) -> StatementLambdaElement:
+    """Filter the states of the entity_ids."""
+    if states_migrated:
+        stmt += lambda q: q.filter(States.metadata_id.in_(metadata_ids))
+    else:
+        stmt += lambda q: q.filter(
+            States.metadata_id.in_(metadata_ids) | States.entity_id.in_(entity_ids)
+        )
+    return stmt
+
+
+def _get_metadata_ids(session: Session, entity_ids: list[str]) -> list[int]:
+    """Return the metadata_ids for the entity_ids that are in the database."""
+    return [
+        metadata_id
+        for metadata_id, _ in session.execute(find_states_metadata_ids(entity_ids))
+    ]
 
 
 def get_significant_states(
@@ -162,6 +201,8 @@ def get_significant_states(
     minimal_response: bool = False,
     no_attributes: bool = False,
     compressed_state_format: bool = False,
+    max_points: int | None = None,
+    resolution: timedelta | None = None,
 ) -> MutableMapping[str, list[State | dict[str, Any]]]:
     """Wrap get_significant_states_with_session with an sql session."""
     with session_scope(hass=hass) as session:
@@ -177,15 +218,17 @@ def get_significant_states(
             minimal_response,
             no_attributes,
             compressed_state_format,
+            max_points,
+            resolution,
         )
 
 
-def _ignore_domains_filter(query: Query) -> Query:
+def _ignore_domains_filter(query: Query, entity_id: ColumnElement) -> Query:
     """Add a filter to ignore domains we do not fetch history for."""
     return query.filter(
         and_(
             *[
-                ~States.entity_id.like(entity_domain)
+                ~entity_id.like(entity_domain)
                 for entity_domain in IGNORE_DOMAINS_ENTITY_ID_LIKE
             ]
         )
@@ -193,18 +236,24 @@ def _ignore_domains_filter(query: Query) -> Query:
 
 
 def _significant_states_stmt(
-    schema_version: int,
     start_time: datetime,
     end_time: datetime | None,
     entity_ids: list[str] | None,
+    metadata_ids: list[int] | None,
     filters: Filters | None,
     significant_changes_only: bool,
     no_attributes: bool,
+    states_migrated: bool,
 ) -> StatementLambdaElement:
     """Query the database for significant state changes."""
     stmt, join_attributes = lambda_stmt_and_join_attributes(
-        schema_version, no_attributes, include_last_changed=not significant_changes_only
+        no_attributes,
+        include_last_changed=not significant_changes_only,
+        states_migrated=states_migrated,
     )
+    last_updated_ts = _last_updated_ts_column(states_migrated)
+    last_changed_ts = _last_changed_ts_column(states_migrated)
+    entity_id = _entity_id_column(states_migrated)
     if (
         entity_ids
         and len(entity_ids) == 1
@@ -212,41 +261,42 @@ def _significant_states_stmt(
         and split_entity_id(entity_ids[0])[0] not in SIGNIFICANT_DOMAINS
     ):
         stmt += lambda q: q.filter(
-            (States.last_changed == States.last_updated) | States.last_changed.is_(None)
+            (last_changed_ts == last_updated_ts) | last_changed_ts.is_(None)
         )
     elif significant_changes_only:
         stmt += lambda q: q.filter(
             or_(
                 *[
-                    States.entity_id.like(entity_domain)
+                    entity_id.like(entity_domain)
                     for entity_domain in SIGNIFICANT_DOMAINS_ENTITY_ID_LIKE
                 ],
-                (
-                    (States.last_changed == States.last_updated)
-                    | States.last_changed.is_(None)
-                ),
+                (last_changed_ts == last_updated_ts) | last_changed_ts.is_(None),
             )
         )
 
-    if entity_ids:
-        stmt += lambda q: q.filter(States.entity_id.in_(entity_ids))
+    if entity_ids and metadata_ids is not None:
+        stmt = _filter_entity_ids(stmt, entity_ids, metadata_ids, states_migrated)
     else:
-        stmt += _ignore_domains_filter
+        stmt += lambda q: _ignore_domains_filter(q, entity_id)
         if filters and filters.has_config:
-            entity_filter = filters.states_entity_filter()
+            entity_filter = filters.states_entity_filter(entity_id)
             stmt = stmt.add_criteria(
-                lambda q: q.filter(entity_filter), track_on=[filters]
+                lambda q: q.filter(entity_filter),
+                track_on=[filters, states_migrated],
             )
 
-    stmt += lambda q: q.filter(States.last_updated > start_time)
+    start_time_ts = start_time.timestamp()
+    stmt += lambda q: q.filter(last_updated_ts > start_time_ts)
     if end_time:
-        stmt += lambda q: q.filter(States.last_updated < end_time)
+        end_time_ts = end_time.timestamp()
+        stmt += lambda q: q.filter(last_updated_ts < end_time_ts)
 
     if join_attributes:
         stmt += lambda q: q.outerjoin(
             StateAttributes, States.attributes_id == StateAttributes.attributes_id
         )
-    stmt += lambda q: q.order_by(States.entity_id, States.last_updated)
+    entity_key = _entity_key_column(states_migrated)
+    stmt += lambda q: q.order_by(entity_key, last_updated_ts)
     return stmt
 
 
@@ -262,6 +312,8 @@ def get_significant_states_with_session(
     minimal_response: bool = False,
     no_attributes: bool = False,
     compressed_state_format: bool = False,
+    max_points: int | None = None,
+    resolution: timedelta | None = None,
 ) -> MutableMapping[str, list[State | dict[str, Any]]]:
     """
     Return states changes during UTC period start_time - end_time.
@@ -274,15 +326,24 @@ def get_significant_states_with_session(
     Significant states are all states where there is a state change,
     as well as all states from certain domains (for instance
     thermostat so that we get current temperature in our graphs).
+
+    max_points and resolution optionally downsample the states of each
+    entity, see downsample_rows.
     """
+    if _schema_version(hass) < TIMESTAMP_SCHEMA_VERSION:
+        # The metadata_id and timestamp columns do not exist
+        # until the schema is upgraded
+        return {}
+    metadata_ids = _get_metadata_ids(session, entity_ids) if entity_ids else None
     stmt = _significant_states_stmt(
-        _schema_version(hass),
         start_time,
         end_time,
         entity_ids,
+        metadata_ids,
         filters,
         significant_changes_only,
         no_attributes,
+        _states_migrated(hass),
     )
     states = execute_stmt_lambda_element(
         session, stmt, None if entity_ids else start_time, end_time
@@ -298,9 +359,73 @@ def get_significant_states_with_session(
         minimal_response,
         no_attributes,
         compressed_state_format,
+        max_points,
+        resolution,
     )
 
 
+def stream_significant_states_with_session(
+    hass: HomeAssistant,
+    session: Session,
+    start_time: datetime,
+    end_time: datetime | None = None,
+    entity_ids: list[str] | None = None,
+    filters: Filters | None = None,
+    include_start_time_state: bool = True,
+    significant_changes_only: bool = True,
+    minimal_response: bool = False,
+    no_attributes: bool = False,
+    compressed_state_format: bool = False,
+    max_points: int | None = None,
+    resolution: timedelta | None = None,
+    chunk_size: int = STREAM_CHUNK_SIZE,
+) -> Iterator[tuple[str, list[State | dict[str, Any]]]]:
+    """Yield the states changes during UTC period start_time - end_time in chunks.
+
+    Each chunk is an entity_id and a list of at most chunk_size of its
+    states. The chunks of an entity are yielded in order, one entity
+    after the other.
+
+    Unlike get_significant_states_with_session the states are never
+    collected so the memory used does not grow with the length of
+    the period.
+    """
+    if _schema_version(hass) < TIMESTAMP_SCHEMA_VERSION:
+        # The metadata_id and timestamp columns do not exist
+        # until the schema is upgraded
+        return
+    metadata_ids = _get_metadata_ids(session, entity_ids) if entity_ids else None
+    stmt = _significant_states_stmt(
+        start_time,
+        end_time,
+        entity_ids,
+        metadata_ids,
+        filters,
+        significant_changes_only,
+        no_attributes,
+        _states_migrated(hass),
+    )
+    # Always pass the period so long periods are read with yield_per
+    # even when the entity_ids are given
+    states = execute_stmt_lambda_element(session, stmt, start_time, end_time)
+    for ent_id, ent_states in _sorted_states_to_entity_states(
+        hass,
+        session,
+        states,
+        start_time,
+        entity_ids,
+        filters,
+        include_start_time_state,
+        minimal_response,
+        no_attributes,
+        compressed_state_format,
+        max_points,
+        resolution,
+    ):
+        while chunk := list(islice(ent_states, chunk_size)):
+            yield ent_id, chunk
+
+
 def get_full_significant_states_with_session(
     hass: HomeAssistant,
     session: Session,
@@ -331,33 +456,41 @@ def get_full_significant_states_with_session(
 
 
 def _state_changed_during_period_stmt(
-    schema_version: int,
     start_time: datetime,
     end_time: datetime | None,
-    entity_id: str | None,
+    entity_ids: list[str] | None,
+    metadata_ids: list[int] | None,
     no_attributes: bool,
     descending: bool,
     limit: int | None,
+    states_migrated: bool,
 ) -> StatementLambdaElement:
     stmt, join_attributes = lambda_stmt_and_join_attributes(
-        schema_version, no_attributes, include_last_changed=False
+        no_attributes,
+        include_last_changed=False,
+        states_migrated=states_migrated,
     )
+    last_updated_ts = _last_updated_ts_column(states_migrated)
+    last_changed_ts = _last_changed_ts_column(states_migrated)
+    start_time_ts = start_time.timestamp()
     stmt += lambda q: q.filter(
-        ((States.last_changed == States.last_updated) | States.last_changed.is_(None))
-        & (States.last_updated > start_time)
+        ((last_changed_ts == last_updated_ts) | last_changed_ts.is_(None))
+        & (last_updated_ts > start_time_ts)
     )
     if end_time:
-        stmt += lambda q: q.filter(States.last_updated < end_time)
-    if entity_id:
-        stmt += lambda q: q.filter(States.entity_id == entity_id)
+        end_time_ts = end_time.timestamp()
+        stmt += lambda q: q.filter(last_updated_ts < end_time_ts)
+    if entity_ids and metadata_ids is not None:
+        stmt = _filter_entity_ids(stmt, entity_ids, metadata_ids, states_migrated)
     if join_attributes:
         stmt += lambda q: q.outerjoin(
             StateAttributes, States.attributes_id == StateAttributes.attributes_id
         )
+    entity_key = _entity_key_column(states_migrated)
     if descending:
-        stmt += lambda q: q.order_by(States.entity_id, States.last_updated.desc())
+        stmt += lambda q: q.order_by(entity_key, last_updated_ts.desc())
     else:
-        stmt += lambda q: q.order_by(States.entity_id, States.last_updated)
+        stmt += lambda q: q.order_by(entity_key, last_updated_ts)
     if limit:
         stmt += lambda q: q.limit(limit)
     return stmt
@@ -376,16 +509,28 @@ def state_changes_during_period(
     """Return states changes during UTC period start_time - end_time."""
     entity_id = entity_id.lower() if entity_id is not None else None
     entity_ids = [entity_id] if entity_id is not None else None
+    if _schema_version(hass) < TIMESTAMP_SCHEMA_VERSION:
+        # The metadata_id and timestamp columns do not exist
+        # until the schema is upgraded
+        return {}
+
+    states_migrated = _states_migrated(hass)
 
     with session_scope(hass=hass) as session:
+        metadata_ids: list[int] | None = None
+        if entity_ids:
+            metadata_ids = _get_metadata_ids(session, entity_ids)
+            if not metadata_ids and states_migrated:
+                return {entity_ids[0]: []}
         stmt = _state_changed_during_period_stmt(
-            _schema_version(hass),
             start_time,
             end_time,
-            entity_id,
+            entity_ids,
+            metadata_ids,
             no_attributes,
             descending,
             limit,
+            states_migrated,
         )
         states = execute_stmt_lambda_element(
             session, stmt, None if entity_id else start_time, end_time
@@ -404,21 +549,27 @@ def state_changes_during_period(
 
 
 def _get_last_state_changes_stmt(
-    schema_version: int, number_of_states: int, entity_id: str | None
+    number_of_states: int,
+    entity_ids: list[str] | None,
+    metadata_ids: list[int] | None,
+    states_migrated: bool,
 ) -> StatementLambdaElement:
     stmt, join_attributes = lambda_stmt_and_join_attributes(
-        schema_version, False, include_last_changed=False
+        False, include_last_changed=False, states_migrated=states_migrated
     )
+    last_updated_ts = _last_updated_ts_column(states_migrated)
+    last_changed_ts = _last_changed_ts_column(states_migrated)
     stmt += lambda q: q.filter(
-        (States.last_changed == States.last_updated) | States.last_changed.is_(None)
+        (last_changed_ts == last_updated_ts) | last_changed_ts.is_(None)
     )
-    if entity_id:
-        stmt += lambda q: q.filter(States.entity_id == entity_id)
+    if entity_ids and metadata_ids is not None:
+        stmt = _filter_entity_ids(stmt, entity_ids, metadata_ids, states_migrated)
     if join_attributes:
         stmt += lambda q: q.outerjoin(
             StateAttributes, States.attributes_id == StateAttributes.attributes_id
         )
-    stmt += lambda q: q.order_by(States.entity_id, States.last_updated.desc()).limit(
+    entity_key = _entity_key_column(states_migrated)
+    stmt += lambda q: q.order_by(entity_key, last_updated_ts.desc()).limit(
         number_of_states
     )
     return stmt
@@ -431,10 +582,21 @@ def get_last_state_changes(
     start_time = dt_util.utcnow()
     entity_id = entity_id.lower() if entity_id is not None else None
     entity_ids = [entity_id] if entity_id is not None else None
+    if _schema_version(hass) < TIMESTAMP_SCHEMA_VERSION:
+        # The metadata_id and timestamp columns do not exist
+        # until the schema is upgraded
+        return {}
+
+    states_migrated = _states_migrated(hass)
 
     with session_scope(hass=hass) as session:
+        metadata_ids: list[int] | None = None
+        if entity_ids:
+            metadata_ids = _get_metadata_ids(session, entity_ids)
+            if not metadata_ids and states_migrated:
+                return {entity_ids[0]: []}
         stmt = _get_last_state_changes_stmt(
-            _schema_version(hass), number_of_states, entity_id
+            number_of_states, entity_ids, metadata_ids, states_migrated
         )
         states = list(execute_stmt_lambda_element(session, stmt))
         return cast(
@@ -451,31 +613,55 @@ def get_last_state_changes(
 
 
 def _get_states_for_entites_stmt(
-    schema_version: int,
     run_start: datetime,
     utc_point_in_time: datetime,
     entity_ids: list[str],
+    metadata_ids: list[int],
     no_attributes: bool,
+    states_migrated: bool,
 ) -> StatementLambdaElement:
     """Baked query to get states for specific entities."""
     stmt, join_attributes = lambda_stmt_and_join_attributes(
-        schema_version, no_attributes, include_last_changed=True
+        no_attributes,
+        include_last_changed=True,
+        states_migrated=states_migrated,
     )
     # We got an include-list of entities, accelerate the query by filtering already
     # in the inner query.
-    stmt += lambda q: q.where(
-        States.state_id
-        == (
-            select(func.max(States.state_id).label("max_state_id"))
-            .filter(
-                (States.last_updated >= run_start)
-                & (States.last_updated < utc_point_in_time)
-            )
-            .filter(States.entity_id.in_(entity_ids))
-            .group_by(States.entity_id)
-            .subquery()
-        ).c.max_state_id
-    )
+    run_start_ts = run_start.timestamp()
+    utc_point_in_time_ts = utc_point_in_time.timestamp()
+    if states_migrated:
+        stmt += lambda q: q.where(
+            States.state_id
+            == (
+                select(func.max(States.state_id).label("max_state_id"))
+                .filter(
+                    (States.last_updated_ts >= run_start_ts)
+                    & (States.last_updated_ts < utc_point_in_time_ts)
+                )
+                .filter(States.metadata_id.in_(metadata_ids))
+                .group_by(States.metadata_id)
+                .subquery()
+            ).c.max_state_id
+        )
+    else:
+        stmt += lambda q: q.where(
+            States.state_id
+            == (
+                select(func.max(States.state_id).label("max_state_id"))
+                .outerjoin(StatesMeta, States.metadata_id == StatesMeta.metadata_id)
+                .filter(
+                    (LEGACY_STATES_LAST_UPDATED_TS >= run_start_ts)
+                    & (LEGACY_STATES_LAST_UPDATED_TS < utc_point_in_time_ts)
+                )
+                .filter(
+                    States.metadata_id.in_(metadata_ids)
+                    | States.entity_id.in_(entity_ids)
+                )
+                .group_by(LEGACY_STATES_ENTITY_ID)
+                .subquery()
+            ).c.max_state_id
+        )
     if join_attributes:
         stmt += lambda q: q.outerjoin(
             StateAttributes, (States.attributes_id == StateAttributes.attributes_id)
@@ -488,58 +674,84 @@ def _generate_most_recent_states_by_date(
     utc_point_in_time: datetime,
 ) -> Subquery:
     """Generate the sub query for the most recent states by data."""
+    run_start_ts = run_start.timestamp()
+    utc_point_in_time_ts = utc_point_in_time.timestamp()
     return (
         select(
-            States.entity_id.label("max_entity_id"),
-            func.max(States.last_updated).label("max_last_updated"),
+            States.metadata_id.label("max_metadata_id"),
+            func.max(States.last_updated_ts).label("max_last_updated"),
         )
         .filter(
-            (States.last_updated >= run_start)
-            & (States.last_updated < utc_point_in_time)
+            (States.last_updated_ts >= run_start_ts)
+            & (States.last_updated_ts < utc_point_in_time_ts)
         )
-        .group_by(States.entity_id)
+        .group_by(States.metadata_id)
         .subquery()
     )
 
 
 def _get_states_for_all_stmt(
-    schema_version: int,
     run_start: datetime,
     utc_point_in_time: datetime,
     filters: Filters | None,
     no_attributes: bool,
+    states_migrated: bool,
 ) -> StatementLambdaElement:
     """Baked query to get states for all entities."""
     stmt, join_attributes = lambda_stmt_and_join_attributes(
-        schema_version, no_attributes, include_last_changed=True
+        no_attributes,
+        include_last_changed=True,
+        states_migrated=states_migrated,
     )
     # We did not get an include-list of entities, query all states in the inner
     # query, then filter out unwanted domains as well as applying the custom filter.
     # This filtering can't be done in the inner query because the domain column is
     # not indexed and we can't control what's in the custom filter.
-    most_recent_states_by_date = _generate_most_recent_states_by_date(
-        run_start, utc_point_in_time
-    )
-    stmt += lambda q: q.where(
-        States.state_id
-        == (
-            select(func.max(States.state_id).label("max_state_id"))
-            .join(
-                most_recent_states_by_date,
-                and_(
-                    States.entity_id == most_recent_states_by_date.c.max_entity_id,
-                    States.last_updated
-                    == most_recent_states_by_date.c.max_last_updated,
-                ),
-            )
-            .group_by(States.entity_id)
-            .subquery()
-        ).c.max_state_id,
-    )
-    stmt += _ignore_domains_filter
+    if states_migrated:
+        most_recent_states_by_date = _generate_most_recent_states_by_date(
+            run_start, utc_point_in_time
+        )
+        stmt += lambda q: q.where(
+            States.state_id
+            == (
+                select(func.max(States.state_id).label("max_state_id"))
+                .join(
+                    most_recent_states_by_date,
+                    and_(
+                        States.metadata_id
+                        == most_recent_states_by_date.c.max_metadata_id,
+                        States.last_updated_ts
+                        == most_recent_states_by_date.c.max_last_updated,
+                    ),
+                )
+                .group_by(States.metadata_id)
+                .subquery()
+            ).c.max_state_id,
+        )
+    else:
+        run_start_ts = run_start.timestamp()
+        utc_point_in_time_ts = utc_point_in_time.timestamp()
+        stmt += lambda q: q.where(
+            States.state_id
+            == (
+                select(func.max(States.state_id).label("max_state_id"))
+                .outerjoin(StatesMeta, States.metadata_id == StatesMeta.metadata_id)
+                .filter(
+                    (LEGACY_STATES_LAST_UPDATED_TS >= run_start_ts)
+                    & (LEGACY_STATES_LAST_UPDATED_TS < utc_point_in_time_ts)
+                )
+                .group_by(LEGACY_STATES_ENTITY_ID)
+                .subquery()
+            ).c.max_state_id,
+        )
+    entity_id = _entity_id_column(states_migrated)
+    stmt += lambda q: _ignore_domains_filter(q, entity_id)
     if filters and filters.has_config:
-        entity_filter = filters.states_entity_filter()
-        stmt = stmt.add_criteria(lambda q: q.filter(entity_filter), track_on=[filters])
+        entity_filter = filters.states_entity_filter(entity_id)
+        stmt = stmt.add_criteria(
+            lambda q: q.filter(entity_filter),
+            track_on=[filters, states_migrated],
+        )
     if join_attributes:
         stmt += lambda q: q.outerjoin(
             StateAttributes, (States.attributes_id == StateAttributes.attributes_id)
@@ -557,12 +769,24 @@ def _get_rows_with_session(
     no_attributes: bool = False,
 ) -> Iterable[Row]:
     """Return the states at a specific point in time."""
-    schema_version = _schema_version(hass)
+    if _schema_version(hass) < TIMESTAMP_SCHEMA_VERSION:
+        # The metadata_id and timestamp columns do not exist
+        # until the schema is upgraded
+        return []
+    states_migrated = _states_migrated(hass)
+    metadata_ids = _get_metadata_ids(session, entity_ids) if entity_ids else None
     if entity_ids and len(entity_ids) == 1:
+        assert metadata_ids is not None
+        if not metadata_ids and states_migrated:
+            return []
         return execute_stmt_lambda_element(
             session,
             _get_single_entity_states_stmt(
-                schema_version, utc_point_in_time, entity_ids[0], no_attributes
+                utc_point_in_time,
+                entity_ids,
+                metadata_ids,
+                no_attributes,
+                states_migrated,
             ),
         )
 
@@ -575,35 +799,43 @@ def _get_rows_with_session(
 
     # We have more than one entity to look at so we need to do a query on states
     # since the last recorder run started.
-    if entity_ids:
+    if entity_ids and metadata_ids is not None:
         stmt = _get_states_for_entites_stmt(
-            schema_version, run.start, utc_point_in_time, entity_ids, no_attributes
+            run.start,
+            utc_point_in_time,
+            entity_ids,
+            metadata_ids,
+            no_attributes,
+            states_migrated,
         )
     else:
         stmt = _get_states_for_all_stmt(
-            schema_version, run.start, utc_point_in_time, filters, no_attributes
+            run.start, utc_point_in_time, filters, no_attributes, states_migrated
         )
 
     return execute_stmt_lambda_element(session, stmt)
 
 
 def _get_single_entity_states_stmt(
-    schema_version: int,
     utc_point_in_time: datetime,
-    entity_id: str,
+    entity_ids: list[str],
+    metadata_ids: list[int],
     no_attributes: bool = False,
+    states_migrated: bool = True,
 ) -> StatementLambdaElement:
     # Use an entirely different (and extremely fast) query if we only
     # have a single entity id
     stmt, join_attributes = lambda_stmt_and_join_attributes(
-        schema_version, no_attributes, include_last_changed=True
+        no_attributes,
+        include_last_changed=True,
+        states_migrated=states_migrated,
     )
+    last_updated_ts = _last_updated_ts_column(states_migrated)
+    utc_point_in_time_ts = utc_point_in_time.timestamp()
+    stmt = _filter_entity_ids(stmt, entity_ids, metadata_ids, states_migrated)
     stmt += (
-        lambda q: q.filter(
-            States.last_updated < utc_point_in_time,
-            States.entity_id == entity_id,
-        )
-        .order_by(States.last_updated.desc())
+        lambda q: q.filter(last_updated_ts < utc_point_in_time_ts)
+        .order_by(last_updated_ts.desc())
         .limit(1)
     )
     if join_attributes:
@@ -624,37 +856,74 @@ def _sorted_states_to_dict(
     minimal_response: bool = False,
     no_attributes: bool = False,
     compressed_state_format: bool = False,
+    max_points: int | None = None,
+    resolution: timedelta | None = None,
 ) -> MutableMapping[str, list[State | dict[str, Any]]]:
     """Convert SQL results into JSON friendly data structure.
 
     This takes our state list and turns it into a JSON friendly data
     structure {'entity_id': [list of states], 'entity_id2': [list of states]}
 
-    States must be sorted by entity_id and last_updated
+    States must be sorted by metadata_id and last_updated_ts
 
     We also need to go back and create a synthetic zero data point for
     each list of states, otherwise our graphs won't start on the Y
     axis correctly.
     """
-    if compressed_state_format:
-        state_class = row_to_compressed_state
-        _process_timestamp: Callable[
-            [datetime], float | str
-        ] = process_datetime_to_timestamp
-        attr_time = COMPRESSED_STATE_LAST_UPDATED
-        attr_state = COMPRESSED_STATE_STATE
-    else:
-        state_class = LazyState  # type: ignore[assignment]
-        _process_timestamp = process_timestamp_to_utc_isoformat
-        attr_time = LAST_CHANGED_KEY
-        attr_state = STATE_KEY
-
     result: dict[str, list[State | dict[str, Any]]] = defaultdict(list)
     # Set all entity IDs to empty lists in result set to maintain the order
     if entity_ids is not None:
         for ent_id in entity_ids:
             result[ent_id] = []
 
+    for ent_id, ent_states in _sorted_states_to_entity_states(
+        hass,
+        session,
+        states,
+        start_time,
+        entity_ids,
+        filters,
+        include_start_time_state,
+        minimal_response,
+        no_attributes,
+        compressed_state_format,
+        max_points,
+        resolution,
+    ):
+        result[ent_id].extend(ent_states)
+
+    # Filter out the empty lists if some states had 0 results.
+    if entity_ids is not None:
+        return {key: val for key, val in result.items() if val}
+    # Rows are grouped by metadata_id, sort by entity_id to keep
+    # the output order stable
+    return {key: result[key] for key in sorted(result) if result[key]}
+
+
+def _sorted_states_to_entity_states(
+    hass: HomeAssistant,
+    session: Session,
+    states: Iterable[Row],
+    start_time: datetime,
+    entity_ids: list[str] | None,
+    filters: Filters | None,
+    include_start_time_state: bool,
+    minimal_response: bool,
+    no_attributes: bool,
+    compressed_state_format: bool,
+    max_points: int | None,
+    resolution: timedelta | None,
+) -> Iterator[tuple[str, Iterator[State | dict[str, Any]]]]:
+    """Yield the entity_id and an iterator of the states of each entity.
+
+    States must be sorted by metadata_id and last_updated_ts. The states
+    of each entity must be consumed before moving on to the next entity.
+    """
+    if compressed_state_format:
+        state_class = row_to_compressed_state
+    else:
+        state_class = LazyState  # type: ignore[assignment]
+
     # Get the states at the start time
     timer_start = time.perf_counter()
     initial_states: dict[str, Row] = {}
@@ -673,7 +942,9 @@ def _sorted_states_to_dict(
 
     if _LOGGER.isEnabledFor(logging.DEBUG):
         elapsed = time.perf_counter() - timer_start
-        _LOGGER.debug("getting %d first datapoints took %fs", len(result), elapsed)
+        _LOGGER.debug(
+            "getting %d first datapoints took %fs", len(initial_states), elapsed
+        )
 
     if entity_ids and len(entity_ids) == 1:
         states_iter: Iterable[tuple[str | Column, Iterator[States]]] = (
@@ -684,50 +955,116 @@ def _sorted_states_to_dict(
 
     # Append all changes to it
     for ent_id, group in states_iter:
-        attr_cache: dict[str, dict[str, Any]] = {}
-        prev_state: Column | str
-        ent_results = result[ent_id]
-        if row := initial_states.pop(ent_id, None):
-            prev_state = row.state
-            ent_results.append(state_class(row, attr_cache, start_time))
-
-        if not minimal_response or split_entity_id(ent_id)[0] in NEED_ATTRIBUTE_DOMAINS:
-            ent_results.extend(state_class(db_state, attr_cache) for db_state in group)
-            continue
+        yield ent_id, entity_states_from_rows(
+            ent_id,
+            group,
+            initial_states.pop(ent_id, None),
+            start_time,
+            minimal_response,
+            compressed_state_format,
+            max_points,
+            resolution,
+        )
+
+    # If there are no states beyond the initial state,
+    # the state a was never popped from initial_states
+    for ent_id, row in initial_states.items():
+        yield ent_id, iter((state_class(row, {}, start_time),))
 
-        # With minimal response we only provide a native
-        # State for the first and last response. All the states
-        # in-between only provide the "state" and the
-        # "last_changed".
-        if not ent_results:
-            if (first_state := next(group, None)) is None:
-                continue
-            prev_state = first_state.state
-            ent_results.append(state_class(first_state, attr_cache))
 
+def entity_states_from_rows(
+    ent_id: str,
+    rows: Iterable[Row],
+    initial_row: Row | None,
+    start_time: datetime,
+    minimal_response: bool = False,
+    compressed_state_format: bool = False,
+    max_points: int | None = None,
+    resolution: timedelta | None = None,
+) -> Iterator[State | dict[str, Any]]:
+    """Yield the states of a single entity from its rows.
+
+    The rows must be sorted by last_updated_ts and have the columns of
+    the significant states query. initial_row is the state at start_time.
+    """
+    if max_points is not None or resolution is not None:
+        # The initial state is always kept and counts as a point
+        downsampled = downsample_rows(rows, max_points, resolution, initial_row)
+        if initial_row is not None:
+            initial_row = next(downsampled)
+        rows = downsampled
+    return _entity_states(
+        ent_id,
+        iter(rows),
+        initial_row,
+        start_time,
+        row_to_compressed_state if compressed_state_format else LazyState,
+        minimal_response,
+        compressed_state_format,
+    )
+
+
+def _entity_states(
+    ent_id: str,
+    group: Iterator[Row],
+    initial_row: Row | None,
+    start_time: datetime,
+    state_class: Callable[..., State | dict[str, Any]],
+    minimal_response: bool,
+    compressed_state_format: bool,
+) -> Iterator[State | dict[str, Any]]:
+    """Yield the states of a single entity."""
+    if compressed_state_format:
+        attr_time = COMPRESSED_STATE_LAST_UPDATED
+        attr_state = COMPRESSED_STATE_STATE
+    else:
+        attr_time = LAST_CHANGED_KEY
+        attr_state = STATE_KEY
+
+    attr_cache: dict[str, dict[str, Any]] = {}
+    prev_state: Column | str
+    if initial_row is not None:
+        prev_state = initial_row.state
+        yield state_class(initial_row, attr_cache, start_time)
+
+    if not minimal_response or split_entity_id(ent_id)[0] in NEED_ATTRIBUTE_DOMAINS:
+        for db_state in group:
+            yield state_class(db_state, attr_cache)
+        return
+
+    # With minimal response we only provide a native
+    # State for the first and last response. All the states
+    # in-between only provide the "state" and the
+    # "last_changed".
+    if initial_row is None:
+        if (first_state := next(group, None)) is None:
+            return
+        prev_state = first_state.state
+        yield state_class(first_state, attr_cache)
+
+    if compressed_state_format:
+        # The compressed format uses the raw timestamps
+        # so there is no need to construct datetime objects
         for row in group:
-            # With minimal response we do not care about attribute
-            # changes so we can filter out duplicate states
             if (state := row.state) == prev_state:
                 continue
-
-            ent_results.append(
-                {
-                    attr_state: state,
-                    #
-                    # minimal_response only makes sense with last_updated == last_updated
-                    #
-                    # We use last_updated for for last_changed since its the same
-                    #
-                    attr_time: _process_timestamp(row.last_updated),
-                }
-            )
+            yield {attr_state: state, attr_time: row.last_updated_ts}
             prev_state = state
+        return
 
-    # If there are no states beyond the initial state,
-    # the state a was never popped from initial_states
-    for ent_id, row in initial_states.items():
-        result[ent_id].append(state_class(row, {}, start_time))
+    for row in group:
+        # With minimal response we do not care about attribute
+        # changes so we can filter out duplicate states
+        if (state := row.state) == prev_state:
+            continue
 
-    # Filter out the empty lists if some states had 0 results.
-    return {key: val for key, val in result.items() if val}
+        yield {
+            attr_state: state,
+            #
+            # minimal_response only makes sense with last_updated == last_updated
+            #
+            # We use last_updated for for last_changed since its the same
+            #
+            attr_time: _utc_from_timestamp(row.last_updated_ts).isoformat(),
+        }
+        prev_state = state
@@ -0,0 +1,44 @@
+"""LRU caches of database ids with hit, miss and eviction counters."""
+from __future__ import annotations
+
+from typing import Any
+
+from lru import LRU  # pylint: disable=no-name-in-module
+
+
+class IdCache(LRU):  # type: ignore[misc]
+    """An LRU cache that maps shared json to a database id.
+
+    Lookups with get and [] are counted by the LRU itself, this
+    adds a counter for evictions and keeps the counters when
+    the cache is cleared.
+    """
+
+    def __init__(self, size: int) -> None:
+        """Init the cache."""
+        super().__init__(size, self._evicted)
+        self.evictions = 0
+        self._cleared_hits = 0
+        self._cleared_misses = 0
+
+    def _evicted(self, key: Any, value: Any) -> None:
+        """Count an evicted entry."""
+        self.evictions += 1
+
+    def clear(self) -> None:
+        """Remove all entries but keep the counters."""
+        hits, misses = self.get_stats()
+        self._cleared_hits += hits
+        self._cleared_misses += misses
+        super().clear()
+
+    def stats(self) -> dict[str, int]:
+        """Return the size and counters of the cache."""
+        hits, misses = self.get_stats()
+        return {
+            "size": len(self),
+            "max_size": self.get_size(),
+            "hits": self._cleared_hits + hits,
+            "misses": self._cleared_misses + misses,
+            "evictions": self.evictions,
+        }
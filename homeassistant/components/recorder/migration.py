@@ -1,9 +1,12 @@
 """Schema migration helpers."""
+from __future__ import annotations
+
 from collections.abc import Callable, Iterable
 import contextlib
 from datetime import timedelta
 import logging
-from typing import Any, cast
+from typing import TYPE_CHECKING, Any, cast
+from uuid import UUID
 
 import sqlalchemy
 from sqlalchemy import ForeignKeyConstraint, MetaData, Table, func, text
@@ -20,25 +23,53 @@ from sqlalchemy.schema import AddConstraint, DropConstraint
 from sqlalchemy.sql.expression import true
 
 from homeassistant.core import HomeAssistant
+from homeassistant.util.ulid import ulid, ulid_to_bytes
 
-from .const import SupportedDialect
+from .const import MAX_ROWS_TO_MIGRATE, SupportedDialect
 from .db_schema import (
+    CONTEXT_ID_BIN_MAX_LENGTH,
+    LEGACY_ENTITY_ID_LAST_UPDATED_INDEX,
+    LEGACY_EVENT_TYPE_ID_TIME_FIRED_INDEX,
+    LEGACY_EVENT_TYPE_TIME_FIRED_INDEX,
+    LEGACY_EVENTS_CONTEXT_ID_INDEX,
+    LEGACY_LAST_UPDATED_INDEX,
+    LEGACY_METADATA_ID_LAST_UPDATED_INDEX,
+    LEGACY_STATES_CONTEXT_ID_INDEX,
+    LEGACY_TIME_FIRED_INDEX,
     SCHEMA_VERSION,
+    TABLE_EVENTS,
     TABLE_STATES,
     Base,
+    Events,
+    EventTypes,
     SchemaChanges,
+    States,
+    StatesMeta,
     Statistics,
     StatisticsMeta,
     StatisticsRuns,
     StatisticsShortTerm,
 )
-from .models import process_timestamp
+from .models import process_datetime_to_timestamp, process_timestamp
+from .queries import (
+    find_entity_ids_to_migrate,
+    find_event_type_ids,
+    find_event_types_to_migrate,
+    find_events_context_ids_to_migrate,
+    find_events_timestamps_to_migrate,
+    find_states_context_ids_to_migrate,
+    find_states_metadata_ids,
+    find_states_timestamps_to_migrate,
+)
 from .statistics import (
     delete_statistics_duplicates,
     delete_statistics_meta_duplicates,
     get_start_time,
 )
-from .util import session_scope
+from .util import retryable_database_job, session_scope
+
+if TYPE_CHECKING:
+    from . import Recorder
 
 LIVE_MIGRATION_MIN_SCHEMA_VERSION = 0
 
@@ -146,7 +177,10 @@ def _create_index(
 
 
 def _drop_index(
-    session_maker: Callable[[], Session], table_name: str, index_name: str
+    session_maker: Callable[[], Session],
+    table_name: str,
+    index_name: str,
+    quiet: bool | None = None,
 ) -> None:
     """Drop an index from a specified table.
 
@@ -210,9 +244,12 @@ def _drop_index(
             "Finished dropping index %s from table %s", index_name, table_name
         )
     else:
-        if index_name == "ix_states_context_parent_id":
+        if index_name == "ix_states_context_parent_id" or quiet:
             # Was only there on nightly so we do not want
             # to generate log noise or issues about it.
+            #
+            # Legacy indexes dropped by the background migrations
+            # do not exist on databases created with a newer schema.
             return
 
         _LOGGER.warning(
@@ -427,6 +464,13 @@ def _apply_update(  # noqa: C901
     """Perform operations to bring schema up to date."""
     dialect = engine.dialect.name
     big_int = "INTEGER(20)" if dialect == SupportedDialect.MYSQL else "INTEGER"
+    timestamp_type = "DOUBLE PRECISION"
+    if dialect == SupportedDialect.MYSQL:
+        context_bin_type = f"BLOB({CONTEXT_ID_BIN_MAX_LENGTH})"
+    elif dialect == SupportedDialect.POSTGRESQL:
+        context_bin_type = "BYTEA"
+    else:
+        context_bin_type = "BLOB"
 
     if new_version == 1:
         _create_index(session_maker, "events", "ix_events_time_fired")
@@ -766,10 +810,351 @@ def _apply_update(  # noqa: C901
                     },
                     synchronize_session=False,
                 )
+    elif new_version == 31:
+        # The entity_id and event_type columns are migrated to the
+        # states_meta and event_types tables in the background
+        # by EntityIDMigrationTask and EventTypeIDMigrationTask
+        # once the recorder has started.
+        _add_columns(session_maker, "states", [f"metadata_id {big_int}"])
+        _add_columns(session_maker, "events", [f"event_type_id {big_int}"])
+        _create_index(session_maker, "states", "ix_states_metadata_id_last_updated")
+        _create_index(session_maker, "events", "ix_events_event_type_id_time_fired")
+    elif new_version == 32:
+        # The datetime columns are migrated to the *_ts columns
+        # in the background by StatesTimestampMigrationTask and
+        # EventsTimestampMigrationTask once the recorder has started.
+        _add_columns(session_maker, "events", [f"time_fired_ts {timestamp_type}"])
+        _add_columns(
+            session_maker,
+            "states",
+            [f"last_updated_ts {timestamp_type}", f"last_changed_ts {timestamp_type}"],
+        )
+        _create_index(session_maker, "events", "ix_events_time_fired_ts")
+        _create_index(session_maker, "events", "ix_events_event_type_id_time_fired_ts")
+        _create_index(session_maker, "states", "ix_states_last_updated_ts")
+        _create_index(session_maker, "states", "ix_states_metadata_id_last_updated_ts")
+    elif new_version == 33:
+        # The context ids are migrated to the *_bin columns in the
+        # background by EventsContextIDMigrationTask and
+        # StatesContextIDMigrationTask once the recorder has started.
+        for table in ("events", "states"):
+            _add_columns(
+                session_maker,
+                table,
+                [
+                    f"context_id_bin {context_bin_type}",
+                    f"context_user_id_bin {context_bin_type}",
+                    f"context_parent_id_bin {context_bin_type}",
+                ],
+            )
+        _create_index(session_maker, "events", "ix_events_context_id_bin")
+        _create_index(session_maker, "states", "ix_states_context_id_bin")
     else:
         raise ValueError(f"No schema migration defined for version {new_version}")
 
 
+@retryable_database_job("migrate states entity_ids to states_meta")
+def migrate_entity_ids(instance: Recorder) -> bool:
+    """Migrate entity_ids to states_meta.
+
+    We do this in batches to avoid locking the database for too long.
+
+    Returns True when the migration is done.
+    """
+    _LOGGER.debug("Migrating entity_ids")
+    with session_scope(session=instance.get_session()) as session:
+        if states := session.execute(find_entity_ids_to_migrate()).all():
+            metadata_ids = _get_or_create_states_meta_ids(
+                session, {entity_id for _, entity_id in states}
+            )
+            session.bulk_update_mappings(
+                States,
+                [
+                    {
+                        "state_id": state_id,
+                        "entity_id": None,
+                        "metadata_id": metadata_ids[entity_id],
+                    }
+                    for state_id, entity_id in states
+                ],
+            )
+        is_done = len(states) < MAX_ROWS_TO_MIGRATE
+
+    if is_done:
+        _drop_index(
+            instance.get_session,
+            TABLE_STATES,
+            LEGACY_ENTITY_ID_LAST_UPDATED_INDEX,
+            quiet=True,
+        )
+
+    _LOGGER.debug("Migrating entity_ids done=%s", is_done)
+    return is_done
+
+
+@retryable_database_job("migrate events event_types to event_types")
+def migrate_event_type_ids(instance: Recorder) -> bool:
+    """Migrate event_types to the event_types table.
+
+    We do this in batches to avoid locking the database for too long.
+
+    Returns True when the migration is done.
+    """
+    _LOGGER.debug("Migrating event_types")
+    with session_scope(session=instance.get_session()) as session:
+        if events := session.execute(find_event_types_to_migrate()).all():
+            event_type_ids = _get_or_create_event_type_ids(
+                session, {event_type for _, event_type in events}
+            )
+            session.bulk_update_mappings(
+                Events,
+                [
+                    {
+                        "event_id": event_id,
+                        "event_type": None,
+                        "event_type_id": event_type_ids[event_type],
+                    }
+                    for event_id, event_type in events
+                ],
+            )
+        is_done = len(events) < MAX_ROWS_TO_MIGRATE
+
+    if is_done:
+        _drop_index(
+            instance.get_session,
+            TABLE_EVENTS,
+            LEGACY_EVENT_TYPE_TIME_FIRED_INDEX,
+            quiet=True,
+        )
+
+    _LOGGER.debug("Migrating event_types done=%s", is_done)
+    return is_done
+
+
+@retryable_database_job("migrate states timestamps")
+def migrate_states_timestamps(instance: Recorder) -> bool:
+    """Migrate states last_updated and last_changed to timestamps.
+
+    We do this in batches to avoid locking the database for too long.
+
+    Returns True when the migration is done.
+    """
+    _LOGGER.debug("Migrating states timestamps")
+    with session_scope(session=instance.get_session()) as session:
+        if states := session.execute(find_states_timestamps_to_migrate()).all():
+            session.bulk_update_mappings(
+                States,
+                [
+                    {
+                        "state_id": state_id,
+                        "last_updated": None,
+                        "last_updated_ts": process_datetime_to_timestamp(last_updated),
+                        "last_changed": None,
+                        "last_changed_ts": None
+                        if last_changed is None or last_changed == last_updated
+                        else process_datetime_to_timestamp(last_changed),
+                    }
+                    for state_id, last_updated, last_changed in states
+                ],
+            )
+        is_done = len(states) < MAX_ROWS_TO_MIGRATE
+
+    if is_done:
+        for index_name in (
+            LEGACY_LAST_UPDATED_INDEX,
+            LEGACY_METADATA_ID_LAST_UPDATED_INDEX,
+        ):
+            _drop_index(instance.get_session, TABLE_STATES, index_name, quiet=True)
+
+    _LOGGER.debug("Migrating states timestamps done=%s", is_done)
+    return is_done
+
+
+@retryable_database_job("migrate events timestamps")
+def migrate_events_timestamps(instance: Recorder) -> bool:
+    """Migrate events time_fired to timestamps.
+
+    We do this in batches to avoid locking the database for too long.
+
+    Returns True when the migration is done.
+    """
+    _LOGGER.debug("Migrating events timestamps")
+    with session_scope(session=instance.get_session()) as session:
+        if events := session.execute(find_events_timestamps_to_migrate()).all():
+            session.bulk_update_mappings(
+                Events,
+                [
+                    {
+                        "event_id": event_id,
+                        "time_fired": None,
+                        "time_fired_ts": process_datetime_to_timestamp(time_fired),
+                    }
+                    for event_id, time_fired in events
+                ],
+            )
+        is_done = len(events) < MAX_ROWS_TO_MIGRATE
+
+    if is_done:
+        for index_name in (
+            LEGACY_TIME_FIRED_INDEX,
+            LEGACY_EVENT_TYPE_ID_TIME_FIRED_INDEX,
+        ):
+            _drop_index(instance.get_session, TABLE_EVENTS, index_name, quiet=True)
+
+    _LOGGER.debug("Migrating events timestamps done=%s", is_done)
+    return is_done
+
+
+def _context_id_to_bytes(context_id: str | None) -> bytes | None:
+    """Convert a ulid or uuid hex context id to bytes."""
+    if context_id is None:
+        return None
+    with contextlib.suppress(ValueError):
+        if len(context_id) == 32:
+            return UUID(hex=context_id).bytes
+        if len(context_id) == 26:
+            return ulid_to_bytes(context_id)
+    return None
+
+
+def _user_id_to_bytes(user_id: str | None) -> bytes | None:
+    """Convert a uuid hex user id to bytes."""
+    if user_id is None or len(user_id) != 32:
+        return None
+    with contextlib.suppress(ValueError):
+        return UUID(hex=user_id).bytes
+    return None
+
+
+def _generate_ulid_bytes_at_time(timestamp: float | None) -> bytes:
+    """Generate a ulid with a specific timestamp."""
+    return ulid_to_bytes(ulid(timestamp))
+
+
+@retryable_database_job("migrate events context_ids to binary format")
+def migrate_events_context_ids(instance: Recorder) -> bool:
+    """Migrate events context_ids to the binary format.
+
+    We do this in batches to avoid locking the database for too long.
+
+    Returns True when the migration is done.
+    """
+    _LOGGER.debug("Migrating events context_ids to binary format")
+    with session_scope(session=instance.get_session()) as session:
+        if events := session.execute(find_events_context_ids_to_migrate()).all():
+            session.bulk_update_mappings(
+                Events,
+                [
+                    {
+                        "event_id": event_id,
+                        "context_id": None,
+                        "context_id_bin": _context_id_to_bytes(context_id)
+                        or _generate_ulid_bytes_at_time(time_fired_ts),
+                        "context_user_id": None,
+                        "context_user_id_bin": _user_id_to_bytes(context_user_id),
+                        "context_parent_id": None,
+                        "context_parent_id_bin": _context_id_to_bytes(
+                            context_parent_id
+                        ),
+                    }
+                    for event_id, time_fired_ts, context_id, context_user_id, context_parent_id in events
+                ],
+            )
+        is_done = len(events) < MAX_ROWS_TO_MIGRATE
+
+    if is_done:
+        _drop_index(
+            instance.get_session,
+            TABLE_EVENTS,
+            LEGACY_EVENTS_CONTEXT_ID_INDEX,
+            quiet=True,
+        )
+
+    _LOGGER.debug("Migrating events context_ids to binary format done=%s", is_done)
+    return is_done
+
+
+@retryable_database_job("migrate states context_ids to binary format")
+def migrate_states_context_ids(instance: Recorder) -> bool:
+    """Migrate states context_ids to the binary format.
+
+    We do this in batches to avoid locking the database for too long.
+
+    Returns True when the migration is done.
+    """
+    _LOGGER.debug("Migrating states context_ids to binary format")
+    with session_scope(session=instance.get_session()) as session:
+        if states := session.execute(find_states_context_ids_to_migrate()).all():
+            session.bulk_update_mappings(
+                States,
+                [
+                    {
+                        "state_id": state_id,
+                        "context_id": None,
+                        "context_id_bin": _context_id_to_bytes(context_id)
+                        or _generate_ulid_bytes_at_time(last_updated_ts),
+                        "context_user_id": None,
+                        "context_user_id_bin": _user_id_to_bytes(context_user_id),
+                        "context_parent_id": None,
+                        "context_parent_id_bin": _context_id_to_bytes(
+                            context_parent_id
+                        ),
+                    }
+                    for state_id, last_updated_ts, context_id, context_user_id, context_parent_id in states
+                ],
+            )
+        is_done = len(states) < MAX_ROWS_TO_MIGRATE
+
+    if is_done:
+        _drop_index(
+            instance.get_session,
+            TABLE_STATES,
+            LEGACY_STATES_CONTEXT_ID_INDEX,
+            quiet=True,
+        )
+
+    _LOGGER.debug("Migrating states context_ids to binary format done=%s", is_done)
+    return is_done
+
+
+def _get_or_create_states_meta_ids(
+    session: Session, entity_ids: set[str]
+) -> dict[str, int]:
+    """Find or create the metadata_ids for a set of entity_ids."""
+    metadata_ids: dict[str, int] = {
+        entity_id: metadata_id
+        for metadata_id, entity_id in session.execute(
+            find_states_metadata_ids(entity_ids)
+        )
+    }
+    if missing := entity_ids.difference(metadata_ids):
+        states_meta = [StatesMeta(entity_id=entity_id) for entity_id in missing]
+        session.add_all(states_meta)
+        session.flush()
+        for meta in states_meta:
+            metadata_ids[meta.entity_id] = meta.metadata_id
+    return metadata_ids
+
+
+def _get_or_create_event_type_ids(
+    session: Session, event_types: set[str]
+) -> dict[str, int]:
+    """Find or create the event_type_ids for a set of event_types."""
+    event_type_ids: dict[str, int] = {
+        event_type: event_type_id
+        for event_type_id, event_type in session.execute(
+            find_event_type_ids(event_types)
+        )
+    }
+    if missing := event_types.difference(event_type_ids):
+        db_event_types = [EventTypes(event_type=event_type) for event_type in missing]
+        session.add_all(db_event_types)
+        session.flush()
+        for db_event_type in db_event_types:
+            event_type_ids[db_event_type.event_type] = db_event_type.event_type_id
+    return event_type_ids
+
+
 def _inspect_schema_version(session: Session) -> int:
     """Determine the schema version by inspecting the db structure.
 
@@ -783,7 +1168,7 @@ def _inspect_schema_version(session: Session) -> int:
     indexes = inspector.get_indexes("events")
 
     for index in indexes:
-        if index["column_names"] == ["time_fired"]:
+        if index["column_names"] in (["time_fired"], ["time_fired_ts"]):
             # Schema addition from version 1 detected. New DB.
             session.add(StatisticsRuns(start=get_start_time()))
             session.add(SchemaChanges(schema_version=SCHEMA_VERSION))
@@ -4,6 +4,7 @@ from __future__ import annotations
 from datetime import datetime
 import logging
 from typing import Any, TypedDict, overload
+from uuid import UUID
 
 from sqlalchemy.engine.row import Row
 
@@ -16,6 +17,7 @@ from homeassistant.components.websocket_api import (
 from homeassistant.core import Context, State
 from homeassistant.helpers.json import json_loads
 import homeassistant.util.dt as dt_util
+from homeassistant.util.ulid import bytes_to_ulid, ulid_to_bytes
 
 # pylint: disable=invalid-name
 
@@ -121,6 +123,56 @@ def process_datetime_to_timestamp(ts: datetime) -> float:
     return ts.timestamp()
 
 
+def ulid_to_bytes_or_none(ulid: str | None) -> bytes | None:
+    """Convert an ulid to bytes."""
+    if ulid is None:
+        return None
+    try:
+        return ulid_to_bytes(ulid)
+    except ValueError as ex:
+        _LOGGER.error("Error converting ulid %s to bytes: %s", ulid, ex, exc_info=True)
+        return None
+
+
+def bytes_to_ulid_or_none(_bytes: bytes | None) -> str | None:
+    """Convert bytes to a ulid."""
+    if _bytes is None:
+        return None
+    try:
+        return bytes_to_ulid(_bytes)
+    except ValueError as ex:
+        _LOGGER.error(
+            "Error converting bytes %s to ulid: %s", _bytes, ex, exc_info=True
+        )
+        return None
+
+
+def uuid_hex_to_bytes_or_none(uuid_hex: str | None) -> bytes | None:
+    """Convert a uuid hex to bytes."""
+    if uuid_hex is None:
+        return None
+    try:
+        return UUID(hex=uuid_hex).bytes
+    except ValueError as ex:
+        _LOGGER.error(
+            "Error converting uuid hex %s to bytes: %s", uuid_hex, ex, exc_info=True
+        )
+        return None
+
+
+def bytes_to_uuid_hex_or_none(_bytes: bytes | None) -> str | None:
+    """Convert bytes to a uuid hex."""
+    if _bytes is None:
+        return None
+    try:
+        return UUID(bytes=_bytes).hex
+    except ValueError as ex:
+        _LOGGER.error(
+            "Error converting bytes %s to uuid hex: %s", _bytes, ex, exc_info=True
+        )
+        return None
+
+
 class LazyState(State):
     """A lazy version of core State."""
 
@@ -177,8 +229,8 @@ class LazyState(State):
     def last_changed(self) -> datetime:  # type: ignore[override]
         """Last changed datetime."""
         if self._last_changed is None:
-            if (last_changed := self._row.last_changed) is not None:
-                self._last_changed = process_timestamp(last_changed)
+            if (last_changed_ts := self._row.last_changed_ts) is not None:
+                self._last_changed = dt_util.utc_from_timestamp(last_changed_ts)
             else:
                 self._last_changed = self.last_updated
         return self._last_changed
@@ -192,7 +244,7 @@ class LazyState(State):
     def last_updated(self) -> datetime:  # type: ignore[override]
         """Last updated datetime."""
         if self._last_updated is None:
-            self._last_updated = process_timestamp(self._row.last_updated)
+            self._last_updated = dt_util.utc_from_timestamp(self._row.last_updated_ts)
         return self._last_updated
 
     @last_updated.setter
@@ -208,18 +260,18 @@ class LazyState(State):
         To be used for JSON serialization.
         """
         if self._last_changed is None and self._last_updated is None:
-            last_updated_isoformat = process_timestamp_to_utc_isoformat(
-                self._row.last_updated
-            )
+            last_updated_ts: float = self._row.last_updated_ts
+            last_updated_isoformat = dt_util.utc_from_timestamp(
+                last_updated_ts
+            ).isoformat()
             if (
-                self._row.last_changed is None
-                or self._row.last_changed == self._row.last_updated
-            ):
+                last_changed_ts := self._row.last_changed_ts
+            ) is None or last_changed_ts == last_updated_ts:
                 last_changed_isoformat = last_updated_isoformat
             else:
-                last_changed_isoformat = process_timestamp_to_utc_isoformat(
-                    self._row.last_changed
-                )
+                last_changed_isoformat = dt_util.utc_from_timestamp(
+                    last_changed_ts
+                ).isoformat()
         else:
             last_updated_isoformat = self.last_updated.isoformat()
             if self.last_changed == self.last_updated:
@@ -274,14 +326,10 @@ def row_to_compressed_state(
     if start_time:
         comp_state[COMPRESSED_STATE_LAST_UPDATED] = start_time.timestamp()
     else:
-        row_last_updated: datetime = row.last_updated
-        comp_state[COMPRESSED_STATE_LAST_UPDATED] = process_datetime_to_timestamp(
-            row_last_updated
-        )
+        row_last_updated_ts: float = row.last_updated_ts
+        comp_state[COMPRESSED_STATE_LAST_UPDATED] = row_last_updated_ts
         if (
-            row_changed_changed := row.last_changed
-        ) and row_last_updated != row_changed_changed:
-            comp_state[COMPRESSED_STATE_LAST_CHANGED] = process_datetime_to_timestamp(
-                row_changed_changed
-            )
+            row_last_changed_ts := row.last_changed_ts
+        ) and row_last_updated_ts != row_last_changed_ts:
+            comp_state[COMPRESSED_STATE_LAST_CHANGED] = row_last_changed_ts
     return comp_state
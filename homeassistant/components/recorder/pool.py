@@ -10,7 +10,7 @@ from sqlalchemy.pool import NullPool, SingletonThreadPool, StaticPool
 from homeassistant.helpers.frame import report
 from homeassistant.util.async_ import check_loop
 
-from .const import DB_WORKER_PREFIX
+from .const import DB_READER_PREFIX, DB_WORKER_PREFIX
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -36,15 +36,17 @@ class RecorderPool(SingletonThreadPool, NullPool):  # type: ignore[misc]
         self, *args: Any, **kw: Any
     ) -> None:
         """Create the pool."""
-        kw["pool_size"] = POOL_SIZE
+        # The recorder passes a larger pool size when it has a read pool
+        kw.setdefault("pool_size", POOL_SIZE)
         SingletonThreadPool.__init__(self, *args, **kw)
 
     @property
     def recorder_or_dbworker(self) -> bool:
-        """Check if the thread is a recorder or dbworker thread."""
+        """Check if the thread is a recorder, dbworker or dbreader thread."""
         thread_name = threading.current_thread().name
         return bool(
-            thread_name == "Recorder" or thread_name.startswith(DB_WORKER_PREFIX)
+            thread_name == "Recorder"
+            or thread_name.startswith((DB_WORKER_PREFIX, DB_READER_PREFIX))
         )
 
     # Any can be switched out for ConnectionPoolEntry in the next version of sqlalchemy
@@ -8,13 +8,15 @@ from itertools import islice, zip_longest
 import logging
 from typing import TYPE_CHECKING, Any
 
+from sqlalchemy import exists, literal, select
+from sqlalchemy.engine.row import Row
 from sqlalchemy.orm.session import Session
-from sqlalchemy.sql.expression import distinct
+from sqlalchemy.sql.elements import ClauseList
 
 from homeassistant.const import EVENT_STATE_CHANGED
 
 from .const import MAX_ROWS_TO_PURGE, SupportedDialect
-from .db_schema import Events, StateAttributes, States
+from .db_schema import Events, EventTypes, StateAttributes, States, StatesMeta
 from .queries import (
     attributes_ids_exist_in_states,
     attributes_ids_exist_in_states_sqlite,
@@ -146,7 +148,7 @@ def _purge_legacy_format(
         attributes_ids,
         data_ids,
     ) = _select_legacy_event_state_and_attributes_and_data_ids_to_purge(
-        session, purge_before
+        session, purge_before, instance.events_timestamps_migrated
     )
     if state_ids:
         _purge_state_ids(instance, session, state_ids)
@@ -176,7 +178,7 @@ def _purge_states_and_attributes_ids(
     attributes_ids_batch: set[int] = set()
     for _ in range(states_batch_size):
         state_ids, attributes_ids = _select_state_attributes_ids_to_purge(
-            session, purge_before
+            session, purge_before, instance.states_timestamps_migrated
         )
         if not state_ids:
             has_remaining_state_ids_to_purge = False
@@ -210,7 +212,9 @@ def _purge_events_and_data_ids(
     # MAX_ROWS_TO_PURGE
     data_ids_batch: set[int] = set()
     for _ in range(events_batch_size):
-        event_ids, data_ids = _select_event_data_ids_to_purge(session, purge_before)
+        event_ids, data_ids = _select_event_data_ids_to_purge(
+            session, purge_before, instance.events_timestamps_migrated
+        )
         if not event_ids:
             has_remaining_event_ids_to_purge = False
             break
@@ -226,12 +230,14 @@ def _purge_events_and_data_ids(
 
 
 def _select_state_attributes_ids_to_purge(
-    session: Session, purge_before: datetime
+    session: Session, purge_before: datetime, timestamps_migrated: bool
 ) -> tuple[set[int], set[int]]:
     """Return sets of state and attribute ids to purge."""
     state_ids = set()
     attributes_ids = set()
-    for state in session.execute(find_states_to_purge(purge_before)).all():
+    for state in session.execute(
+        find_states_to_purge(purge_before.timestamp(), timestamps_migrated)
+    ).all():
         state_ids.add(state.state_id)
         if state.attributes_id:
             attributes_ids.add(state.attributes_id)
@@ -244,12 +250,14 @@ def _select_state_attributes_ids_to_purge(
 
 
 def _select_event_data_ids_to_purge(
-    session: Session, purge_before: datetime
+    session: Session, purge_before: datetime, timestamps_migrated: bool
 ) -> tuple[set[int], set[int]]:
     """Return sets of event and data ids to purge."""
     event_ids = set()
     data_ids = set()
-    for event in session.execute(find_events_to_purge(purge_before)).all():
+    for event in session.execute(
+        find_events_to_purge(purge_before.timestamp(), timestamps_migrated)
+    ).all():
         event_ids.add(event.event_id)
         if event.data_id:
             data_ids.add(event.data_id)
@@ -409,7 +417,7 @@ def _select_short_term_statistics_to_purge(
 
 
 def _select_legacy_event_state_and_attributes_and_data_ids_to_purge(
-    session: Session, purge_before: datetime
+    session: Session, purge_before: datetime, timestamps_migrated: bool
 ) -> tuple[set[int], set[int], set[int], set[int]]:
     """Return a list of event, state, and attribute ids to purge that are linked by the event_id.
 
@@ -418,7 +426,9 @@ def _select_legacy_event_state_and_attributes_and_data_ids_to_purge(
     still need to be able to purge them.
     """
     events = session.execute(
-        find_legacy_event_state_and_attributes_and_data_ids_to_purge(purge_before)
+        find_legacy_event_state_and_attributes_and_data_ids_to_purge(
+            purge_before.timestamp(), timestamps_migrated
+        )
     ).all()
     _LOGGER.debug("Selected %s event ids to remove", len(events))
     event_ids = set()
@@ -572,19 +582,23 @@ def _purge_filtered_data(instance: Recorder, session: Session) -> bool:
     using_sqlite = instance.dialect_name == SupportedDialect.SQLITE
 
     # Check if excluded entity_ids are in database
-    excluded_entity_ids: list[str] = [
-        entity_id
-        for (entity_id,) in session.query(distinct(States.entity_id)).all()
+    excluded_states_meta: list[tuple[int | None, str]] = [
+        (metadata_id, entity_id)
+        for (metadata_id, entity_id) in _select_states_meta_in_use(
+            session, instance.states_meta_migrated
+        )
         if not instance.entity_filter(entity_id)
     ]
-    if len(excluded_entity_ids) > 0:
-        _purge_filtered_states(instance, session, excluded_entity_ids, using_sqlite)
+    if len(excluded_states_meta) > 0:
+        _purge_filtered_states(instance, session, excluded_states_meta, using_sqlite)
         return False
 
     # Check if excluded event_types are in database
-    excluded_event_types: list[str] = [
-        event_type
-        for (event_type,) in session.query(distinct(Events.event_type)).all()
+    excluded_event_types: list[tuple[int | None, str]] = [
+        (event_type_id, event_type)
+        for (event_type_id, event_type) in _select_event_types_in_use(
+            session, instance.event_types_migrated
+        )
         if event_type in instance.exclude_t
     ]
     if len(excluded_event_types) > 0:
@@ -594,10 +608,90 @@ def _purge_filtered_data(instance: Recorder, session: Session) -> bool:
     return True
 
 
+def _select_states_meta_in_use(
+    session: Session, states_meta_migrated: bool
+) -> list[Row]:
+    """Return the metadata_id and entity_id of the states_meta rows in use.
+
+    Until the states_meta migration is done the entity_ids of the
+    states that only have the legacy entity_id column set are
+    returned as well with a metadata_id of None.
+    """
+    rows = session.execute(
+        select(StatesMeta.metadata_id, StatesMeta.entity_id).where(
+            exists().where(States.metadata_id == StatesMeta.metadata_id)
+        )
+    ).all()
+    if states_meta_migrated:
+        return rows
+    return (
+        rows
+        + session.execute(
+            select(literal(None), States.entity_id)
+            .where(States.metadata_id.is_(None) & States.entity_id.isnot(None))
+            .distinct()
+        ).all()
+    )
+
+
+def _select_event_types_in_use(
+    session: Session, event_types_migrated: bool
+) -> list[Row]:
+    """Return the event_type_id and event_type of the event_types rows in use.
+
+    Until the event_types migration is done the event_types of the
+    events that only have the legacy event_type column set are
+    returned as well with an event_type_id of None.
+    """
+    rows = session.execute(
+        select(EventTypes.event_type_id, EventTypes.event_type).where(
+            exists().where(Events.event_type_id == EventTypes.event_type_id)
+        )
+    ).all()
+    if event_types_migrated:
+        return rows
+    return (
+        rows
+        + session.execute(
+            select(literal(None), Events.event_type)
+            .where(Events.event_type_id.is_(None) & Events.event_type.isnot(None))
+            .distinct()
+        ).all()
+    )
+
+
+def _states_meta_matcher(states_meta: list[tuple[int | None, str]]) -> ClauseList:
+    """Match the states of the metadata_ids or legacy entity_ids."""
+    matcher = States.metadata_id.in_(
+        [metadata_id for metadata_id, _ in states_meta if metadata_id is not None]
+    )
+    if legacy_entity_ids := [
+        entity_id for metadata_id, entity_id in states_meta if metadata_id is None
+    ]:
+        matcher |= States.metadata_id.is_(None) & States.entity_id.in_(
+            legacy_entity_ids
+        )
+    return matcher
+
+
+def _event_types_matcher(event_types: list[tuple[int | None, str]]) -> ClauseList:
+    """Match the events of the event_type_ids or legacy event_types."""
+    matcher = Events.event_type_id.in_(
+        [event_type_id for event_type_id, _ in event_types if event_type_id is not None]
+    )
+    if legacy_event_types := [
+        event_type for event_type_id, event_type in event_types if event_type_id is None
+    ]:
+        matcher |= Events.event_type_id.is_(None) & Events.event_type.in_(
+            legacy_event_types
+        )
+    return matcher
+
+
 def _purge_filtered_states(
     instance: Recorder,
     session: Session,
-    excluded_entity_ids: list[str],
+    excluded_states_meta: list[tuple[int | None, str]],
     using_sqlite: bool,
 ) -> None:
     """Remove filtered states and linked events."""
@@ -607,7 +701,7 @@ def _purge_filtered_states(
     state_ids, attributes_ids, event_ids = zip(
         *(
             session.query(States.state_id, States.attributes_id, States.event_id)
-            .filter(States.entity_id.in_(excluded_entity_ids))
+            .filter(_states_meta_matcher(excluded_states_meta))
             .limit(MAX_ROWS_TO_PURGE)
             .all()
         )
@@ -625,14 +719,16 @@ def _purge_filtered_states(
 
 
 def _purge_filtered_events(
-    instance: Recorder, session: Session, excluded_event_types: list[str]
+    instance: Recorder,
+    session: Session,
+    excluded_event_types: list[tuple[int | None, str]],
 ) -> None:
     """Remove filtered events and linked states."""
     using_sqlite = instance.dialect_name == SupportedDialect.SQLITE
     event_ids, data_ids = zip(
         *(
             session.query(Events.event_id, Events.data_id)
-            .filter(Events.event_type.in_(excluded_event_types))
+            .filter(_event_types_matcher(excluded_event_types))
             .limit(MAX_ROWS_TO_PURGE)
             .all()
         )
@@ -650,9 +746,9 @@ def _purge_filtered_events(
         session, set(data_ids), using_sqlite
     ):
         _purge_batch_data_ids(instance, session, unused_data_ids_set)
-    if EVENT_STATE_CHANGED in excluded_event_types:
+    if any(event_type == EVENT_STATE_CHANGED for _, event_type in excluded_event_types):
         session.query(StateAttributes).delete(synchronize_session=False)
-        instance._state_attributes_ids = {}  # pylint: disable=protected-access
+        instance._state_attributes_ids.clear()  # pylint: disable=protected-access
 
 
 @retryable_database_job("purge")
@@ -660,15 +756,22 @@ def purge_entity_data(instance: Recorder, entity_filter: Callable[[str], bool])
     """Purge states and events of specified entities."""
     using_sqlite = instance.dialect_name == SupportedDialect.SQLITE
     with session_scope(session=instance.get_session()) as session:
-        selected_entity_ids: list[str] = [
-            entity_id
-            for (entity_id,) in session.query(distinct(States.entity_id)).all()
+        selected_states_meta: list[tuple[int | None, str]] = [
+            (metadata_id, entity_id)
+            for (metadata_id, entity_id) in _select_states_meta_in_use(
+                session, instance.states_meta_migrated
+            )
             if entity_filter(entity_id)
         ]
-        _LOGGER.debug("Purging entity data for %s", selected_entity_ids)
-        if len(selected_entity_ids) > 0:
+        _LOGGER.debug(
+            "Purging entity data for %s",
+            [entity_id for _, entity_id in selected_states_meta],
+        )
+        if len(selected_states_meta) > 0:
             # Purge a max of MAX_ROWS_TO_PURGE, based on the oldest states or events record
-            _purge_filtered_states(instance, session, selected_entity_ids, using_sqlite)
+            _purge_filtered_states(
+                instance, session, selected_states_meta, using_sqlite
+            )
             _LOGGER.debug("Purging entity data hasn't fully completed yet")
             return False
 
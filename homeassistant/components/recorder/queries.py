@@ -8,13 +8,17 @@ from sqlalchemy import delete, distinct, func, lambda_stmt, select, union_all, u
 from sqlalchemy.sql.lambdas import StatementLambdaElement
 from sqlalchemy.sql.selectable import Select
 
-from .const import MAX_ROWS_TO_PURGE
+import homeassistant.util.dt as dt_util
+
+from .const import MAX_ROWS_TO_MIGRATE, MAX_ROWS_TO_PURGE
 from .db_schema import (
     EventData,
     Events,
+    EventTypes,
     RecorderRuns,
     StateAttributes,
     States,
+    StatesMeta,
     StatisticsRuns,
     StatisticsShortTerm,
 )
@@ -40,6 +44,115 @@ def find_shared_data_id(attr_hash: int, shared_data: str) -> StatementLambdaElem
     )
 
 
+def find_recent_states_attributes_ids(
+    start_time_ts: float, limit: int
+) -> StatementLambdaElement:
+    """Find the attributes_ids most recently used by states since start_time_ts."""
+    return lambda_stmt(
+        lambda: select(States.attributes_id)
+        .filter(States.last_updated_ts > start_time_ts)
+        .filter(States.attributes_id.isnot(None))
+        .group_by(States.attributes_id)
+        .order_by(func.max(States.last_updated_ts).desc())
+        .limit(limit)
+    )
+
+
+def find_shared_attributes(attributes_ids: Iterable[int]) -> StatementLambdaElement:
+    """Find shared_attrs by attributes_ids."""
+    return lambda_stmt(
+        lambda: select(
+            StateAttributes.attributes_id, StateAttributes.shared_attrs
+        ).filter(StateAttributes.attributes_id.in_(attributes_ids))
+    )
+
+
+def find_states_metadata_ids(entity_ids: Iterable[str]) -> StatementLambdaElement:
+    """Find metadata_ids by entity_ids."""
+    return lambda_stmt(
+        lambda: select(StatesMeta.metadata_id, StatesMeta.entity_id).filter(
+            StatesMeta.entity_id.in_(entity_ids)
+        )
+    )
+
+
+def find_event_type_ids(event_types: Iterable[str]) -> StatementLambdaElement:
+    """Find event_type_ids by event_types."""
+    return lambda_stmt(
+        lambda: select(EventTypes.event_type_id, EventTypes.event_type).filter(
+            EventTypes.event_type.in_(event_types)
+        )
+    )
+
+
+def find_entity_ids_to_migrate() -> StatementLambdaElement:
+    """Find states rows that still have an entity_id instead of a metadata_id."""
+    return lambda_stmt(
+        lambda: select(States.state_id, States.entity_id)
+        .filter(States.entity_id.isnot(None))
+        .limit(MAX_ROWS_TO_MIGRATE)
+    )
+
+
+def find_event_types_to_migrate() -> StatementLambdaElement:
+    """Find events rows that still have an event_type instead of an event_type_id."""
+    return lambda_stmt(
+        lambda: select(Events.event_id, Events.event_type)
+        .filter(Events.event_type.isnot(None))
+        .limit(MAX_ROWS_TO_MIGRATE)
+    )
+
+
+def find_states_timestamps_to_migrate() -> StatementLambdaElement:
+    """Find states rows that still have their times stored as datetimes."""
+    return lambda_stmt(
+        lambda: select(States.state_id, States.last_updated, States.last_changed)
+        .filter(States.last_updated_ts.is_(None))
+        .filter(States.last_updated.isnot(None))
+        .limit(MAX_ROWS_TO_MIGRATE)
+    )
+
+
+def find_events_timestamps_to_migrate() -> StatementLambdaElement:
+    """Find events rows that still have their time_fired stored as a datetime."""
+    return lambda_stmt(
+        lambda: select(Events.event_id, Events.time_fired)
+        .filter(Events.time_fired_ts.is_(None))
+        .filter(Events.time_fired.isnot(None))
+        .limit(MAX_ROWS_TO_MIGRATE)
+    )
+
+
+def find_events_context_ids_to_migrate() -> StatementLambdaElement:
+    """Find events rows that still have their context ids stored as strings."""
+    return lambda_stmt(
+        lambda: select(
+            Events.event_id,
+            Events.time_fired_ts,
+            Events.context_id,
+            Events.context_user_id,
+            Events.context_parent_id,
+        )
+        .filter(Events.context_id.isnot(None))
+        .limit(MAX_ROWS_TO_MIGRATE)
+    )
+
+
+def find_states_context_ids_to_migrate() -> StatementLambdaElement:
+    """Find states rows that still have their context ids stored as strings."""
+    return lambda_stmt(
+        lambda: select(
+            States.state_id,
+            States.last_updated_ts,
+            States.context_id,
+            States.context_user_id,
+            States.context_parent_id,
+        )
+        .filter(States.context_id.isnot(None))
+        .limit(MAX_ROWS_TO_MIGRATE)
+    )
+
+
 def _state_attrs_exist(attr: int | None) -> Select:
     """Check if a state attributes id exists in the states table."""
     return select(func.min(States.attributes_id)).where(States.attributes_id == attr)
@@ -578,20 +691,58 @@ def delete_recorder_runs_rows(
     )
 
 
-def find_events_to_purge(purge_before: datetime) -> StatementLambdaElement:
-    """Find events to purge."""
+def find_events_to_purge(
+    purge_before: float, timestamps_migrated: bool
+) -> StatementLambdaElement:
+    """Find events to purge.
+
+    Until the timestamps are migrated the events that only
+    have the legacy time_fired column set are found as well.
+    """
+    if timestamps_migrated:
+        return lambda_stmt(
+            lambda: select(Events.event_id, Events.data_id)
+            .filter(Events.time_fired_ts < purge_before)
+            .limit(MAX_ROWS_TO_PURGE)
+        )
+    legacy_purge_before = dt_util.utc_from_timestamp(purge_before)
     return lambda_stmt(
         lambda: select(Events.event_id, Events.data_id)
-        .filter(Events.time_fired < purge_before)
+        .filter(
+            (Events.time_fired_ts < purge_before)
+            | (
+                Events.time_fired_ts.is_(None)
+                & (Events.time_fired < legacy_purge_before)
+            )
+        )
         .limit(MAX_ROWS_TO_PURGE)
     )
 
 
-def find_states_to_purge(purge_before: datetime) -> StatementLambdaElement:
-    """Find states to purge."""
+def find_states_to_purge(
+    purge_before: float, timestamps_migrated: bool
+) -> StatementLambdaElement:
+    """Find states to purge.
+
+    Until the timestamps are migrated the states that only
+    have the legacy last_updated column set are found as well.
+    """
+    if timestamps_migrated:
+        return lambda_stmt(
+            lambda: select(States.state_id, States.attributes_id)
+            .filter(States.last_updated_ts < purge_before)
+            .limit(MAX_ROWS_TO_PURGE)
+        )
+    legacy_purge_before = dt_util.utc_from_timestamp(purge_before)
     return lambda_stmt(
         lambda: select(States.state_id, States.attributes_id)
-        .filter(States.last_updated < purge_before)
+        .filter(
+            (States.last_updated_ts < purge_before)
+            | (
+                States.last_updated_ts.is_(None)
+                & (States.last_updated < legacy_purge_before)
+            )
+        )
         .limit(MAX_ROWS_TO_PURGE)
     )
 
@@ -624,15 +775,31 @@ def find_latest_statistics_runs_run_id() -> StatementLambdaElement:
 
 
 def find_legacy_event_state_and_attributes_and_data_ids_to_purge(
-    purge_before: datetime,
+    purge_before: float, timestamps_migrated: bool
 ) -> StatementLambdaElement:
     """Find the latest row in the legacy format to purge."""
+    if timestamps_migrated:
+        return lambda_stmt(
+            lambda: select(
+                Events.event_id, Events.data_id, States.state_id, States.attributes_id
+            )
+            .outerjoin(States, Events.event_id == States.event_id)
+            .filter(Events.time_fired_ts < purge_before)
+            .limit(MAX_ROWS_TO_PURGE)
+        )
+    legacy_purge_before = dt_util.utc_from_timestamp(purge_before)
     return lambda_stmt(
         lambda: select(
             Events.event_id, Events.data_id, States.state_id, States.attributes_id
         )
         .outerjoin(States, Events.event_id == States.event_id)
-        .filter(Events.time_fired < purge_before)
+        .filter(
+            (Events.time_fired_ts < purge_before)
+            | (
+                Events.time_fired_ts.is_(None)
+                & (Events.time_fired < legacy_purge_before)
+            )
+        )
         .limit(MAX_ROWS_TO_PURGE)
     )
 
@@ -45,7 +45,15 @@ from homeassistant.util.unit_system import UnitSystem
 import homeassistant.util.volume as volume_util
 
 from .const import DOMAIN, MAX_ROWS_TO_PURGE, SupportedDialect
-from .db_schema import Statistics, StatisticsMeta, StatisticsRuns, StatisticsShortTerm
+from .db_schema import (
+    Statistics,
+    StatisticsDay,
+    StatisticsMeta,
+    StatisticsMonth,
+    StatisticsRollupRuns,
+    StatisticsRuns,
+    StatisticsShortTerm,
+)
 from .models import (
     StatisticData,
     StatisticMetaData,
@@ -53,6 +61,7 @@ from .models import (
     process_timestamp,
     process_timestamp_to_utc_isoformat,
 )
+from .statistics_buffer import same_summary
 from .util import (
     execute,
     execute_stmt_lambda_element,
@@ -107,6 +116,26 @@ QUERY_STATISTICS_SUMMARY_SUM = [
     .label("rownum"),
 ]
 
+QUERY_STATISTICS_ROLLUP_MEAN = [
+    Statistics.metadata_id,
+    func.avg(Statistics.mean),
+    func.min(Statistics.min),
+    func.max(Statistics.max),
+]
+
+QUERY_STATISTICS_ROLLUP_SUM = [
+    Statistics.metadata_id,
+    Statistics.last_reset,
+    Statistics.state,
+    Statistics.sum,
+    func.row_number()
+    .over(
+        partition_by=Statistics.metadata_id,
+        order_by=Statistics.start.desc(),
+    )
+    .label("rownum"),
+]
+
 QUERY_STATISTICS_SUMMARY_SUM_LEGACY = [
     StatisticsShortTerm.metadata_id,
     StatisticsShortTerm.last_reset,
@@ -189,6 +218,10 @@ DISPLAY_UNIT_TO_STATISTIC_UNIT_CONVERSIONS: dict[
 
 _LOGGER = logging.getLogger(__name__)
 
+# The number of days or months rolled up by each task
+# when catching up, so other tasks are not blocked
+MAX_ROLLUPS_PER_TASK = 10
+
 
 @dataclasses.dataclass
 class PlatformCompiledStatistics:
@@ -540,14 +573,38 @@ def compile_hourly_statistics(
     """Compile hourly statistics.
 
     This will summarize 5-minute statistics for one hour:
-    - average, min max is computed by a database query
+    - average, min max is computed from the buffered 5-minute statistics,
+      or by a database query if they were not all buffered
     - sum is taken from the last 5-minute entry during the hour
     """
     start_time = start.replace(minute=0)
     end_time = start_time + timedelta(hours=1)
 
+    summary = instance.hourly_statistics.summary(start_time)
+    if summary is None:
+        summary = _compile_hourly_statistics_summary(session, start_time, end_time)
+    elif instance.verify_statistics:
+        db_summary = _compile_hourly_statistics_summary(session, start_time, end_time)
+        if not same_summary(summary, db_summary):
+            _LOGGER.warning(
+                "Buffered hourly statistics for %s differ from the database: %s != %s",
+                start_time,
+                summary,
+                db_summary,
+            )
+            summary = db_summary
+
+    # Insert compiled hourly statistics in the database
+    for metadata_id, stat in summary.items():
+        session.add(Statistics.from_stats(metadata_id, stat))
+
+
+def _compile_hourly_statistics_summary(
+    session: Session, start_time: datetime, end_time: datetime
+) -> dict[int, StatisticData]:
+    """Summarize the 5-minute statistics of an hour with database queries."""
     # Compute last hour's average, min, max
-    summary: dict[str, StatisticData] = {}
+    summary: dict[int, StatisticData] = {}
     stmt = _compile_hourly_statistics_summary_mean_stmt(start_time, end_time)
     stats = execute_stmt_lambda_element(session, stmt)
 
@@ -594,9 +651,7 @@ def compile_hourly_statistics(
                     "sum": _sum,
                 }
 
-    # Insert compiled hourly statistics in the database
-    for metadata_id, stat in summary.items():
-        session.add(Statistics.from_stats(metadata_id, stat))
+    return summary
 
 
 @retryable_database_job("statistics")
@@ -639,6 +694,7 @@ def compile_statistics(instance: Recorder, start: datetime) -> bool:
         session=instance.get_session(),
         exception_filter=_filter_unique_constraint_integrity_error(instance),
     ) as session:
+        period_stats: dict[int, StatisticData] = {}
         for stats in platform_stats:
             metadata_id = _update_or_add_metadata(
                 session, stats["meta"], current_metadata
@@ -649,16 +705,130 @@ def compile_statistics(instance: Recorder, start: datetime) -> bool:
                 metadata_id,
                 stats["stat"],
             )
+            period_stats[metadata_id] = stats["stat"]
+        instance.hourly_statistics.add_period(start, period_stats)
 
         if start.minute == 55:
             # A full hour is ready, summarize it
             compile_hourly_statistics(instance, session, start)
+            if instance.statistics_rollups:
+                hour_start = start.replace(minute=0)
+                # Catching up with missed hours changes the periods rolled up
+                _invalidate_rollups(session, hour_start)
+                _compile_completed_rollups(session, hour_start)
 
         session.add(StatisticsRuns(start=start))
 
+    # The next period only needs the states from its start
+    instance.statistics_states.prune(end - timedelta.resolution)
+    return True
+
+
+def _compile_completed_rollups(session: Session, hour_start: datetime) -> None:
+    """Roll up the day and month that end with the hour."""
+    hour_end = hour_start + timedelta(hours=1)
+    for period, (_, period_start_end) in ROLLUP_PERIODS.items():
+        period_start, period_end = period_start_end(hour_start)
+        if period_end == hour_end:
+            _compile_rollup(session, period, period_start, period_end)
+
+
+def _compile_rollup(
+    session: Session, period: str, start_time: datetime, end_time: datetime
+) -> None:
+    """Roll up the long term statistics of a day or month.
+
+    The rolled up statistics are the same as reducing the hourly
+    statistics: the mean is the average of the means, min and max
+    are the lowest and highest of the period and last_reset, state
+    and sum are taken from the last hour.
+    """
+    table, _ = ROLLUP_PERIODS[period]
+    session.query(table).filter(table.start == start_time).delete(
+        synchronize_session=False
+    )
+    session.query(StatisticsRollupRuns).filter(
+        (StatisticsRollupRuns.period == period)
+        & (StatisticsRollupRuns.start == start_time)
+    ).delete(synchronize_session=False)
+
+    summary: dict[int, StatisticData] = {}
+    for metadata_id, _mean, _min, _max in session.execute(
+        select(*QUERY_STATISTICS_ROLLUP_MEAN)
+        .filter(Statistics.start >= start_time)
+        .filter(Statistics.start < end_time)
+        .group_by(Statistics.metadata_id)
+    ):
+        summary[metadata_id] = {
+            "start": start_time,
+            "mean": _mean,
+            "min": _min,
+            "max": _max,
+        }
+    subquery = (
+        select(*QUERY_STATISTICS_ROLLUP_SUM)
+        .filter(Statistics.start >= start_time)
+        .filter(Statistics.start < end_time)
+        .subquery()
+    )
+    for metadata_id, last_reset, state, _sum, _ in session.execute(
+        select(subquery).filter(subquery.c.rownum == 1)
+    ):
+        summary[metadata_id].update(
+            {
+                "last_reset": process_timestamp(last_reset),
+                "state": state,
+                "sum": _sum,
+            }
+        )
+
+    for metadata_id, stat in summary.items():
+        session.add(table.from_stats(metadata_id, stat))
+    session.add(StatisticsRollupRuns(period=period, start=start_time, end=end_time))
+
+
+@retryable_database_job("compile missing rollups")
+def compile_missing_rollups(instance: Recorder) -> bool:
+    """Roll up the complete days and months of statistics that are not rolled up.
+
+    Returns False if there are more periods to roll up.
+    """
+    with session_scope(session=instance.get_session()) as session:
+        first_start = session.query(func.min(Statistics.start)).scalar()
+        last_run = session.query(func.max(StatisticsRuns.start)).scalar()
+        if first_start is None or last_run is None:
+            return True
+        # The hourly statistics are compiled with the last 5-minute period
+        last_run = process_timestamp(last_run) + timedelta(minutes=5)
+        compiled_until = last_run.replace(minute=0, second=0, microsecond=0)
+
+        rollups = 0
+        for period, (_, period_start_end) in ROLLUP_PERIODS.items():
+            rolled_up = {
+                (process_timestamp(start), process_timestamp(end))
+                for start, end in session.query(
+                    StatisticsRollupRuns.start, StatisticsRollupRuns.end
+                ).filter(StatisticsRollupRuns.period == period)
+            }
+            start_time, end_time = period_start_end(process_timestamp(first_start))
+            while end_time <= compiled_until:
+                if (start_time, end_time) not in rolled_up:
+                    if rollups == MAX_ROLLUPS_PER_TASK:
+                        return False
+                    _compile_rollup(session, period, start_time, end_time)
+                    rollups += 1
+                start_time, end_time = period_start_end(end_time)
+
     return True
 
 
+def _invalidate_rollups(session: Session, start_time: datetime) -> None:
+    """Drop the rollups of the periods changed from start_time on."""
+    session.query(StatisticsRollupRuns).filter(
+        StatisticsRollupRuns.end > start_time
+    ).delete(synchronize_session=False)
+
+
 def _adjust_sum_statistics(
     session: Session,
     table: type[Statistics | StatisticsShortTerm],
@@ -830,6 +1000,7 @@ def clear_statistics(instance: Recorder, statistic_ids: list[str]) -> None:
         session.query(StatisticsMeta).filter(
             StatisticsMeta.statistic_id.in_(statistic_ids)
         ).delete(synchronize_session=False)
+    instance.hourly_statistics.clear()
 
 
 def update_statistics_metadata(
@@ -1028,6 +1199,26 @@ def _reduce_statistics_per_month(
     return _reduce_statistics(stats, same_month, month_start_end, timedelta(days=31))
 
 
+ROLLUP_PERIODS: dict[
+    str,
+    tuple[
+        type[StatisticsDay | StatisticsMonth],
+        Callable[[datetime], tuple[datetime, datetime]],
+    ],
+] = {
+    "day": (StatisticsDay, day_start_end),
+    "month": (StatisticsMonth, month_start_end),
+}
+
+REDUCE_STATISTICS: dict[
+    str,
+    Callable[[dict[str, list[dict[str, Any]]]], dict[str, list[dict[str, Any]]]],
+] = {
+    "day": _reduce_statistics_per_day,
+    "month": _reduce_statistics_per_month,
+}
+
+
 def _statistics_during_period_stmt(
     start_time: datetime,
     end_time: datetime | None,
@@ -1096,6 +1287,17 @@ def statistics_during_period(
         if statistic_ids is not None:
             metadata_ids = [metadata_id for metadata_id, _ in metadata.values()]
 
+        if period in REDUCE_STATISTICS and get_instance(hass).statistics_rollups:
+            return _rolled_up_statistics_during_period(
+                hass,
+                session,
+                start_time,
+                end_time,
+                metadata,
+                metadata_ids,
+                period,
+            )
+
         if period == "5minute":
             table = StatisticsShortTerm
             stmt = _statistics_during_period_stmt_short_term(
@@ -1132,6 +1334,150 @@ def statistics_during_period(
         return _reduce_statistics_per_month(result)
 
 
+def _rolled_up_periods(
+    session: Session,
+    period: str,
+    start_time: datetime,
+    end_time: datetime | None,
+) -> list[tuple[datetime, datetime]]:
+    """Return the rolled up days or months between start_time and end_time."""
+    _, period_start_end = ROLLUP_PERIODS[period]
+    query = session.query(StatisticsRollupRuns.start, StatisticsRollupRuns.end).filter(
+        (StatisticsRollupRuns.period == period)
+        & (StatisticsRollupRuns.start >= start_time)
+    )
+    if end_time is not None:
+        query = query.filter(StatisticsRollupRuns.end <= end_time)
+    periods = []
+    for start, end in execute(query):
+        start, end = process_timestamp(start), process_timestamp(end)
+        # Periods rolled up in another time zone are not used
+        if period_start_end(start) == (start, end):
+            periods.append((start, end))
+    return sorted(periods)
+
+
+def _rolled_up_statistics_during_period(
+    hass: HomeAssistant,
+    session: Session,
+    start_time: datetime,
+    end_time: datetime | None,
+    metadata: dict[str, tuple[int, StatisticMetaData]],
+    metadata_ids: list[int] | None,
+    period: str,
+) -> dict[str, list[dict[str, Any]]]:
+    """Return daily or monthly statistics using the rolled up periods.
+
+    The result is the same as reducing the hourly statistics, but only
+    the hours of the periods that are not rolled up are reduced.
+    """
+    table, period_start_end = ROLLUP_PERIODS[period]
+    rolled_up = _rolled_up_periods(session, period, start_time, end_time)
+
+    # Read the hours before, between and after the rolled up periods
+    hours: list[tuple[datetime, datetime | None]] = []
+    hours_start = start_time
+    for rollup_start, rollup_end in rolled_up:
+        if rollup_start > hours_start:
+            hours.append((hours_start, rollup_start))
+        hours_start = rollup_end
+    if end_time is None or hours_start < end_time:
+        hours.append((hours_start, end_time))
+    hourly_stats: list[Row] = []
+    for hours_start, hours_end in hours:
+        hourly_stats.extend(
+            execute_stmt_lambda_element(
+                session,
+                _statistics_during_period_stmt(hours_start, hours_end, metadata_ids),
+            )
+        )
+
+    rollup_stats: list[Row] = []
+    if rolled_up:
+        rolled_up_starts = {start for start, _ in rolled_up}
+        query = session.query(
+            table.metadata_id,
+            table.start,
+            table.mean,
+            table.min,
+            table.max,
+            table.last_reset,
+            table.state,
+            table.sum,
+        ).filter((table.start >= rolled_up[0][0]) & (table.start < rolled_up[-1][1]))
+        if metadata_ids:
+            query = query.filter(table.metadata_id.in_(metadata_ids))
+        rollup_stats = [
+            stat
+            for stat in execute(query.order_by(table.metadata_id, table.start))
+            if process_timestamp(stat.start) in rolled_up_starts
+        ]
+
+    # Like the hourly statistics, the last statistics before start_time
+    # are added for the statistics which do not start at start_time
+    first_starts: dict[int, datetime] = {}
+    for stat in chain(rollup_stats, hourly_stats):
+        stat_start = process_timestamp(stat.start)
+        if stat.metadata_id not in first_starts or (
+            stat_start < first_starts[stat.metadata_id]
+        ):
+            first_starts[stat.metadata_id] = stat_start
+    if rolled_up and rolled_up[0][0] == start_time:
+        # The first hour of the rolled up period may be later than its start
+        has_first_hour = {
+            metadata_id
+            for (metadata_id,) in execute(
+                session.query(Statistics.metadata_id).filter(
+                    Statistics.start == start_time
+                )
+            )
+        }
+        for metadata_id, first_start in first_starts.items():
+            if first_start == start_time and metadata_id not in has_first_hour:
+                first_starts[metadata_id] = start_time + timedelta(hours=1)
+    need_stat_at_start_time = {
+        metadata_id
+        for metadata_id, first_start in first_starts.items()
+        if first_start > start_time
+    }
+    if need_stat_at_start_time:
+        hourly_stats = (
+            list(
+                _statistics_at_time(
+                    session, need_stat_at_start_time, Statistics, start_time
+                )
+                or ()
+            )
+            + hourly_stats
+        )
+    hourly_stats.sort(key=lambda stat: stat.metadata_id)  # type: ignore[no-any-return]
+
+    result = REDUCE_STATISTICS[period](
+        _sorted_statistics_to_dict(
+            hass, session, hourly_stats, None, metadata, True, Statistics, None, True
+        )
+    )
+    for statistic_id, stat_list in _sorted_statistics_to_dict(
+        hass, session, rollup_stats, None, metadata, True, Statistics, None, True
+    ).items():
+        for stat in stat_list:
+            # The end of a rolled up period is not a fixed duration
+            start, end = period_start_end(stat["start"])
+            stat["start"] = start.isoformat()
+            stat["end"] = end.isoformat()
+        result[statistic_id] = sorted(
+            chain(result.get(statistic_id, ()), stat_list),
+            key=lambda stat: stat["start"],
+        )
+
+    # Like the hourly statistics, the result is ordered by metadata_id
+    return {
+        statistic_id: result[statistic_id]
+        for statistic_id, _ in sorted(metadata.items(), key=lambda item: item[1][0])
+        if result.get(statistic_id)
+    }
+
+
 def _get_last_statistics_stmt(
     metadata_id: int,
     number_of_stats: int,
@@ -1539,6 +1885,7 @@ def import_statistics(
             instance.hass, session, statistic_ids=[metadata["statistic_id"]]
         )
         metadata_id = _update_or_add_metadata(session, metadata, old_metadata_dict)
+        first_start: datetime | None = None
         for stat in statistics:
             if stat_id := _statistics_exists(
                 session, Statistics, metadata_id, stat["start"]
@@ -1546,6 +1893,10 @@ def import_statistics(
                 _update_statistics(session, Statistics, stat_id, stat)
             else:
                 _insert_statistics(session, Statistics, metadata_id, stat)
+            if first_start is None or stat["start"] < first_start:
+                first_start = stat["start"]
+        if first_start is not None:
+            _invalidate_rollups(session, first_start)
 
     return True
 
@@ -1587,5 +1938,7 @@ def adjust_statistics(
             start_time.replace(minute=0),
             sum_adjustment,
         )
+        _invalidate_rollups(session, start_time.replace(minute=0))
+    instance.hourly_statistics.clear()
 
     return True
@@ -0,0 +1,284 @@
+"""Buffers that let the statistics be compiled without scanning the database.
+
+The recorder thread sees every state it records and every short-term
+statistic it compiles. Keeping the recent ones in memory turns the
+5-minute and hourly compile steps into a flush of what was buffered:
+
+- StatesBuffer keeps the recent states of the sensors, which the sensor
+  platform reads instead of querying the states of the last five minutes.
+- HourlyStatisticsBuffer keeps the short-term statistics of the current
+  hour, which are summarized instead of querying the short-term
+  statistics table.
+
+Both fall back to the database when they do not cover a period, for
+example after the recorder started or after a purge.
+"""
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from typing import Any
+
+from homeassistant.core import Event, State, split_entity_id
+import homeassistant.util.dt as dt_util
+
+from .history import SIGNIFICANT_DOMAINS
+from .models import StatisticData
+
+# The domains of the platforms that compile statistics from states
+BUFFERED_DOMAINS = {"sensor"}
+
+# The buffer of states is cleared when it grows beyond this,
+# for example when the statistics have not been compiled for a while
+MAX_BUFFERED_STATES = 100000
+
+SHORT_TERM_PERIODS_PER_HOUR = 12
+
+
+class StatesBuffer:
+    """The recent states of the entities that can have statistics.
+
+    The states of an entity are only returned when the state at the start
+    of the period is buffered, the states of the other entities are read
+    from the database. Must only be used in the recorder thread.
+    """
+
+    def __init__(self, start: datetime) -> None:
+        """Init the buffer, covering the states recorded since start."""
+        self.start = start
+        self.states_count = 0
+        self._states: dict[str, list[State]] = {}
+
+    def add_event(self, event: Event) -> None:
+        """Add the state of a recorded state_changed event."""
+        entity_id: str = event.data["entity_id"]
+        if split_entity_id(entity_id)[0] not in BUFFERED_DOMAINS:
+            return
+        if (state := event.data.get("new_state")) is None:
+            # The removal is recorded as an empty state
+            # without attributes, which is kept the same way
+            state = State(
+                entity_id,
+                "",
+                None,
+                event.time_fired,
+                event.time_fired,
+                validate_entity_id=False,
+            )
+        elif state.last_updated < self.start:
+            # The database does not use the states updated before
+            # the recorder run started as the state at the start
+            return
+        if (entity_states := self._states.get(entity_id)) is None:
+            entity_states = self._states[entity_id] = []
+        entity_states.append(state)
+        self.states_count += 1
+        if self.states_count > MAX_BUFFERED_STATES:
+            self.clear(dt_util.utcnow())
+
+    def clear(self, start: datetime) -> None:
+        """Drop all states, the buffer only covers the states since start."""
+        self.start = start
+        self.states_count = 0
+        self._states = {}
+
+    def prune(self, before: datetime) -> None:
+        """Drop the states that are not needed for periods starting at before.
+
+        The last recorded state before that time is kept as the state at
+        the start.
+        """
+        for entity_id, entity_states in self._states.items():
+            if (initial := _initial_state(entity_states, before)) is None:
+                continue
+            kept = [
+                state
+                for state in entity_states
+                if state is initial or state.last_updated >= before
+            ]
+            self.states_count -= len(entity_states) - len(kept)
+            self._states[entity_id] = kept
+
+    def get_full_significant_states(
+        self,
+        start_time: datetime,
+        end_time: datetime,
+        entity_ids: list[str],
+        significant_changes_only: bool = True,
+    ) -> tuple[dict[str, list[State]], list[str]]:
+        """Return the states like history.get_full_significant_states_with_session.
+
+        The entities without a buffered state at start_time are returned
+        as the second item, their states must be read from the database.
+        """
+        result: dict[str, list[State]] = {}
+        not_buffered: list[str] = []
+        for entity_id in entity_ids:
+            entity_states = self._states.get(entity_id, [])
+            if (initial := _initial_state(entity_states, start_time)) is None:
+                not_buffered.append(entity_id)
+                continue
+            significant_only = (
+                significant_changes_only
+                and split_entity_id(entity_id)[0] not in SIGNIFICANT_DOMAINS
+            )
+            states = [
+                State(
+                    entity_id,
+                    initial.state,
+                    initial.attributes,
+                    start_time,
+                    start_time,
+                    validate_entity_id=False,
+                )
+            ]
+            states.extend(
+                sorted(
+                    (
+                        state
+                        for state in entity_states
+                        if start_time < state.last_updated < end_time
+                        and (
+                            not significant_only
+                            or state.last_changed == state.last_updated
+                        )
+                    ),
+                    key=lambda state: state.last_updated,
+                )
+            )
+            result[entity_id] = states
+        return result, not_buffered
+
+
+def _initial_state(entity_states: list[State], start_time: datetime) -> State | None:
+    """Return the last recorded state updated before start_time.
+
+    Like the database the most recently recorded state is used,
+    not the one with the most recent last_updated.
+    """
+    for state in reversed(entity_states):
+        if state.last_updated < start_time:
+            return state
+    return None
+
+
+class HourlyStatisticsBuffer:
+    """The short-term statistics compiled during the current hour.
+
+    Must only be used in the recorder thread.
+    """
+
+    def __init__(self) -> None:
+        """Init the buffer."""
+        self._hour_start: datetime | None = None
+        self._periods: dict[datetime, dict[int, StatisticData]] = {}
+
+    def add_period(self, start: datetime, stats: dict[int, StatisticData]) -> None:
+        """Add the short-term statistics of a 5-minute period by metadata_id.
+
+        Adding a period again replaces what was buffered for it, so a
+        compile can be retried.
+        """
+        hour_start = start.replace(minute=0, second=0, microsecond=0)
+        if hour_start != self._hour_start:
+            self._hour_start = hour_start
+            self._periods = {}
+        self._periods[start] = stats
+
+    def clear(self) -> None:
+        """Drop the buffered statistics after they were changed in the database."""
+        self._hour_start = None
+        self._periods = {}
+
+    def summary(self, hour_start: datetime) -> dict[int, StatisticData] | None:
+        """Summarize the short-term statistics of an hour.
+
+        The result is the same as the summary of the short-term statistics
+        table: the mean is the average of the means, min and max are the
+        lowest and highest of the period and last_reset, state and sum
+        are taken from the last period.
+
+        Returns None if not all the periods of the hour were buffered.
+        """
+        if (
+            hour_start != self._hour_start
+            or len(self._periods) != SHORT_TERM_PERIODS_PER_HOUR
+        ):
+            return None
+
+        means: dict[int, list[float]] = {}
+        summary: dict[int, StatisticData] = {}
+        for _, period in sorted(self._periods.items()):
+            for metadata_id, stat in period.items():
+                if (hourly := summary.get(metadata_id)) is None:
+                    hourly = summary[metadata_id] = {
+                        "start": hour_start,
+                        "mean": None,
+                        "min": None,
+                        "max": None,
+                    }
+                    means[metadata_id] = []
+                if (mean := stat.get("mean")) is not None:
+                    means[metadata_id].append(mean)
+                if (_min := stat.get("min")) is not None:
+                    hourly["min"] = _lowest(hourly.get("min"), _min)
+                if (_max := stat.get("max")) is not None:
+                    hourly["max"] = _highest(hourly.get("max"), _max)
+                hourly["last_reset"] = stat.get("last_reset")
+                hourly["state"] = stat.get("state")
+                hourly["sum"] = stat.get("sum")
+
+        for metadata_id, hourly_means in means.items():
+            if hourly_means:
+                summary[metadata_id]["mean"] = sum(hourly_means) / len(hourly_means)
+        return summary
+
+
+def _lowest(current: float | None, value: float) -> float:
+    """Return the lowest value."""
+    return value if current is None or value < current else current
+
+
+def _highest(current: float | None, value: float) -> float:
+    """Return the highest value."""
+    return value if current is None or value > current else current
+
+
+def same_summary(
+    first: dict[int, StatisticData],
+    second: dict[int, StatisticData],
+    rel_tol: float = 1e-9,
+) -> bool:
+    """Return if two summaries of the short-term statistics are the same."""
+    if first.keys() != second.keys():
+        return False
+    for metadata_id, stat in first.items():
+        other = second[metadata_id]
+        for key in ("mean", "min", "max", "state", "sum"):
+            if not _same_value(stat.get(key), other.get(key), rel_tol):
+                return False
+        if stat.get("last_reset") != other.get("last_reset"):
+            return False
+    return True
+
+
+def same_states(first: dict[str, list[State]], second: dict[str, list[State]]) -> bool:
+    """Return if two histories have the same states at the same time."""
+    if first.keys() != second.keys():
+        return False
+    for entity_id, states in first.items():
+        other = second[entity_id]
+        if len(states) != len(other):
+            return False
+        for state, other_state in zip(states, other):
+            if state.state != other_state.state or abs(
+                state.last_updated - other_state.last_updated
+            ) > timedelta(milliseconds=1):
+                return False
+    return True
+
+
+def _same_value(first: Any, second: Any, rel_tol: float) -> bool:
+    """Return if two statistic values are the same."""
+    if first is None or second is None:
+        return first is second
+    return bool(abs(first - second) <= rel_tol * max(abs(first), abs(second), 1.0))
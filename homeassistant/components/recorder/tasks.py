@@ -11,8 +11,9 @@ from typing import TYPE_CHECKING, Any
 
 from homeassistant.core import Event
 from homeassistant.helpers.typing import UndefinedType
+import homeassistant.util.dt as dt_util
 
-from . import purge, statistics
+from . import migration, purge, statistics
 from .const import DOMAIN, EXCLUDE_ATTRIBUTES
 from .models import StatisticData, StatisticMetaData
 from .util import periodic_db_cleanups
@@ -70,6 +71,9 @@ class PurgeTask(RecorderTask):
 
     def run(self, instance: Recorder) -> None:
         """Purge the database."""
+        # The buffered states and statistics may have been purged
+        instance.statistics_states.clear(dt_util.utcnow())
+        instance.hourly_statistics.clear()
         if purge.purge_old_data(
             instance, self.purge_before, self.repack, self.apply_filter
         ):
@@ -94,6 +98,7 @@ class PurgeEntitiesTask(RecorderTask):
 
     def run(self, instance: Recorder) -> None:
         """Purge entities from the database."""
+        instance.statistics_states.clear(dt_util.utcnow())
         if purge.purge_entity_data(instance, self.entity_filter):
             return
         # Schedule a new purge task if this one didn't finish
@@ -133,6 +138,8 @@ class ImportStatisticsTask(RecorderTask):
     def run(self, instance: Recorder) -> None:
         """Run statistics task."""
         if statistics.import_statistics(instance, self.metadata, self.statistics):
+            if instance.statistics_rollups:
+                instance.queue_task(CompileMissingRollupsTask())
             return
         # Schedule a new statistics task if this one didn't finish
         instance.queue_task(ImportStatisticsTask(self.metadata, self.statistics))
@@ -154,6 +161,8 @@ class AdjustStatisticsTask(RecorderTask):
             self.start_time,
             self.sum_adjustment,
         ):
+            if instance.statistics_rollups:
+                instance.queue_task(CompileMissingRollupsTask())
             return
         # Schedule a new adjust statistics task if this one didn't finish
         instance.queue_task(
@@ -163,6 +172,18 @@ class AdjustStatisticsTask(RecorderTask):
         )
 
 
+@dataclass
+class CompileMissingRollupsTask(RecorderTask):
+    """An object to insert into the recorder queue to roll up the long term statistics."""
+
+    def run(self, instance: Recorder) -> None:
+        """Run rollup task."""
+        if statistics.compile_missing_rollups(instance):
+            return
+        # Schedule a new rollup task if this one didn't finish
+        instance.queue_task(CompileMissingRollupsTask())
+
+
 @dataclass
 class WaitTask(RecorderTask):
     """An object to insert into the recorder queue to tell it set the _queue_watch event."""
@@ -235,6 +256,16 @@ class CommitTask(RecorderTask):
         instance._commit_event_session_or_retry()
 
 
+@dataclass
+class PrewarmStateAttributesIDsTask(RecorderTask):
+    """Load the most recently used attributes ids into the cache."""
+
+    def run(self, instance: Recorder) -> None:
+        """Handle the task."""
+        # pylint: disable-next=[protected-access]
+        instance._prewarm_state_attributes_ids()
+
+
 @dataclass
 class AddRecorderPlatformTask(RecorderTask):
     """Add a recorder platform."""
@@ -255,6 +286,82 @@ class AddRecorderPlatformTask(RecorderTask):
             hass.data[EXCLUDE_ATTRIBUTES][domain] = platform.exclude_attributes(hass)
 
 
+@dataclass
+class EntityIDMigrationTask(RecorderTask):
+    """An object to insert into the recorder queue to migrate entity_ids to StatesMeta."""
+
+    def run(self, instance: Recorder) -> None:
+        """Run entity_id migration task."""
+        if migration.migrate_entity_ids(instance):
+            instance.states_meta_migrated = True
+            return
+        # Schedule a new migration task if this one didn't finish
+        instance.queue_task(EntityIDMigrationTask())
+
+
+@dataclass
+class EventTypeIDMigrationTask(RecorderTask):
+    """An object to insert into the recorder queue to migrate event_types to EventTypes."""
+
+    def run(self, instance: Recorder) -> None:
+        """Run event_type migration task."""
+        if migration.migrate_event_type_ids(instance):
+            instance.event_types_migrated = True
+            return
+        # Schedule a new migration task if this one didn't finish
+        instance.queue_task(EventTypeIDMigrationTask())
+
+
+@dataclass
+class StatesTimestampMigrationTask(RecorderTask):
+    """An object to insert into the recorder queue to migrate states datetimes to timestamps."""
+
+    def run(self, instance: Recorder) -> None:
+        """Run states timestamp migration task."""
+        if migration.migrate_states_timestamps(instance):
+            instance.states_timestamps_migrated = True
+            return
+        # Schedule a new migration task if this one didn't finish
+        instance.queue_task(StatesTimestampMigrationTask())
+
+
+@dataclass
+class EventsTimestampMigrationTask(RecorderTask):
+    """An object to insert into the recorder queue to migrate events datetimes to timestamps."""
+
+    def run(self, instance: Recorder) -> None:
+        """Run events timestamp migration task."""
+        if migration.migrate_events_timestamps(instance):
+            instance.events_timestamps_migrated = True
+            return
+        # Schedule a new migration task if this one didn't finish
+        instance.queue_task(EventsTimestampMigrationTask())
+
+
+@dataclass
+class EventsContextIDMigrationTask(RecorderTask):
+    """An object to insert into the recorder queue to migrate events context ids."""
+
+    def run(self, instance: Recorder) -> None:
+        """Run events context id migration task."""
+        if migration.migrate_events_context_ids(instance):
+            return
+        # Schedule a new migration task if this one didn't finish
+        instance.queue_task(EventsContextIDMigrationTask())
+
+
+@dataclass
+class StatesContextIDMigrationTask(RecorderTask):
+    """An object to insert into the recorder queue to migrate states context ids."""
+
+    def run(self, instance: Recorder) -> None:
+        """Run states context id migration task."""
+        if migration.migrate_states_context_ids(instance):
+            return
+        # Schedule a new migration task if this one didn't finish
+        instance.queue_task(StatesContextIDMigrationTask())
+
+
 @dataclass
 class SynchronizeTask(RecorderTask):
     """Ensure all pending data has been committed."""
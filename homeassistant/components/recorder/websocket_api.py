@@ -39,6 +39,7 @@ def async_setup(hass: HomeAssistant) -> None:
     websocket_api.async_register_command(hass, ws_list_statistic_ids)
     websocket_api.async_register_command(hass, ws_import_statistics)
     websocket_api.async_register_command(hass, ws_info)
+    websocket_api.async_register_command(hass, ws_id_cache_stats)
     websocket_api.async_register_command(hass, ws_update_statistics_metadata)
     websocket_api.async_register_command(hass, ws_validate_statistics)
 
@@ -83,7 +84,7 @@ async def ws_handle_get_statistics_during_period(
         end_time = None
 
     connection.send_message(
-        await get_instance(hass).async_add_executor_job(
+        await get_instance(hass).async_add_read_executor_job(
             _ws_get_statistics_during_period,
             hass,
             msg["id"],
@@ -128,7 +129,7 @@ async def ws_handle_list_statistic_ids(
 ) -> None:
     """Fetch a list of available statistic_id."""
     connection.send_message(
-        await get_instance(hass).async_add_executor_job(
+        await get_instance(hass).async_add_read_executor_job(
             _ws_get_list_statistic_ids,
             hass,
             msg["id"],
@@ -201,7 +202,7 @@ async def ws_get_statistics_metadata(
 ) -> None:
     """Get metadata for a list of statistic_ids."""
     instance = get_instance(hass)
-    statistic_ids = await instance.async_add_executor_job(
+    statistic_ids = await instance.async_add_read_executor_job(
         list_statistic_ids, hass, msg.get("statistic_ids")
     )
     connection.send_result(msg["id"], statistic_ids)
@@ -311,6 +312,7 @@ def ws_info(
     instance = get_instance(hass)
 
     backlog = instance.backlog if instance else None
+    read_backlog = instance.read_backlog if instance else None
     migration_in_progress = async_migration_in_progress(hass)
     migration_is_live = async_migration_is_live(hass)
     recording = instance.recording if instance else False
@@ -319,6 +321,7 @@ def ws_info(
     recorder_info = {
         "backlog": backlog,
         "max_backlog": MAX_QUEUE_BACKLOG,
+        "read_backlog": read_backlog,
         "migration_in_progress": migration_in_progress,
         "migration_is_live": migration_is_live,
         "recording": recording,
@@ -327,6 +330,21 @@ def ws_info(
     connection.send_result(msg["id"], recorder_info)
 
 
+@websocket_api.require_admin
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): "recorder/id_cache_stats",
+    }
+)
+@callback
+def ws_id_cache_stats(
+    hass: HomeAssistant, connection: websocket_api.ActiveConnection, msg: dict
+) -> None:
+    """Return the size and counters of the recorder id caches."""
+    instance = get_instance(hass)
+    connection.send_result(msg["id"], instance.id_cache_stats)
+
+
 @websocket_api.ws_require_user(only_supervisor=True)
 @websocket_api.websocket_command({vol.Required("type"): "backup/start"})
 @websocket_api.async_response
@@ -13,6 +13,7 @@ from sqlalchemy.orm.session import Session
 
 from homeassistant.components.recorder import (
     DOMAIN as RECORDER_DOMAIN,
+    get_instance,
     history,
     is_entity_recorded,
     statistics,
@@ -23,6 +24,7 @@ from homeassistant.components.recorder.models import (
     StatisticMetaData,
     StatisticResult,
 )
+from homeassistant.components.recorder.statistics_buffer import same_states
 from homeassistant.const import (
     ATTR_DEVICE_CLASS,
     ATTR_UNIT_OF_MEASUREMENT,
@@ -397,6 +399,51 @@ def compile_statistics(
     return compiled
 
 
+def _get_history(
+    hass: HomeAssistant,
+    session: Session,
+    start_time: datetime.datetime,
+    end_time: datetime.datetime,
+    entity_ids: list[str],
+    significant_changes_only: bool,
+) -> MutableMapping[str, list[State]]:
+    """Return the states of the entities during a period.
+
+    The states buffered by the recorder are used when possible, only the
+    entities without buffered states are read from the database.
+    """
+    instance = get_instance(hass)
+    buffered, not_buffered = instance.statistics_states.get_full_significant_states(
+        start_time, end_time, entity_ids, significant_changes_only
+    )
+    history_list: MutableMapping[str, list[State]] = {}
+    if instance.verify_statistics:
+        not_buffered = entity_ids
+    if not_buffered:
+        history_list = history.get_full_significant_states_with_session(
+            hass,
+            session,
+            start_time,
+            end_time,
+            entity_ids=not_buffered,
+            significant_changes_only=significant_changes_only,
+        )
+    if instance.verify_statistics:
+        from_database = {
+            entity_id: history_list[entity_id]
+            for entity_id in buffered
+            if entity_id in history_list
+        }
+        if not same_states(buffered, from_database):
+            _LOGGER.warning(
+                "Buffered states during %s-%s differ from the database",
+                start_time,
+                end_time,
+            )
+        return history_list
+    return {**history_list, **buffered}
+
+
 def _compile_statistics(  # noqa: C901
     hass: HomeAssistant,
     session: Session,
@@ -418,12 +465,12 @@ def _compile_statistics(  # noqa: C901
     ]
     history_list: MutableMapping[str, list[State]] = {}
     if entities_full_history:
-        history_list = history.get_full_significant_states_with_session(
+        history_list = _get_history(
             hass,
             session,
             start - datetime.timedelta.resolution,
             end,
-            entity_ids=entities_full_history,
+            entities_full_history,
             significant_changes_only=False,
         )
     entities_significant_history = [
@@ -432,12 +479,13 @@ def _compile_statistics(  # noqa: C901
         if "sum" not in wanted_statistics[i.entity_id]
     ]
     if entities_significant_history:
-        _history_list = history.get_full_significant_states_with_session(
+        _history_list = _get_history(
             hass,
             session,
             start - datetime.timedelta.resolution,
             end,
-            entity_ids=entities_significant_history,
+            entities_significant_history,
+            significant_changes_only=True,
         )
         history_list = {**history_list, **_history_list}
     # If there are no recent state changes, the sensor's state may already be pruned
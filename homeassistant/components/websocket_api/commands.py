@@ -29,7 +29,7 @@ from homeassistant.helpers.event import (
     TrackTemplateResult,
     async_track_template_result,
 )
-from homeassistant.helpers.json import JSON_DUMP, ExtendedJSONEncoder
+from homeassistant.helpers.json import JSON_DUMP, ExtendedJSONEncoder, json_bytes
 from homeassistant.helpers.service import async_get_all_descriptions
 from homeassistant.loader import (
     Integration,
@@ -46,6 +46,7 @@ from homeassistant.util.json import (
 from . import const, decorators, messages
 from .connection import ActiveConnection
 from .const import ERR_NOT_FOUND
+from .subscriptions import async_get_entity_subscription_hub
 
 
 @callback
@@ -245,32 +246,32 @@ def handle_get_states(
 
     # JSON serialize here so we can recover if it blows up due to the
     # state machine containing unserializable data. This command is required
-    # to succeed for the UI to show.
-    response = messages.result_message(msg["id"], states)
+    # to succeed for the UI to show. The states are serialized with their
+    # cached JSON, so they are only serialized once for all connections.
     try:
-        connection.send_message(JSON_DUMP(response))
-        return
+        serialized = [state.as_dict_json() for state in states]
     except (ValueError, TypeError):
+        response = messages.result_message(msg["id"], states)
         connection.logger.error(
             "Unable to serialize to JSON. Bad data found at %s",
             format_unserializable_data(
                 find_paths_unserializable_data(response, dump=JSON_DUMP)
             ),
         )
-    del response
-
-    # If we can't serialize, we'll filter out unserializable states
-    serialized = []
-    for state in states:
-        try:
-            serialized.append(JSON_DUMP(state))
-        except (ValueError, TypeError):
-            # Error is already logged above
-            pass
-
-    # We now have partially serialized states. Craft some JSON.
+        del response
+
+        # If we can't serialize, we'll filter out unserializable states
+        serialized = []
+        for state in states:
+            try:
+                serialized.append(state.as_dict_json())
+            except (ValueError, TypeError):
+                # Error is already logged above
+                pass
+
+    # We now have the serialized states. Craft some JSON.
     response2 = JSON_DUMP(messages.result_message(msg["id"], ["TO_REPLACE"]))
-    response2 = response2.replace('"TO_REPLACE"', ", ".join(serialized))
+    response2 = response2.replace('"TO_REPLACE"', b",".join(serialized).decode("utf-8"))
     connection.send_message(response2)
 
 
@@ -279,72 +280,89 @@ def handle_get_states(
     {
         vol.Required("type"): "subscribe_entities",
         vol.Optional("entity_ids"): cv.entity_ids,
+        vol.Optional("resumable", default=False): bool,
+        vol.Optional("resume_token"): str,
     }
 )
 def handle_subscribe_entities(
     hass: HomeAssistant, connection: ActiveConnection, msg: dict[str, Any]
 ) -> None:
-    """Handle subscribe entities command."""
-    entity_ids = set(msg.get("entity_ids", []))
-
-    @callback
-    def forward_entity_changes(event: Event) -> None:
-        """Forward entity state changed events to websocket."""
-        if not connection.user.permissions.check_entity(
-            event.data["entity_id"], POLICY_READ
-        ):
-            return
-        if entity_ids and event.data["entity_id"] not in entity_ids:
-            return
+    """Handle subscribe entities command.
 
-        connection.send_message(
-            lambda: messages.cached_state_diff_message(msg["id"], event)
-        )
+    Resumable subscriptions get the resume token of the last state change
+    with their messages. Resubscribing with it only sends the state changes
+    since, or all the states when they are no longer known.
+    """
+    entity_ids = set(msg.get("entity_ids", []))
+    hub = async_get_entity_subscription_hub(hass)
+    resume_token: str | None = msg.get("resume_token")
+    resumable: bool = msg["resumable"] or resume_token is not None
 
     # We must never await between sending the states and listening for
     # state changed events or we will introduce a race condition
     # where some states are missed
-    states = _async_get_allowed_states(hass, connection)
-    connection.subscriptions[msg["id"]] = hass.bus.async_listen(
-        EVENT_STATE_CHANGED, forward_entity_changes, run_immediately=True
+    diff = None
+    if resume_token is not None:
+        diff = hub.async_resume_diff(connection.user, resume_token, entity_ids)
+    if diff is None:
+        states = _async_get_allowed_states(hass, connection)
+    connection.subscriptions[msg["id"]] = hub.async_subscribe(
+        connection, msg["id"], entity_ids, resumable
     )
-    connection.send_result(msg["id"])
-    data: dict[str, dict[str, dict]] = {
-        messages.ENTITY_EVENT_ADD: {
-            state.entity_id: messages.compressed_state_dict_add(state)
-            for state in states
-            if not entity_ids or state.entity_id in entity_ids
-        }
-    }
+    if not resumable:
+        connection.send_result(msg["id"])
+    else:
+        connection.send_result(msg["id"], {"resumed": diff is not None})
+    if diff is not None:
+        diff[messages.ENTITY_EVENT_RESUME_TOKEN] = hub.resume_token
+        connection.send_message(
+            messages.message_to_json(messages.event_message(msg["id"], diff))
+        )
+        return
+
+    states = [
+        state for state in states if not entity_ids or state.entity_id in entity_ids
+    ]
 
     # JSON serialize here so we can recover if it blows up due to the
     # state machine containing unserializable data. This command is required
-    # to succeed for the UI to show.
-    response = messages.event_message(msg["id"], data)
-    try:
-        connection.send_message(JSON_DUMP(response))
-        return
-    except (ValueError, TypeError):
+    # to succeed for the UI to show. The states are serialized with their
+    # cached JSON, so they are only serialized once for all connections.
+    serialized: list[bytes] = []
+    cannot_serialize = False
+    for state in states:
+        try:
+            serialized.append(
+                json_bytes(state.entity_id) + b":" + state.as_compressed_state_json()
+            )
+        except (ValueError, TypeError):
+            cannot_serialize = True
+    if cannot_serialize:
+        response = messages.event_message(
+            msg["id"],
+            {
+                messages.ENTITY_EVENT_ADD: {
+                    state.entity_id: state.as_compressed_state() for state in states
+                }
+            },
+        )
         connection.logger.error(
             "Unable to serialize to JSON. Bad data found at %s",
             format_unserializable_data(
                 find_paths_unserializable_data(response, dump=JSON_DUMP)
             ),
         )
-    del response
-
-    add_entities = data[messages.ENTITY_EVENT_ADD]
-    cannot_serialize: list[str] = []
-    for entity_id, state_dict in add_entities.items():
-        try:
-            JSON_DUMP(state_dict)
-        except (ValueError, TypeError):
-            cannot_serialize.append(entity_id)
-
-    for entity_id in cannot_serialize:
-        del add_entities[entity_id]
-
-    connection.send_message(JSON_DUMP(messages.event_message(msg["id"], data)))
+        del response
+
+    # Craft the JSON of the states that could be serialized
+    event: dict[str, Any] = {messages.ENTITY_EVENT_ADD: "TO_REPLACE"}
+    if resumable:
+        event[messages.ENTITY_EVENT_RESUME_TOKEN] = hub.resume_token
+    response2 = JSON_DUMP(messages.event_message(msg["id"], event))
+    response2 = response2.replace(
+        '"TO_REPLACE"', b"".join((b"{", b",".join(serialized), b"}")).decode("utf-8")
+    )
+    connection.send_message(response2)
 
 
 @decorators.websocket_command({vol.Required("type"): "get_services"})
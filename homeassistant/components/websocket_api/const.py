@@ -6,6 +6,13 @@ from collections.abc import Awaitable, Callable
 from concurrent import futures
 from typing import TYPE_CHECKING, Any, Final
 
+from homeassistant.const import (  # noqa: F401
+    COMPRESSED_STATE_ATTRIBUTES,
+    COMPRESSED_STATE_CONTEXT,
+    COMPRESSED_STATE_LAST_CHANGED,
+    COMPRESSED_STATE_LAST_UPDATED,
+    COMPRESSED_STATE_STATE,
+)
 from homeassistant.core import HomeAssistant
 
 if TYPE_CHECKING:
@@ -24,6 +31,16 @@ URL: Final = "/api/websocket"
 PENDING_MSG_PEAK: Final = 512
 PENDING_MSG_PEAK_TIME: Final = 5
 MAX_PENDING_MSG: Final = 2048
+# The pending state diffs of an entity merge once this many messages
+# are waiting to be written
+PENDING_MSG_MERGE_MIN: Final = 32
+# Coalescing clients with at least this many pending messages wait
+# PENDING_MSG_BATCH_DELAY per pending message above it, up to
+# PENDING_MSG_BATCH_MAX_DELAY, so more state diffs merge into the batch.
+# Queues below it, or at PENDING_MSG_PEAK and above, are drained at once.
+PENDING_MSG_BATCH_MIN: Final = 64
+PENDING_MSG_BATCH_DELAY: Final = 0.0005
+PENDING_MSG_BATCH_MAX_DELAY: Final = 0.05
 
 ERR_ID_REUSE: Final = "id_reuse"
 ERR_INVALID_FORMAT: Final = "invalid_format"
@@ -49,11 +66,19 @@ SIGNAL_WEBSOCKET_DISCONNECTED: Final = "websocket_disconnected"
 
 # Data used to store the current connection list
 DATA_CONNECTIONS: Final = f"{DOMAIN}.connections"
-
-COMPRESSED_STATE_STATE = "s"
-COMPRESSED_STATE_ATTRIBUTES = "a"
-COMPRESSED_STATE_CONTEXT = "c"
-COMPRESSED_STATE_LAST_CHANGED = "lc"
-COMPRESSED_STATE_LAST_UPDATED = "lu"
+# Data used to store the hub of the entity subscriptions
+DATA_ENTITY_SUBSCRIPTIONS: Final = f"{DOMAIN}.entity_subscriptions"
+# Number of state changes kept to resume the entity subscriptions
+# of reconnecting clients
+ENTITY_RESUME_RING_SIZE: Final = 4096
+# Data used to store the handlers of the connections by connection id
+DATA_WRITE_QUEUES: Final = f"{DOMAIN}.write_queues"
 
 FEATURE_COALESCE_MESSAGES = "coalesce_messages"
+FEATURE_COMPRESSED_MESSAGES = "compressed_messages"
+
+# Messages at least this long are compressed for the clients supporting it
+COMPRESSED_MESSAGE_MIN_SIZE: Final = 1024
+# Messages at least this long are compressed in the executor
+COMPRESSED_MESSAGE_EXECUTOR_MIN_SIZE: Final = 256 * 1024
+COMPRESSED_MESSAGE_LEVEL: Final = 6
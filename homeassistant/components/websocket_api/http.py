@@ -7,6 +7,7 @@ from contextlib import suppress
 import datetime as dt
 import logging
 from typing import TYPE_CHECKING, Any, Final
+import zlib
 
 from aiohttp import WSMsgType, web
 import async_timeout
@@ -21,9 +22,18 @@ from homeassistant.helpers.json import json_loads
 from .auth import AuthPhase, auth_required_message
 from .const import (
     CANCELLATION_ERRORS,
+    COMPRESSED_MESSAGE_EXECUTOR_MIN_SIZE,
+    COMPRESSED_MESSAGE_LEVEL,
+    COMPRESSED_MESSAGE_MIN_SIZE,
     DATA_CONNECTIONS,
+    DATA_WRITE_QUEUES,
     FEATURE_COALESCE_MESSAGES,
+    FEATURE_COMPRESSED_MESSAGES,
     MAX_PENDING_MSG,
+    PENDING_MSG_BATCH_DELAY,
+    PENDING_MSG_BATCH_MAX_DELAY,
+    PENDING_MSG_BATCH_MIN,
+    PENDING_MSG_MERGE_MIN,
     PENDING_MSG_PEAK,
     PENDING_MSG_PEAK_TIME,
     SIGNAL_WEBSOCKET_CONNECTED,
@@ -31,7 +41,7 @@ from .const import (
     URL,
 )
 from .error import Disconnect
-from .messages import message_to_json
+from .messages import StateDiffMessage, message_to_json
 
 if TYPE_CHECKING:
     from .connection import ActiveConnection
@@ -40,6 +50,20 @@ if TYPE_CHECKING:
 _WS_LOGGER: Final = logging.getLogger(f"{__name__}.connection")
 
 
+def _batch_delay(pending: int) -> float:
+    """Return how long to wait before writing a batch of pending messages.
+
+    Only queues that are falling behind wait; queues at the peak are
+    written at once so the wait never pushes a client to the limit.
+    """
+    if pending < PENDING_MSG_BATCH_MIN or pending >= PENDING_MSG_PEAK:
+        return 0
+    return min(
+        (pending - PENDING_MSG_BATCH_MIN + 1) * PENDING_MSG_BATCH_DELAY,
+        PENDING_MSG_BATCH_MAX_DELAY,
+    )
+
+
 class WebsocketAPIView(HomeAssistantView):
     """View to serve a websockets endpoint."""
 
@@ -74,19 +98,43 @@ class WebSocketHandler:
         self._logger = WebSocketAdapter(_WS_LOGGER, {"connid": id(self)})
         self._peak_checker_unsub: Callable[[], None] | None = None
         self.connection: ActiveConnection | None = None
+        # The state diffs waiting in the queue by subscription and entity id
+        self._pending_state_diffs: dict[tuple[int, str], StateDiffMessage] = {}
+        self._max_pending = 0
+        self._merged_state_diffs = 0
+
+    @property
+    def write_queue_stats(self) -> dict[str, int]:
+        """Return the statistics of the queue of messages to write."""
+        return {
+            "pending": self._to_write.qsize(),
+            "max_pending": self._max_pending,
+            "merged_state_diffs": self._merged_state_diffs,
+        }
+
+    def _render(self, process: str | Callable[[], str]) -> str:
+        """Render a message taken from the queue."""
+        if isinstance(process, str):
+            return process
+        if (
+            isinstance(process, StateDiffMessage)
+            and self._pending_state_diffs.get((process.iden, process.entity_id))
+            is process
+        ):
+            del self._pending_state_diffs[(process.iden, process.entity_id)]
+        return process()
 
     async def _writer(self) -> None:
         """Write outgoing messages."""
         # Exceptions if Socket disconnected or cancelled by connection handler
         to_write = self._to_write
         logger = self._logger
-        wsock = self.wsock
         try:
             with suppress(RuntimeError, ConnectionResetError, *CANCELLATION_ERRORS):
                 while not self.wsock.closed:
                     if (process := await to_write.get()) is None:
                         return
-                    message = process if isinstance(process, str) else process()
+                    message = self._render(process)
 
                     if (
                         to_write.empty()
@@ -95,26 +143,55 @@ class WebSocketHandler:
                         not in self.connection.supported_features
                     ):
                         logger.debug("Sending %s", message)
-                        await wsock.send_str(message)
+                        await self._async_send_str(message)
                         continue
 
+                    if delay := _batch_delay(to_write.qsize()):
+                        # The client is falling behind, wait a little so more
+                        # diffs of the same entities merge into the batch
+                        await asyncio.sleep(delay)
+
                     messages: list[str] = [message]
                     while not to_write.empty():
                         if (process := to_write.get_nowait()) is None:
                             return
-                        messages.append(
-                            process if isinstance(process, str) else process()
-                        )
+                        messages.append(self._render(process))
 
                     coalesced_messages = "[" + ",".join(messages) + "]"
                     self._logger.debug("Sending %s", coalesced_messages)
-                    await self.wsock.send_str(coalesced_messages)
+                    await self._async_send_str(coalesced_messages)
         finally:
             # Clean up the peaker checker when we shut down the writer
             if self._peak_checker_unsub is not None:
                 self._peak_checker_unsub()
                 self._peak_checker_unsub = None
 
+    async def _async_send_str(self, message: str) -> None:
+        """Send a message as text, or compressed when the client supports it.
+
+        Clients that announce FEATURE_COMPRESSED_MESSAGES get the larger
+        messages as binary frames of zlib compressed JSON, unless the
+        connection already negotiated permessage-deflate.
+        """
+        if (
+            len(message) < COMPRESSED_MESSAGE_MIN_SIZE
+            or not self.connection
+            or FEATURE_COMPRESSED_MESSAGES not in self.connection.supported_features
+            or self.wsock.compress
+        ):
+            await self.wsock.send_str(message)
+            return
+
+        data = message.encode("utf-8")
+        if len(data) < COMPRESSED_MESSAGE_EXECUTOR_MIN_SIZE:
+            compressed = zlib.compress(data, COMPRESSED_MESSAGE_LEVEL)
+        else:
+            # zlib releases the GIL so large snapshots do not block the loop
+            compressed = await self.hass.async_add_executor_job(
+                zlib.compress, data, COMPRESSED_MESSAGE_LEVEL
+            )
+        await self.wsock.send_bytes(compressed)
+
     @callback
     def _send_message(self, message: str | dict[str, Any] | Callable[[], str]) -> None:
         """Send a message to the client.
@@ -125,17 +202,36 @@ class WebSocketHandler:
         """
         if isinstance(message, dict):
             message = message_to_json(message)
+        elif isinstance(message, StateDiffMessage):
+            key = (message.iden, message.entity_id)
+            if (
+                pending := self._pending_state_diffs.get(key)
+            ) is not None and self._to_write.qsize() >= PENDING_MSG_MERGE_MIN:
+                # The client is falling behind and did not receive the
+                # previous diff of the entity yet
+                pending.merge(message)
+                self._merged_state_diffs += 1
+                return
 
         try:
             self._to_write.put_nowait(message)
         except asyncio.QueueFull:
             self._logger.error(
-                "Client exceeded max pending messages [2]: %s", MAX_PENDING_MSG
+                "Client exceeded max pending messages [2]: %s (%s)",
+                MAX_PENDING_MSG,
+                self.write_queue_stats,
             )
 
             self._cancel()
+        else:
+            if isinstance(message, StateDiffMessage):
+                # Later diffs merge into the latest pending one
+                self._pending_state_diffs[key] = message
 
-        if self._to_write.qsize() < PENDING_MSG_PEAK:
+        if (pending_count := self._to_write.qsize()) > self._max_pending:
+            self._max_pending = pending_count
+
+        if pending_count < PENDING_MSG_PEAK:
             if self._peak_checker_unsub:
                 self._peak_checker_unsub()
                 self._peak_checker_unsub = None
@@ -155,9 +251,10 @@ class WebSocketHandler:
             return
 
         self._logger.error(
-            "Client unable to keep up with pending messages. Stayed over %s for %s seconds",
+            "Client unable to keep up with pending messages. Stayed over %s for %s seconds (%s)",
             PENDING_MSG_PEAK,
             PENDING_MSG_PEAK_TIME,
+            self.write_queue_stats,
         )
         self._cancel()
 
@@ -231,6 +328,7 @@ class WebSocketHandler:
             self.hass.data[DATA_CONNECTIONS] = (
                 self.hass.data.get(DATA_CONNECTIONS, 0) + 1
             )
+            self.hass.data.setdefault(DATA_WRITE_QUEUES, {})[id(self)] = self
             async_dispatcher_send(self.hass, SIGNAL_WEBSOCKET_CONNECTED)
 
             # Command phase
@@ -289,8 +387,18 @@ class WebSocketHandler:
 
                 if connection is not None:
                     self.hass.data[DATA_CONNECTIONS] -= 1
+                    del self.hass.data[DATA_WRITE_QUEUES][id(self)]
                     self.connection = None
 
                 async_dispatcher_send(self.hass, SIGNAL_WEBSOCKET_DISCONNECTED)
 
         return wsock
+
+
+@callback
+def async_get_write_queue_stats(hass: HomeAssistant) -> dict[int, dict[str, int]]:
+    """Return the write queue statistics of the connected clients."""
+    return {
+        connid: handler.write_queue_stats
+        for connid, handler in hass.data.get(DATA_WRITE_QUEUES, {}).items()
+    }
@@ -1,6 +1,7 @@
 """Message templates for websocket commands."""
 from __future__ import annotations
 
+from collections.abc import Iterable
 from functools import lru_cache
 import logging
 from typing import Any, Final
@@ -45,6 +46,7 @@ STATE_DIFF_REMOVALS = "-"
 ENTITY_EVENT_ADD = "a"
 ENTITY_EVENT_REMOVE = "r"
 ENTITY_EVENT_CHANGE = "c"
+ENTITY_EVENT_RESUME_TOKEN = "t"
 
 
 def result_message(iden: int, result: Any = None) -> dict[str, Any]:
@@ -86,7 +88,12 @@ def _cached_event_message(event: Event) -> str:
     The IDEN_TEMPLATE is used which will be replaced
     with the actual iden in cached_event_message
     """
-    return message_to_json(event_message(IDEN_TEMPLATE, event))
+    try:
+        event_json = event.as_dict_json().decode("utf-8")
+    except (ValueError, TypeError):
+        # Logs where the data that cannot be serialized is
+        return message_to_json(event_message(IDEN_TEMPLATE, event))
+    return f'{{"id":{IDEN_JSON_TEMPLATE},"type":"event","event":{event_json}}}'
 
 
 def cached_state_diff_message(iden: int, event: Event) -> str:
@@ -111,6 +118,66 @@ def _cached_state_diff_message(event: Event) -> str:
     return message_to_json(event_message(IDEN_TEMPLATE, _state_diff_event(event)))
 
 
+@lru_cache(maxsize=128)
+def _cached_resumable_state_diff_message(event: Event, token: str) -> str:
+    """Cache and serialize the event to json with its resume token.
+
+    The IDEN_TEMPLATE is used which will be replaced
+    with the actual iden in cached_event_message
+    """
+    return message_to_json(
+        event_message(
+            IDEN_TEMPLATE,
+            {**_state_diff_event(event), ENTITY_EVENT_RESUME_TOKEN: token},
+        )
+    )
+
+
+class StateDiffMessage:
+    """A state diff message of an entity subscription.
+
+    The diffs of an entity still waiting to be written to a slow client
+    are merged into one going from the state the client last received
+    to the latest one.
+
+    The messages of resumable subscriptions carry the resume token of
+    the first state change they include. The diffs of other entities
+    queued behind a merged message have later tokens, resuming from the
+    first token replays the merged diff again instead of missing them.
+    """
+
+    __slots__ = ("iden", "entity_id", "event", "new_state", "token", "merged")
+
+    def __init__(self, iden: int, event: Event, token: str | None = None) -> None:
+        """Initialize the message."""
+        self.iden = iden
+        self.entity_id: str = event.data["entity_id"]
+        self.event = event
+        self.new_state: State | None = event.data["new_state"]
+        self.token = token
+        self.merged = False
+
+    def merge(self, other: StateDiffMessage) -> None:
+        """Merge a later diff of the same entity into this one."""
+        self.new_state = other.new_state
+        self.merged = True
+
+    def __call__(self) -> str:
+        """Serialize the message to json."""
+        if not self.merged:
+            if self.token is None:
+                return cached_state_diff_message(self.iden, self.event)
+            return _cached_resumable_state_diff_message(self.event, self.token).replace(
+                IDEN_JSON_TEMPLATE, str(self.iden), 1
+            )
+        diff = _state_diff_from_states(
+            self.entity_id, self.event.data["old_state"], self.new_state
+        )
+        if self.token is not None:
+            diff[ENTITY_EVENT_RESUME_TOKEN] = self.token
+        return message_to_json(event_message(self.iden, diff))
+
+
 def _state_diff_event(event: Event) -> dict:
     """Convert a state_changed event to the minimal version.
 
@@ -122,17 +189,40 @@ def _state_diff_event(event: Event) -> dict:
         "r": [entity_id,…]
     }
     """
-    if (event_new_state := event.data["new_state"]) is None:
-        return {ENTITY_EVENT_REMOVE: [event.data["entity_id"]]}
-    assert isinstance(event_new_state, State)
-    if (event_old_state := event.data["old_state"]) is None:
+    return _state_diff_from_states(
+        event.data["entity_id"], event.data["old_state"], event.data["new_state"]
+    )
+
+
+def _state_diff_from_states(
+    entity_id: str, old_state: State | None, new_state: State | None
+) -> dict:
+    """Return the minimal state diff going from the old to the new state."""
+    if new_state is None:
+        return {ENTITY_EVENT_REMOVE: [entity_id]}
+    assert isinstance(new_state, State)
+    if old_state is None:
         return {
-            ENTITY_EVENT_ADD: {
-                event_new_state.entity_id: compressed_state_dict_add(event_new_state)
-            }
+            ENTITY_EVENT_ADD: {new_state.entity_id: new_state.as_compressed_state()}
         }
-    assert isinstance(event_old_state, State)
-    return _state_diff(event_old_state, event_new_state)
+    assert isinstance(old_state, State)
+    return _state_diff(old_state, new_state)
+
+
+def merged_state_diff(
+    changes: Iterable[tuple[str, State | None, State | None]]
+) -> dict[str, Any]:
+    """Return the state diff of entities going from their old to their new state."""
+    diff: dict[str, Any] = {}
+    for entity_id, old_state, new_state in changes:
+        for kind, entity_diff in _state_diff_from_states(
+            entity_id, old_state, new_state
+        ).items():
+            if kind == ENTITY_EVENT_REMOVE:
+                diff.setdefault(kind, []).extend(entity_diff)
+            else:
+                diff.setdefault(kind, {}).update(entity_diff)
+    return diff
 
 
 def _state_diff(
@@ -176,19 +266,7 @@ def compressed_state_dict_add(state: State) -> dict[str, Any]:
 
     Sends c (context) as a string if it only contains an id.
     """
-    if state.context.parent_id is None and state.context.user_id is None:
-        context: dict[str, Any] | str = state.context.id
-    else:
-        context = state.context.as_dict()
-    compressed_state: dict[str, Any] = {
-        COMPRESSED_STATE_STATE: state.state,
-        COMPRESSED_STATE_ATTRIBUTES: state.attributes,
-        COMPRESSED_STATE_CONTEXT: context,
-        COMPRESSED_STATE_LAST_CHANGED: state.last_changed.timestamp(),
-    }
-    if state.last_changed != state.last_updated:
-        compressed_state[COMPRESSED_STATE_LAST_UPDATED] = state.last_updated.timestamp()
-    return compressed_state
+    return state.as_compressed_state()
 
 
 def message_to_json(message: dict[str, Any]) -> str:
@@ -0,0 +1,191 @@
+"""Fan out the state changes to the entity subscriptions of the connections."""
+from __future__ import annotations
+
+from collections import deque
+from itertools import islice
+from typing import TYPE_CHECKING, Any, cast
+
+from homeassistant.auth.models import User
+from homeassistant.auth.permissions import AbstractPermissions
+from homeassistant.auth.permissions.const import POLICY_READ
+from homeassistant.const import EVENT_STATE_CHANGED
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, State, callback
+from homeassistant.util.ulid import ulid_hex
+
+from . import messages
+from .const import DATA_ENTITY_SUBSCRIPTIONS, ENTITY_RESUME_RING_SIZE
+
+if TYPE_CHECKING:
+    from .connection import ActiveConnection
+
+
+class _EntitySubscription:
+    """A subscribe_entities subscription of a connection."""
+
+    __slots__ = ("connection", "msg_id", "resumable")
+
+    def __init__(
+        self, connection: ActiveConnection, msg_id: int, resumable: bool
+    ) -> None:
+        """Initialize the subscription."""
+        self.connection = connection
+        self.msg_id = msg_id
+        self.resumable = resumable
+
+
+class EntitySubscriptionHub:
+    """Forward the state changes to the entity subscriptions.
+
+    A single state changed listener is shared by all the subscriptions,
+    which are indexed by the entity ids they follow so a state change
+    only looks at the subscriptions that want it. The read permission
+    decisions are cached per user until the permissions of the user change.
+
+    The last state changes are kept in a ring, numbered by a monotonic
+    sequence, so a reconnecting client can resume its subscription from
+    the resume token of the last message it received instead of getting
+    all the states again. The sequence restarts with Home Assistant,
+    so the resume tokens include the id of the run.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the hub."""
+        self.hass = hass
+        self._all: dict[_EntitySubscription, None] = {}
+        self._by_entity_id: dict[str, dict[_EntitySubscription, None]] = {}
+        self._user_subscriptions: dict[str, int] = {}
+        self._decisions: dict[str, tuple[AbstractPermissions, dict[str, bool]]] = {}
+        self._run_id = ulid_hex()
+        self._sequence = 0
+        self._ring: deque[Event] = deque(maxlen=ENTITY_RESUME_RING_SIZE)
+        # The ring must keep recording while the clients are disconnected
+        hass.bus.async_listen(
+            EVENT_STATE_CHANGED, self._async_forward, run_immediately=True
+        )
+
+    @property
+    def resume_token(self) -> str:
+        """Return the resume token of the last state change."""
+        return f"{self._run_id}-{self._sequence}"
+
+    @callback
+    def async_subscribe(
+        self,
+        connection: ActiveConnection,
+        msg_id: int,
+        entity_ids: set[str],
+        resumable: bool = False,
+    ) -> CALLBACK_TYPE:
+        """Subscribe a connection to the state changes of entities.
+
+        All the entities are followed when entity_ids is empty. The
+        messages of resumable subscriptions carry their resume token.
+        """
+        subscription = _EntitySubscription(connection, msg_id, resumable)
+        if entity_ids:
+            for entity_id in entity_ids:
+                self._by_entity_id.setdefault(entity_id, {})[subscription] = None
+        else:
+            self._all[subscription] = None
+
+        user_id = connection.user.id
+        self._user_subscriptions[user_id] = self._user_subscriptions.get(user_id, 0) + 1
+
+        @callback
+        def _async_unsubscribe() -> None:
+            """Unsubscribe the connection."""
+            if entity_ids:
+                for entity_id in entity_ids:
+                    subscriptions = self._by_entity_id[entity_id]
+                    del subscriptions[subscription]
+                    if not subscriptions:
+                        del self._by_entity_id[entity_id]
+            else:
+                del self._all[subscription]
+
+            self._user_subscriptions[user_id] -= 1
+            if not self._user_subscriptions[user_id]:
+                del self._user_subscriptions[user_id]
+                self._decisions.pop(user_id, None)
+
+        return _async_unsubscribe
+
+    @callback
+    def async_resume_diff(
+        self, user: User, resume_token: str, entity_ids: set[str]
+    ) -> dict[str, Any] | None:
+        """Return the state diff since a resume token.
+
+        None is returned when the state changes since the resume token
+        are no longer in the ring.
+        """
+        run_id, _, sequence = resume_token.rpartition("-")
+        if run_id != self._run_id or not sequence.isdigit():
+            return None
+        if (missed := self._sequence - int(sequence)) < 0 or missed > len(self._ring):
+            return None
+
+        changes: dict[str, tuple[State | None, State | None]] = {}
+        for event in islice(self._ring, len(self._ring) - missed, None):
+            entity_id: str = event.data["entity_id"]
+            if entity_ids and entity_id not in entity_ids:
+                continue
+            if (change := changes.get(entity_id)) is None:
+                changes[entity_id] = (event.data["old_state"], event.data["new_state"])
+            else:
+                changes[entity_id] = (change[0], event.data["new_state"])
+
+        return messages.merged_state_diff(
+            (entity_id, old_state, new_state)
+            for entity_id, (old_state, new_state) in changes.items()
+            if self._async_can_read(user, entity_id)
+        )
+
+    @callback
+    def _async_can_read(self, user: User, entity_id: str) -> bool:
+        """Return if the user can read the entity."""
+        permissions = user.permissions
+        cached = self._decisions.get(user.id)
+        if cached is None or cached[0] is not permissions:
+            cached = self._decisions[user.id] = (permissions, {})
+        decisions = cached[1]
+        if (allowed := decisions.get(entity_id)) is None:
+            allowed = decisions[entity_id] = permissions.check_entity(
+                entity_id, POLICY_READ
+            )
+        return allowed
+
+    @callback
+    def _async_forward(self, event: Event) -> None:
+        """Forward a state change to the subscriptions following the entity."""
+        self._sequence += 1
+        self._ring.append(event)
+
+        entity_id: str = event.data["entity_id"]
+        subscriptions = [*self._all]
+        if entity_subscriptions := self._by_entity_id.get(entity_id):
+            subscriptions.extend(entity_subscriptions)
+
+        # The message is serialized once, when the first connection writes it
+        token: str | None = None
+        for subscription in subscriptions:
+            connection = subscription.connection
+            if not self._async_can_read(connection.user, entity_id):
+                continue
+            if subscription.resumable and token is None:
+                token = self.resume_token
+            connection.send_message(
+                messages.StateDiffMessage(
+                    subscription.msg_id,
+                    event,
+                    token if subscription.resumable else None,
+                )
+            )
+
+
+@callback
+def async_get_entity_subscription_hub(hass: HomeAssistant) -> EntitySubscriptionHub:
+    """Get the entity subscription hub."""
+    if (hub := hass.data.get(DATA_ENTITY_SUBSCRIPTIONS)) is None:
+        hub = hass.data[DATA_ENTITY_SUBSCRIPTIONS] = EntitySubscriptionHub(hass)
+    return cast(EntitySubscriptionHub, hub)
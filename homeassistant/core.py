@@ -49,6 +49,11 @@ from .const import (
     ATTR_FRIENDLY_NAME,
     ATTR_SERVICE,
     ATTR_SERVICE_DATA,
+    COMPRESSED_STATE_ATTRIBUTES,
+    COMPRESSED_STATE_CONTEXT,
+    COMPRESSED_STATE_LAST_CHANGED,
+    COMPRESSED_STATE_LAST_UPDATED,
+    COMPRESSED_STATE_STATE,
     CONF_UNIT_SYSTEM_IMPERIAL,
     EVENT_CALL_SERVICE,
     EVENT_CORE_CONFIG_UPDATE,
@@ -74,6 +79,7 @@ from .exceptions import (
     ServiceNotFound,
     Unauthorized,
 )
+from .helpers.json import json_bytes
 from .util import dt as dt_util, location, ulid as ulid_util
 from .util.async_ import (
     fire_coroutine_threadsafe,
@@ -778,7 +784,14 @@ class EventOrigin(enum.Enum):
 class Event:
     """Representation of an event within the bus."""
 
-    __slots__ = ["event_type", "data", "origin", "time_fired", "context"]
+    __slots__ = [
+        "event_type",
+        "data",
+        "origin",
+        "time_fired",
+        "context",
+        "_as_dict_json",
+    ]
 
     def __init__(
         self,
@@ -796,6 +809,7 @@ class Event:
         self.context: Context = context or Context(
             id=ulid_util.ulid(dt_util.utc_to_timestamp(self.time_fired))
         )
+        self._as_dict_json: bytes | None = None
 
     def __hash__(self) -> int:
         """Make hashable."""
@@ -815,6 +829,32 @@ class Event:
             "context": self.context.as_dict(),
         }
 
+    def as_dict_json(self) -> bytes:
+        """Return the JSON of the dict representation of this Event.
+
+        The event is serialized once for all its consumers and the
+        states in the data are serialized with their cached JSON.
+
+        Async friendly.
+        """
+        if self._as_dict_json is None:
+            self._as_dict_json = b"".join(
+                (
+                    b'{"event_type":',
+                    json_bytes(self.event_type),
+                    b',"data":',
+                    _event_data_json(self.data),
+                    b',"origin":',
+                    json_bytes(str(self.origin.value)),
+                    b',"time_fired":',
+                    json_bytes(self.time_fired.isoformat()),
+                    b',"context":',
+                    json_bytes(self.context.as_dict()),
+                    b"}",
+                )
+            )
+        return self._as_dict_json
+
     def __repr__(self) -> str:
         """Return the representation."""
         if self.data:
@@ -834,12 +874,37 @@ class Event:
         )
 
 
+def _event_data_json(data: dict[str, Any]) -> bytes:
+    """Serialize the data of an event, reusing the JSON of the states in it."""
+    if not any(isinstance(value, State) for value in data.values()) or not all(
+        isinstance(key, str) for key in data
+    ):
+        return json_bytes(data)
+    return b"".join(
+        (
+            b"{",
+            b",".join(
+                json_bytes(key)
+                + b":"
+                + (
+                    value.as_dict_json()
+                    if isinstance(value, State)
+                    else json_bytes(value)
+                )
+                for key, value in data.items()
+            ),
+            b"}",
+        )
+    )
+
+
 class _FilterableJob(NamedTuple):
     """Event listener job to be executed with optional filter."""
 
     job: HassJob[[Event], Coroutine[Any, Any, None] | None]
     event_filter: Callable[[Event], bool] | None
     run_immediately: bool
+    batched: bool = False
 
 
 class EventBus:
@@ -848,6 +913,15 @@ class EventBus:
     def __init__(self, hass: HomeAssistant) -> None:
         """Initialize a new event bus."""
         self._listeners: dict[str, list[_FilterableJob]] = {}
+        # The listeners to run for an event type, including the MATCH_ALL
+        # listeners. Built when an event is fired and dropped when the
+        # listeners of the event type change.
+        self._dispatch: dict[str, tuple[_FilterableJob, ...]] = {}
+        self._match_all_listeners: tuple[_FilterableJob, ...] | None = None
+        # The batched listeners to run with their events
+        self._batch: list[
+            tuple[HassJob[[Event], Coroutine[Any, Any, None] | None], Event]
+        ] = []
         self._hass = hass
 
     @callback
@@ -893,12 +967,8 @@ class EventBus:
                 event_type, "event_type", MAX_LENGTH_EVENT_EVENT_TYPE
             )
 
-        listeners = self._listeners.get(event_type, [])
-
-        # EVENT_HOMEASSISTANT_CLOSE should go only to this listeners
-        match_all_listeners = self._listeners.get(MATCH_ALL)
-        if match_all_listeners is not None and event_type != EVENT_HOMEASSISTANT_CLOSE:
-            listeners = match_all_listeners + listeners
+        if (listeners := self._dispatch.get(event_type)) is None:
+            listeners = self._async_dispatch_listeners(event_type)
 
         event = Event(event_type, event_data, origin, time_fired, context)
         if not event.context.origin_event:
@@ -909,7 +979,7 @@ class EventBus:
         if not listeners:
             return
 
-        for job, event_filter, run_immediately in listeners:
+        for job, event_filter, run_immediately, batched in listeners:
             if event_filter is not None:
                 try:
                     if not event_filter(event):
@@ -922,9 +992,39 @@ class EventBus:
                     job.target(event)
                 except Exception:  # pylint: disable=broad-except
                     _LOGGER.exception("Error running job: %s", job)
+            elif batched:
+                if not self._batch:
+                    self._hass.loop.call_soon(self._async_run_batch)
+                self._batch.append((job, event))
             else:
                 self._hass.async_add_hass_job(job, event)
 
+    @callback
+    def _async_dispatch_listeners(self, event_type: str) -> tuple[_FilterableJob, ...]:
+        """Return the listeners to run for an event type."""
+        if (match_all_listeners := self._match_all_listeners) is None:
+            match_all_listeners = self._match_all_listeners = tuple(
+                self._listeners.get(MATCH_ALL, ())
+            )
+        # EVENT_HOMEASSISTANT_CLOSE should go only to this listeners
+        if event_type == EVENT_HOMEASSISTANT_CLOSE:
+            match_all_listeners = ()
+        if (listeners := self._listeners.get(event_type)) is None:
+            return match_all_listeners
+        dispatch = self._dispatch[event_type] = match_all_listeners + tuple(listeners)
+        return dispatch
+
+    @callback
+    def _async_run_batch(self) -> None:
+        """Run the batched listeners with the events fired since the last batch."""
+        batch = self._batch
+        self._batch = []
+        for job, event in batch:
+            try:
+                job.target(event)
+            except Exception:  # pylint: disable=broad-except
+                _LOGGER.exception("Error running job: %s", job)
+
     def listen(
         self,
         event_type: str,
@@ -952,6 +1052,7 @@ class EventBus:
         listener: Callable[[Event], Coroutine[Any, Any, None] | None],
         event_filter: Callable[[Event], bool] | None = None,
         run_immediately: bool = False,
+        batched: bool = False,
     ) -> CALLBACK_TYPE:
         """Listen for all events or events of a specific type.
 
@@ -966,14 +1067,24 @@ class EventBus:
         right away instead of using call_soon. Only use this if
         the callback results in scheduling another task.
 
+        If batched is passed, the callback is run together with the
+        other batched listeners, for all the events fired since the
+        batch was scheduled, using a single call_soon. Use this for
+        callbacks which listen to events that are fired often.
+
         This method must be run in the event loop.
         """
         if event_filter is not None and not is_callback(event_filter):
             raise HomeAssistantError(f"Event filter {event_filter} is not a callback")
-        if run_immediately and not is_callback(listener):
+        if (run_immediately or batched) and not is_callback(listener):
             raise HomeAssistantError(f"Event listener {listener} is not a callback")
+        if run_immediately and batched:
+            raise HomeAssistantError(
+                f"Event listener {listener} can not be run immediately and batched"
+            )
         return self._async_listen_filterable_job(
-            event_type, _FilterableJob(HassJob(listener), event_filter, run_immediately)
+            event_type,
+            _FilterableJob(HassJob(listener), event_filter, run_immediately, batched),
         )
 
     @callback
@@ -981,6 +1092,7 @@ class EventBus:
         self, event_type: str, filterable_job: _FilterableJob
     ) -> CALLBACK_TYPE:
         self._listeners.setdefault(event_type, []).append(filterable_job)
+        self._async_invalidate_dispatch(event_type)
 
         def remove_listener() -> None:
             """Remove the listener."""
@@ -1071,11 +1183,38 @@ class EventBus:
             _LOGGER.exception(
                 "Unable to remove unknown job listener %s", filterable_job
             )
+            return
+        self._async_invalidate_dispatch(event_type)
+
+    @callback
+    def _async_invalidate_dispatch(self, event_type: str) -> None:
+        """Drop the listeners to run built for the event types affected."""
+        if event_type == MATCH_ALL:
+            self._match_all_listeners = None
+            self._dispatch.clear()
+        else:
+            self._dispatch.pop(event_type, None)
 
 
 _StateT = TypeVar("_StateT", bound="State")
 
 
+class _StateAttributes(ReadOnlyDict[str, Any]):
+    """The attributes of states.
+
+    The attributes are shared by the states of an entity as long as
+    they do not change, which saves memory and lets their JSON be
+    serialized once.
+    """
+
+    __slots__ = ("json",)
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        """Initialize the attributes."""
+        super().__init__(*args, **kwargs)
+        self.json: bytes | None = None
+
+
 class State:
     """Object to represent a state within the state machine.
 
@@ -1099,6 +1238,9 @@ class State:
         "domain",
         "object_id",
         "_as_dict",
+        "_as_dict_json",
+        "_as_compressed_state",
+        "_as_compressed_state_json",
     ]
 
     def __init__(
@@ -1128,12 +1270,21 @@ class State:
 
         self.entity_id = entity_id.lower()
         self.state = state
-        self.attributes = ReadOnlyDict(attributes or {})
+        # The attributes are read only, so they are shared with
+        # the states created from the same attributes
+        self.attributes: ReadOnlyDict[str, Any] = (
+            attributes
+            if isinstance(attributes, _StateAttributes)
+            else _StateAttributes(attributes or {})
+        )
         self.last_updated = last_updated or dt_util.utcnow()
         self.last_changed = last_changed or self.last_updated
         self.context = context or Context()
         self.domain, self.object_id = split_entity_id(self.entity_id)
         self._as_dict: ReadOnlyDict[str, Collection[Any]] | None = None
+        self._as_dict_json: bytes | None = None
+        self._as_compressed_state: dict[str, Any] | None = None
+        self._as_compressed_state_json: bytes | None = None
 
     def __hash__(self) -> int:
         """Make the state hashable.
@@ -1175,6 +1326,65 @@ class State:
             )
         return self._as_dict
 
+    def as_dict_json(self) -> bytes:
+        """Return the JSON of the dict representation of the State.
+
+        The state is serialized once for all its consumers.
+
+        Async friendly.
+        """
+        if self._as_dict_json is None:
+            self._as_dict_json = json_bytes(self.as_dict())
+        return self._as_dict_json
+
+    def as_compressed_state(self) -> dict[str, Any]:
+        """Build a compressed dict of the State.
+
+        Omits the lu (last_updated) if it matches (lc) last_changed.
+
+        Sends c (context) as a string if it only contains an id.
+
+        Async friendly.
+        """
+        if self._as_compressed_state is None:
+            context = self.context
+            if context.parent_id is None and context.user_id is None:
+                compressed_context: dict[str, Any] | str = context.id
+            else:
+                compressed_context = context.as_dict()
+            compressed_state: dict[str, Any] = {
+                COMPRESSED_STATE_STATE: self.state,
+                COMPRESSED_STATE_ATTRIBUTES: self.attributes,
+                COMPRESSED_STATE_CONTEXT: compressed_context,
+                COMPRESSED_STATE_LAST_CHANGED: self.last_changed.timestamp(),
+            }
+            if self.last_changed != self.last_updated:
+                compressed_state[
+                    COMPRESSED_STATE_LAST_UPDATED
+                ] = self.last_updated.timestamp()
+            self._as_compressed_state = compressed_state
+        return self._as_compressed_state
+
+    def as_compressed_state_json(self) -> bytes:
+        """Return the JSON of the compressed dict of the State.
+
+        Async friendly.
+        """
+        if self._as_compressed_state_json is None:
+            self._as_compressed_state_json = json_bytes(self.as_compressed_state())
+        return self._as_compressed_state_json
+
+    def attributes_json(self) -> bytes:
+        """Return the JSON of the attributes of the State.
+
+        Async friendly.
+        """
+        attributes = self.attributes
+        assert isinstance(attributes, _StateAttributes)
+        if attributes.json is None:
+            attributes.json = json_bytes(attributes)
+        return attributes.json
+
     @classmethod
     def from_dict(cls: type[_StateT], json_dict: dict[str, Any]) -> _StateT | None:
         """Initialize a state from a dict.
@@ -1252,6 +1462,9 @@ class StateMachine:
     def __init__(self, bus: EventBus, loop: asyncio.events.AbstractEventLoop) -> None:
         """Initialize state machine."""
         self._states: dict[str, State] = {}
+        # The states by domain, so the states of a domain
+        # are found without looking at all the states
+        self._domain_index: dict[str, dict[str, State]] = {}
         self._reservations: set[str] = set()
         self._bus = bus
         self._loop = loop
@@ -1275,13 +1488,12 @@ class StateMachine:
             return list(self._states)
 
         if isinstance(domain_filter, str):
-            domain_filter = (domain_filter.lower(),)
+            return list(self._domain_index.get(domain_filter.lower(), ()))
 
-        return [
-            state.entity_id
-            for state in self._states.values()
-            if state.domain in domain_filter
-        ]
+        entity_ids: list[str] = []
+        for domain_states in self._domain_states(domain_filter):
+            entity_ids.extend(domain_states)
+        return entity_ids
 
     @callback
     def async_entity_ids_count(
@@ -1295,10 +1507,10 @@ class StateMachine:
             return len(self._states)
 
         if isinstance(domain_filter, str):
-            domain_filter = (domain_filter.lower(),)
+            return len(self._domain_index.get(domain_filter.lower(), ()))
 
-        return len(
-            [None for state in self._states.values() if state.domain in domain_filter]
+        return sum(
+            len(domain_states) for domain_states in self._domain_states(domain_filter)
         )
 
     def all(self, domain_filter: str | Iterable[str] | None = None) -> list[State]:
@@ -1319,10 +1531,21 @@ class StateMachine:
             return list(self._states.values())
 
         if isinstance(domain_filter, str):
-            domain_filter = (domain_filter.lower(),)
+            if (domain_states := self._domain_index.get(domain_filter.lower())) is None:
+                return []
+            return list(domain_states.values())
 
+        states: list[State] = []
+        for domain_states in self._domain_states(domain_filter):
+            states.extend(domain_states.values())
+        return states
+
+    def _domain_states(self, domains: Iterable[str]) -> list[dict[str, State]]:
+        """Return the states of each of the domains."""
         return [
-            state for state in self._states.values() if state.domain in domain_filter
+            domain_states
+            for domain in dict.fromkeys(domains)
+            if (domain_states := self._domain_index.get(domain)) is not None
         ]
 
     def get(self, entity_id: str) -> State | None:
@@ -1366,6 +1589,11 @@ class StateMachine:
         if old_state is None:
             return False
 
+        domain_states = self._domain_index[old_state.domain]
+        del domain_states[entity_id]
+        if not domain_states:
+            del self._domain_index[old_state.domain]
+
         old_state.expire()
         self._bus.async_fire(
             EVENT_STATE_CHANGED,
@@ -1450,7 +1678,10 @@ class StateMachine:
             last_changed = None
         else:
             same_state = old_state.state == new_state and not force_update
-            same_attr = old_state.attributes == attributes
+            # The attributes are often passed on from the old state
+            same_attr = (
+                old_state.attributes is attributes or old_state.attributes == attributes
+            )
             last_changed = old_state.last_changed if same_state else None
 
         if same_state and same_attr:
@@ -1460,6 +1691,10 @@ class StateMachine:
 
         if context is None:
             context = Context(id=ulid_util.ulid(dt_util.utc_to_timestamp(now)))
+        if same_attr:
+            # Share the attributes and their JSON with the old state
+            assert old_state is not None
+            attributes = old_state.attributes
         state = State(
             entity_id,
             new_state,
@@ -1472,6 +1707,9 @@ class StateMachine:
         if old_state is not None:
             old_state.expire()
         self._states[entity_id] = state
+        if (domain_states := self._domain_index.get(state.domain)) is None:
+            domain_states = self._domain_index[state.domain] = {}
+        domain_states[entity_id] = state
         self._bus.async_fire(
             EVENT_STATE_CHANGED,
             {"entity_id": entity_id, "old_state": old_state, "new_state": state},
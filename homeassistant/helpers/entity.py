@@ -677,9 +677,14 @@ class Entity(ABC):
         else:
             self.async_write_ha_state()
 
-    async def async_device_update(self, warning: bool = True) -> None:
+    async def async_device_update(
+        self, warning: bool = True, budget: asyncio.Semaphore | None = None
+    ) -> None:
         """Process 'update' or 'async_update' from entity.
 
+        The update waits for the budget, when given, once it is
+        its turn within the parallel updates of the platform.
+
         This method is a coroutine.
         """
         if self._update_staged:
@@ -690,7 +695,11 @@ class Entity(ABC):
         if self.parallel_updates:
             await self.parallel_updates.acquire()
 
+        budget_acquired = False
         try:
+            if budget is not None:
+                await budget.acquire()
+                budget_acquired = True
             task: asyncio.Future[None]
             if hasattr(self, "async_update"):
                 task = self.hass.async_create_task(self.async_update())  # type: ignore[attr-defined]
@@ -717,6 +726,9 @@ class Entity(ABC):
             )
             await task
         finally:
+            if budget_acquired:
+                assert budget is not None
+                budget.release()
             self._update_staged = False
             if self.parallel_updates:
                 self.parallel_updates.release()
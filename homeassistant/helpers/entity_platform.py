@@ -2,11 +2,15 @@
 from __future__ import annotations
 
 import asyncio
+from bisect import bisect_left
 from collections.abc import Awaitable, Callable, Coroutine, Iterable
 from contextvars import ContextVar
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 from logging import Logger, getLogger
-from typing import TYPE_CHECKING, Any, Protocol
+import random
+import time
+from typing import TYPE_CHECKING, Any, Protocol, cast
 from urllib.parse import urlparse
 
 import voluptuous as vol
@@ -20,6 +24,7 @@ from homeassistant.const import (
 from homeassistant.core import (
     CALLBACK_TYPE,
     CoreState,
+    HassJob,
     HomeAssistant,
     ServiceCall,
     callback,
@@ -32,6 +37,7 @@ from homeassistant.exceptions import (
     RequiredParameterMissing,
 )
 from homeassistant.setup import async_start_setup
+from homeassistant.util import dt as dt_util
 from homeassistant.util.async_ import run_callback_threadsafe
 
 from . import (
@@ -42,7 +48,7 @@ from . import (
 )
 from .device_registry import DeviceRegistry
 from .entity_registry import EntityRegistry, RegistryEntryDisabler, RegistryEntryHider
-from .event import async_call_later, async_track_time_interval
+from .event import async_call_later, async_track_point_in_utc_time
 from .typing import ConfigType, DiscoveryInfoType
 
 if TYPE_CHECKING:
@@ -58,6 +64,19 @@ PLATFORM_NOT_READY_RETRIES = 10
 DATA_ENTITY_PLATFORM = "entity_platform"
 PLATFORM_NOT_READY_BASE_WAIT_TIME = 30  # seconds
 
+DATA_POLLING_SCHEDULER = "entity_platform_polling_scheduler"
+# Maximum number of polling updates running at the same time for all platforms
+MAX_PARALLEL_POLLING_UPDATES = 32
+# The first poll of a platform starts up to this fraction of the scan
+# interval early so platforms set up together do not poll together
+POLLING_JITTER = 0.1
+# Entities that failed or were slower than the scan interval this many
+# times in a row skip 1, 2, 4... polls up to POLLING_MAX_BACKOFF
+POLLING_BACKOFF_FAILURES = 3
+POLLING_MAX_BACKOFF = 8
+# Upper bounds in seconds of the buckets of the update latency histograms
+POLLING_LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
 _LOGGER = getLogger(__name__)
 
 
@@ -100,6 +119,15 @@ class EntityPlatformModule(Protocol):
         """Set up an integration platform from a config entry."""
 
 
+@dataclass
+class _EntityPollingState:
+    """Polling state of an entity."""
+
+    updating: bool = False
+    failures: int = 0
+    skip: int = 0
+
+
 class EntityPlatform:
     """Manage the entities for a single platform."""
 
@@ -131,9 +159,10 @@ class EntityPlatform:
         self._async_unsub_polling: CALLBACK_TYPE | None = None
         # Method to cancel the retry of setup
         self._async_cancel_retry_setup: CALLBACK_TYPE | None = None
-        self._process_updates: asyncio.Lock | None = None
+        self._polling_states: dict[str, _EntityPollingState] = {}
 
         self.parallel_updates: asyncio.Semaphore | None = None
+        self.parallel_updates_limit: int | None = None
 
         # Platform is None for the EntityComponent "catch-all" EntityPlatform
         # which powers entity_component.add_entities
@@ -175,6 +204,7 @@ class EntityPlatform:
 
         if parallel_updates is not None:
             self.parallel_updates = asyncio.Semaphore(parallel_updates)
+            self.parallel_updates_limit = parallel_updates
 
         return self.parallel_updates
 
@@ -448,11 +478,9 @@ class EntityPlatform:
         ):
             return
 
-        self._async_unsub_polling = async_track_time_interval(
-            self.hass,
-            self._update_entity_states,
-            self.scan_interval,
-        )
+        self._async_unsub_polling = async_get_polling_scheduler(
+            self.hass
+        ).async_track_platform(self)
 
     def _entity_id_already_exists(self, entity_id: str) -> tuple[bool, bool]:
         """Check if an entity_id already exists.
@@ -685,6 +713,7 @@ class EntityPlatform:
         def remove_entity_cb() -> None:
             """Remove entity from entities dict."""
             self.entities.pop(entity_id)
+            self._polling_states.pop(entity_id, None)
 
         entity.async_on_remove(remove_entity_cb)
 
@@ -785,31 +814,173 @@ class EntityPlatform:
     async def _update_entity_states(self, now: datetime) -> None:
         """Update the states of all the polling entities.
 
-        To protect from flooding the executor, we will update async entities
-        in parallel and other entities sequential.
+        To protect from flooding the executor, the updates share the budget
+        of the polling scheduler and respect the parallel updates of the
+        platform. Entities still updating from the previous poll and entities
+        backing off are skipped.
 
         This method must be run in the event loop.
         """
-        if self._process_updates is None:
-            self._process_updates = asyncio.Lock()
-        if self._process_updates.locked():
-            self.logger.warning(
-                "Updating %s %s took longer than the scheduled update interval %s",
-                self.platform_name,
-                self.domain,
-                self.scan_interval,
+        entities: list[tuple[Entity, _EntityPollingState]] = []
+        for entity_id, entity in self.entities.items():
+            if not entity.should_poll:
+                continue
+            if (state := self._polling_states.get(entity_id)) is None:
+                state = self._polling_states[entity_id] = _EntityPollingState()
+            if state.updating:
+                self.logger.warning(
+                    "Updating %s took longer than the scheduled update interval %s",
+                    entity_id,
+                    self.scan_interval,
+                )
+                continue
+            if state.skip:
+                state.skip -= 1
+                continue
+            entities.append((entity, state))
+
+        if not entities:
+            return
+
+        scheduler = async_get_polling_scheduler(self.hass)
+        pending = iter(entities)
+
+        async def _async_update_pending() -> None:
+            """Update the pending entities one at a time."""
+            for entity, state in pending:
+                await scheduler.async_update_entity(self, entity, state)
+
+        workers = len(entities)
+        if self.parallel_updates_limit is not None:
+            workers = min(workers, self.parallel_updates_limit)
+        await asyncio.gather(*(_async_update_pending() for _ in range(workers)))
+
+
+class _LatencyHistogram:
+    """Histogram of the update latencies of a platform."""
+
+    __slots__ = ("buckets", "count", "sum", "failures")
+
+    def __init__(self) -> None:
+        """Initialize the histogram."""
+        self.buckets = [0] * (len(POLLING_LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.failures = 0
+
+    def add(self, duration: float, failed: bool) -> None:
+        """Add the latency of an update."""
+        self.buckets[bisect_left(POLLING_LATENCY_BUCKETS, duration)] += 1
+        self.count += 1
+        self.sum += duration
+        if failed:
+            self.failures += 1
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the histogram as a dict."""
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "failures": self.failures,
+            "buckets": dict(
+                zip(
+                    [*(str(bound) for bound in POLLING_LATENCY_BUCKETS), "+Inf"],
+                    self.buckets,
+                )
+            ),
+        }
+
+
+class EntityPollingScheduler:
+    """Schedule the polling of the entity platforms.
+
+    The first poll of each platform is jittered so the platforms do not all
+    poll at the same instant, the updates of all the platforms share a
+    global budget and the latency of the updates is kept per platform.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the scheduler."""
+        self.hass = hass
+        self._budget = asyncio.Semaphore(MAX_PARALLEL_POLLING_UPDATES)
+        self._latencies: dict[str, _LatencyHistogram] = {}
+
+    @callback
+    def async_track_platform(self, platform: EntityPlatform) -> CALLBACK_TYPE:
+        """Poll the entities of a platform at its scan interval."""
+        hass = self.hass
+        interval = platform.scan_interval
+        cancel_timer: CALLBACK_TYPE
+
+        @callback
+        def _async_poll(now: datetime) -> None:
+            """Schedule the next poll and poll the platform."""
+            nonlocal cancel_timer
+            cancel_timer = async_track_point_in_utc_time(
+                hass, poll_job, dt_util.utcnow() + interval
             )
+            hass.async_create_task(platform._update_entity_states(now))
+
+        poll_job = HassJob(_async_poll)
+        cancel_timer = async_track_point_in_utc_time(
+            hass,
+            poll_job,
+            dt_util.utcnow() + interval * (1 - random.random() * POLLING_JITTER),
+        )
+
+        @callback
+        def _async_cancel() -> None:
+            """Stop polling the platform."""
+            cancel_timer()
+
+        return _async_cancel
+
+    async def async_update_entity(
+        self, platform: EntityPlatform, entity: Entity, state: _EntityPollingState
+    ) -> None:
+        """Update a polled entity within the budget and record its latency."""
+        state.updating = True
+        failed = False
+        try:
+            start = time.monotonic()
+            try:
+                # The budget is only taken once the platform lets the entity update
+                await entity.async_device_update(budget=self._budget)
+            except Exception:  # pylint: disable=broad-except
+                platform.logger.exception("Update for %s fails", entity.entity_id)
+                failed = True
+            else:
+                entity.async_write_ha_state()
+            duration = time.monotonic() - start
+        finally:
+            state.updating = False
+
+        key = f"{platform.domain}.{platform.platform_name}"
+        if (histogram := self._latencies.get(key)) is None:
+            histogram = self._latencies[key] = _LatencyHistogram()
+        histogram.add(duration, failed)
+
+        if not failed and duration <= platform.scan_interval.total_seconds():
+            state.failures = 0
             return
+        state.failures += 1
+        if state.failures >= POLLING_BACKOFF_FAILURES:
+            state.skip = min(
+                2 ** (state.failures - POLLING_BACKOFF_FAILURES), POLLING_MAX_BACKOFF
+            )
 
-        async with self._process_updates:
-            tasks: list[Coroutine[Any, Any, None]] = []
-            for entity in self.entities.values():
-                if not entity.should_poll:
-                    continue
-                tasks.append(entity.async_update_ha_state(True))
+    @callback
+    def async_latencies(self) -> dict[str, dict[str, Any]]:
+        """Return the update latency histograms keyed by domain.platform."""
+        return {key: histogram.as_dict() for key, histogram in self._latencies.items()}
 
-            if tasks:
-                await asyncio.gather(*tasks)
+
+@callback
+def async_get_polling_scheduler(hass: HomeAssistant) -> EntityPollingScheduler:
+    """Get the polling scheduler of the entity platforms."""
+    if (scheduler := hass.data.get(DATA_POLLING_SCHEDULER)) is None:
+        scheduler = hass.data[DATA_POLLING_SCHEDULER] = EntityPollingScheduler(hass)
+    return cast(EntityPollingScheduler, scheduler)
 
 
 current_platform: ContextVar[EntityPlatform | None] = ContextVar(
@@ -824,6 +824,9 @@ class _TrackTemplateResultInfo:
         self._has_super_template = has_super_template
 
         self._last_result: dict[Template, bool | str | TemplateError] = {}
+        # The states and attributes the templates read when they were rendered,
+        # keyed by the id of the TrackTemplate
+        self._last_inputs: dict[int, tuple[Any, ...]] = {}
 
         self._rate_limit = KeyedRateLimit(hass)
         self._info: dict[Template, RenderInfo] = {}
@@ -842,6 +845,7 @@ class _TrackTemplateResultInfo:
             self._info[template] = info = template.async_render_to_info(
                 variables, strict=strict
             )
+            self._async_store_inputs(super_template)
 
             # If the super template did not render to True, don't update other templates
             try:
@@ -863,6 +867,7 @@ class _TrackTemplateResultInfo:
             self._info[template] = info = template.async_render_to_info(
                 variables, strict=strict
             )
+            self._async_store_inputs(track_template_)
 
             if info.exception:
                 if raise_on_template_error:
@@ -884,6 +889,12 @@ class _TrackTemplateResultInfo:
             block_render,
         )
 
+    @callback
+    def _async_store_inputs(self, track_template_: TrackTemplate) -> None:
+        """Store the states and attributes a template read when it rendered."""
+        if (static_info := track_template_.template.async_analyze()) is not None:
+            self._last_inputs[id(track_template_)] = static_info.inputs(self.hass)
+
     @property
     def listeners(self) -> dict[str, bool | set[str]]:
         """State changes that will cause a re-render."""
@@ -974,6 +985,18 @@ class _TrackTemplateResultInfo:
             ):
                 return not had_timer
 
+            static_info = template.async_analyze()
+            if (
+                static_info is not None
+                # The first result after the setup is always sent
+                and template in self._last_result
+                and id(track_template_) in self._last_inputs
+                and static_info.inputs(self.hass)
+                == self._last_inputs[id(track_template_)]
+            ):
+                # None of the states and attributes the template reads changed
+                return False
+
             _LOGGER.debug(
                 "Template update %s triggered by event: %s",
                 template.template,
@@ -984,6 +1007,7 @@ class _TrackTemplateResultInfo:
         self._info[template] = info = template.async_render_to_info(
             track_template_.variables
         )
+        self._async_store_inputs(track_template_)
 
         try:
             result: str | TemplateError = info.result()
@@ -0,0 +1,14 @@
+"""Shared helpers for the registries."""
+from __future__ import annotations
+
+from typing import Literal
+
+
+def unindex_key(
+    index: dict[str, dict[str, Literal[True]]], value: str, key: str
+) -> None:
+    """Remove a key from the keys indexed by value."""
+    keys = index[value]
+    del keys[key]
+    if not keys:
+        del index[value]
@@ -21,16 +21,17 @@ from struct import error as StructError, pack, unpack_from
 import sys
 from typing import Any, NoReturn, TypeVar, cast, overload
 from urllib.parse import urlencode as urllib_urlencode
-import weakref
 
 from awesomeversion import AwesomeVersion
 import jinja2
-from jinja2 import pass_context, pass_environment
+from jinja2 import nodes, pass_context, pass_environment
 from jinja2.sandbox import ImmutableSandboxedEnvironment
 from jinja2.utils import Namespace
+from lru import LRU  # pylint: disable=no-name-in-module
 import voluptuous as vol
 
 from homeassistant.const import (
+    ATTR_DEVICE_CLASS,
     ATTR_ENTITY_ID,
     ATTR_LATITUDE,
     ATTR_LONGITUDE,
@@ -82,6 +83,45 @@ _RESERVED_NAMES = {"contextfunction", "evalcontextfunction", "environmentfunctio
 _GROUP_DOMAIN_PREFIX = "group."
 _ZONE_DOMAIN_PREFIX = "zone."
 
+# Functions aggregating the numeric states of a set of entities
+_AGGREGATE_FUNCTIONS = {
+    "state_count",
+    "state_max",
+    "state_mean",
+    "state_min",
+    "state_sum",
+}
+# Functions reading the state of the entity id passed as first argument
+_STATE_FUNCTIONS = {"states", "is_state"}
+# Functions reading an attribute of the entity id passed as first argument
+_STATE_ATTR_FUNCTIONS = {"state_attr", "is_state_attr"}
+# Names of functions and filters depending on more than the states and
+# attributes they are passed, the template can't be analyzed when they are used
+_NOT_ANALYZABLE_NAMES = {
+    *_AGGREGATE_FUNCTIONS,
+    "area_devices",
+    "area_entities",
+    "area_id",
+    "area_name",
+    "closest",
+    "cycler",
+    "device_attr",
+    "device_entities",
+    "device_id",
+    "distance",
+    "expand",
+    "integration_entities",
+    "is_device_attr",
+    "joiner",
+    "lipsum",
+    "now",
+    "random",
+    "relative_time",
+    "this",
+    "today_at",
+    "utcnow",
+}
+
 _COLLECTABLE_STATE_ATTRIBUTES = {
     "state",
     "attributes",
@@ -104,6 +144,7 @@ template_cv: ContextVar[tuple[str, str] | None] = ContextVar(
 
 CACHED_TEMPLATE_STATES = 512
 EVAL_CACHE_SIZE = 512
+COMPILED_TEMPLATE_CACHE_SIZE = 1024
 
 
 @bind_hass
@@ -229,6 +270,21 @@ def _false(arg: str) -> bool:
 
 _cached_literal_eval = lru_cache(maxsize=EVAL_CACHE_SIZE)(literal_eval)
 
+# Compiled code of the templates, shared by all environments and keyed by
+# (source, limited, strict)
+_COMPILED_TEMPLATE_CACHE: LRU = LRU(COMPILED_TEMPLATE_CACHE_SIZE)
+
+
+def compiled_template_cache_info() -> dict[str, int]:
+    """Return the statistics of the compiled template cache."""
+    hits, misses = _COMPILED_TEMPLATE_CACHE.get_stats()
+    return {
+        "hits": hits,
+        "misses": misses,
+        "size": len(_COMPILED_TEMPLATE_CACHE),
+        "maxsize": _COMPILED_TEMPLATE_CACHE.get_size(),
+    }
+
 
 class RenderInfo:
     """Holds information about a template render."""
@@ -313,6 +369,135 @@ class RenderInfo:
             self.filter = _false
 
 
+class StaticRenderInfo:
+    """Holds the states a template reads, found without rendering it."""
+
+    def __init__(
+        self, entities: frozenset[str], attributes: frozenset[tuple[str, str]]
+    ) -> None:
+        """Initialise."""
+        self.entities = entities
+        self.attributes = attributes
+
+    def __repr__(self) -> str:
+        """Representation of StaticRenderInfo."""
+        return (
+            f"<StaticRenderInfo entities={self.entities} attributes={self.attributes}>"
+        )
+
+    def inputs(self, hass: HomeAssistant) -> tuple[Any, ...]:
+        """Return the current value of the states and attributes the template reads.
+
+        The template renders the same result as long as the inputs do not change.
+        """
+        get_state = hass.states.get
+        return (
+            *(
+                None if (state := get_state(entity_id)) is None else state.state
+                for entity_id in self.entities
+            ),
+            *(
+                None
+                if (state := get_state(entity_id)) is None
+                else state.attributes.get(name)
+                for entity_id, name in self.attributes
+            ),
+        )
+
+
+def _constant_strings(args: list[nodes.Expr], count: int) -> list[str] | None:
+    """Return the first arguments of a call if they are constant strings."""
+    if len(args) < count:
+        return None
+    values = []
+    for arg in args[:count]:
+        if not isinstance(arg, nodes.Const) or not isinstance(arg.value, str):
+            return None
+        values.append(arg.value)
+    return values
+
+
+def _states_getattr_path(node: nodes.Getattr) -> list[str] | None:
+    """Return the path of attributes read from states, like states.light.kitchen."""
+    path: list[str] = []
+    expr: nodes.Expr = node
+    while isinstance(expr, nodes.Getattr):
+        path.append(expr.attr)
+        expr = expr.node
+    if not isinstance(expr, nodes.Name) or expr.name != "states":
+        return None
+    path.reverse()
+    return path
+
+
+@lru_cache(maxsize=COMPILED_TEMPLATE_CACHE_SIZE)
+def _async_analyze_template(source: str) -> StaticRenderInfo | None:
+    """Find the states and attributes a template reads without rendering it.
+
+    Returns None if the result of the template may depend on anything else
+    than the states and attributes of the entities it names, and the
+    variables it is rendered with.
+    """
+    try:
+        ast = _NO_HASS_ENV.parse(source)
+    except jinja2.TemplateSyntaxError:
+        return None
+
+    entities: set[str] = set()
+    attributes: set[tuple[str, str]] = set()
+    # The names of the state functions which are used in an analyzable way
+    analyzed: set[int] = set()
+
+    for call in ast.find_all(nodes.Call):
+        if not isinstance(call.node, nodes.Name):
+            continue
+        name = call.node.name
+        if name in _STATE_FUNCTIONS:
+            if name == "states" and len(call.args) != 1:
+                return None
+            if (values := _constant_strings(call.args, 1)) is None:
+                return None
+            entities.add(values[0])
+        elif name in _STATE_ATTR_FUNCTIONS:
+            if (values := _constant_strings(call.args, 2)) is None:
+                return None
+            attributes.add((values[0], values[1]))
+        else:
+            continue
+        if call.kwargs or call.dyn_args or call.dyn_kwargs:
+            return None
+        analyzed.add(id(call.node))
+
+    for getattr_ in ast.find_all(nodes.Getattr):
+        if (path := _states_getattr_path(getattr_)) is None:
+            continue
+        if len(path) == 3 and path[2] == "state":
+            entities.add(f"{path[0]}.{path[1]}")
+        elif len(path) == 4 and path[2] == "attributes":
+            attributes.add((f"{path[0]}.{path[1]}", path[3]))
+        else:
+            continue
+        expr: nodes.Expr = getattr_
+        while isinstance(expr, nodes.Getattr):
+            expr = expr.node
+        analyzed.add(id(expr))
+
+    for name_node in ast.find_all(nodes.Name):
+        if name_node.name in _NOT_ANALYZABLE_NAMES:
+            return None
+        if (
+            name_node.name in _STATE_FUNCTIONS
+            or name_node.name in _STATE_ATTR_FUNCTIONS
+        ) and id(name_node) not in analyzed:
+            return None
+
+    for filter_ in ast.find_all(nodes.Filter):
+        if filter_.name in _NOT_ANALYZABLE_NAMES:
+            return None
+
+    return StaticRenderInfo(frozenset(entities), frozenset(attributes))
+
+
 class Template:
     """Class to hold a template and manage caching and rendering."""
 
@@ -359,6 +544,15 @@ class Template:
             ret = self.hass.data[wanted_env] = TemplateEnvironment(self.hass, self._limited, self._strict)  # type: ignore[no-untyped-call]
         return ret
 
+    def async_analyze(self) -> StaticRenderInfo | None:
+        """Find the states and attributes the template reads without rendering it.
+
+        Returns None if the template can't be analyzed.
+        """
+        if self.is_static:
+            return None
+        return _async_analyze_template(self.template)
+
     def ensure_valid(self) -> None:
         """Return if template is valid."""
         with set_template(self.template, "compiling"):
@@ -1372,6 +1566,112 @@ def state_attr(hass: HomeAssistant, entity_id: str, name: str) -> Any:
     return None
 
 
+def _numeric_states(
+    hass: HomeAssistant,
+    entity_ids: str | Iterable[str] | None,
+    area: str | None,
+    domain: str | None,
+    device_class: str | None,
+) -> list[float]:
+    """Return the numeric states of the entities matching the arguments.
+
+    States which are not numbers, like unknown or unavailable, are skipped.
+    """
+    render_info: RenderInfo | None = hass.data.get(_RENDER_INFO)
+    states: Iterable[State | None]
+    if entity_ids is None and area is None:
+        states = hass.states.async_all(domain)
+        if render_info is not None:
+            if domain is None:
+                render_info.all_states = True
+                render_info.all_states_lifecycle = True
+            else:
+                render_info.domains.add(domain)
+                render_info.domains_lifecycle.add(domain)
+    else:
+        if isinstance(entity_ids, str):
+            entity_ids = [entity_ids]
+        wanted = list(entity_ids or ())
+        if area is not None:
+            wanted.extend(area_entities(hass, area))
+        if domain is not None:
+            wanted = [
+                entity_id
+                for entity_id in wanted
+                if split_entity_id(entity_id)[0] == domain
+            ]
+        if render_info is not None:
+            render_info.entities.update(wanted)
+        get_state = hass.states.get
+        states = [get_state(entity_id) for entity_id in dict.fromkeys(wanted)]
+
+    values: list[float] = []
+    for state in states:
+        if state is None or (
+            device_class is not None
+            and state.attributes.get(ATTR_DEVICE_CLASS) != device_class
+        ):
+            continue
+        try:
+            value = float(state.state)
+        except ValueError:
+            continue
+        if math.isfinite(value):
+            values.append(value)
+    return values
+
+
+def state_sum(
+    hass: HomeAssistant,
+    entity_ids: str | Iterable[str] | None = None,
+    area: str | None = None,
+    domain: str | None = None,
+    device_class: str | None = None,
+) -> float:
+    """Return the sum of the numeric states of the matching entities."""
+    return math.fsum(_numeric_states(hass, entity_ids, area, domain, device_class))
+
+
+def state_count(
+    hass: HomeAssistant,
+    entity_ids: str | Iterable[str] | None = None,
+    area: str | None = None,
+    domain: str | None = None,
+    device_class: str | None = None,
+) -> int:
+    """Return the number of the matching entities with a numeric state."""
+    return len(_numeric_states(hass, entity_ids, area, domain, device_class))
+
+
+def _aggregate_function(
+    name: str, function: Callable[[list[float]], float]
+) -> Callable[..., Any]:
+    """Return a template function aggregating the numeric states of entities."""
+
+    def aggregate(
+        hass: HomeAssistant,
+        entity_ids: str | Iterable[str] | None = None,
+        area: str | None = None,
+        domain: str | None = None,
+        device_class: str | None = None,
+        default: Any = _SENTINEL,
+    ) -> Any:
+        """Aggregate the numeric states of the matching entities."""
+        if values := _numeric_states(hass, entity_ids, area, domain, device_class):
+            return function(values)
+        if default is _SENTINEL:
+            raise_no_default(name, entity_ids)
+        return default
+
+    aggregate.__name__ = name
+    return aggregate
+
+
+state_mean = _aggregate_function("state_mean", statistics.fmean)
+state_min = _aggregate_function("state_min", min)
+state_max = _aggregate_function("state_max", max)
+
+
 def now(hass: HomeAssistant) -> datetime:
     """Record fetching now."""
     if (render_info := hass.data.get(_RENDER_INFO)) is not None:
@@ -1962,7 +2262,8 @@ class TemplateEnvironment(ImmutableSandboxedEnvironment):
             undefined = jinja2.StrictUndefined
         super().__init__(undefined=undefined)
         self.hass = hass
-        self.template_cache = weakref.WeakValueDictionary()
+        self.limited = limited
+        self.strict = strict
         self.filters["round"] = forgiving_round
         self.filters["multiply"] = multiply
         self.filters["log"] = logarithm
@@ -2113,8 +2414,16 @@ class TemplateEnvironment(ImmutableSandboxedEnvironment):
                 "device_id",
                 "area_id",
                 "area_name",
+                *_AGGREGATE_FUNCTIONS,
+            ]
+            hass_filters = [
+                "closest",
+                "expand",
+                "device_id",
+                "area_id",
+                "area_name",
+                *_AGGREGATE_FUNCTIONS,
             ]
-            hass_filters = ["closest", "expand", "device_id", "area_id", "area_name"]
             for glob in hass_globals:
                 self.globals[glob] = unsupported(glob)
             for filt in hass_filters:
@@ -2132,6 +2441,15 @@ class TemplateEnvironment(ImmutableSandboxedEnvironment):
         self.globals["states"] = AllStates(hass)
         self.globals["utcnow"] = hassfunction(utcnow)
         self.globals["now"] = hassfunction(now)
+        for name, function in (
+            ("state_count", state_count),
+            ("state_max", state_max),
+            ("state_mean", state_mean),
+            ("state_min", state_min),
+            ("state_sum", state_sum),
+        ):
+            self.globals[name] = hassfunction(function)
+            self.filters[name] = pass_context(self.globals[name])
 
     def is_safe_callable(self, obj):
         """Test if callback is safe."""
@@ -2160,8 +2478,10 @@ class TemplateEnvironment(ImmutableSandboxedEnvironment):
             # any instance of this.
             return super().compile(source, name, filename, raw, defer_init)
 
-        if (cached := self.template_cache.get(source)) is None:
-            cached = self.template_cache[source] = super().compile(source)
+        # The environments without hass have fewer globals and filters
+        key = (source, self.hass is not None, bool(self.limited), bool(self.strict))
+        if (cached := _COMPILED_TEMPLATE_CACHE.get(key)) is None:
+            cached = _COMPILED_TEMPLATE_CACHE[key] = super().compile(source)
 
         return cached
 
@@ -10,21 +10,25 @@ import json
 import logging
 from timeit import default_timer as timer
 from typing import TypeVar
+import zlib
 
 from homeassistant import core
-from homeassistant.const import EVENT_STATE_CHANGED
+from homeassistant.const import EVENT_STATE_CHANGED, MATCH_ALL
 from homeassistant.helpers.entityfilter import convert_include_exclude_filter
 from homeassistant.helpers.event import (
     async_track_state_change,
     async_track_state_change_event,
 )
 from homeassistant.helpers.json import JSON_DUMP, JSONEncoder
+import homeassistant.util.dt as dt_util
 
 # mypy: allow-untyped-calls, allow-untyped-defs, no-check-untyped-defs
 # mypy: no-warn-return-any
 
 _CallableT = TypeVar("_CallableT", bound=Callable)
 
+_LOGGER = logging.getLogger(__name__)
+
 BENCHMARKS: dict[str, Callable] = {}
 
 
@@ -120,6 +124,59 @@ async def fire_events_with_filter(hass):
     return timer() - start
 
 
+async def _fire_events_to_many_listeners(hass, **listen_kwargs):
+    """Fire a thousand events to ten thousand listeners."""
+    count = 0
+    event_name = "benchmark_event"
+    events_to_fire = 10**3
+    listeners = 10**4
+
+    @core.callback
+    def listener(_):
+        """Handle event."""
+        nonlocal count
+        count += 1
+
+    @core.callback
+    def event_filter(event):
+        """Filter event."""
+        return True
+
+    for index in range(listeners):
+        hass.bus.async_listen(
+            event_name,
+            listener,
+            event_filter=event_filter if index % 2 else None,
+            **listen_kwargs,
+        )
+    # Events of other types with listeners for all events
+    hass.bus.async_listen(MATCH_ALL, listener, run_immediately=True)
+
+    start = timer()
+
+    for _ in range(events_to_fire):
+        hass.bus.async_fire(event_name)
+        hass.bus.async_fire("other_event")
+
+    await hass.async_block_till_done()
+
+    assert count == events_to_fire * (listeners + 2)
+
+    return timer() - start
+
+
+@benchmark
+async def fire_events_many_listeners(hass):
+    """Fire a thousand events to ten thousand listeners."""
+    return await _fire_events_to_many_listeners(hass)
+
+
+@benchmark
+async def fire_events_many_batched_listeners(hass):
+    """Fire a thousand events to ten thousand batched listeners."""
+    return await _fire_events_to_many_listeners(hass, batched=True)
+
+
 @benchmark
 async def state_changed_helper(hass):
     """Run a million events through state changed helper with 1000 entities."""
@@ -311,6 +368,54 @@ async def json_serialize_states(hass):
     return timer() - start
 
 
+@benchmark
+async def websocket_entities_snapshot(hass):
+    """Serialize and compress the subscribe_entities snapshot of 6000 states."""
+    # pylint: disable=import-outside-toplevel
+    from homeassistant.components.websocket_api.const import COMPRESSED_MESSAGE_LEVEL
+    from homeassistant.helpers.json import json_bytes
+
+    states = [
+        core.State(
+            f"sensor.temperature_{i}",
+            str(20 + i % 10),
+            {
+                "unit_of_measurement": "°C",
+                "device_class": "temperature",
+                "state_class": "measurement",
+                "friendly_name": f"Temperature {i}",
+            },
+        )
+        for i in range(6000)
+    ]
+
+    start = timer()
+    snapshot = b"".join(
+        (
+            b"{",
+            b",".join(
+                json_bytes(state.entity_id) + b":" + state.as_compressed_state_json()
+                for state in states
+            ),
+            b"}",
+        )
+    )
+    serialized = timer()
+    compressed = zlib.compress(snapshot, COMPRESSED_MESSAGE_LEVEL)
+    end = timer()
+
+    _LOGGER.info(
+        "Snapshot of %s states: %s bytes serialized in %.4fs,"
+        " %s bytes compressed in %.4fs",
+        len(states),
+        len(snapshot),
+        serialized - start,
+        len(compressed),
+        end - serialized,
+    )
+    return end - start
+
+
 def _create_state_changed_event_from_old_new(
     entity_id, event_time_fired, old_state, new_state
 ):
@@ -326,9 +431,10 @@ def _create_state_changed_event_from_old_new(
         [
             "event_type"
             "event_data"
-            "time_fired"
-            "context_id"
-            "context_user_id"
+            "time_fired_ts"
+            "context_id_bin"
+            "context_user_id_bin"
+            "context_parent_id_bin"
             "state"
             "entity_id"
             "domain"
@@ -341,12 +447,13 @@ def _create_state_changed_event_from_old_new(
     row.event_type = EVENT_STATE_CHANGED
     row.event_data = "{}"
     row.attributes = attributes_json
-    row.time_fired = event_time_fired
+    row.time_fired_ts = dt_util.utc_to_timestamp(event_time_fired)
     row.state = new_state and new_state.get("state")
     row.entity_id = entity_id
     row.domain = entity_id and core.split_entity_id(entity_id)[0]
-    row.context_id = None
-    row.context_user_id = None
+    row.context_id_bin = None
+    row.context_user_id_bin = None
+    row.context_parent_id_bin = None
     row.old_state_id = old_state and 1
     row.state_id = new_state and 1
 
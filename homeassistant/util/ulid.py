@@ -4,6 +4,12 @@ from __future__ import annotations
 from random import getrandbits
 import time
 
+_ENCODING = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+_DECODING = {
+    **{char: idx for idx, char in enumerate(_ENCODING)},
+    **{char.lower(): idx for idx, char in enumerate(_ENCODING)},
+}
+
 
 def ulid_hex() -> str:
     """Generate a ULID in lowercase hex that will work for a UUID.
@@ -38,13 +44,22 @@ def ulid(timestamp: float | None = None) -> str:
     ulid_bytes = int((timestamp or time.time()) * 1000).to_bytes(
         6, byteorder="big"
     ) + int(getrandbits(80)).to_bytes(10, byteorder="big")
+    return bytes_to_ulid(ulid_bytes)
+
 
+def bytes_to_ulid(ulid_bytes: bytes) -> str:
+    """Encode the 16 byte representation of a ULID to a string.
+
+    Raises ValueError if the bytes are not 16 bytes long.
+    """
+    if len(ulid_bytes) != 16:
+        raise ValueError(f"ULID bytes must be 16 bytes: {ulid_bytes!r}")
     # This is base32 crockford encoding with the loop unrolled for performance
     #
     # This code is adapted from:
     # https://github.com/ahawker/ulid/blob/06289583e9de4286b4d80b4ad000d137816502ca/ulid/base32.py#L102
     #
-    enc = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+    enc = _ENCODING
     return (
         enc[(ulid_bytes[0] & 224) >> 5]
         + enc[ulid_bytes[0] & 31]
@@ -73,3 +88,21 @@ def ulid(timestamp: float | None = None) -> str:
         + enc[((ulid_bytes[14] & 3) << 3) | ((ulid_bytes[15] & 224) >> 5)]
         + enc[ulid_bytes[15] & 31]
     )
+
+
+def ulid_to_bytes(ulid_str: str) -> bytes:
+    """Decode a ULID string to its 16 byte representation.
+
+    Raises ValueError if the string is not a valid ULID.
+    """
+    if len(ulid_str) != 26:
+        raise ValueError(f"ULID must be 26 characters: {ulid_str}")
+    value = 0
+    try:
+        for char in ulid_str:
+            value = (value << 5) | _DECODING[char]
+    except KeyError as err:
+        raise ValueError(f"ULID contains invalid characters: {ulid_str}") from err
+    if value >> 128:
+        raise ValueError(f"ULID is out of range: {ulid_str}")
+    return value.to_bytes(16, byteorder="big")
@@ -0,0 +1,231 @@
+"""The tests for the recent history cache of the History component."""
+from datetime import timedelta
+from unittest.mock import patch
+
+import pytest
+
+from homeassistant.components import history
+from homeassistant.components.history.cache import RecentHistoryCache
+from homeassistant.const import ATTR_SUPPORTED_FEATURES
+from homeassistant.core import HomeAssistant
+from homeassistant.setup import async_setup_component
+import homeassistant.util.dt as dt_util
+
+from tests.components.recorder.common import (
+    async_recorder_block_till_done,
+    async_wait_recording_done,
+)
+
+
+def _set_states(hass: HomeAssistant) -> None:
+    """Set states with state and attribute only changes."""
+    for value in range(3):
+        hass.states.async_set(
+            "sensor.power",
+            value,
+            {"unit_of_measurement": "W", ATTR_SUPPORTED_FEATURES: 1},
+        )
+        hass.states.async_set("sensor.power", value, {"unit_of_measurement": "kW"})
+        hass.states.async_set("climate.room", "heat", {"temperature": value})
+        hass.states.async_set("light.kitchen", "on" if value % 2 else "off")
+
+
+async def _fetch_history(client, msg_id: int, request: dict) -> dict:
+    """Fetch the history with the websocket api."""
+    await client.send_json({"id": msg_id, **request})
+    response = await client.receive_json()
+    assert response["success"]
+    return response["result"]
+
+
+@pytest.mark.parametrize(
+    "options",
+    [
+        {},
+        {"significant_changes_only": False},
+        {"minimal_response": True},
+        {"no_attributes": True},
+        {"include_start_time_state": False},
+        {"significant_changes_only": False, "minimal_response": True},
+    ],
+)
+async def test_cached_history_matches_database(
+    hass, hass_ws_client, recorder_mock, options
+):
+    """Test the history answered from the cache is the same as the database."""
+    await async_setup_component(hass, "history", {})
+    await async_recorder_block_till_done(hass)
+    _set_states(hass)
+    start_time = dt_util.utcnow()
+    _set_states(hass)
+    end_time = dt_util.utcnow()
+    _set_states(hass)
+    await async_wait_recording_done(hass)
+
+    cache: RecentHistoryCache = hass.data[history.HISTORY_CACHE]
+    client = await hass_ws_client()
+    request = {
+        "type": "history/history_during_period",
+        "start_time": start_time.isoformat(),
+        "end_time": end_time.isoformat(),
+        "entity_ids": ["sensor.power", "climate.room", "light.kitchen"],
+        **options,
+    }
+    with patch(
+        "homeassistant.components.recorder.history.get_significant_states_with_session",
+        side_effect=AssertionError("database queried"),
+    ):
+        cached = await _fetch_history(client, 1, request)
+    assert cache.hits == 3
+    assert cached
+
+    hass.data[history.HISTORY_CACHE] = None
+    assert await _fetch_history(client, 2, request) == cached
+
+
+@pytest.mark.parametrize(
+    "options",
+    [
+        {"significant_changes_only": False},
+        {"significant_changes_only": False, "minimal_response": True},
+        {"minimal_response": True, "include_start_time_state": False},
+    ],
+)
+async def test_partially_cached_history(hass, hass_ws_client, recorder_mock, options):
+    """Test the entities cached after the start of the period use the database."""
+    await async_setup_component(hass, "recorder", {})
+    await async_recorder_block_till_done(hass)
+    start_time = dt_util.utcnow()
+    # Recorded before the history and its cache are set up
+    hass.states.async_set("sensor.power", 1, {"unit_of_measurement": "W"})
+    hass.states.async_set("sensor.power", 2, {"unit_of_measurement": "W"})
+    await async_wait_recording_done(hass)
+
+    await async_setup_component(hass, "history", {})
+    hass.states.async_set("sensor.power", 3, {"unit_of_measurement": "W"})
+    hass.states.async_set("sensor.power", 4, {"unit_of_measurement": "W"})
+    await async_wait_recording_done(hass)
+
+    client = await hass_ws_client()
+    request = {
+        "type": "history/history_during_period",
+        "start_time": start_time.isoformat(),
+        "entity_ids": ["sensor.power", "sensor.not_cached"],
+        **options,
+    }
+    cache: RecentHistoryCache = hass.data[history.HISTORY_CACHE]
+    cached = await _fetch_history(client, 1, request)
+    assert cache.misses == 2
+    assert [state["s"] for state in cached["sensor.power"]] == ["1", "2", "3", "4"]
+
+    hass.data[history.HISTORY_CACHE] = None
+    assert await _fetch_history(client, 2, request) == cached
+
+
+async def test_fetch_period_api_cached(hass, hass_client, recorder_mock):
+    """Test the fetch period view answers from the cache."""
+    await async_setup_component(hass, "history", {})
+    await async_recorder_block_till_done(hass)
+    _set_states(hass)
+    start_time = dt_util.utcnow()
+    _set_states(hass)
+    await async_wait_recording_done(hass)
+
+    client = await hass_client()
+    url = (
+        f"/api/history/period/{start_time.isoformat()}"
+        "?filter_entity_id=sensor.power,climate.room&minimal_response"
+    )
+    with patch(
+        "homeassistant.components.recorder.history.get_significant_states_with_session",
+        side_effect=AssertionError("database queried"),
+    ):
+        response = await client.get(url)
+    cached = await response.json()
+    assert len(cached) == 2
+
+    hass.data[history.HISTORY_CACHE] = None
+    response = await client.get(url)
+    assert await response.json() == cached
+
+
+async def test_cache_max_states(hass, recorder_mock):
+    """Test the oldest states are evicted when the cache is full."""
+    await async_setup_component(
+        hass, "history", {history.DOMAIN: {history.CONF_CACHE_MAX_STATES: 10}}
+    )
+    cache: RecentHistoryCache = hass.data[history.HISTORY_CACHE]
+    start_time = dt_util.utcnow()
+    for value in range(20):
+        hass.states.async_set("sensor.power", value)
+    hass.states.async_set("sensor.energy", 1)
+    await hass.async_block_till_done()
+    assert cache.states_count <= 10
+    assert cache.stats()["entities"] == 2
+
+    # The start of the period was evicted
+    cached, not_cached = cache.async_get(
+        ["sensor.power", "sensor.energy"], start_time, None, True
+    )
+    assert cached == {}
+    assert not_cached == ["sensor.power", "sensor.energy"]
+
+    later = dt_util.utcnow() + timedelta(seconds=1)
+    cached, not_cached = cache.async_get(
+        ["sensor.power", "sensor.energy"], later, None, True
+    )
+    assert not_cached == []
+    assert cached["sensor.power"].initial_state.state == "19"
+    assert cached["sensor.power"].states == []
+
+    # Every entity keeps its last state until there
+    # are more entities than states in the cache
+    for entity in range(10):
+        hass.states.async_set(f"sensor.other_{entity}", 1)
+    await hass.async_block_till_done()
+    assert cache.states_count == 10
+    assert cache.stats()["entities"] == 10
+
+
+async def test_cache_removed_entity(hass, recorder_mock):
+    """Test the history of removed entities is no longer cached."""
+    await async_setup_component(hass, "history", {})
+    cache: RecentHistoryCache = hass.data[history.HISTORY_CACHE]
+    hass.states.async_set("sensor.power", 1)
+    await hass.async_block_till_done()
+    assert cache.states_count == 1
+
+    hass.states.async_remove("sensor.power")
+    await hass.async_block_till_done()
+    assert cache.states_count == 0
+    cached, not_cached = cache.async_get(["sensor.power"], dt_util.utcnow(), None, True)
+    assert cached == {}
+    assert not_cached == ["sensor.power"]
+
+
+async def test_cache_disabled(hass, recorder_mock):
+    """Test the cache can be disabled."""
+    await async_setup_component(
+        hass, "history", {history.DOMAIN: {history.CONF_CACHE_MAX_STATES: 0}}
+    )
+    assert hass.data[history.HISTORY_CACHE] is None
+
+
+async def test_cache_not_recording(hass, recorder_mock):
+    """Test the states are not cached while the recorder is disabled."""
+    await async_setup_component(hass, "history", {})
+    cache: RecentHistoryCache = hass.data[history.HISTORY_CACHE]
+    hass.states.async_set("sensor.power", 1)
+    await hass.async_block_till_done()
+    assert cache.states_count == 1
+
+    await hass.services.async_call("recorder", "disable", blocking=True)
+    hass.states.async_set("sensor.power", 2)
+    await hass.async_block_till_done()
+    assert cache.states_count == 0
+    assert cache.stats()["entities"] == 0
+
+    await hass.services.async_call("recorder", "enable", blocking=True)
+    hass.states.async_set("sensor.power", 3)
+    await hass.async_block_till_done()
+    assert cache.states_count == 1
@@ -1,10 +1,12 @@
 """The tests the History component."""
 # pylint: disable=protected-access,invalid-name
 from datetime import timedelta
+from functools import partial
 from http import HTTPStatus
 import json
 from unittest.mock import patch, sentinel
 
+from freezegun import freeze_time
 import pytest
 
 from homeassistant.components import history
@@ -1374,3 +1376,232 @@ async def test_history_during_period_with_use_include_order(
         *sort_order,
         "sensor.three",
     ]
+
+
+async def test_history_during_period_stream(hass, hass_ws_client, recorder_mock):
+    """Test history_during_period streams the same states in chunks."""
+    now = dt_util.utcnow()
+
+    await async_setup_component(hass, "history", {})
+    await async_setup_component(hass, "sensor", {})
+    await async_recorder_block_till_done(hass)
+    for state in ("on", "off", "on", "off"):
+        hass.states.async_set("sensor.test", state, attributes={"any": "attr"})
+        hass.states.async_set("sensor.other", state, attributes={"any": "attr"})
+        await async_recorder_block_till_done(hass)
+    await async_wait_recording_done(hass)
+
+    client = await hass_ws_client()
+    request = {
+        "type": "history/history_during_period",
+        "start_time": now.isoformat(),
+        "entity_ids": ["sensor.test", "sensor.other"],
+        "significant_changes_only": False,
+    }
+    await client.send_json({"id": 1, **request})
+    response = await client.receive_json()
+    assert response["success"]
+    expected = response["result"]
+    assert len(expected["sensor.test"]) == 4
+
+    stream_significant_states = history.history.stream_significant_states_with_session
+    with patch(
+        "homeassistant.components.recorder.history.stream_significant_states_with_session",
+        partial(stream_significant_states, chunk_size=3),
+    ):
+        await client.send_json({"id": 2, "stream": True, **request})
+        streamed: dict[str, list] = {}
+        events = 0
+        while (response := await client.receive_json())["type"] == "event":
+            assert response["id"] == 2
+            events += 1
+            for entity_id, states in response["event"]["states"].items():
+                assert len(states) <= 3
+                streamed.setdefault(entity_id, []).extend(states)
+
+    assert response["id"] == 2
+    assert response["success"]
+    assert response["result"] is None
+    assert events == 4
+    assert streamed == expected
+
+
+async def test_history_during_period_stream_no_states(
+    hass, hass_ws_client, recorder_mock
+):
+    """Test history_during_period streams nothing without states."""
+    now = dt_util.utcnow()
+
+    await async_setup_component(hass, "history", {})
+    await async_recorder_block_till_done(hass)
+
+    client = await hass_ws_client()
+    await client.send_json(
+        {
+            "id": 1,
+            "type": "history/history_during_period",
+            "start_time": now.isoformat(),
+            "entity_ids": ["sensor.test"],
+            "stream": True,
+        }
+    )
+    response = await client.receive_json()
+    assert response["type"] == "result"
+    assert response["success"]
+    assert response["result"] is None
+
+
+async def test_fetch_period_api_stream(hass, hass_client, recorder_mock):
+    """Test the fetch period view streams the same response."""
+    now = dt_util.utcnow()
+    await async_setup_component(hass, "history", {})
+
+    for state in ("0", "50", "23"):
+        hass.states.async_set("sensor.power", state, {"attr": "any"})
+        hass.states.async_set("sensor.energy", state, {"attr": "any"})
+        await async_wait_recording_done(hass)
+
+    client = await hass_client()
+    url = (
+        f"/api/history/period/{now.isoformat()}"
+        "?filter_entity_id=sensor.power,sensor.energy&minimal_response"
+    )
+    response = await client.get(url)
+    assert response.status == HTTPStatus.OK
+    expected = await response.json()
+    assert len(expected) == 2
+
+    stream_significant_states = history.history.stream_significant_states_with_session
+    with patch(
+        "homeassistant.components.recorder.history.stream_significant_states_with_session",
+        partial(stream_significant_states, chunk_size=1),
+    ):
+        response = await client.get(f"{url}&stream")
+    assert response.status == HTTPStatus.OK
+    streamed = await response.json()
+    assert sorted(streamed, key=lambda states: states[0]["entity_id"]) == sorted(
+        expected, key=lambda states: states[0]["entity_id"]
+    )
+
+    response = await client.get(
+        f"/api/history/period/{now.isoformat()}"
+        "?filter_entity_id=sensor.does_not_exist&stream"
+    )
+    assert response.status == HTTPStatus.OK
+    assert await response.json() == []
+
+
+async def test_history_during_period_downsampled(hass, hass_ws_client, recorder_mock):
+    """Test history_during_period with max_points and resolution."""
+    # Record the states one second apart in the middle of an
+    # hour so they all fall in the same resolution bucket
+    now = dt_util.utcnow().replace(minute=30, second=0, microsecond=0) - timedelta(
+        hours=1
+    )
+
+    await async_setup_component(hass, "history", {})
+    await async_recorder_block_till_done(hass)
+    with freeze_time(now) as freezer:
+        for value in range(40):
+            freezer.tick()
+            hass.states.async_set("sensor.power", value % 9)
+        freezer.tick()
+        hass.states.async_set("sensor.power", 100)
+        await async_wait_recording_done(hass)
+
+    client = await hass_ws_client()
+    request = {
+        "type": "history/history_during_period",
+        "start_time": now.isoformat(),
+        "entity_ids": ["sensor.power"],
+        "significant_changes_only": False,
+        "minimal_response": True,
+    }
+    await client.send_json({"id": 1, **request})
+    response = await client.receive_json()
+    assert response["success"]
+    states = response["result"]["sensor.power"]
+    assert len(states) == 41
+
+    await client.send_json({"id": 2, "max_points": 10, **request})
+    response = await client.receive_json()
+    assert response["success"]
+    downsampled = response["result"]["sensor.power"]
+    # Ten states are picked and minimal_response merges
+    # the consecutive picks that have the same value
+    assert [state["s"] for state in downsampled] == [
+        "0",
+        "4",
+        "8",
+        "1",
+        "8",
+        "2",
+        "8",
+        "3",
+        "100",
+    ]
+    assert downsampled[0] == states[0]
+    assert downsampled[-1] == states[-1]
+
+    # All the states were recorded within the same hour
+    # so only the lowest, highest and last state are left
+    await client.send_json({"id": 3, "resolution": 3600, **request})
+    response = await client.receive_json()
+    assert response["success"]
+    downsampled = response["result"]["sensor.power"]
+    assert [state["s"] for state in downsampled] == ["0", "100"]
+
+    # The state at the start time counts as one of the points
+    await client.send_json(
+        {
+            "id": 4,
+            **request,
+            "start_time": (now + timedelta(seconds=20.5)).isoformat(),
+            "max_points": 3,
+        }
+    )
+    response = await client.receive_json()
+    assert response["success"]
+    downsampled = response["result"]["sensor.power"]
+    assert len(downsampled) == 3
+    assert downsampled[0]["s"] == states[19]["s"]
+    assert downsampled[-1] == states[-1]
+
+    await client.send_json({"id": 5, "max_points": 2, **request})
+    response = await client.receive_json()
+    assert not response["success"]
+    assert response["error"]["code"] == "invalid_format"
+
+
+async def test_fetch_period_api_downsampled(hass, hass_client, recorder_mock):
+    """Test the fetch period view with max_points and resolution."""
+    now = dt_util.utcnow().replace(minute=30, second=0, microsecond=0) - timedelta(
+        hours=1
+    )
+    await async_setup_component(hass, "history", {})
+
+    with freeze_time(now) as freezer:
+        for value in range(40):
+            freezer.tick()
+            hass.states.async_set("sensor.power", value % 9)
+        await async_wait_recording_done(hass)
+
+    client = await hass_client()
+    url = f"/api/history/period/{now.isoformat()}?filter_entity_id=sensor.power"
+    response = await client.get(f"{url}&max_points=10")
+    assert response.status == HTTPStatus.OK
+    response_json = await response.json()
+    assert len(response_json[0]) == 10
+
+    response = await client.get(f"{url}&max_points=10&stream")
+    assert response.status == HTTPStatus.OK
+    assert await response.json() == response_json
+
+    response = await client.get(f"{url}&resolution=3600")
+    assert response.status == HTTPStatus.OK
+    response_json = await response.json()
+    assert [state["state"] for state in response_json[0]] == ["0", "8", "3"]
+
+    for query in ("max_points=2", "max_points=x", "resolution=0", "resolution=x"):
+        response = await client.get(f"{url}&{query}")
+        assert response.status == HTTPStatus.BAD_REQUEST
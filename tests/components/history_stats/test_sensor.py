@@ -21,6 +21,7 @@ from tests.common import (
     get_test_home_assistant,
     init_recorder_component,
 )
+from tests.components.recorder.common import async_wait_recording_done
 
 
 class TestHistoryStatsSensor(unittest.TestCase):
@@ -1441,7 +1442,7 @@ async def test_end_time_with_microseconds_zeroed(time_zone, hass, recorder_mock)
         await hass.async_block_till_done()
         assert hass.states.get("sensor.heatpump_compressor_today").state == "1.83"
         hass.states.async_set("binary_sensor.heatpump_compressor_state", "off")
-        await hass.async_block_till_done()
+        await async_wait_recording_done(hass)
 
     time_400 = start_of_today + timedelta(hours=4)
     with freeze_time(time_400):
@@ -1449,7 +1450,7 @@ async def test_end_time_with_microseconds_zeroed(time_zone, hass, recorder_mock)
         await hass.async_block_till_done()
         assert hass.states.get("sensor.heatpump_compressor_today").state == "1.83"
         hass.states.async_set("binary_sensor.heatpump_compressor_state", "on")
-        await hass.async_block_till_done()
+        await async_wait_recording_done(hass)
     time_600 = start_of_today + timedelta(hours=6)
     with freeze_time(time_600):
         async_fire_time_changed(hass, time_600)
@@ -0,0 +1,274 @@
+"""Test the static file handling of the HTTP component."""
+import gzip
+from http import HTTPStatus
+import os
+from pathlib import Path
+import threading
+from unittest.mock import patch
+
+from aiohttp.hdrs import (
+    ACCEPT_ENCODING,
+    CONTENT_ENCODING,
+    CONTENT_RANGE,
+    ETAG,
+    IF_MATCH,
+    IF_NONE_MATCH,
+    IF_RANGE,
+    RANGE,
+    VARY,
+)
+import pytest
+
+from homeassistant.components.http import static
+from homeassistant.setup import async_setup_component
+
+
+@pytest.fixture
+async def static_dir(hass, tmp_path):
+    """Register a static directory with a pre-compressed file."""
+    (tmp_path / "app.js").write_text("console.log('hello');")
+    (tmp_path / "app.js.gz").write_bytes(gzip.compress(b"console.log('hello');"))
+    (tmp_path / "index.html").write_text("<html></html>")
+    assert await async_setup_component(hass, "http", {"http": {}})
+    hass.http.register_static_path("/static_test", str(tmp_path))
+    await hass.async_block_till_done()
+    return tmp_path
+
+
+async def test_serves_indexed_files(hass, hass_client, static_dir):
+    """Test the files are sent from the index and answer conditional requests."""
+    client = await hass_client()
+    resp = await client.get("/static_test/index.html")
+    assert resp.status == HTTPStatus.OK
+    assert await resp.text() == "<html></html>"
+    assert resp.headers[ETAG]
+    assert VARY not in resp.headers
+    await hass.async_block_till_done()
+
+    with patch(
+        "homeassistant.components.http.static._get_static_file"
+    ) as mock_get_static_file:
+        resp = await client.get("/static_test/app.js", headers={ACCEPT_ENCODING: ""})
+        assert resp.status == HTTPStatus.OK
+        assert await resp.text() == "console.log('hello');"
+        assert resp.headers[VARY] == ACCEPT_ENCODING
+        identity_etag = resp.headers[ETAG]
+
+        resp = await client.get(
+            "/static_test/app.js", headers={ACCEPT_ENCODING: "gzip, deflate"}
+        )
+        assert resp.status == HTTPStatus.OK
+        assert resp.headers[CONTENT_ENCODING] == "gzip"
+        assert await resp.text() == "console.log('hello');"
+        gzip_etag = resp.headers[ETAG]
+        assert gzip_etag != identity_etag
+
+    # All the files were indexed after the first request
+    assert not mock_get_static_file.mock_calls
+
+    resp = await client.get(
+        "/static_test/app.js",
+        headers={ACCEPT_ENCODING: "gzip", IF_NONE_MATCH: gzip_etag},
+    )
+    assert resp.status == HTTPStatus.NOT_MODIFIED
+    assert resp.headers[ETAG] == gzip_etag
+
+    resp = await client.get(
+        "/static_test/app.js",
+        headers={ACCEPT_ENCODING: "", IF_NONE_MATCH: gzip_etag},
+    )
+    assert resp.status == HTTPStatus.OK
+
+    resp = await client.get("/static_test/missing.js")
+    assert resp.status == HTTPStatus.NOT_FOUND
+
+
+async def test_refreshes_changed_files(hass, hass_client, static_dir):
+    """Test the changed files are indexed again."""
+    client = await hass_client()
+    resp = await client.get("/static_test/index.html")
+    etag = resp.headers[ETAG]
+
+    (static_dir / "index.html").write_text("<html><body></body></html>")
+    os.utime(static_dir / "index.html", (1, 1))
+
+    # The change is only looked for after the refresh interval
+    resp = await client.get("/static_test/index.html", headers={IF_NONE_MATCH: etag})
+    assert resp.status == HTTPStatus.NOT_MODIFIED
+
+    with patch.object(static, "INDEX_REFRESH_INTERVAL", -1):
+        resp = await client.get(
+            "/static_test/index.html", headers={IF_NONE_MATCH: etag}
+        )
+        assert resp.status == HTTPStatus.OK
+        assert await resp.text() == "<html><body></body></html>"
+        assert resp.headers[ETAG] != etag
+
+        (static_dir / "index.html").unlink()
+        resp = await client.get("/static_test/index.html")
+        assert resp.status == HTTPStatus.NOT_FOUND
+
+
+async def test_file_changed_since_refresh(hass, hass_client, static_dir):
+    """Test a file that changed size since it was indexed is still sent whole."""
+    client = await hass_client()
+    resp = await client.get("/static_test/index.html")
+    assert resp.status == HTTPStatus.OK
+
+    (static_dir / "index.html").write_text("<html><body></body></html>")
+
+    resp = await client.get("/static_test/index.html")
+    assert resp.status == HTTPStatus.OK
+    assert await resp.text() == "<html><body></body></html>"
+
+
+async def test_refused_encoding(hass, hass_client, static_dir):
+    """Test a pre-compressed variant is not sent when its encoding is refused."""
+    client = await hass_client()
+
+    resp = await client.get(
+        "/static_test/app.js", headers={ACCEPT_ENCODING: "gzip;q=0, deflate"}
+    )
+    assert resp.status == HTTPStatus.OK
+    assert CONTENT_ENCODING not in resp.headers
+    assert await resp.text() == "console.log('hello');"
+
+    resp = await client.get(
+        "/static_test/app.js", headers={ACCEPT_ENCODING: "deflate, gzip;q=0.5"}
+    )
+    assert resp.status == HTTPStatus.OK
+    assert resp.headers[CONTENT_ENCODING] == "gzip"
+
+    resp = await client.get("/static_test/app.js", headers={ACCEPT_ENCODING: "*"})
+    assert resp.status == HTTPStatus.OK
+    assert resp.headers[CONTENT_ENCODING] == "gzip"
+
+
+async def test_variant_linked_outside_directory(hass, hass_client, tmp_path):
+    """Test a pre-compressed variant linking outside the directory is not sent."""
+    static_path = tmp_path / "static"
+    static_path.mkdir()
+    (static_path / "app.js").write_text("console.log('hello');")
+    (tmp_path / "secret.gz").write_bytes(gzip.compress(b"secret"))
+    (static_path / "app.js.gz").symlink_to(tmp_path / "secret.gz")
+    assert await async_setup_component(hass, "http", {"http": {}})
+    hass.http.register_static_path("/static_test", str(static_path))
+    client = await hass_client()
+
+    resp = await client.get("/static_test/app.js", headers={ACCEPT_ENCODING: "gzip"})
+    assert resp.status == HTTPStatus.OK
+    assert CONTENT_ENCODING not in resp.headers
+    assert VARY not in resp.headers
+    assert await resp.text() == "console.log('hello');"
+
+
+async def test_file_rewritten_with_same_size(hass, hass_client, static_dir):
+    """Test a file rewritten with the same size is not sent with the old ETag."""
+    client = await hass_client()
+    resp = await client.get("/static_test/index.html")
+    etag = resp.headers[ETAG]
+
+    (static_dir / "index.html").write_text("<body></body>")
+    os.utime(static_dir / "index.html", (1, 1))
+
+    resp = await client.get("/static_test/index.html")
+    assert resp.status == HTTPStatus.OK
+    assert await resp.text() == "<body></body>"
+    assert resp.headers[ETAG] != etag
+
+    # The file is indexed again on the next request
+    resp = await client.get("/static_test/index.html")
+    assert resp.status == HTTPStatus.OK
+    assert await resp.text() == "<body></body>"
+    new_etag = resp.headers[ETAG]
+    assert new_etag != etag
+
+    resp = await client.get(
+        "/static_test/index.html", headers={IF_NONE_MATCH: new_etag}
+    )
+    assert resp.status == HTTPStatus.NOT_MODIFIED
+
+
+async def test_index_built_in_background(hass, hass_client, static_dir):
+    """Test the files are served while the index is being built."""
+    client = await hass_client()
+    build_index = static._build_index
+    release = threading.Event()
+
+    def _slow_build_index(*args):
+        release.wait()
+        return build_index(*args)
+
+    with patch.object(static, "_build_index", _slow_build_index):
+        resp = await client.get("/static_test/index.html")
+        assert resp.status == HTTPStatus.OK
+        assert await resp.text() == "<html></html>"
+        release.set()
+        await hass.async_block_till_done()
+
+
+async def test_preconditions_use_index_etag(hass, hass_client, static_dir):
+    """Test the preconditions and ranges are evaluated against the served ETag."""
+    client = await hass_client()
+    resp = await client.get("/static_test/index.html")
+    etag = resp.headers[ETAG]
+
+    resp = await client.get("/static_test/index.html", headers={IF_MATCH: etag})
+    assert resp.status == HTTPStatus.OK
+    assert resp.headers[ETAG] == etag
+    resp = await client.get("/static_test/index.html", headers={IF_MATCH: '"other"'})
+    assert resp.status == HTTPStatus.PRECONDITION_FAILED
+
+    resp = await client.get("/static_test/index.html", headers={RANGE: "bytes=1-4"})
+    assert resp.status == HTTPStatus.PARTIAL_CONTENT
+    assert resp.headers[ETAG] == etag
+    assert resp.headers[CONTENT_RANGE] == "bytes 1-4/13"
+    assert await resp.text() == "html"
+
+    resp = await client.get("/static_test/index.html", headers={RANGE: "bytes=-6"})
+    assert resp.status == HTTPStatus.PARTIAL_CONTENT
+    assert await resp.text() == "/html>"
+
+    resp = await client.get(
+        "/static_test/index.html", headers={RANGE: "bytes=1-4", IF_RANGE: etag}
+    )
+    assert resp.status == HTTPStatus.PARTIAL_CONTENT
+    assert await resp.text() == "html"
+
+    # The whole file is sent when the representation changed
+    resp = await client.get(
+        "/static_test/index.html", headers={RANGE: "bytes=1-4", IF_RANGE: '"other"'}
+    )
+    assert resp.status == HTTPStatus.OK
+    assert await resp.text() == "<html></html>"
+
+    resp = await client.get("/static_test/index.html", headers={RANGE: "bytes=20-"})
+    assert resp.status == HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE
+    assert resp.headers[CONTENT_RANGE] == "bytes */13"
+
+
+async def test_large_file_etag(hass, hass_client, static_dir):
+    """Test the large files get an ETag from their modification time and size."""
+    client = await hass_client()
+    st = (static_dir / "index.html").stat()
+
+    with patch.object(static, "ETAG_HASH_MAX_SIZE", 1):
+        resp = await client.get("/static_test/index.html")
+    assert resp.status == HTTPStatus.OK
+    assert resp.headers[ETAG] == f'"{st.st_mtime_ns:x}-{st.st_size:x}"'
+
+
+def test_build_index_skips_variants(tmp_path):
+    """Test the pre-compressed variants do not count toward the indexed files."""
+    (tmp_path / "app.js").write_text("console.log('hello');")
+    (tmp_path / "app.js.gz").write_bytes(gzip.compress(b"console.log('hello');"))
+    (tmp_path / "app.js.br").write_bytes(b"brotli")
+    (tmp_path / "index.html").write_text("<html></html>")
+
+    with patch.object(static, "INDEX_MAX_FILES", 2):
+        index = static._build_index(tmp_path, False)
+
+    assert set(index) == {Path("app.js"), Path("index.html")}
+    assert set(index[Path("app.js")].encodings) == {"br", "gzip"}
+    # The ETags are only set when a file is first sent
+    assert index[Path("app.js")].variant.etag is None
@@ -17,6 +17,20 @@ from homeassistant.components.automation import EVENT_AUTOMATION_TRIGGERED
 from homeassistant.components.logbook.models import LazyEventPartialState
 from homeassistant.components.logbook.processor import EventProcessor
 from homeassistant.components.logbook.queries.common import PSUEDO_EVENT_STATE_CHANGED
+from homeassistant.components.recorder import get_instance
+from homeassistant.components.recorder.db_schema import (
+    Events,
+    EventTypes,
+    States,
+    StatesMeta,
+)
+from homeassistant.components.recorder.tasks import (
+    EntityIDMigrationTask,
+    EventsTimestampMigrationTask,
+    EventTypeIDMigrationTask,
+    StatesTimestampMigrationTask,
+)
+from homeassistant.components.recorder.util import session_scope
 from homeassistant.components.script import EVENT_SCRIPT_STARTED
 from homeassistant.components.sensor import SensorStateClass
 from homeassistant.const import (
@@ -151,6 +165,138 @@ async def test_service_call_create_logbook_entry_invalid_entity_id(hass, recorde
     assert events[0][logbook.ATTR_MESSAGE] == "is triggered"
 
 
+async def test_get_events_during_entity_id_and_event_type_migration(hass_):
+    """Test rows that still use the legacy entity_id and event_type are returned."""
+    instance = get_instance(hass_)
+    await async_wait_recording_done(hass_)
+    now = dt_util.utcnow()
+    entity_id = "switch.test"
+
+    def _add_legacy_rows():
+        with session_scope(hass=hass_) as session:
+            old_state = States(
+                entity_id=entity_id, state="off", last_updated_ts=now.timestamp()
+            )
+            session.add_all(
+                (
+                    old_state,
+                    States(
+                        entity_id=entity_id,
+                        state="on",
+                        old_state=old_state,
+                        last_updated_ts=now.timestamp() + 1,
+                    ),
+                    Events(
+                        event_type=logbook.EVENT_LOGBOOK_ENTRY,
+                        event_data=json.dumps(
+                            {
+                                logbook.ATTR_NAME: "Alarm",
+                                logbook.ATTR_MESSAGE: "is triggered",
+                                logbook.ATTR_ENTITY_ID: entity_id,
+                            }
+                        ),
+                        origin_idx=0,
+                        time_fired_ts=now.timestamp() + 2,
+                    ),
+                )
+            )
+
+    await instance.async_add_executor_job(_add_legacy_rows)
+    instance.states_meta_migrated = False
+    instance.event_types_migrated = False
+
+    def _assert_events():
+        for entity_ids in (None, [entity_id]):
+            event_processor = EventProcessor(hass_, (EVENT_LOGBOOK_ENTRY,), entity_ids)
+            events = event_processor.get_events(
+                now - timedelta(hours=1), now + timedelta(hours=1)
+            )
+            assert [
+                (event[logbook.ATTR_ENTITY_ID], event.get("state")) for event in events
+            ] == [(entity_id, "on"), (entity_id, None)]
+
+    await instance.async_add_executor_job(_assert_events)
+
+    instance.queue_task(EntityIDMigrationTask())
+    instance.queue_task(EventTypeIDMigrationTask())
+    await async_recorder_block_till_done(hass_)
+    assert instance.states_meta_migrated is True
+    assert instance.event_types_migrated is True
+
+    await instance.async_add_executor_job(_assert_events)
+
+
+async def test_get_events_during_timestamp_migration(hass_):
+    """Test rows that still use the legacy datetime columns are returned."""
+    instance = get_instance(hass_)
+    await async_wait_recording_done(hass_)
+    now = dt_util.utcnow()
+    entity_id = "switch.test"
+
+    def _add_legacy_rows():
+        states_meta = StatesMeta(entity_id=entity_id)
+        with session_scope(hass=hass_) as session:
+            old_state = States(
+                states_meta_rel=states_meta,
+                state="off",
+                last_changed=now,
+                last_updated=now,
+            )
+            session.add_all(
+                (
+                    old_state,
+                    States(
+                        states_meta_rel=states_meta,
+                        state="on",
+                        old_state=old_state,
+                        last_changed=now + timedelta(seconds=1),
+                        last_updated=now + timedelta(seconds=1),
+                    ),
+                    Events(
+                        event_type_rel=EventTypes(event_type=EVENT_LOGBOOK_ENTRY),
+                        event_data=json.dumps(
+                            {
+                                logbook.ATTR_NAME: "Alarm",
+                                logbook.ATTR_MESSAGE: "is triggered",
+                                logbook.ATTR_ENTITY_ID: entity_id,
+                            }
+                        ),
+                        origin_idx=0,
+                        time_fired=now + timedelta(seconds=2),
+                    ),
+                )
+            )
+            session.flush()
+            # The legacy rows were written before the timestamp columns existed
+            session.query(States).filter(States.last_updated.isnot(None)).update(
+                {States.last_updated_ts: None}
+            )
+
+    await instance.async_add_executor_job(_add_legacy_rows)
+    instance.states_timestamps_migrated = False
+    instance.events_timestamps_migrated = False
+
+    def _assert_events():
+        for entity_ids in (None, [entity_id]):
+            event_processor = EventProcessor(hass_, (EVENT_LOGBOOK_ENTRY,), entity_ids)
+            events = event_processor.get_events(
+                now - timedelta(hours=1), now + timedelta(hours=1)
+            )
+            assert [
+                (event[logbook.ATTR_ENTITY_ID], event.get("state")) for event in events
+            ] == [(entity_id, "on"), (entity_id, None)]
+
+    await instance.async_add_executor_job(_assert_events)
+
+    instance.queue_task(StatesTimestampMigrationTask())
+    instance.queue_task(EventsTimestampMigrationTask())
+    await async_recorder_block_till_done(hass_)
+    assert instance.states_timestamps_migrated is True
+    assert instance.events_timestamps_migrated is True
+
+    await instance.async_add_executor_job(_assert_events)
+
+
 async def test_service_call_create_log_book_entry_no_message(hass_):
     """Test if service call create log book entry without message."""
     calls = async_capture_events(hass_, logbook.EVENT_LOGBOOK_ENTRY)
@@ -315,10 +461,10 @@ def create_state_changed_event_from_old_new(
         [
             "event_type"
             "event_data"
-            "time_fired"
-            "context_id"
-            "context_user_id"
-            "context_parent_id"
+            "time_fired_ts"
+            "context_id_bin"
+            "context_user_id_bin"
+            "context_parent_id_bin"
             "state"
             "entity_id"
             "domain"
@@ -336,17 +482,17 @@ def create_state_changed_event_from_old_new(
     row.shared_data = "{}"
     row.attributes = attributes_json
     row.shared_attrs = attributes_json
-    row.time_fired = event_time_fired
+    row.time_fired_ts = dt_util.utc_to_timestamp(event_time_fired)
     row.state = new_state and new_state.get("state")
     row.entity_id = entity_id
     row.domain = entity_id and ha.split_entity_id(entity_id)[0]
     row.context_only = False
-    row.context_id = None
+    row.context_id_bin = None
     row.friendly_name = None
     row.icon = None
     row.old_format_icon = None
-    row.context_user_id = None
-    row.context_parent_id = None
+    row.context_user_id_bin = None
+    row.context_parent_id_bin = None
     row.old_state_id = old_state and 1
     row.state_id = new_state and 1
     return LazyEventPartialState(row, {})
@@ -903,7 +1049,7 @@ async def test_logbook_entity_context_id(hass, recorder_mock, hass_client):
     await async_recorder_block_till_done(hass)
 
     context = ha.Context(
-        id="ac5bd62de45711eaaeb351041eec8dd9",
+        id="5CBFB2VS2Q27NAXCTH0GFES3ES",
         user_id="b400facee45711eaa9308bfd3d19e474",
     )
 
@@ -964,7 +1110,7 @@ async def test_logbook_entity_context_id(hass, recorder_mock, hass_client):
 
     # A service call
     light_turn_off_service_context = ha.Context(
-        id="9c5bd62de45711eaaeb351041eec8dd9",
+        id="4WBFB2VS2Q27NAXCTH0GFES3ES",
         user_id="9400facee45711eaa9308bfd3d19e474",
     )
     hass.states.async_set("light.switch", STATE_ON)
@@ -1057,7 +1203,7 @@ async def test_logbook_context_id_automation_script_started_manually(
     # An Automation
     automation_entity_id_test = "automation.alarm"
     automation_context = ha.Context(
-        id="fc5bd62de45711eaaeb351041eec8dd9",
+        id="7WBFB2VS2Q27NAXCTH0GFES3ES",
         user_id="f400facee45711eaa9308bfd3d19e474",
     )
     hass.bus.async_fire(
@@ -1066,7 +1212,7 @@ async def test_logbook_context_id_automation_script_started_manually(
         context=automation_context,
     )
     script_context = ha.Context(
-        id="ac5bd62de45711eaaeb351041eec8dd9",
+        id="5CBFB2VS2Q27NAXCTH0GFES3ES",
         user_id="b400facee45711eaa9308bfd3d19e474",
     )
     hass.bus.async_fire(
@@ -1078,7 +1224,7 @@ async def test_logbook_context_id_automation_script_started_manually(
     hass.bus.async_fire(EVENT_HOMEASSISTANT_START)
 
     script_2_context = ha.Context(
-        id="1234",
+        id="01GTDGKBCH00GW0X476W5TVAAV",
         user_id="b400facee45711eaa9308bfd3d19e474",
     )
     hass.bus.async_fire(
@@ -1109,12 +1255,12 @@ async def test_logbook_context_id_automation_script_started_manually(
     assert json_dict[0]["entity_id"] == "automation.alarm"
     assert "context_entity_id" not in json_dict[0]
     assert json_dict[0]["context_user_id"] == "f400facee45711eaa9308bfd3d19e474"
-    assert json_dict[0]["context_id"] == "fc5bd62de45711eaaeb351041eec8dd9"
+    assert json_dict[0]["context_id"] == "7WBFB2VS2Q27NAXCTH0GFES3ES"
 
     assert json_dict[1]["entity_id"] == "script.mock_script"
     assert "context_entity_id" not in json_dict[1]
     assert json_dict[1]["context_user_id"] == "b400facee45711eaa9308bfd3d19e474"
-    assert json_dict[1]["context_id"] == "ac5bd62de45711eaaeb351041eec8dd9"
+    assert json_dict[1]["context_id"] == "5CBFB2VS2Q27NAXCTH0GFES3ES"
 
     assert json_dict[2]["domain"] == "homeassistant"
 
@@ -1122,7 +1268,7 @@ async def test_logbook_context_id_automation_script_started_manually(
     assert json_dict[3]["name"] == "Mock script"
     assert "context_entity_id" not in json_dict[1]
     assert json_dict[3]["context_user_id"] == "b400facee45711eaa9308bfd3d19e474"
-    assert json_dict[3]["context_id"] == "1234"
+    assert json_dict[3]["context_id"] == "01GTDGKBCH00GW0X476W5TVAAV"
 
     assert json_dict[4]["entity_id"] == "switch.new"
     assert json_dict[4]["state"] == "off"
@@ -1144,7 +1290,7 @@ async def test_logbook_entity_context_parent_id(hass, hass_client, recorder_mock
     await async_recorder_block_till_done(hass)
 
     context = ha.Context(
-        id="ac5bd62de45711eaaeb351041eec8dd9",
+        id="5CBFB2VS2Q27NAXCTH0GFES3ES",
         user_id="b400facee45711eaa9308bfd3d19e474",
     )
 
@@ -1157,8 +1303,8 @@ async def test_logbook_entity_context_parent_id(hass, hass_client, recorder_mock
     )
 
     child_context = ha.Context(
-        id="2798bfedf8234b5e9f4009c91f48f30c",
-        parent_id="ac5bd62de45711eaaeb351041eec8dd9",
+        id="17K2ZYVY139DF9YG09S4FMHWRC",
+        parent_id="5CBFB2VS2Q27NAXCTH0GFES3ES",
         user_id="b400facee45711eaa9308bfd3d19e474",
     )
     hass.bus.async_fire(
@@ -1209,8 +1355,8 @@ async def test_logbook_entity_context_parent_id(hass, hass_client, recorder_mock
 
     # A state change via service call with the script as the parent
     light_turn_off_service_context = ha.Context(
-        id="9c5bd62de45711eaaeb351041eec8dd9",
-        parent_id="2798bfedf8234b5e9f4009c91f48f30c",
+        id="4WBFB2VS2Q27NAXCTH0GFES3ES",
+        parent_id="17K2ZYVY139DF9YG09S4FMHWRC",
         user_id="9400facee45711eaa9308bfd3d19e474",
     )
     hass.states.async_set("light.switch", STATE_ON)
@@ -1234,8 +1380,8 @@ async def test_logbook_entity_context_parent_id(hass, hass_client, recorder_mock
 
     # An event with a parent event, but the parent event isn't available
     missing_parent_context = ha.Context(
-        id="fc40b9a0d1f246f98c34b33c76228ee6",
-        parent_id="c8ce515fe58e442f8664246c65ed964f",
+        id="7W82WT1MFJ8VWRRD5K7HV253Q6",
+        parent_id="68SS8NZSCE8GQRCS14DHJYV5JF",
         user_id="485cacf93ef84d25a99ced3126b921d2",
     )
     logbook.async_log_entry(
@@ -1356,7 +1502,7 @@ async def test_logbook_context_from_template(hass, hass_client, recorder_mock):
     await hass.async_block_till_done()
 
     switch_turn_off_context = ha.Context(
-        id="9c5bd62de45711eaaeb351041eec8dd9",
+        id="4WBFB2VS2Q27NAXCTH0GFES3ES",
         user_id="9400facee45711eaa9308bfd3d19e474",
     )
     hass.states.async_set(
@@ -1437,7 +1583,7 @@ async def test_logbook_(hass, hass_client, recorder_mock):
     await hass.async_block_till_done()
 
     switch_turn_off_context = ha.Context(
-        id="9c5bd62de45711eaaeb351041eec8dd9",
+        id="4WBFB2VS2Q27NAXCTH0GFES3ES",
         user_id="9400facee45711eaa9308bfd3d19e474",
     )
     hass.states.async_set(
@@ -1617,7 +1763,7 @@ async def test_logbook_multiple_entities(hass, hass_client, recorder_mock):
     await hass.async_block_till_done()
 
     switch_turn_off_context = ha.Context(
-        id="9c5bd62de45711eaaeb351041eec8dd9",
+        id="4WBFB2VS2Q27NAXCTH0GFES3ES",
         user_id="9400facee45711eaa9308bfd3d19e474",
     )
     hass.states.async_set(
@@ -2293,7 +2439,7 @@ async def test_get_events(hass, hass_ws_client, recorder_mock):
     hass.states.async_set("light.kitchen", STATE_ON, {"brightness": 400})
     await hass.async_block_till_done()
     context = ha.Context(
-        id="ac5bd62de45711eaaeb351041eec8dd9",
+        id="5CBFB2VS2Q27NAXCTH0GFES3ES",
         user_id="b400facee45711eaa9308bfd3d19e474",
     )
 
@@ -2373,7 +2519,7 @@ async def test_get_events(hass, hass_ws_client, recorder_mock):
             "id": 5,
             "type": "logbook/get_events",
             "start_time": now.isoformat(),
-            "context_id": "ac5bd62de45711eaaeb351041eec8dd9",
+            "context_id": "5CBFB2VS2Q27NAXCTH0GFES3ES",
         }
     )
     response = await client.receive_json()
@@ -2538,7 +2684,7 @@ async def test_get_events_with_device_ids(hass, hass_ws_client, recorder_mock):
     hass.states.async_set("light.kitchen", STATE_ON, {"brightness": 400})
     await hass.async_block_till_done()
     context = ha.Context(
-        id="ac5bd62de45711eaaeb351041eec8dd9",
+        id="5CBFB2VS2Q27NAXCTH0GFES3ES",
         user_id="b400facee45711eaa9308bfd3d19e474",
     )
 
@@ -2625,7 +2771,7 @@ async def test_logbook_select_entities_context_id(hass, recorder_mock, hass_clie
     await async_recorder_block_till_done(hass)
 
     context = ha.Context(
-        id="ac5bd62de45711eaaeb351041eec8dd9",
+        id="5CBFB2VS2Q27NAXCTH0GFES3ES",
         user_id="b400facee45711eaa9308bfd3d19e474",
     )
 
@@ -2684,7 +2830,7 @@ async def test_logbook_select_entities_context_id(hass, recorder_mock, hass_clie
 
     # A service call
     light_turn_off_service_context = ha.Context(
-        id="9c5bd62de45711eaaeb351041eec8dd9",
+        id="4WBFB2VS2Q27NAXCTH0GFES3ES",
         user_id="9400facee45711eaa9308bfd3d19e474",
     )
     hass.states.async_set("light.switch", STATE_ON)
@@ -2763,7 +2909,7 @@ async def test_get_events_with_context_state(hass, hass_ws_client, recorder_mock
     hass.states.async_set("light.kitchen2", STATE_OFF)
 
     context = ha.Context(
-        id="ac5bd62de45711eaaeb351041eec8dd9",
+        id="5CBFB2VS2Q27NAXCTH0GFES3ES",
         user_id="b400facee45711eaa9308bfd3d19e474",
     )
     hass.states.async_set("binary_sensor.is_light", STATE_OFF, context=context)
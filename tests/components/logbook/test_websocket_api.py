@@ -147,7 +147,7 @@ async def test_get_events(hass, hass_ws_client, recorder_mock):
     hass.states.async_set("light.kitchen", STATE_ON, {"brightness": 400})
     await hass.async_block_till_done()
     context = core.Context(
-        id="ac5bd62de45711eaaeb351041eec8dd9",
+        id="5CBFB2VS2Q27NAXCTH0GFES3ES",
         user_id="b400facee45711eaa9308bfd3d19e474",
     )
 
@@ -227,7 +227,7 @@ async def test_get_events(hass, hass_ws_client, recorder_mock):
             "id": 5,
             "type": "logbook/get_events",
             "start_time": now.isoformat(),
-            "context_id": "ac5bd62de45711eaaeb351041eec8dd9",
+            "context_id": "5CBFB2VS2Q27NAXCTH0GFES3ES",
         }
     )
     response = await client.receive_json()
@@ -421,7 +421,7 @@ async def test_get_events_with_device_ids(hass, hass_ws_client, recorder_mock):
     hass.states.async_set("light.kitchen", STATE_ON, {"brightness": 400})
     await hass.async_block_till_done()
     context = core.Context(
-        id="ac5bd62de45711eaaeb351041eec8dd9",
+        id="5CBFB2VS2Q27NAXCTH0GFES3ES",
         user_id="b400facee45711eaa9308bfd3d19e474",
     )
 
@@ -1229,7 +1229,7 @@ async def test_subscribe_unsubscribe_logbook_stream(
     ]
 
     context = core.Context(
-        id="ac5bd62de45711eaaeb351041eec8dd9",
+        id="5CBFB2VS2Q27NAXCTH0GFES3ES",
         user_id="b400facee45711eaa9308bfd3d19e474",
     )
     automation_entity_id_test = "automation.alarm"
@@ -1267,7 +1267,7 @@ async def test_subscribe_unsubscribe_logbook_stream(
     assert msg["type"] == "event"
     assert msg["event"]["events"] == [
         {
-            "context_id": "ac5bd62de45711eaaeb351041eec8dd9",
+            "context_id": "5CBFB2VS2Q27NAXCTH0GFES3ES",
             "context_user_id": "b400facee45711eaa9308bfd3d19e474",
             "domain": "automation",
             "entity_id": "automation.alarm",
@@ -1280,7 +1280,7 @@ async def test_subscribe_unsubscribe_logbook_stream(
             "context_domain": "automation",
             "context_entity_id": "automation.alarm",
             "context_event_type": "automation_triggered",
-            "context_id": "ac5bd62de45711eaaeb351041eec8dd9",
+            "context_id": "5CBFB2VS2Q27NAXCTH0GFES3ES",
             "context_message": "triggered by state of " "binary_sensor.dog_food_ready",
             "context_name": "Mock automation",
             "context_source": "state of binary_sensor.dog_food_ready",
@@ -1332,7 +1332,7 @@ async def test_subscribe_unsubscribe_logbook_stream(
             "context_domain": "automation",
             "context_entity_id": "automation.alarm",
             "context_event_type": "automation_triggered",
-            "context_id": "ac5bd62de45711eaaeb351041eec8dd9",
+            "context_id": "5CBFB2VS2Q27NAXCTH0GFES3ES",
             "context_message": "triggered by state of binary_sensor.dog_food_ready",
             "context_name": "Mock automation",
             "context_source": "state of binary_sensor.dog_food_ready",
@@ -1362,7 +1362,7 @@ async def test_subscribe_unsubscribe_logbook_stream(
             "context_domain": "automation",
             "context_entity_id": "automation.alarm",
             "context_event_type": "automation_triggered",
-            "context_id": "ac5bd62de45711eaaeb351041eec8dd9",
+            "context_id": "5CBFB2VS2Q27NAXCTH0GFES3ES",
             "context_message": "triggered by state of binary_sensor.dog_food_ready",
             "context_name": "Mock automation",
             "context_source": "state of binary_sensor.dog_food_ready",
@@ -1919,7 +1919,7 @@ async def test_logbook_stream_match_multiple_entities(
     hass.states.async_set("binary_sensor.should_not_appear", STATE_ON)
     hass.states.async_set("binary_sensor.should_not_appear", STATE_OFF)
     context = core.Context(
-        id="ac5bd62de45711eaaeb351041eec8dd9",
+        id="5CBFB2VS2Q27NAXCTH0GFES3ES",
         user_id="b400facee45711eaa9308bfd3d19e474",
     )
     hass.bus.async_fire(
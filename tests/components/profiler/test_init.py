@@ -7,7 +7,10 @@ from homeassistant.components.profiler import (
     CONF_SECONDS,
     SERVICE_DUMP_LOG_OBJECTS,
     SERVICE_LOG_EVENT_LOOP_SCHEDULED,
+    SERVICE_LOG_POLLING_LATENCY,
+    SERVICE_LOG_TEMPLATE_CACHE,
     SERVICE_LOG_THREAD_FRAMES,
+    SERVICE_LOG_WEBSOCKET_QUEUES,
     SERVICE_MEMORY,
     SERVICE_START,
     SERVICE_START_LOG_OBJECTS,
@@ -15,6 +18,7 @@ from homeassistant.components.profiler import (
 )
 from homeassistant.components.profiler.const import DOMAIN
 from homeassistant.const import CONF_SCAN_INTERVAL, CONF_TYPE
+from homeassistant.helpers.entity_platform import async_get_polling_scheduler
 import homeassistant.util.dt as dt_util
 
 from tests.common import MockConfigEntry, async_fire_time_changed
@@ -194,3 +198,79 @@ async def test_log_scheduled(hass, caplog):
 
     assert await hass.config_entries.async_unload(entry.entry_id)
     await hass.async_block_till_done()
+
+
+async def test_log_template_cache(hass, caplog):
+    """Test we can log the statistics of the compiled template cache."""
+
+    entry = MockConfigEntry(domain=DOMAIN)
+    entry.add_to_hass(hass)
+
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    assert hass.services.has_service(DOMAIN, SERVICE_LOG_TEMPLATE_CACHE)
+
+    await hass.services.async_call(DOMAIN, SERVICE_LOG_TEMPLATE_CACHE, {})
+    await hass.async_block_till_done()
+
+    assert "Compiled template cache" in caplog.text
+    assert "'hits':" in caplog.text
+    caplog.clear()
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
+
+
+async def test_log_polling_latency(hass, caplog):
+    """Test we can log the update latency histograms of the polled platforms."""
+
+    entry = MockConfigEntry(domain=DOMAIN)
+    entry.add_to_hass(hass)
+
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    assert hass.services.has_service(DOMAIN, SERVICE_LOG_POLLING_LATENCY)
+
+    scheduler = async_get_polling_scheduler(hass)
+    with patch.object(
+        scheduler,
+        "async_latencies",
+        return_value={"sensor.demo": {"count": 1, "sum": 0.01}},
+    ):
+        await hass.services.async_call(DOMAIN, SERVICE_LOG_POLLING_LATENCY, {})
+        await hass.async_block_till_done()
+
+    assert "Polling latency of sensor.demo" in caplog.text
+    assert "'count': 1" in caplog.text
+    caplog.clear()
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
+
+
+async def test_log_websocket_queues(hass, caplog):
+    """Test we can log the write queues of the websocket connections."""
+
+    entry = MockConfigEntry(domain=DOMAIN)
+    entry.add_to_hass(hass)
+
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    assert hass.services.has_service(DOMAIN, SERVICE_LOG_WEBSOCKET_QUEUES)
+
+    with patch(
+        "homeassistant.components.profiler.async_get_write_queue_stats",
+        return_value={1234: {"pending": 3, "max_pending": 40, "merged_state_diffs": 7}},
+    ):
+        await hass.services.async_call(DOMAIN, SERVICE_LOG_WEBSOCKET_QUEUES, {})
+        await hass.async_block_till_done()
+
+    assert "Websocket write queue of 1234" in caplog.text
+    assert "'merged_state_diffs': 7" in caplog.text
+    caplog.clear()
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
@@ -0,0 +1,248 @@
+"""The tests for the recorder bulk insert write path."""
+from __future__ import annotations
+
+# pylint: disable=protected-access
+from unittest.mock import patch
+
+from sqlalchemy.exc import OperationalError
+
+from homeassistant.components import recorder
+from homeassistant.components.recorder import CONF_BULK_INSERT, CONF_COMMIT_INTERVAL
+from homeassistant.components.recorder import bulk_insert
+from homeassistant.components.recorder.bulk_insert import BulkInserter
+from homeassistant.components.recorder.db_schema import (
+    EventData,
+    Events,
+    EventTypes,
+    StateAttributes,
+    States,
+    StatesMeta,
+)
+from homeassistant.components.recorder.tasks import CommitTask
+from homeassistant.components.recorder.util import session_scope
+from homeassistant.core import HomeAssistant
+
+from .common import async_recorder_block_till_done, async_wait_recording_done
+
+from tests.common import SetupRecorderInstanceT
+
+
+def _entity_states(session, entity_id: str) -> list[States]:
+    """Return the states rows of an entity in insert order."""
+    return (
+        session.query(States)
+        .join(StatesMeta, States.metadata_id == StatesMeta.metadata_id)
+        .filter(StatesMeta.entity_id == entity_id)
+        .order_by(States.state_id)
+        .all()
+    )
+
+
+async def test_bulk_insert_states(
+    hass: HomeAssistant, async_setup_recorder_instance: SetupRecorderInstanceT
+) -> None:
+    """Test states are written and chained with the bulk insert write path."""
+    instance = await async_setup_recorder_instance(hass, {CONF_BULK_INSERT: True})
+    assert instance._bulk_inserter is not None
+    attributes = {"test_attr": 5, "test_attr_10": "nice"}
+
+    # Several states of the same entity in the same commit
+    hass.states.async_set("test.one", "on", attributes)
+    hass.states.async_set("test.one", "off", attributes)
+    hass.states.async_set("test.two", "on", attributes)
+    await async_wait_recording_done(hass)
+    # Chained to a state from a previous commit
+    hass.states.async_set("test.one", "on", {"other": 1})
+    hass.states.async_remove("test.two")
+    await async_wait_recording_done(hass)
+
+    with session_scope(hass=hass) as session:
+        one_states = _entity_states(session, "test.one")
+        assert [state.state for state in one_states] == ["on", "off", "on"]
+        assert one_states[0].old_state_id is None
+        assert one_states[1].old_state_id == one_states[0].state_id
+        assert one_states[2].old_state_id == one_states[1].state_id
+        assert one_states[0].attributes_id == one_states[1].attributes_id
+        assert one_states[1].attributes_id != one_states[2].attributes_id
+
+        two_states = _entity_states(session, "test.two")
+        assert [state.state for state in two_states] == ["on", None]
+        assert two_states[1].old_state_id == two_states[0].state_id
+        assert two_states[0].attributes_id == one_states[0].attributes_id
+
+        assert session.query(StatesMeta).count() == 2
+        assert (
+            session.query(StateAttributes)
+            .filter(
+                StateAttributes.attributes_id.in_(
+                    [state.attributes_id for state in one_states + two_states[:1]]
+                )
+            )
+            .count()
+            == 2
+        )
+        native = one_states[2].to_native()
+        assert native.entity_id == "test.one"
+        assert native.state == "on"
+        metadata_id = one_states[0].metadata_id
+
+    assert not instance._bulk_inserter.has_pending_writes
+    assert instance._states_meta_ids["test.one"] == metadata_id
+
+
+async def test_bulk_insert_states_batched_by_generation(
+    hass: HomeAssistant, async_setup_recorder_instance: SetupRecorderInstanceT
+) -> None:
+    """Test the states of a commit are inserted with one executemany per generation."""
+    instance = await async_setup_recorder_instance(
+        hass, {CONF_BULK_INSERT: True, CONF_COMMIT_INTERVAL: 30}
+    )
+    await async_wait_recording_done(hass)
+    entity_ids = ["test.one", "test.two", "test.three"]
+
+    with patch(
+        "homeassistant.components.recorder.bulk_insert._insert_many",
+        wraps=bulk_insert._insert_many,
+    ) as insert_many_mock:
+        for value in range(3):
+            for entity_id in entity_ids:
+                hass.states.async_set(entity_id, str(value), {"value": value})
+        await hass.async_block_till_done()
+        instance.queue_task(CommitTask())
+        await async_recorder_block_till_done(hass)
+
+    states_inserts = [
+        call.args[3]
+        for call in insert_many_mock.call_args_list
+        if call.args[2] is bulk_insert.STATES_INSERT
+    ]
+    assert [len(rows) for rows in states_inserts] == [3, 3, 3]
+
+    with session_scope(hass=hass) as session:
+        for entity_id in entity_ids:
+            db_states = _entity_states(session, entity_id)
+            assert [state.state for state in db_states] == ["0", "1", "2"]
+            assert db_states[0].old_state_id is None
+            assert db_states[1].old_state_id == db_states[0].state_id
+            assert db_states[2].old_state_id == db_states[1].state_id
+            assert [
+                session.get(StateAttributes, state.attributes_id).to_native()
+                for state in db_states
+            ] == [{"value": 0}, {"value": 1}, {"value": 2}]
+
+
+async def test_bulk_insert_events(
+    hass: HomeAssistant, async_setup_recorder_instance: SetupRecorderInstanceT
+) -> None:
+    """Test events are written and deduplicated with the bulk insert write path."""
+    await async_setup_recorder_instance(hass, {CONF_BULK_INSERT: True})
+    event_data = {"test_attr": 5, "test_attr_10": "nice"}
+
+    hass.bus.async_fire("bulk_test", event_data)
+    hass.bus.async_fire("bulk_test", event_data)
+    hass.bus.async_fire("bulk_test", {"different": True})
+    await async_wait_recording_done(hass)
+    hass.bus.async_fire("bulk_test", event_data)
+    await async_wait_recording_done(hass)
+
+    with session_scope(hass=hass) as session:
+        db_events = (
+            session.query(Events)
+            .join(EventTypes, Events.event_type_id == EventTypes.event_type_id)
+            .filter(EventTypes.event_type == "bulk_test")
+            .order_by(Events.event_id)
+            .all()
+        )
+        assert len(db_events) == 4
+        data_ids = [event.data_id for event in db_events]
+        assert data_ids[0] == data_ids[1] == data_ids[3]
+        assert data_ids[0] != data_ids[2]
+        assert (
+            session.query(EventData).filter(EventData.data_id.in_(data_ids)).count()
+            == 2
+        )
+        assert (
+            session.query(EventTypes)
+            .filter(EventTypes.event_type == "bulk_test")
+            .count()
+            == 1
+        )
+        native = db_events[0].to_native()
+        assert native.event_type == "bulk_test"
+        assert native.context.id is not None
+
+
+async def test_bulk_insert_with_commit_interval(
+    hass: HomeAssistant, async_setup_recorder_instance: SetupRecorderInstanceT
+) -> None:
+    """Test states are chained across commits with a zero commit interval."""
+    await async_setup_recorder_instance(
+        hass, {CONF_BULK_INSERT: True, CONF_COMMIT_INTERVAL: 0}
+    )
+
+    for state in ("on", "off", "on", "off"):
+        hass.states.async_set("test.one", state)
+        await async_wait_recording_done(hass)
+
+    with session_scope(hass=hass) as session:
+        states = _entity_states(session, "test.one")
+        assert [state.state for state in states] == ["on", "off", "on", "off"]
+        for previous, current in zip(states, states[1:]):
+            assert current.old_state_id == previous.state_id
+
+
+async def test_bulk_insert_retried_after_error(
+    hass: HomeAssistant, async_setup_recorder_instance: SetupRecorderInstanceT
+) -> None:
+    """Test the rows are written once when the first write fails."""
+    instance = await async_setup_recorder_instance(
+        hass, {CONF_BULK_INSERT: True, recorder.CONF_DB_RETRY_WAIT: 0}
+    )
+    hass.states.async_set("test.one", "on", {"attr": 1})
+    await async_wait_recording_done(hass)
+
+    original_write = BulkInserter.write
+    calls = 0
+
+    def _write_fails_once(self, session):
+        nonlocal calls
+        calls += 1
+        original_write(self, session)
+        if calls == 1:
+            raise OperationalError("insert", {}, Exception("database is locked"))
+
+    with patch.object(BulkInserter, "write", _write_fails_once):
+        hass.states.async_set("test.one", "off", {"attr": 2})
+        hass.states.async_set("test.one", "on", {"attr": 2})
+        await async_wait_recording_done(hass)
+
+    assert calls >= 2
+    assert not instance._bulk_inserter.has_pending_writes
+    with session_scope(hass=hass) as session:
+        states = _entity_states(session, "test.one")
+        assert [state.state for state in states] == ["on", "off", "on"]
+        for previous, current in zip(states, states[1:]):
+            assert current.old_state_id == previous.state_id
+        assert states[1].attributes_id == states[2].attributes_id
+        assert session.query(StatesMeta).count() == 1
+
+
+async def test_bulk_insert_commits_once(
+    hass: HomeAssistant, async_setup_recorder_instance: SetupRecorderInstanceT
+) -> None:
+    """Test the bulk rows are committed with the rest of the session."""
+    instance = await async_setup_recorder_instance(
+        hass, {CONF_BULK_INSERT: True, CONF_COMMIT_INTERVAL: 1}
+    )
+    hass.states.async_set("test.one", "on")
+    await async_wait_recording_done(hass)
+
+    session = instance.event_session
+    with patch.object(session, "commit", wraps=session.commit) as mock_commit:
+        hass.states.async_set("test.one", "off")
+        hass.bus.async_fire("bulk_test")
+        await async_recorder_block_till_done(hass)
+        await async_wait_recording_done(hass)
+
+    assert len(mock_commit.mock_calls) == 1
+    assert not instance._bulk_inserter.has_pending_writes
@@ -0,0 +1,115 @@
+"""The tests for downsampling the recorder history."""
+from __future__ import annotations
+
+from datetime import timedelta
+import math
+from typing import Any, NamedTuple
+
+from homeassistant.components.recorder.downsample import (
+    downsample_rows,
+    largest_triangle_three_buckets,
+    min_max_buckets,
+)
+
+
+class FakeRow(NamedTuple):
+    """A row with the columns used for downsampling."""
+
+    state: Any
+    last_updated_ts: float
+
+
+def _rows(states: list[Any], start: float = 990.0) -> list[FakeRow]:
+    """Return one row per second with the given states."""
+    return [FakeRow(state, start + index) for index, state in enumerate(states)]
+
+
+def test_lttb_keeps_short_series() -> None:
+    """Test a series with fewer rows than max_points is returned as is."""
+    rows = _rows(["1", "2", "3"])
+    assert largest_triangle_three_buckets(rows, 3) is rows
+
+
+def test_lttb_keeps_peaks() -> None:
+    """Test LTTB keeps the first, last and peak rows of a series."""
+    states = [str(math.sin(index / 10)) for index in range(1000)]
+    states[500] = "100"
+    rows = _rows(states)
+    result = largest_triangle_three_buckets(rows, 50)
+    assert len(result) == 50
+    assert result[0] is rows[0]
+    assert result[-1] is rows[-1]
+    assert rows[500] in result
+    assert result == sorted(result, key=lambda row: row.last_updated_ts)
+
+
+def test_lttb_keeps_non_numeric_rows() -> None:
+    """Test rows that are not numeric are never dropped."""
+    states = [str(index % 7) for index in range(200)]
+    states[20] = "unavailable"
+    states[150] = None
+    rows = _rows(states)
+    result = largest_triangle_three_buckets(rows, 10)
+    assert len(result) == 10
+    assert rows[20] in result
+    assert rows[150] in result
+
+    # There are more rows that cannot be dropped than max_points
+    rows = _rows(["unknown"] * 20 + ["1"] * 20)
+    result = largest_triangle_three_buckets(rows, 10)
+    assert len(result) == 23
+    assert result[:20] == rows[:20]
+
+
+def test_min_max_buckets() -> None:
+    """Test the lowest and highest row of each bucket are kept in order."""
+    rows = _rows(["5", "9", "1", "4", "3", "8", "2", "6", "7"])
+    result = list(min_max_buckets(rows, 3.0))
+    assert [row.state for row in result] == ["9", "1", "3", "8", "2", "7"]
+
+    # The last row is kept even when it is not the lowest or highest
+    result = list(min_max_buckets(rows, 10.0))
+    assert [row.state for row in result] == ["9", "1", "7"]
+
+
+def test_min_max_buckets_non_numeric_rows() -> None:
+    """Test a state that is not numeric closes the current bucket."""
+    rows = _rows(["5", "9", "unavailable", "1", "4"])
+    result = list(min_max_buckets(rows, 10.0))
+    assert [row.state for row in result] == ["5", "9", "unavailable", "1", "4"]
+
+    rows = _rows(["5", "9", "6", "unavailable"])
+    result = list(min_max_buckets(rows, 10.0))
+    assert [row.state for row in result] == ["5", "9", "unavailable"]
+
+
+def test_downsample_rows() -> None:
+    """Test downsample_rows applies the resolution before max_points."""
+    rows = _rows([str(index % 10) for index in range(1000)])
+    assert list(downsample_rows(rows, None, None)) == rows
+
+    by_resolution = list(downsample_rows(rows, None, timedelta(seconds=10)))
+    assert len(by_resolution) == 200
+    assert list(downsample_rows(iter(rows), None, timedelta(seconds=10))) == (
+        by_resolution
+    )
+
+    both = list(downsample_rows(rows, 20, timedelta(seconds=10)))
+    assert both == largest_triangle_three_buckets(by_resolution, 20)
+    assert len(both) == 20
+
+
+def test_downsample_rows_first_row() -> None:
+    """Test the first row is always kept and counts toward max_points."""
+    first_row = FakeRow("5", 900.0)
+    rows = _rows([str(index % 10) for index in range(100)])
+
+    result = list(downsample_rows(rows, 3, None, first_row))
+    assert len(result) == 3
+    assert result[0] is first_row
+    assert result[-1] is rows[-1]
+
+    # The first row is not part of the resolution buckets
+    result = list(downsample_rows(rows, None, timedelta(seconds=1000), first_row))
+    assert result[0] is first_row
+    assert result[1:] == list(min_max_buckets(rows, 1000.0))
@@ -8,7 +8,6 @@ import json
 from unittest.mock import patch, sentinel
 
 import pytest
-from sqlalchemy import text
 
 from homeassistant.components import recorder
 from homeassistant.components.recorder import history
@@ -17,8 +16,13 @@ from homeassistant.components.recorder.db_schema import (
     RecorderRuns,
     StateAttributes,
     States,
+    StatesMeta,
 )
 from homeassistant.components.recorder.models import LazyState, process_timestamp
+from homeassistant.components.recorder.tasks import (
+    EntityIDMigrationTask,
+    StatesTimestampMigrationTask,
+)
 from homeassistant.components.recorder.util import session_scope
 import homeassistant.core as ha
 from homeassistant.core import HomeAssistant, State
@@ -27,6 +31,7 @@ import homeassistant.util.dt as dt_util
 
 from tests.common import SetupRecorderInstanceT, mock_state_change_event
 from tests.components.recorder.common import (
+    async_recorder_block_till_done,
     async_wait_recording_done,
     wait_recording_done,
 )
@@ -73,16 +78,16 @@ def _add_db_entries(
                     event_type="state_changed",
                     event_data="{}",
                     origin="LOCAL",
-                    time_fired=point,
+                    time_fired_ts=point.timestamp(),
                 )
             )
             session.add(
                 States(
-                    entity_id=entity_id,
+                    states_meta_rel=StatesMeta(entity_id=entity_id),
                     state="on",
                     attributes='{"name":"the light"}',
-                    last_changed=None,
-                    last_updated=point,
+                    last_changed_ts=None,
+                    last_updated_ts=point.timestamp(),
                     event_id=1001 + idx,
                     attributes_id=1002 + idx,
                 )
@@ -515,6 +520,34 @@ def test_get_significant_states_are_ordered(hass_recorder):
     assert list(hist.keys()) == entity_ids
 
 
+@pytest.mark.parametrize("chunk_size", [1, 2, 1000])
+def test_stream_significant_states(hass_recorder, chunk_size):
+    """Test streaming significant states returns the same states in chunks."""
+    hass = hass_recorder()
+    zero, four, _states = record_states(hass)
+    with session_scope(hass=hass) as session:
+        hist = history.get_significant_states_with_session(hass, session, zero, four)
+        streamed: dict[str, list[State]] = {}
+        for entity_id, chunk in history.stream_significant_states_with_session(
+            hass, session, zero, four, chunk_size=chunk_size
+        ):
+            assert 0 < len(chunk) <= chunk_size
+            streamed.setdefault(entity_id, []).extend(chunk)
+    assert streamed == hist
+
+
+def test_stream_significant_states_no_matches(hass_recorder):
+    """Test streaming significant states of an entity without states."""
+    hass = hass_recorder()
+    zero, four, _states = record_states(hass)
+    with session_scope(hass=hass) as session:
+        assert not list(
+            history.stream_significant_states_with_session(
+                hass, session, zero, four, ["light.does_not_exist"]
+            )
+        )
+
+
 def test_get_significant_states_only(hass_recorder):
     """Test significant states when significant_states_only is set."""
     hass = hass_recorder()
@@ -651,11 +684,11 @@ def record_states(hass) -> tuple[datetime, datetime, dict[str, list[State]]]:
     return zero, four, states
 
 
-async def test_state_changes_during_period_query_during_migration_to_schema_25(
+async def test_state_changes_during_period_query_during_migration_to_schema_31(
     hass: ha.HomeAssistant,
     async_setup_recorder_instance: SetupRecorderInstanceT,
 ):
-    """Test we can query data prior to schema 25 and during migration to schema 25."""
+    """Test we can query data and do not return any while migrating to schema 31."""
     instance = await async_setup_recorder_instance(hass, {})
 
     start = dt_util.utcnow()
@@ -680,32 +713,18 @@ async def test_state_changes_during_period_query_during_migration_to_schema_25(
     state = hist[entity_id][0]
     assert state.attributes == {"name": "the shared light"}
 
-    with instance.engine.connect() as conn:
-        conn.execute(text("update states set attributes_id=NULL;"))
-        conn.execute(text("drop table state_attributes;"))
-        conn.commit()
-
-    with patch.object(instance, "schema_version", 24):
-        no_attributes = True
-        hist = history.state_changes_during_period(
-            hass, start, end, entity_id, no_attributes, include_start_time_state=False
-        )
-        state = hist[entity_id][0]
-        assert state.attributes == {}
-
-        no_attributes = False
+    with patch.object(instance, "schema_version", 30):
         hist = history.state_changes_during_period(
             hass, start, end, entity_id, no_attributes, include_start_time_state=False
         )
-        state = hist[entity_id][0]
-        assert state.attributes == {"name": "the light"}
+        assert hist == {}
 
 
-async def test_get_states_query_during_migration_to_schema_25(
+async def test_get_states_query_during_migration_to_schema_31(
     hass: ha.HomeAssistant,
     async_setup_recorder_instance: SetupRecorderInstanceT,
 ):
-    """Test we can query data prior to schema 25 and during migration to schema 25."""
+    """Test we can query data and do not return any while migrating to schema 31."""
     instance = await async_setup_recorder_instance(hass, {})
 
     start = dt_util.utcnow()
@@ -726,32 +745,18 @@ async def test_get_states_query_during_migration_to_schema_25(
     state = hist[0]
     assert state.attributes == {"name": "the shared light"}
 
-    with instance.engine.connect() as conn:
-        conn.execute(text("update states set attributes_id=NULL;"))
-        conn.execute(text("drop table state_attributes;"))
-        conn.commit()
-
-    with patch.object(instance, "schema_version", 24):
-        no_attributes = True
-        hist = await _async_get_states(
-            hass, end, [entity_id], no_attributes=no_attributes
-        )
-        state = hist[0]
-        assert state.attributes == {}
-
-        no_attributes = False
+    with patch.object(instance, "schema_version", 30):
         hist = await _async_get_states(
             hass, end, [entity_id], no_attributes=no_attributes
         )
-        state = hist[0]
-        assert state.attributes == {"name": "the light"}
+        assert hist == []
 
 
-async def test_get_states_query_during_migration_to_schema_25_multiple_entities(
+async def test_get_states_query_during_migration_to_schema_31_multiple_entities(
     hass: ha.HomeAssistant,
     async_setup_recorder_instance: SetupRecorderInstanceT,
 ):
-    """Test we can query data prior to schema 25 and during migration to schema 25."""
+    """Test we can query data and do not return any while migrating to schema 31."""
     instance = await async_setup_recorder_instance(hass, {})
 
     start = dt_util.utcnow()
@@ -775,25 +780,183 @@ async def test_get_states_query_during_migration_to_schema_25_multiple_entities(
     assert hist[0].attributes == {"name": "the shared light"}
     assert hist[1].attributes == {"name": "the shared light"}
 
-    with instance.engine.connect() as conn:
-        conn.execute(text("update states set attributes_id=NULL;"))
-        conn.execute(text("drop table state_attributes;"))
-        conn.commit()
-
-    with patch.object(instance, "schema_version", 24):
-        no_attributes = True
+    with patch.object(instance, "schema_version", 30):
         hist = await _async_get_states(
             hass, end, entity_ids, no_attributes=no_attributes
         )
-        assert hist[0].attributes == {}
-        assert hist[1].attributes == {}
+        assert hist == []
 
-        no_attributes = False
-        hist = await _async_get_states(
-            hass, end, entity_ids, no_attributes=no_attributes
+
+async def test_query_during_entity_id_migration(
+    hass: ha.HomeAssistant,
+    async_setup_recorder_instance: SetupRecorderInstanceT,
+):
+    """Test the states that still use the legacy entity_id column are returned."""
+    instance = await async_setup_recorder_instance(hass, {})
+    await async_wait_recording_done(hass)
+    assert instance.states_meta_migrated is True
+
+    start = dt_util.utcnow()
+    point = start + timedelta(seconds=1)
+    point2 = point + timedelta(seconds=1)
+    end = point2 + timedelta(seconds=1)
+    entity_id_1 = "light.test"
+    entity_id_2 = "switch.test"
+
+    def _add_legacy_and_migrated_states():
+        with session_scope(hass=hass) as session:
+            session.add_all(
+                (
+                    States(
+                        entity_id=entity_id_1,
+                        state="on",
+                        last_updated_ts=point.timestamp(),
+                    ),
+                    States(
+                        states_meta_rel=StatesMeta(entity_id=entity_id_1),
+                        state="off",
+                        last_updated_ts=point2.timestamp(),
+                    ),
+                    States(
+                        entity_id=entity_id_2,
+                        state="on",
+                        last_updated_ts=point.timestamp(),
+                    ),
+                )
+            )
+
+    await instance.async_add_executor_job(_add_legacy_and_migrated_states)
+    instance.states_meta_migrated = False
+
+    def _assert_history():
+        hist = history.state_changes_during_period(
+            hass, start, end, entity_id_1, include_start_time_state=False
         )
-        assert hist[0].attributes == {"name": "the light"}
-        assert hist[1].attributes == {"name": "the light"}
+        assert [state.state for state in hist[entity_id_1]] == ["on", "off"]
+
+        hist = history.get_significant_states(
+            hass, start, end, include_start_time_state=False
+        )
+        assert {
+            entity_id: [state.state for state in states]
+            for entity_id, states in hist.items()
+        } == {entity_id_1: ["on", "off"], entity_id_2: ["on"]}
+
+        hist = history.get_last_state_changes(hass, 1, entity_id_2)
+        assert [state.state for state in hist[entity_id_2]] == ["on"]
+
+    async def _async_assert_states_at_end():
+        hist = await _async_get_states(hass, end, [entity_id_2])
+        assert [(state.entity_id, state.state) for state in hist] == [
+            (entity_id_2, "on")
+        ]
+        hist = await _async_get_states(hass, end, [entity_id_1, entity_id_2])
+        assert {(state.entity_id, state.state) for state in hist} == {
+            (entity_id_1, "off"),
+            (entity_id_2, "on"),
+        }
+        hist = await _async_get_states(hass, end)
+        assert {(state.entity_id, state.state) for state in hist} == {
+            (entity_id_1, "off"),
+            (entity_id_2, "on"),
+        }
+
+    await instance.async_add_executor_job(_assert_history)
+    await _async_assert_states_at_end()
+
+    instance.queue_task(EntityIDMigrationTask())
+    await async_recorder_block_till_done(hass)
+    assert instance.states_meta_migrated is True
+
+    await instance.async_add_executor_job(_assert_history)
+    await _async_assert_states_at_end()
+
+
+async def test_query_during_timestamp_migration(
+    hass: ha.HomeAssistant,
+    async_setup_recorder_instance: SetupRecorderInstanceT,
+):
+    """Test the states that still use the legacy datetime columns are returned."""
+    instance = await async_setup_recorder_instance(hass, {})
+    await async_wait_recording_done(hass)
+    assert instance.states_timestamps_migrated is True
+
+    start = dt_util.utcnow()
+    point = start + timedelta(seconds=1)
+    point2 = point + timedelta(seconds=1)
+    point3 = point2 + timedelta(seconds=1)
+    end = point3 + timedelta(seconds=1)
+    entity_id = "light.test"
+
+    def _add_legacy_and_migrated_states():
+        states_meta = StatesMeta(entity_id=entity_id)
+        with session_scope(hass=hass) as session:
+            session.add_all(
+                (
+                    States(
+                        states_meta_rel=states_meta,
+                        state="on",
+                        last_changed=point,
+                        last_updated=point,
+                    ),
+                    # An attribute only update
+                    States(
+                        states_meta_rel=states_meta,
+                        state="on",
+                        last_changed=point,
+                        last_updated=point2,
+                    ),
+                    States(
+                        states_meta_rel=states_meta,
+                        state="off",
+                        last_updated_ts=point3.timestamp(),
+                    ),
+                )
+            )
+            session.flush()
+            # The legacy rows were written before the timestamp columns existed
+            session.query(States).filter(States.last_updated.isnot(None)).update(
+                {States.last_updated_ts: None}
+            )
+
+    await instance.async_add_executor_job(_add_legacy_and_migrated_states)
+    instance.states_timestamps_migrated = False
+
+    def _assert_history():
+        hist = history.state_changes_during_period(
+            hass, start, end, entity_id, include_start_time_state=False
+        )
+        assert [state.state for state in hist[entity_id]] == ["on", "off"]
+
+        hist = history.get_significant_states(
+            hass, start, end, [entity_id], include_start_time_state=False
+        )
+        assert [(state.state, state.last_updated) for state in hist[entity_id]] == [
+            ("on", point),
+            ("off", point3),
+        ]
+
+        hist = history.get_last_state_changes(hass, 2, entity_id)
+        assert [state.state for state in hist[entity_id]] == ["on", "off"]
+
+    async def _async_assert_states_at_point2():
+        for entity_ids in ([entity_id], None):
+            hist = await _async_get_states(
+                hass, point2 + timedelta(microseconds=1), entity_ids
+            )
+            assert [
+                (state.state, state.last_changed, state.last_updated) for state in hist
+            ] == [("on", point, point2)]
+
+    await instance.async_add_executor_job(_assert_history)
+    await _async_assert_states_at_point2()
+
+    instance.queue_task(StatesTimestampMigrationTask())
+    await async_recorder_block_till_done(hass)
+    assert instance.states_timestamps_migrated is True
+
+    await instance.async_add_executor_job(_assert_history)
+    await _async_assert_states_at_point2()
 
 
 async def test_get_full_significant_states_handles_empty_last_changed(
@@ -871,12 +1034,17 @@ async def test_get_full_significant_states_handles_empty_last_changed(
         _fetch_db_states
     )
     assert db_sensor_one_states[0].last_changed is None
+    assert db_sensor_one_states[0].last_changed_ts is None
+    assert (
+        dt_util.utc_from_timestamp(db_sensor_one_states[1].last_changed_ts)
+        == state0.last_changed
+    )
+    assert db_sensor_one_states[0].last_updated_ts is not None
+    assert db_sensor_one_states[1].last_updated_ts is not None
     assert (
-        process_timestamp(db_sensor_one_states[1].last_changed) == state0.last_changed
+        db_sensor_one_states[0].last_updated_ts
+        != db_sensor_one_states[1].last_updated_ts
     )
-    assert db_sensor_one_states[0].last_updated is not None
-    assert db_sensor_one_states[1].last_updated is not None
-    assert db_sensor_one_states[0].last_updated != db_sensor_one_states[1].last_updated
 
 
 def test_state_changes_during_period_multiple_entities_single_test(hass_recorder):
@@ -10,6 +10,7 @@ from typing import cast
 from unittest.mock import Mock, patch
 
 import pytest
+from sqlalchemy import func
 from sqlalchemy.exc import DatabaseError, OperationalError, SQLAlchemyError
 
 from homeassistant.components import recorder
@@ -29,9 +30,11 @@ from homeassistant.components.recorder.db_schema import (
     SCHEMA_VERSION,
     EventData,
     Events,
+    EventTypes,
     RecorderRuns,
     StateAttributes,
     States,
+    StatesMeta,
     StatisticsRuns,
 )
 from homeassistant.components.recorder.models import process_timestamp
@@ -41,6 +44,7 @@ from homeassistant.components.recorder.services import (
     SERVICE_PURGE,
     SERVICE_PURGE_ENTITIES,
 )
+from homeassistant.components.recorder.tasks import PrewarmStateAttributesIDsTask
 from homeassistant.components.recorder.util import session_scope
 from homeassistant.const import (
     EVENT_HOMEASSISTANT_FINAL_WRITE,
@@ -85,6 +89,12 @@ def _default_recorder(hass):
         entity_filter=CONFIG_SCHEMA({DOMAIN: {}}),
         exclude_t=[],
         exclude_attributes_by_domain={},
+        bulk_insert=False,
+        state_attributes_cache_size=2048,
+        event_data_cache_size=2048,
+        db_read_pool_size=2,
+        verify_statistics=False,
+        statistics_rollups=False,
     )
 
 
@@ -167,6 +177,69 @@ async def test_shutdown_closes_connections(hass, recorder_mock):
         assert instance.get_session()
 
 
+async def test_read_executor_jobs_use_query_only_connections(
+    hass: HomeAssistant, tmpdir
+):
+    """Test jobs in the read pool can read but not write with SQLite."""
+
+    def _create_tmpdir_for_test_db():
+        return tmpdir.mkdir("sqlite").join("test.db")
+
+    test_db_file = await hass.async_add_executor_job(_create_tmpdir_for_test_db)
+    dburl = f"{SQLITE_URL_PREFIX}//{test_db_file}"
+
+    recorder_helper.async_initialize_recorder(hass)
+    assert await async_setup_component(
+        hass, DOMAIN, {DOMAIN: {CONF_DB_URL: dburl, CONF_COMMIT_INTERVAL: 0}}
+    )
+    await hass.async_block_till_done()
+    instance = get_instance(hass)
+    hass.states.async_set("test.recorder", "on")
+    await async_wait_recording_done(hass)
+
+    def _count_states() -> int:
+        assert threading.current_thread().name.startswith("DbReader")
+        with session_scope(hass=hass) as session:
+            return session.query(States).count()
+
+    def _write_state() -> None:
+        with session_scope(hass=hass) as session:
+            session.query(States).delete()
+
+    job = instance.async_add_read_executor_job(_count_states)
+    assert instance.read_backlog == 1
+    assert await job == 1
+    assert instance.read_backlog == 0
+
+    with pytest.raises(OperationalError, match="readonly database"):
+        await instance.async_add_read_executor_job(_write_state)
+    assert instance.read_backlog == 0
+
+    # The recorder thread can still write while the read pool is open
+    hass.states.async_set("test.recorder", "off")
+    await async_wait_recording_done(hass)
+    assert await instance.async_add_read_executor_job(_count_states) == 2
+
+    await hass.async_stop()
+
+
+async def test_read_executor_disabled(
+    hass: HomeAssistant, async_setup_recorder_instance: SetupRecorderInstanceT
+):
+    """Test read jobs use the db executor when the read pool is disabled."""
+    instance = await async_setup_recorder_instance(
+        hass, {recorder.CONF_DB_READ_POOL_SIZE: 0}
+    )
+
+    def _thread_name() -> str:
+        return threading.current_thread().name
+
+    assert (await instance.async_add_read_executor_job(_thread_name)).startswith(
+        "DbWorker"
+    )
+    assert instance.read_backlog == 0
+
+
 async def test_state_gets_saved_when_set_before_start_event(
     hass: HomeAssistant, async_setup_recorder_instance: SetupRecorderInstanceT
 ):
@@ -404,7 +477,8 @@ def test_saving_event(hass, hass_recorder):
     with session_scope(hass=hass) as session:
         for select_event, event_data in (
             session.query(Events, EventData)
-            .filter_by(event_type=event_type)
+            .join(EventTypes, Events.event_type_id == EventTypes.event_type_id)
+            .filter(EventTypes.event_type == event_type)
             .outerjoin(EventData, Events.data_id == EventData.data_id)
         ):
             select_event = cast(Events, select_event)
@@ -639,11 +713,11 @@ def test_saving_state_and_removing_entity(hass, hass_recorder):
     with session_scope(hass=hass) as session:
         states = list(session.query(States))
         assert len(states) == 3
-        assert states[0].entity_id == entity_id
+        assert states[0].states_meta_rel.entity_id == entity_id
         assert states[0].state == STATE_LOCKED
-        assert states[1].entity_id == entity_id
+        assert states[1].states_meta_rel.entity_id == entity_id
         assert states[1].state == STATE_UNLOCKED
-        assert states[2].entity_id == entity_id
+        assert states[2].states_meta_rel.entity_id == entity_id
         assert states[2].state is None
 
 
@@ -1047,10 +1121,10 @@ def test_saving_sets_old_state(hass_recorder):
         states = list(session.query(States))
         assert len(states) == 4
 
-        assert states[0].entity_id == "test.one"
-        assert states[1].entity_id == "test.two"
-        assert states[2].entity_id == "test.one"
-        assert states[3].entity_id == "test.two"
+        assert states[0].states_meta_rel.entity_id == "test.one"
+        assert states[1].states_meta_rel.entity_id == "test.two"
+        assert states[2].states_meta_rel.entity_id == "test.one"
+        assert states[3].states_meta_rel.entity_id == "test.two"
 
         assert states[0].old_state_id is None
         assert states[1].old_state_id is None
@@ -1074,8 +1148,8 @@ def test_saving_state_with_serializable_data(hass_recorder, caplog):
         states = list(session.query(States))
         assert len(states) == 2
 
-        assert states[0].entity_id == "test.two"
-        assert states[1].entity_id == "test.two"
+        assert states[0].states_meta_rel.entity_id == "test.two"
+        assert states[1].states_meta_rel.entity_id == "test.two"
         assert states[0].old_state_id is None
         assert states[1].old_state_id == states[0].state_id
 
@@ -1123,7 +1197,11 @@ def test_service_disable_events_not_recording(hass, hass_recorder):
     event = events[0]
 
     with session_scope(hass=hass) as session:
-        db_events = list(session.query(Events).filter_by(event_type=event_type))
+        db_events = list(
+            session.query(Events)
+            .join(EventTypes, Events.event_type_id == EventTypes.event_type_id)
+            .filter(EventTypes.event_type == event_type)
+        )
         assert len(db_events) == 0
 
     assert hass.services.call(
@@ -1145,7 +1223,8 @@ def test_service_disable_events_not_recording(hass, hass_recorder):
     with session_scope(hass=hass) as session:
         for select_event, event_data in (
             session.query(Events, EventData)
-            .filter_by(event_type=event_type)
+            .join(EventTypes, Events.event_type_id == EventTypes.event_type_id)
+            .filter(EventTypes.event_type == event_type)
             .outerjoin(EventData, Events.data_id == EventData.data_id)
         ):
             select_event = cast(Events, select_event)
@@ -1339,7 +1418,11 @@ def test_entity_id_filter(hass_recorder):
         wait_recording_done(hass)
 
         with session_scope(hass=hass) as session:
-            db_events = list(session.query(Events).filter_by(event_type="hello"))
+            db_events = list(
+                session.query(Events)
+                .join(EventTypes, Events.event_type_id == EventTypes.event_type_id)
+                .filter(EventTypes.event_type == "hello")
+            )
             assert len(db_events) == idx + 1, data
 
     for data in (
@@ -1350,7 +1433,11 @@ def test_entity_id_filter(hass_recorder):
         wait_recording_done(hass)
 
         with session_scope(hass=hass) as session:
-            db_events = list(session.query(Events).filter_by(event_type="hello"))
+            db_events = list(
+                session.query(Events)
+                .join(EventTypes, Events.event_type_id == EventTypes.event_type_id)
+                .filter(EventTypes.event_type == "hello")
+            )
             # Keep referring idx + 1, as no new events are being added
             assert len(db_events) == idx + 1, data
 
@@ -1371,7 +1458,11 @@ async def test_database_lock_and_unlock(
 
     def _get_db_events():
         with session_scope(hass=hass) as session:
-            return list(session.query(Events).filter_by(event_type=event_type))
+            return list(
+                session.query(Events)
+                .join(EventTypes, Events.event_type_id == EventTypes.event_type_id)
+                .filter(EventTypes.event_type == event_type)
+            )
 
     instance = get_instance(hass)
 
@@ -1413,7 +1504,11 @@ async def test_database_lock_and_overflow(
 
     def _get_db_events():
         with session_scope(hass=hass) as session:
-            return list(session.query(Events).filter_by(event_type=event_type))
+            return list(
+                session.query(Events)
+                .join(EventTypes, Events.event_type_id == EventTypes.event_type_id)
+                .filter(EventTypes.event_type == event_type)
+            )
 
     instance = get_instance(hass)
 
@@ -1530,7 +1625,8 @@ def test_deduplication_event_data_inside_commit_interval(hass_recorder, caplog):
     with session_scope(hass=hass) as session:
         events = list(
             session.query(Events)
-            .filter(Events.event_type == "this_event")
+            .join(EventTypes, (Events.event_type_id == EventTypes.event_type_id))
+            .filter(EventTypes.event_type == "this_event")
             .outerjoin(EventData, (Events.data_id == EventData.data_id))
         )
         assert len(events) == 20
@@ -1538,12 +1634,11 @@ def test_deduplication_event_data_inside_commit_interval(hass_recorder, caplog):
         assert all(event.data_id == first_data_id for event in events)
 
 
-# Patch STATE_ATTRIBUTES_ID_CACHE_SIZE since otherwise
+# Use a small state attributes cache since otherwise
 # the CI can fail because the test takes too long to run
-@patch("homeassistant.components.recorder.core.STATE_ATTRIBUTES_ID_CACHE_SIZE", 5)
 def test_deduplication_state_attributes_inside_commit_interval(hass_recorder, caplog):
     """Test deduplication of state attributes inside the commit interval."""
-    hass = hass_recorder()
+    hass = hass_recorder({recorder.CONF_STATE_ATTRIBUTES_CACHE_SIZE: 5})
 
     entity_id = "test.recorder"
     attributes = {"test_attr": 5, "test_attr_10": "nice"}
@@ -1565,7 +1660,8 @@ def test_deduplication_state_attributes_inside_commit_interval(hass_recorder, ca
     with session_scope(hass=hass) as session:
         states = list(
             session.query(States)
-            .filter(States.entity_id == entity_id)
+            .join(StatesMeta, (States.metadata_id == StatesMeta.metadata_id))
+            .filter(StatesMeta.entity_id == entity_id)
             .outerjoin(
                 StateAttributes, (States.attributes_id == StateAttributes.attributes_id)
             )
@@ -1576,6 +1672,124 @@ def test_deduplication_state_attributes_inside_commit_interval(hass_recorder, ca
         assert first_attributes_id == last_attributes_id
 
 
+# Patch STATES_META_ID_CACHE_SIZE and EVENT_TYPE_ID_CACHE_SIZE
+# so we go back to the db to find the ids
+@patch("homeassistant.components.recorder.core.STATES_META_ID_CACHE_SIZE", 1)
+@patch("homeassistant.components.recorder.core.EVENT_TYPE_ID_CACHE_SIZE", 1)
+def test_deduplication_states_meta_and_event_types(hass_recorder):
+    """Test entity_ids and event_types are only stored once."""
+    hass = hass_recorder()
+
+    for _ in range(2):
+        for entity_id in ("test.one", "test.two"):
+            hass.states.set(entity_id, "on")
+            hass.states.set(entity_id, "off")
+        for event_type in ("event_one", "event_two"):
+            hass.bus.fire(event_type)
+        wait_recording_done(hass)
+
+    with session_scope(hass=hass) as session:
+        assert {
+            entity_id: count
+            for entity_id, count in session.query(
+                StatesMeta.entity_id, func.count(States.state_id)
+            )
+            .join(States, (States.metadata_id == StatesMeta.metadata_id))
+            .group_by(StatesMeta.entity_id)
+        } == {"test.one": 4, "test.two": 4}
+        assert {
+            event_type: count
+            for event_type, count in session.query(
+                EventTypes.event_type, func.count(Events.event_id)
+            )
+            .join(Events, (Events.event_type_id == EventTypes.event_type_id))
+            .filter(EventTypes.event_type.in_(("event_one", "event_two")))
+            .group_by(EventTypes.event_type)
+        } == {"event_one": 2, "event_two": 2}
+
+
+def test_state_attributes_id_cache_stats(hass_recorder):
+    """Test the state attributes id cache counts hits, misses and evictions."""
+    hass = hass_recorder({recorder.CONF_STATE_ATTRIBUTES_CACHE_SIZE: 2})
+    instance = get_instance(hass)
+
+    for attr in (1, 2, 3, 1):
+        hass.states.set("test.recorder", "on", {"attr": attr})
+        wait_recording_done(hass)
+
+    assert instance.id_cache_stats["state_attributes"] == {
+        "size": 2,
+        "max_size": 2,
+        "hits": 0,
+        "misses": 4,
+        "evictions": 2,
+    }
+
+    hass.states.set("test.recorder", "off", {"attr": 1})
+    wait_recording_done(hass)
+    # The counters are kept when the event session is reopened
+    instance._close_event_session()
+    assert instance.id_cache_stats["state_attributes"] == {
+        "size": 0,
+        "max_size": 2,
+        "hits": 1,
+        "misses": 4,
+        "evictions": 2,
+    }
+    # The id caches stay bounded
+    assert (
+        instance._states_meta_ids.get_size() == recorder.core.STATES_META_ID_CACHE_SIZE
+    )
+    assert not instance._states_meta_ids
+    assert instance._event_type_ids.get_size() == recorder.core.EVENT_TYPE_ID_CACHE_SIZE
+
+
+def test_prewarm_state_attributes_ids(hass_recorder):
+    """Test recently used attributes ids are loaded into the cache."""
+    hass = hass_recorder()
+    instance = get_instance(hass)
+
+    hass.states.set("test.one", "on", {"attr": "one"})
+    hass.states.set("test.two", "on", {"attr": "two"})
+    wait_recording_done(hass)
+    with session_scope(hass=hass) as session:
+        attributes_ids = {
+            shared_attrs: attributes_id
+            for attributes_id, shared_attrs in session.query(
+                StateAttributes.attributes_id, StateAttributes.shared_attrs
+            )
+        }
+    assert len(attributes_ids) == 2
+
+    instance._state_attributes_ids.clear()
+    with patch(
+        "homeassistant.components.recorder.core.dt_util.utcnow",
+        return_value=dt_util.utcnow() + timedelta(hours=2),
+    ):
+        instance._prewarm_state_attributes_ids()
+    assert len(instance._state_attributes_ids) == 0
+
+    instance._prewarm_state_attributes_ids()
+    assert dict(instance._state_attributes_ids.items()) == attributes_ids
+
+    # Loading them again does not count as a cache hit or miss
+    instance.queue_task(PrewarmStateAttributesIDsTask())
+    wait_recording_done(hass)
+    stats = instance.id_cache_stats["state_attributes"]
+    assert stats["size"] == 2
+    assert stats["hits"] == 0
+
+    # A state with the same attributes after a restart does
+    # not have to look up the attributes in the database
+    with patch.object(
+        instance, "_find_shared_attr_in_db", return_value=None
+    ) as find_shared_attr_in_db:
+        hass.states.set("test.one", "off", {"attr": "one"})
+        wait_recording_done(hass)
+    assert not find_shared_attr_in_db.called
+    assert instance.id_cache_stats["state_attributes"]["hits"] == 1
+
+
 async def test_async_block_till_done(hass, async_setup_recorder_instance):
     """Test we can block until recordering is done."""
     instance = await async_setup_recorder_instance(hass)
@@ -1589,7 +1803,11 @@ async def test_async_block_till_done(hass, async_setup_recorder_instance):
 
     def _fetch_states():
         with session_scope(hass=hass) as session:
-            return list(session.query(States).filter(States.entity_id == entity_id))
+            return list(
+                session.query(States)
+                .join(StatesMeta, (States.metadata_id == StatesMeta.metadata_id))
+                .filter(StatesMeta.entity_id == entity_id)
+            )
 
     await async_block_recorder(hass, 0.1)
     await instance.async_block_till_done()
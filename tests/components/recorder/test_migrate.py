@@ -6,6 +6,7 @@ import sqlite3
 import sys
 import threading
 from unittest.mock import Mock, PropertyMock, call, patch
+import uuid
 
 import pytest
 from sqlalchemy import create_engine, text
@@ -24,18 +25,40 @@ from homeassistant.components.recorder import db_schema, migration
 from homeassistant.components.recorder.const import SQLITE_URL_PREFIX
 from homeassistant.components.recorder.db_schema import (
     SCHEMA_VERSION,
+    Events,
+    EventTypes,
     RecorderRuns,
     States,
+    StatesMeta,
 )
 from homeassistant.components.recorder.statistics import get_start_time
+from homeassistant.components.recorder.tasks import (
+    EntityIDMigrationTask,
+    EventsContextIDMigrationTask,
+    EventsTimestampMigrationTask,
+    EventTypeIDMigrationTask,
+    StatesContextIDMigrationTask,
+    StatesTimestampMigrationTask,
+)
 from homeassistant.components.recorder.util import session_scope
+from homeassistant.core import HomeAssistant
 from homeassistant.helpers import recorder as recorder_helper
 from homeassistant.setup import setup_component
 import homeassistant.util.dt as dt_util
+from homeassistant.util.ulid import bytes_to_ulid
 
-from .common import async_wait_recording_done, create_engine_test, wait_recording_done
+from .common import (
+    async_recorder_block_till_done,
+    async_wait_recording_done,
+    create_engine_test,
+    wait_recording_done,
+)
 
-from tests.common import async_fire_time_changed, get_test_home_assistant
+from tests.common import (
+    SetupRecorderInstanceT,
+    async_fire_time_changed,
+    get_test_home_assistant,
+)
 
 ORIG_TZ = dt_util.DEFAULT_TIME_ZONE
 
@@ -44,7 +67,9 @@ def _get_native_states(hass, entity_id):
     with session_scope(hass=hass) as session:
         return [
             state.to_native()
-            for state in session.query(States).filter(States.entity_id == entity_id)
+            for state in session.query(States)
+            .join(StatesMeta)
+            .filter(StatesMeta.entity_id == entity_id)
         ]
 
 
@@ -587,3 +612,337 @@ def test_raise_if_exception_missing_empty_cause_str():
 
     with pytest.raises(ProgrammingError):
         migration.raise_if_exception_missing_str(programming_exc, ["not present"])
+
+
+async def test_migrate_entity_ids(
+    hass: HomeAssistant, async_setup_recorder_instance: SetupRecorderInstanceT
+):
+    """Test we can migrate entity_ids to the StatesMeta table."""
+    instance = await async_setup_recorder_instance(hass)
+    await async_wait_recording_done(hass)
+    now = dt_util.utcnow()
+
+    def _insert_states():
+        with session_scope(hass=hass) as session:
+            session.add_all(
+                (
+                    States(entity_id="sensor.one", state="one_1", last_updated=now),
+                    States(entity_id="sensor.two", state="two_1", last_updated=now),
+                    States(entity_id="sensor.two", state="two_2", last_updated=now),
+                )
+            )
+
+    await instance.async_add_executor_job(_insert_states)
+
+    instance.queue_task(EntityIDMigrationTask())
+    await async_recorder_block_till_done(hass)
+
+    def _fetch_migrated_states():
+        with session_scope(hass=hass) as session:
+            assert (
+                session.query(States).filter(States.entity_id.isnot(None)).count() == 0
+            )
+            return {
+                (entity_id, state)
+                for entity_id, state in session.query(
+                    StatesMeta.entity_id, States.state
+                )
+                .join(StatesMeta, States.metadata_id == StatesMeta.metadata_id)
+                .filter(StatesMeta.entity_id.in_(("sensor.one", "sensor.two")))
+            }
+
+    states = await instance.async_add_executor_job(_fetch_migrated_states)
+    assert states == {
+        ("sensor.one", "one_1"),
+        ("sensor.two", "two_1"),
+        ("sensor.two", "two_2"),
+    }
+
+
+async def test_migrate_event_type_ids(
+    hass: HomeAssistant, async_setup_recorder_instance: SetupRecorderInstanceT
+):
+    """Test we can migrate event_types to the EventTypes table."""
+    instance = await async_setup_recorder_instance(hass)
+    await async_wait_recording_done(hass)
+    now = dt_util.utcnow()
+
+    def _insert_events():
+        with session_scope(hass=hass) as session:
+            session.add_all(
+                (
+                    Events(event_type="event_type_one", time_fired=now),
+                    Events(event_type="event_type_one", time_fired=now),
+                    Events(event_type="event_type_two", time_fired=now),
+                )
+            )
+
+    await instance.async_add_executor_job(_insert_events)
+
+    instance.queue_task(EventTypeIDMigrationTask())
+    await async_recorder_block_till_done(hass)
+
+    def _fetch_migrated_events():
+        with session_scope(hass=hass) as session:
+            assert (
+                session.query(Events).filter(Events.event_type.isnot(None)).count() == 0
+            )
+            return [
+                event_type
+                for (event_type,) in session.query(EventTypes.event_type)
+                .join(Events, Events.event_type_id == EventTypes.event_type_id)
+                .filter(EventTypes.event_type.in_(("event_type_one", "event_type_two")))
+                .order_by(EventTypes.event_type)
+            ]
+
+    events = await instance.async_add_executor_job(_fetch_migrated_events)
+    assert events == ["event_type_one", "event_type_one", "event_type_two"]
+
+
+async def test_migrate_states_timestamps(
+    hass: HomeAssistant, async_setup_recorder_instance: SetupRecorderInstanceT
+):
+    """Test we can migrate states last_updated and last_changed to timestamps."""
+    instance = await async_setup_recorder_instance(hass)
+    await async_wait_recording_done(hass)
+    now = datetime.datetime(2022, 10, 1, 12, 0, 0, 123456, tzinfo=dt_util.UTC)
+    one_minute_ago = now - datetime.timedelta(minutes=1)
+
+    def _insert_states():
+        with session_scope(hass=hass) as session:
+            session.add_all(
+                (
+                    States(state="legacy_1", last_updated=now, last_changed=now),
+                    States(
+                        state="legacy_2", last_updated=now, last_changed=one_minute_ago
+                    ),
+                )
+            )
+            session.flush()
+            # last_updated_ts has a default so we need to clear it
+            # to simulate a row that was written before schema 32
+            session.query(States).filter(
+                States.state.in_(("legacy_1", "legacy_2"))
+            ).update({States.last_updated_ts: None}, synchronize_session=False)
+
+    await instance.async_add_executor_job(_insert_states)
+
+    instance.queue_task(StatesTimestampMigrationTask())
+    await async_recorder_block_till_done(hass)
+
+    def _fetch_migrated_states():
+        with session_scope(hass=hass) as session:
+            assert (
+                session.query(States).filter(States.last_updated.isnot(None)).count()
+                == 0
+            )
+            return {
+                state: (last_updated_ts, last_changed_ts)
+                for state, last_updated_ts, last_changed_ts in session.query(
+                    States.state, States.last_updated_ts, States.last_changed_ts
+                ).filter(States.state.in_(("legacy_1", "legacy_2")))
+            }
+
+    states = await instance.async_add_executor_job(_fetch_migrated_states)
+    assert states == {
+        "legacy_1": (now.timestamp(), None),
+        "legacy_2": (now.timestamp(), one_minute_ago.timestamp()),
+    }
+
+
+async def test_migrate_events_timestamps(
+    hass: HomeAssistant, async_setup_recorder_instance: SetupRecorderInstanceT
+):
+    """Test we can migrate events time_fired to timestamps."""
+    instance = await async_setup_recorder_instance(hass)
+    await async_wait_recording_done(hass)
+    now = datetime.datetime(2022, 10, 1, 12, 0, 0, 123456, tzinfo=dt_util.UTC)
+
+    def _insert_events():
+        with session_scope(hass=hass) as session:
+            session.add(Events(context_id="legacy", time_fired=now))
+
+    await instance.async_add_executor_job(_insert_events)
+
+    instance.queue_task(EventsTimestampMigrationTask())
+    await async_recorder_block_till_done(hass)
+
+    def _fetch_migrated_events():
+        with session_scope(hass=hass) as session:
+            assert (
+                session.query(Events).filter(Events.time_fired.isnot(None)).count() == 0
+            )
+            return [
+                time_fired_ts
+                for (time_fired_ts,) in session.query(Events.time_fired_ts).filter(
+                    Events.context_id == "legacy"
+                )
+            ]
+
+    assert await instance.async_add_executor_job(_fetch_migrated_events) == [
+        now.timestamp()
+    ]
+
+
+async def test_migrate_events_context_ids(
+    hass: HomeAssistant, async_setup_recorder_instance: SetupRecorderInstanceT
+):
+    """Test we can migrate events context ids to the binary format."""
+    instance = await async_setup_recorder_instance(hass)
+    await async_wait_recording_done(hass)
+    test_uuid = uuid.uuid4()
+    uuid_hex = test_uuid.hex
+
+    def _insert_events():
+        with session_scope(hass=hass) as session:
+            session.add_all(
+                (
+                    Events(
+                        origin_idx=1,
+                        time_fired_ts=1677721632.452529,
+                        context_id="01GTDGKBCH00GW0X476W5TVAAV",
+                        context_user_id="b400facee45711eaa9308bfd3d19e474",
+                        context_parent_id="01GTDGKBCH00GW0X476W5TVDDD",
+                    ),
+                    Events(
+                        origin_idx=1,
+                        time_fired_ts=1677721632.552529,
+                        context_id=uuid_hex,
+                        context_user_id=None,
+                        context_parent_id=None,
+                    ),
+                    Events(
+                        origin_idx=1,
+                        time_fired_ts=1677721632.652529,
+                        context_id="invalid",
+                        context_user_id="not_a_uuid",
+                        context_parent_id="invalid",
+                    ),
+                )
+            )
+
+    await instance.async_add_executor_job(_insert_events)
+
+    instance.queue_task(EventsContextIDMigrationTask())
+    await async_recorder_block_till_done(hass)
+
+    def _fetch_migrated_events():
+        with session_scope(hass=hass) as session:
+            assert (
+                session.query(Events).filter(Events.context_id.isnot(None)).count() == 0
+            )
+            return {
+                time_fired_ts: (
+                    context_id_bin,
+                    context_user_id_bin,
+                    context_parent_id_bin,
+                )
+                for (
+                    time_fired_ts,
+                    context_id_bin,
+                    context_user_id_bin,
+                    context_parent_id_bin,
+                ) in session.query(
+                    Events.time_fired_ts,
+                    Events.context_id_bin,
+                    Events.context_user_id_bin,
+                    Events.context_parent_id_bin,
+                ).filter(
+                    Events.origin_idx == 1
+                )
+            }
+
+    events = await instance.async_add_executor_job(_fetch_migrated_events)
+    assert len(events) == 3
+    ulid_event = events[1677721632.452529]
+    assert bytes_to_ulid(ulid_event[0]) == "01GTDGKBCH00GW0X476W5TVAAV"
+    assert ulid_event[1] == bytes.fromhex("b400facee45711eaa9308bfd3d19e474")
+    assert bytes_to_ulid(ulid_event[2]) == "01GTDGKBCH00GW0X476W5TVDDD"
+
+    uuid_event = events[1677721632.552529]
+    assert uuid_event == (test_uuid.bytes, None, None)
+
+    invalid_event = events[1677721632.652529]
+    # An invalid context id gets a new ulid generated at the time of the event
+    assert int.from_bytes(invalid_event[0][:6], "big") == 1677721632652
+    assert invalid_event[1:] == (None, None)
+
+
+async def test_migrate_states_context_ids(
+    hass: HomeAssistant, async_setup_recorder_instance: SetupRecorderInstanceT
+):
+    """Test we can migrate states context ids to the binary format."""
+    instance = await async_setup_recorder_instance(hass)
+    await async_wait_recording_done(hass)
+    test_uuid = uuid.uuid4()
+    uuid_hex = test_uuid.hex
+
+    def _insert_states():
+        with session_scope(hass=hass) as session:
+            session.add_all(
+                (
+                    States(
+                        state="ulid_context_id",
+                        last_updated_ts=1677721632.452529,
+                        context_id="01GTDGKBCH00GW0X476W5TVAAV",
+                        context_user_id="b400facee45711eaa9308bfd3d19e474",
+                        context_parent_id="01GTDGKBCH00GW0X476W5TVDDD",
+                    ),
+                    States(
+                        state="uuid_context_id",
+                        last_updated_ts=1677721632.552529,
+                        context_id=uuid_hex,
+                        context_user_id=None,
+                        context_parent_id=None,
+                    ),
+                    States(
+                        state="invalid_context_id",
+                        last_updated_ts=1677721632.652529,
+                        context_id="invalid",
+                        context_user_id="not_a_uuid",
+                        context_parent_id="invalid",
+                    ),
+                )
+            )
+
+    await instance.async_add_executor_job(_insert_states)
+
+    instance.queue_task(StatesContextIDMigrationTask())
+    await async_recorder_block_till_done(hass)
+
+    def _fetch_migrated_states():
+        with session_scope(hass=hass) as session:
+            assert (
+                session.query(States).filter(States.context_id.isnot(None)).count() == 0
+            )
+            return {
+                state: (context_id_bin, context_user_id_bin, context_parent_id_bin)
+                for (
+                    state,
+                    context_id_bin,
+                    context_user_id_bin,
+                    context_parent_id_bin,
+                ) in session.query(
+                    States.state,
+                    States.context_id_bin,
+                    States.context_user_id_bin,
+                    States.context_parent_id_bin,
+                ).filter(
+                    States.state.in_(
+                        ("ulid_context_id", "uuid_context_id", "invalid_context_id")
+                    )
+                )
+            }
+
+    states = await instance.async_add_executor_job(_fetch_migrated_states)
+    ulid_state = states["ulid_context_id"]
+    assert bytes_to_ulid(ulid_state[0]) == "01GTDGKBCH00GW0X476W5TVAAV"
+    assert ulid_state[1] == bytes.fromhex("b400facee45711eaa9308bfd3d19e474")
+    assert bytes_to_ulid(ulid_state[2]) == "01GTDGKBCH00GW0X476W5TVDDD"
+
+    assert states["uuid_context_id"] == (test_uuid.bytes, None, None)
+
+    invalid_state = states["invalid_context_id"]
+    # An invalid context id gets a new ulid generated at the time of the state
+    assert int.from_bytes(invalid_state[0][:6], "big") == 1677721632652
+    assert invalid_state[1:] == (None, None)
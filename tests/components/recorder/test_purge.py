@@ -9,13 +9,16 @@ from sqlalchemy.exc import DatabaseError, OperationalError
 from sqlalchemy.orm.session import Session
 
 from homeassistant.components import recorder
+from homeassistant.components.recorder import migration
 from homeassistant.components.recorder.const import MAX_ROWS_TO_PURGE, SupportedDialect
 from homeassistant.components.recorder.db_schema import (
     EventData,
     Events,
+    EventTypes,
     RecorderRuns,
     StateAttributes,
     States,
+    StatesMeta,
     StatisticsRuns,
     StatisticsShortTerm,
 )
@@ -52,6 +55,24 @@ def mock_use_sqlite(request):
         yield
 
 
+def _convert_pending_states_and_events(session: Session) -> None:
+    """Convert pending states and events to use states_meta and event_types."""
+    states = [obj for obj in session if isinstance(obj, States) and obj.entity_id]
+    events = [obj for obj in session if isinstance(obj, Events) and obj.event_type]
+    metadata_ids = migration._get_or_create_states_meta_ids(
+        session, {state.entity_id for state in states}
+    )
+    event_type_ids = migration._get_or_create_event_type_ids(
+        session, {event.event_type for event in events}
+    )
+    for state in states:
+        state.metadata_id = metadata_ids[state.entity_id]
+        state.entity_id = None
+    for event in events:
+        event.event_type_id = event_type_ids[event.event_type]
+        event.event_type = None
+
+
 async def test_purge_old_states(
     hass: HomeAssistant, async_setup_recorder_instance: SetupRecorderInstanceT
 ):
@@ -70,7 +91,11 @@ async def test_purge_old_states(
         assert states[5].old_state_id == states[4].state_id
         assert state_attributes.count() == 3
 
-        events = session.query(Events).filter(Events.event_type == "state_changed")
+        events = (
+            session.query(Events)
+            .join(EventTypes)
+            .filter(EventTypes.event_type == "state_changed")
+        )
         assert events.count() == 0
         assert "test.recorder2" in instance._old_states
 
@@ -126,7 +151,11 @@ async def test_purge_old_states(
         assert states[0].old_state_id is None
         assert states[5].old_state_id == states[4].state_id
 
-        events = session.query(Events).filter(Events.event_type == "state_changed")
+        events = (
+            session.query(Events)
+            .join(EventTypes)
+            .filter(EventTypes.event_type == "state_changed")
+        )
         assert events.count() == 0
         assert "test.recorder2" in instance._old_states
 
@@ -230,7 +259,11 @@ async def test_purge_old_events(
     await _add_test_events(hass)
 
     with session_scope(hass=hass) as session:
-        events = session.query(Events).filter(Events.event_type.like("EVENT_TEST%"))
+        events = (
+            session.query(Events)
+            .join(EventTypes)
+            .filter(EventTypes.event_type.like("EVENT_TEST%"))
+        )
         assert events.count() == 6
 
         purge_before = dt_util.utcnow() - timedelta(days=4)
@@ -354,7 +387,11 @@ async def test_purge_method(
         states = session.query(States)
         assert states.count() == 6
 
-        events = session.query(Events).filter(Events.event_type.like("EVENT_TEST%"))
+        events = (
+            session.query(Events)
+            .join(EventTypes)
+            .filter(EventTypes.event_type.like("EVENT_TEST%"))
+        )
         assert events.count() == 6
 
         statistics = session.query(StatisticsShortTerm)
@@ -385,7 +422,11 @@ async def test_purge_method(
 
     with session_scope(hass=hass) as session:
         states = session.query(States)
-        events = session.query(Events).filter(Events.event_type.like("EVENT_TEST%"))
+        events = (
+            session.query(Events)
+            .join(EventTypes)
+            .filter(EventTypes.event_type.like("EVENT_TEST%"))
+        )
         statistics = session.query(StatisticsShortTerm)
 
         # only purged old states, events and statistics
@@ -402,7 +443,11 @@ async def test_purge_method(
 
     with session_scope(hass=hass) as session:
         states = session.query(States)
-        events = session.query(Events).filter(Events.event_type.like("EVENT_TEST%"))
+        events = (
+            session.query(Events)
+            .join(EventTypes)
+            .filter(EventTypes.event_type.like("EVENT_TEST%"))
+        )
         statistics = session.query(StatisticsShortTerm)
         recorder_runs = session.query(RecorderRuns)
         statistics_runs = session.query(StatisticsRuns)
@@ -450,7 +495,7 @@ async def test_purge_edge_case(
                     event_type="EVENT_TEST_PURGE",
                     event_data="{}",
                     origin="LOCAL",
-                    time_fired=timestamp,
+                    time_fired_ts=timestamp.timestamp(),
                 )
             )
             session.add(
@@ -458,8 +503,8 @@ async def test_purge_edge_case(
                     entity_id="test.recorder2",
                     state="purgeme",
                     attributes="{}",
-                    last_changed=timestamp,
-                    last_updated=timestamp,
+                    last_changed_ts=None,
+                    last_updated_ts=timestamp.timestamp(),
                     event_id=1001,
                     attributes_id=1002,
                 )
@@ -471,6 +516,7 @@ async def test_purge_edge_case(
                     attributes_id=1002,
                 )
             )
+            _convert_pending_states_and_events(session)
 
     await async_setup_recorder_instance(hass, None)
     await async_wait_purge_done(hass)
@@ -486,7 +532,11 @@ async def test_purge_edge_case(
         state_attributes = session.query(StateAttributes)
         assert state_attributes.count() == 1
 
-        events = session.query(Events).filter(Events.event_type == "EVENT_TEST_PURGE")
+        events = (
+            session.query(Events)
+            .join(EventTypes)
+            .filter(EventTypes.event_type == "EVENT_TEST_PURGE")
+        )
         assert events.count() == 1
 
     await hass.services.async_call(recorder.DOMAIN, SERVICE_PURGE, service_data)
@@ -498,7 +548,11 @@ async def test_purge_edge_case(
     with session_scope(hass=hass) as session:
         states = session.query(States)
         assert states.count() == 0
-        events = session.query(Events).filter(Events.event_type == "EVENT_TEST_PURGE")
+        events = (
+            session.query(Events)
+            .join(EventTypes)
+            .filter(EventTypes.event_type == "EVENT_TEST_PURGE")
+        )
         assert events.count() == 0
 
 
@@ -519,7 +573,7 @@ async def test_purge_cutoff_date(
                     event_type="KEEP",
                     event_data="{}",
                     origin="LOCAL",
-                    time_fired=timestamp_keep,
+                    time_fired_ts=timestamp_keep.timestamp(),
                 )
             )
             session.add(
@@ -527,8 +581,8 @@ async def test_purge_cutoff_date(
                     entity_id="test.cutoff",
                     state="keep",
                     attributes="{}",
-                    last_changed=timestamp_keep,
-                    last_updated=timestamp_keep,
+                    last_changed_ts=None,
+                    last_updated_ts=timestamp_keep.timestamp(),
                     event_id=1000,
                     attributes_id=1000,
                 )
@@ -547,7 +601,7 @@ async def test_purge_cutoff_date(
                         event_type="PURGE",
                         event_data="{}",
                         origin="LOCAL",
-                        time_fired=timestamp_purge,
+                        time_fired_ts=timestamp_purge.timestamp(),
                     )
                 )
                 session.add(
@@ -555,8 +609,8 @@ async def test_purge_cutoff_date(
                         entity_id="test.cutoff",
                         state="purge",
                         attributes="{}",
-                        last_changed=timestamp_purge,
-                        last_updated=timestamp_purge,
+                        last_changed_ts=None,
+                        last_updated_ts=timestamp_purge.timestamp(),
                         event_id=1000 + row,
                         attributes_id=1000 + row,
                     )
@@ -568,6 +622,7 @@ async def test_purge_cutoff_date(
                         attributes_id=1000 + row,
                     )
                 )
+            _convert_pending_states_and_events(session)
 
     instance = await async_setup_recorder_instance(hass, None)
     await async_wait_purge_done(hass)
@@ -593,8 +648,13 @@ async def test_purge_cutoff_date(
             .count()
             == 1
         )
-        assert events.filter(Events.event_type == "PURGE").count() == rows - 1
-        assert events.filter(Events.event_type == "KEEP").count() == 1
+        assert (
+            events.join(EventTypes).filter(EventTypes.event_type == "PURGE").count()
+            == rows - 1
+        )
+        assert (
+            events.join(EventTypes).filter(EventTypes.event_type == "KEEP").count() == 1
+        )
 
     instance.queue_task(PurgeTask(cutoff, repack=False, apply_filter=False))
     await hass.async_block_till_done()
@@ -623,8 +683,13 @@ async def test_purge_cutoff_date(
             .count()
             == 1
         )
-        assert events.filter(Events.event_type == "PURGE").count() == 0
-        assert events.filter(Events.event_type == "KEEP").count() == 1
+        assert (
+            events.join(EventTypes).filter(EventTypes.event_type == "PURGE").count()
+            == 0
+        )
+        assert (
+            events.join(EventTypes).filter(EventTypes.event_type == "KEEP").count() == 1
+        )
 
     # Make sure we can purge everything
     instance.queue_task(PurgeTask(dt_util.utcnow(), repack=False, apply_filter=False))
@@ -680,8 +745,8 @@ async def test_purge_filtered_states(
                     entity_id="sensor.excluded",
                     state="purgeme",
                     attributes="{}",
-                    last_changed=timestamp,
-                    last_updated=timestamp,
+                    last_changed_ts=None,
+                    last_updated_ts=timestamp.timestamp(),
                 )
             )
             # Add states and state_changed events that should be keeped
@@ -706,8 +771,8 @@ async def test_purge_filtered_states(
                 entity_id="sensor.linked_old_state_id",
                 state="keep",
                 attributes="{}",
-                last_changed=timestamp,
-                last_updated=timestamp,
+                last_changed_ts=None,
+                last_updated_ts=timestamp.timestamp(),
                 old_state_id=1,
                 state_attributes=state_attrs,
             )
@@ -716,8 +781,8 @@ async def test_purge_filtered_states(
                 entity_id="sensor.linked_old_state_id",
                 state="keep",
                 attributes="{}",
-                last_changed=timestamp,
-                last_updated=timestamp,
+                last_changed_ts=None,
+                last_updated_ts=timestamp.timestamp(),
                 old_state_id=2,
                 state_attributes=state_attrs,
             )
@@ -725,8 +790,8 @@ async def test_purge_filtered_states(
                 entity_id="sensor.linked_old_state_id",
                 state="keep",
                 attributes="{}",
-                last_changed=timestamp,
-                last_updated=timestamp,
+                last_changed_ts=None,
+                last_updated_ts=timestamp.timestamp(),
                 old_state_id=62,  # keep
                 state_attributes=state_attrs,
             )
@@ -738,9 +803,10 @@ async def test_purge_filtered_states(
                     event_type="EVENT_KEEP",
                     event_data="{}",
                     origin="LOCAL",
-                    time_fired=timestamp,
+                    time_fired_ts=timestamp.timestamp(),
                 )
             )
+            _convert_pending_states_and_events(session)
 
     service_data = {"keep_days": 10}
     _add_db_entries(hass)
@@ -749,10 +815,16 @@ async def test_purge_filtered_states(
         states = session.query(States)
         assert states.count() == 74
 
-        events_state_changed = session.query(Events).filter(
-            Events.event_type == EVENT_STATE_CHANGED
+        events_state_changed = (
+            session.query(Events)
+            .join(EventTypes)
+            .filter(EventTypes.event_type == EVENT_STATE_CHANGED)
+        )
+        events_keep = (
+            session.query(Events)
+            .join(EventTypes)
+            .filter(EventTypes.event_type == "EVENT_KEEP")
         )
-        events_keep = session.query(Events).filter(Events.event_type == "EVENT_KEEP")
         assert events_state_changed.count() == 70
         assert events_keep.count() == 1
 
@@ -766,11 +838,17 @@ async def test_purge_filtered_states(
     with session_scope(hass=hass) as session:
         states = session.query(States)
         assert states.count() == 74
-        events_state_changed = session.query(Events).filter(
-            Events.event_type == EVENT_STATE_CHANGED
+        events_state_changed = (
+            session.query(Events)
+            .join(EventTypes)
+            .filter(EventTypes.event_type == EVENT_STATE_CHANGED)
         )
         assert events_state_changed.count() == 70
-        events_keep = session.query(Events).filter(Events.event_type == "EVENT_KEEP")
+        events_keep = (
+            session.query(Events)
+            .join(EventTypes)
+            .filter(EventTypes.event_type == "EVENT_KEEP")
+        )
         assert events_keep.count() == 1
 
     # Test with 'apply_filter' = True
@@ -787,15 +865,23 @@ async def test_purge_filtered_states(
     with session_scope(hass=hass) as session:
         states = session.query(States)
         assert states.count() == 13
-        events_state_changed = session.query(Events).filter(
-            Events.event_type == EVENT_STATE_CHANGED
+        events_state_changed = (
+            session.query(Events)
+            .join(EventTypes)
+            .filter(EventTypes.event_type == EVENT_STATE_CHANGED)
         )
         assert events_state_changed.count() == 10
-        events_keep = session.query(Events).filter(Events.event_type == "EVENT_KEEP")
+        events_keep = (
+            session.query(Events)
+            .join(EventTypes)
+            .filter(EventTypes.event_type == "EVENT_KEEP")
+        )
         assert events_keep.count() == 1
 
-        states_sensor_excluded = session.query(States).filter(
-            States.entity_id == "sensor.excluded"
+        states_sensor_excluded = (
+            session.query(States)
+            .join(StatesMeta)
+            .filter(StatesMeta.entity_id == "sensor.excluded")
         )
         assert states_sensor_excluded.count() == 0
 
@@ -859,6 +945,7 @@ async def test_purge_filtered_states_to_empty(
                         timestamp,
                         event_id * days,
                     )
+            _convert_pending_states_and_events(session)
 
     service_data = {"keep_days": 10}
     _add_db_entries(hass)
@@ -910,8 +997,8 @@ async def test_purge_without_state_attributes_filtered_states_to_empty(
                     entity_id="sensor.old_format",
                     state=STATE_ON,
                     attributes=json.dumps({"old": "not_using_state_attributes"}),
-                    last_changed=timestamp,
-                    last_updated=timestamp,
+                    last_changed_ts=None,
+                    last_updated_ts=timestamp.timestamp(),
                     event_id=event_id,
                     state_attributes=None,
                 )
@@ -922,7 +1009,7 @@ async def test_purge_without_state_attributes_filtered_states_to_empty(
                     event_type=EVENT_STATE_CHANGED,
                     event_data="{}",
                     origin="LOCAL",
-                    time_fired=timestamp,
+                    time_fired_ts=timestamp.timestamp(),
                 )
             )
             session.add(
@@ -931,9 +1018,10 @@ async def test_purge_without_state_attributes_filtered_states_to_empty(
                     event_type=EVENT_THEMES_UPDATED,
                     event_data="{}",
                     origin="LOCAL",
-                    time_fired=timestamp,
+                    time_fired_ts=timestamp.timestamp(),
                 )
             )
+            _convert_pending_states_and_events(session)
 
     service_data = {"keep_days": 10}
     _add_db_entries(hass)
@@ -983,7 +1071,7 @@ async def test_purge_filtered_events(
                             event_type="EVENT_PURGE",
                             event_data="{}",
                             origin="LOCAL",
-                            time_fired=timestamp,
+                            time_fired_ts=timestamp.timestamp(),
                         )
                     )
 
@@ -997,14 +1085,21 @@ async def test_purge_filtered_events(
                     timestamp,
                     event_id,
                 )
+            _convert_pending_states_and_events(session)
 
     service_data = {"keep_days": 10}
     _add_db_entries(hass)
 
     with session_scope(hass=hass) as session:
-        events_purge = session.query(Events).filter(Events.event_type == "EVENT_PURGE")
-        events_keep = session.query(Events).filter(
-            Events.event_type == EVENT_STATE_CHANGED
+        events_purge = (
+            session.query(Events)
+            .join(EventTypes)
+            .filter(EventTypes.event_type == "EVENT_PURGE")
+        )
+        events_keep = (
+            session.query(Events)
+            .join(EventTypes)
+            .filter(EventTypes.event_type == EVENT_STATE_CHANGED)
         )
         states = session.query(States)
 
@@ -1020,9 +1115,15 @@ async def test_purge_filtered_events(
     await async_wait_purge_done(hass)
 
     with session_scope(hass=hass) as session:
-        events_purge = session.query(Events).filter(Events.event_type == "EVENT_PURGE")
-        events_keep = session.query(Events).filter(
-            Events.event_type == EVENT_STATE_CHANGED
+        events_purge = (
+            session.query(Events)
+            .join(EventTypes)
+            .filter(EventTypes.event_type == "EVENT_PURGE")
+        )
+        events_keep = (
+            session.query(Events)
+            .join(EventTypes)
+            .filter(EventTypes.event_type == EVENT_STATE_CHANGED)
         )
         states = session.query(States)
         assert events_purge.count() == 60
@@ -1041,9 +1142,15 @@ async def test_purge_filtered_events(
     await async_wait_purge_done(hass)
 
     with session_scope(hass=hass) as session:
-        events_purge = session.query(Events).filter(Events.event_type == "EVENT_PURGE")
-        events_keep = session.query(Events).filter(
-            Events.event_type == EVENT_STATE_CHANGED
+        events_purge = (
+            session.query(Events)
+            .join(EventTypes)
+            .filter(EventTypes.event_type == "EVENT_PURGE")
+        )
+        events_keep = (
+            session.query(Events)
+            .join(EventTypes)
+            .filter(EventTypes.event_type == EVENT_STATE_CHANGED)
         )
         states = session.query(States)
         assert events_purge.count() == 0
@@ -1083,7 +1190,7 @@ async def test_purge_filtered_events_state_changed(
                         event_type="EVENT_KEEP",
                         event_data="{}",
                         origin="LOCAL",
-                        time_fired=timestamp,
+                        time_fired_ts=timestamp.timestamp(),
                     )
                 )
             # Add states with linked old_state_ids that need to be handled
@@ -1092,8 +1199,8 @@ async def test_purge_filtered_events_state_changed(
                 entity_id="sensor.linked_old_state_id",
                 state="keep",
                 attributes="{}",
-                last_changed=timestamp,
-                last_updated=timestamp,
+                last_changed_ts=None,
+                last_updated_ts=timestamp.timestamp(),
                 old_state_id=1,
             )
             timestamp = dt_util.utcnow() - timedelta(days=4)
@@ -1101,27 +1208,34 @@ async def test_purge_filtered_events_state_changed(
                 entity_id="sensor.linked_old_state_id",
                 state="keep",
                 attributes="{}",
-                last_changed=timestamp,
-                last_updated=timestamp,
+                last_changed_ts=None,
+                last_updated_ts=timestamp.timestamp(),
                 old_state_id=2,
             )
             state_3 = States(
                 entity_id="sensor.linked_old_state_id",
                 state="keep",
                 attributes="{}",
-                last_changed=timestamp,
-                last_updated=timestamp,
+                last_changed_ts=None,
+                last_updated_ts=timestamp.timestamp(),
                 old_state_id=62,  # keep
             )
             session.add_all((state_1, state_2, state_3))
+            _convert_pending_states_and_events(session)
 
     service_data = {"keep_days": 10, "apply_filter": True}
     _add_db_entries(hass)
 
     with session_scope(hass=hass) as session:
-        events_keep = session.query(Events).filter(Events.event_type == "EVENT_KEEP")
-        events_purge = session.query(Events).filter(
-            Events.event_type == EVENT_STATE_CHANGED
+        events_keep = (
+            session.query(Events)
+            .join(EventTypes)
+            .filter(EventTypes.event_type == "EVENT_KEEP")
+        )
+        events_purge = (
+            session.query(Events)
+            .join(EventTypes)
+            .filter(EventTypes.event_type == EVENT_STATE_CHANGED)
         )
         states = session.query(States)
 
@@ -1139,9 +1253,15 @@ async def test_purge_filtered_events_state_changed(
     await async_wait_purge_done(hass)
 
     with session_scope(hass=hass) as session:
-        events_keep = session.query(Events).filter(Events.event_type == "EVENT_KEEP")
-        events_purge = session.query(Events).filter(
-            Events.event_type == EVENT_STATE_CHANGED
+        events_keep = (
+            session.query(Events)
+            .join(EventTypes)
+            .filter(EventTypes.event_type == "EVENT_KEEP")
+        )
+        events_purge = (
+            session.query(Events)
+            .join(EventTypes)
+            .filter(EventTypes.event_type == EVENT_STATE_CHANGED)
         )
         states = session.query(States)
 
@@ -1154,6 +1274,111 @@ async def test_purge_filtered_events_state_changed(
         assert session.query(States).get(63).old_state_id == 62  # should have been kept
 
 
+async def test_purge_filtered_legacy_rows_during_migration(
+    hass: HomeAssistant,
+    async_setup_recorder_instance: SetupRecorderInstanceT,
+):
+    """Test filtered rows that still use the legacy entity_id and event_type are purged."""
+    config: ConfigType = {
+        "exclude": {"entities": ["sensor.excluded"], "event_types": ["EVENT_PURGE"]}
+    }
+    instance = await async_setup_recorder_instance(hass, config)
+    await async_wait_recording_done(hass)
+
+    def _add_legacy_db_entries(hass: HomeAssistant) -> None:
+        timestamp = (dt_util.utcnow() - timedelta(days=1)).timestamp()
+        with session_scope(hass=hass) as session:
+            for entity_id in ("sensor.excluded", "sensor.excluded", "sensor.keep"):
+                session.add(
+                    States(entity_id=entity_id, state="on", last_updated_ts=timestamp)
+                )
+            for event_type in ("EVENT_PURGE", "EVENT_PURGE", "EVENT_KEEP"):
+                session.add(
+                    Events(
+                        event_type=event_type,
+                        event_data="{}",
+                        origin_idx=0,
+                        time_fired_ts=timestamp,
+                    )
+                )
+
+    await instance.async_add_executor_job(_add_legacy_db_entries, hass)
+    instance.states_meta_migrated = False
+    instance.event_types_migrated = False
+
+    service_data = {"keep_days": 10, "apply_filter": True}
+    for _ in range(2):
+        await hass.services.async_call(recorder.DOMAIN, SERVICE_PURGE, service_data)
+        await hass.async_block_till_done()
+        await async_recorder_block_till_done(hass)
+        await async_wait_purge_done(hass)
+
+    with session_scope(hass=hass) as session:
+        assert [state.entity_id for state in session.query(States)] == ["sensor.keep"]
+        legacy_events = session.query(Events).filter(Events.event_type.isnot(None))
+        assert [event.event_type for event in legacy_events] == ["EVENT_KEEP"]
+
+    await hass.services.async_call(
+        recorder.DOMAIN, SERVICE_PURGE_ENTITIES, {"entity_id": "sensor.keep"}
+    )
+    await hass.async_block_till_done()
+    await async_recorder_block_till_done(hass)
+    await async_wait_purge_done(hass)
+
+    with session_scope(hass=hass) as session:
+        assert session.query(States).count() == 0
+
+
+async def test_purge_legacy_datetime_rows_during_migration(
+    hass: HomeAssistant,
+    async_setup_recorder_instance: SetupRecorderInstanceT,
+):
+    """Test rows that still use the legacy datetime columns are purged."""
+    instance = await async_setup_recorder_instance(hass)
+    await async_wait_recording_done(hass)
+
+    def _add_legacy_db_entries(hass: HomeAssistant) -> None:
+        with session_scope(hass=hass) as session:
+            for days in (5, 0):
+                timestamp = dt_util.utcnow() - timedelta(days=days)
+                session.add(
+                    States(
+                        entity_id=f"sensor.legacy_{days}",
+                        state="on",
+                        last_changed=timestamp,
+                        last_updated=timestamp,
+                    )
+                )
+                session.add(
+                    Events(
+                        event_type=f"EVENT_LEGACY_{days}",
+                        event_data="{}",
+                        origin_idx=0,
+                        time_fired=timestamp,
+                    )
+                )
+            session.flush()
+            # The legacy rows were written before the timestamp columns existed
+            session.query(States).filter(States.last_updated.isnot(None)).update(
+                {States.last_updated_ts: None}
+            )
+
+    await instance.async_add_executor_job(_add_legacy_db_entries, hass)
+    instance.states_timestamps_migrated = False
+    instance.events_timestamps_migrated = False
+
+    await hass.services.async_call(recorder.DOMAIN, SERVICE_PURGE, {"keep_days": 1})
+    await hass.async_block_till_done()
+    await async_recorder_block_till_done(hass)
+    await async_wait_purge_done(hass)
+
+    with session_scope(hass=hass) as session:
+        legacy_states = session.query(States).filter(States.last_updated.isnot(None))
+        assert [state.entity_id for state in legacy_states] == ["sensor.legacy_0"]
+        legacy_events = session.query(Events).filter(Events.time_fired.isnot(None))
+        assert [event.event_type for event in legacy_events] == ["EVENT_LEGACY_0"]
+
+
 async def test_purge_entities(
     hass: HomeAssistant, async_setup_recorder_instance: SetupRecorderInstanceT
 ):
@@ -1206,6 +1431,7 @@ async def test_purge_entities(
                         timestamp,
                         event_id * days,
                     )
+            _convert_pending_states_and_events(session)
 
     def _add_keep_records(hass: HomeAssistant) -> None:
         with session_scope(hass=hass) as session:
@@ -1219,6 +1445,7 @@ async def test_purge_entities(
                     timestamp,
                     event_id,
                 )
+            _convert_pending_states_and_events(session)
 
     _add_purge_records(hass)
     _add_keep_records(hass)
@@ -1234,8 +1461,10 @@ async def test_purge_entities(
         states = session.query(States)
         assert states.count() == 10
 
-        states_sensor_kept = session.query(States).filter(
-            States.entity_id == "sensor.keep"
+        states_sensor_kept = (
+            session.query(States)
+            .join(StatesMeta)
+            .filter(StatesMeta.entity_id == "sensor.keep")
         )
         assert states_sensor_kept.count() == 10
 
@@ -1264,8 +1493,10 @@ async def test_purge_entities(
         states = session.query(States)
         assert states.count() == 10
 
-        states_sensor_kept = session.query(States).filter(
-            States.entity_id == "sensor.keep"
+        states_sensor_kept = (
+            session.query(States)
+            .join(StatesMeta)
+            .filter(StatesMeta.entity_id == "sensor.keep")
         )
         assert states_sensor_kept.count() == 10
 
@@ -1345,9 +1576,10 @@ async def _add_test_events(hass: HomeAssistant, iterations: int = 1):
                         event_type=event_type,
                         event_data=json.dumps(event_data),
                         origin="LOCAL",
-                        time_fired=timestamp,
+                        time_fired_ts=timestamp.timestamp(),
                     )
                 )
+        _convert_pending_states_and_events(session)
 
 
 async def _add_events_with_event_data(hass: HomeAssistant, iterations: int = 1):
@@ -1382,10 +1614,11 @@ async def _add_events_with_event_data(hass: HomeAssistant, iterations: int = 1):
                     Events(
                         event_type=event_type,
                         origin="LOCAL",
-                        time_fired=timestamp,
+                        time_fired_ts=timestamp.timestamp(),
                         event_data_rel=event_data,
                     )
                 )
+        _convert_pending_states_and_events(session)
 
 
 async def _add_test_statistics(hass: HomeAssistant):
@@ -1484,8 +1717,8 @@ def _add_state_without_event_linkage(
             entity_id=entity_id,
             state=state,
             attributes=None,
-            last_changed=timestamp,
-            last_updated=timestamp,
+            last_changed_ts=None,
+            last_updated_ts=timestamp.timestamp(),
             event_id=None,
             state_attributes=state_attrs,
         )
@@ -1509,8 +1742,8 @@ def _add_state_and_state_changed_event(
             entity_id=entity_id,
             state=state,
             attributes=None,
-            last_changed=timestamp,
-            last_updated=timestamp,
+            last_changed_ts=None,
+            last_updated_ts=timestamp.timestamp(),
             event_id=event_id,
             state_attributes=state_attrs,
         )
@@ -1521,7 +1754,7 @@ def _add_state_and_state_changed_event(
             event_type=EVENT_STATE_CHANGED,
             event_data="{}",
             origin="LOCAL",
-            time_fired=timestamp,
+            time_fired_ts=timestamp.timestamp(),
         )
     )
 
@@ -1535,7 +1768,11 @@ async def test_purge_many_old_events(
     await _add_test_events(hass, MAX_ROWS_TO_PURGE)
 
     with session_scope(hass=hass) as session:
-        events = session.query(Events).filter(Events.event_type.like("EVENT_TEST%"))
+        events = (
+            session.query(Events)
+            .join(EventTypes)
+            .filter(EventTypes.event_type.like("EVENT_TEST%"))
+        )
         event_datas = session.query(EventData)
         assert events.count() == MAX_ROWS_TO_PURGE * 6
         assert event_datas.count() == 5
@@ -1590,8 +1827,8 @@ async def test_purge_can_mix_legacy_and_new_format(
         broken_state_no_time = States(
             event_id=None,
             entity_id="orphened.state",
-            last_updated=None,
-            last_changed=None,
+            last_updated_ts=None,
+            last_changed_ts=None,
         )
         session.add(broken_state_no_time)
         start_id = 50000
@@ -0,0 +1,172 @@
+"""The tests for the buffers used to compile statistics."""
+# pylint: disable=protected-access
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+from pytest import approx
+
+from homeassistant.components import recorder
+from homeassistant.components.recorder import statistics
+from homeassistant.components.recorder.statistics import statistics_during_period
+from homeassistant.components.recorder.statistics_buffer import (
+    HourlyStatisticsBuffer,
+    StatesBuffer,
+)
+from homeassistant.const import EVENT_STATE_CHANGED
+from homeassistant.core import Event, State
+from homeassistant.setup import setup_component
+import homeassistant.util.dt as dt_util
+
+from .common import do_adhoc_statistics, wait_recording_done
+
+HOUR_START = datetime(2022, 10, 1, 12, tzinfo=dt_util.UTC)
+POWER_SENSOR_ATTRIBUTES = {
+    "device_class": "power",
+    "state_class": "measurement",
+    "unit_of_measurement": "kW",
+}
+
+
+def _state_changed(entity_id: str, state: str | None, time: datetime) -> Event:
+    """Return a state_changed event."""
+    new_state = None
+    if state is not None:
+        new_state = State(entity_id, state, {"state_class": "measurement"}, time, time)
+    return Event(
+        EVENT_STATE_CHANGED,
+        {"entity_id": entity_id, "new_state": new_state},
+        time_fired=time,
+    )
+
+
+def test_states_buffer() -> None:
+    """Test the buffer returns the states like the history does."""
+    buffer = StatesBuffer(HOUR_START - timedelta(hours=1))
+    for minute, state in ((-1, "0"), (1, "1"), (3, "2"), (6, "3")):
+        buffer.add_event(
+            _state_changed(
+                "sensor.power", state, HOUR_START + timedelta(minutes=minute)
+            )
+        )
+    buffer.add_event(_state_changed("light.kitchen", "on", HOUR_START))
+    buffer.add_event(
+        _state_changed("sensor.new", "1", HOUR_START + timedelta(minutes=1))
+    )
+    assert buffer.states_count == 5
+
+    start = HOUR_START + timedelta(seconds=30)
+    end = start + timedelta(minutes=5)
+    states, not_buffered = buffer.get_full_significant_states(
+        start, end, ["sensor.power", "sensor.new", "sensor.unknown"]
+    )
+    # The state at the start of the period is not buffered for the new entity
+    assert not_buffered == ["sensor.new", "sensor.unknown"]
+    assert [state.state for state in states["sensor.power"]] == ["0", "1", "2"]
+    assert states["sensor.power"][0].last_updated == start
+
+    # The state at the start is kept when pruning
+    buffer.prune(start)
+    assert buffer.states_count == 5
+    buffer.prune(end)
+    assert buffer.states_count == 3
+    states, not_buffered = buffer.get_full_significant_states(
+        start, end, ["sensor.power"]
+    )
+    assert not_buffered == ["sensor.power"]
+
+    # Removing an entity is recorded as an empty state
+    removed = HOUR_START + timedelta(minutes=7)
+    buffer.add_event(_state_changed("sensor.power", None, removed))
+    states, _ = buffer.get_full_significant_states(
+        removed + timedelta(minutes=1), removed + timedelta(minutes=6), ["sensor.power"]
+    )
+    assert [state.state for state in states["sensor.power"]] == [""]
+
+    buffer.clear(removed)
+    assert buffer.states_count == 0
+    # The states updated before the buffer covers are not buffered
+    buffer.add_event(_state_changed("sensor.power", "1", HOUR_START))
+    assert buffer.states_count == 0
+
+
+def test_hourly_statistics_buffer() -> None:
+    """Test the short-term statistics are only summarized for a full hour."""
+    buffer = HourlyStatisticsBuffer()
+    for period in range(12):
+        start = HOUR_START + timedelta(minutes=5 * period)
+        assert buffer.summary(HOUR_START) is None
+        buffer.add_period(
+            start,
+            {
+                1: {"start": start, "mean": period, "min": period, "max": period + 1},
+                2: {"start": start, "last_reset": None, "state": period, "sum": 2},
+            },
+        )
+    # Adding a period again replaces it
+    buffer.add_period(
+        HOUR_START,
+        {1: {"start": HOUR_START, "mean": 12, "min": -1, "max": 0}},
+    )
+
+    assert buffer.summary(HOUR_START + timedelta(hours=1)) is None
+    assert buffer.summary(HOUR_START) == {
+        1: {
+            "start": HOUR_START,
+            "mean": 6.5,
+            "min": -1,
+            "max": 12,
+            "last_reset": None,
+            "state": None,
+            "sum": None,
+        },
+        2: {
+            "start": HOUR_START,
+            "mean": None,
+            "min": None,
+            "max": None,
+            "last_reset": None,
+            "state": 11,
+            "sum": 2,
+        },
+    }
+
+    # A period of the next hour starts a new summary
+    buffer.add_period(HOUR_START + timedelta(hours=1), {})
+    assert buffer.summary(HOUR_START) is None
+    buffer.clear()
+    assert buffer.summary(HOUR_START) is None
+
+
+def test_compile_hourly_statistics_from_buffer(hass_recorder, caplog):
+    """Test the hourly statistics are summarized from the buffered statistics."""
+    hass = hass_recorder({"verify_statistics": True})
+    instance = recorder.get_instance(hass)
+    setup_component(hass, "sensor", {})
+    wait_recording_done(hass)
+    hass.states.set("sensor.power", "10", POWER_SENSOR_ATTRIBUTES)
+    wait_recording_done(hass)
+
+    hour_start = dt_util.utcnow().replace(minute=0, second=0, microsecond=0)
+    hour_start += timedelta(hours=1)
+    with patch.object(
+        statistics,
+        "_compile_hourly_statistics_summary",
+        wraps=statistics._compile_hourly_statistics_summary,
+    ) as summary_from_database:
+        for period in range(12):
+            do_adhoc_statistics(hass, start=hour_start + timedelta(minutes=5 * period))
+        wait_recording_done(hass)
+    # Only called to verify the buffered statistics
+    assert summary_from_database.call_count == 1
+    assert "differ from the database" not in caplog.text
+
+    stats = statistics_during_period(hass, hour_start, period="hour")
+    assert len(stats["sensor.power"]) == 1
+    assert stats["sensor.power"][0]["mean"] == approx(10.0)
+    assert stats["sensor.power"][0]["max"] == approx(10.0)
+
+    # Changing the short-term statistics drops the buffered statistics
+    assert instance.hourly_statistics.summary(hour_start) is not None
+    hass.add_job(instance.async_clear_statistics, ["sensor.other"])
+    wait_recording_done(hass)
+    assert instance.hourly_statistics.summary(hour_start) is None
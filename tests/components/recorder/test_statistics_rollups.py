@@ -0,0 +1,175 @@
+"""The tests for the daily and monthly rollups of the long term statistics."""
+from datetime import timedelta
+
+import pytest
+from pytest import approx
+
+from homeassistant.components import recorder
+from homeassistant.components.recorder.db_schema import StatisticsRollupRuns
+from homeassistant.components.recorder.models import process_timestamp
+from homeassistant.components.recorder.statistics import (
+    async_add_external_statistics,
+    statistics_during_period,
+)
+from homeassistant.components.recorder.util import session_scope
+import homeassistant.util.dt as dt_util
+
+from .common import wait_recording_done
+
+MEAN_METADATA = {
+    "has_mean": True,
+    "has_sum": False,
+    "name": "Carbon dioxide",
+    "source": "test",
+    "statistic_id": "test:carbon_dioxide",
+    "unit_of_measurement": "ppm",
+}
+SUM_METADATA = {
+    "has_mean": False,
+    "has_sum": True,
+    "name": "Total imported energy",
+    "source": "test",
+    "statistic_id": "test:total_energy_import",
+    "unit_of_measurement": "kWh",
+}
+
+
+def _add_statistics(hass, first_hour, hours):
+    """Add hourly statistics, the sum is only added every 5 hours."""
+    mean_statistics = []
+    sum_statistics = []
+    for hour in range(hours):
+        start = first_hour + timedelta(hours=hour)
+        mean_statistics.append(
+            {
+                "start": start,
+                "mean": hour % 7 + 0.1,
+                "min": hour % 7 - 0.5,
+                "max": hour % 11,
+            }
+        )
+        if hour % 5 == 0:
+            sum_statistics.append(
+                {"start": start, "last_reset": None, "state": hour, "sum": hour * 2}
+            )
+    async_add_external_statistics(hass, MEAN_METADATA, mean_statistics)
+    async_add_external_statistics(hass, SUM_METADATA, sum_statistics)
+
+
+def _wait_rollups_done(hass):
+    """Wait for the rollup tasks, which requeue themselves."""
+    for _ in range(10):
+        wait_recording_done(hass)
+
+
+def _rollup_runs(hass, period):
+    """Return the start of the rolled up periods."""
+    with session_scope(hass=hass) as session:
+        return sorted(
+            dt_util.as_local(process_timestamp(start)).date().isoformat()
+            for (start,) in session.query(StatisticsRollupRuns.start).filter(
+                StatisticsRollupRuns.period == period
+            )
+        )
+
+
+def _assert_same_as_hourly(hass, start_time, end_time, period, statistic_ids=None):
+    """Assert the statistics read with the rollups match the reduced hourly ones."""
+    instance = recorder.get_instance(hass)
+    rolled_up = statistics_during_period(
+        hass, start_time, end_time, statistic_ids, period
+    )
+    instance.statistics_rollups = False
+    reduced = statistics_during_period(
+        hass, start_time, end_time, statistic_ids, period
+    )
+    instance.statistics_rollups = True
+
+    assert list(rolled_up) == list(reduced)
+    for statistic_id, stats in reduced.items():
+        assert len(rolled_up[statistic_id]) == len(stats)
+        for rolled_up_stat, stat in zip(rolled_up[statistic_id], stats):
+            assert rolled_up_stat == {
+                key: value if value is None or isinstance(value, str) else approx(value)
+                for key, value in stat.items()
+            }
+    return rolled_up
+
+
+@pytest.mark.parametrize("timezone", ["America/Regina", "Europe/Vienna", "UTC"])
+@pytest.mark.freeze_time("2022-10-06 12:00:00+00:00")
+def test_rolled_up_statistics(hass_recorder, timezone):
+    """Test the daily and monthly statistics are read from the rollups."""
+    dt_util.set_default_time_zone(dt_util.get_time_zone(timezone))
+    hass = hass_recorder({"statistics_rollups": True})
+    wait_recording_done(hass)
+
+    first_hour = dt_util.as_utc(dt_util.parse_datetime("2022-08-30 03:00:00"))
+    _add_statistics(hass, first_hour, 24 * 40)
+    _wait_rollups_done(hass)
+
+    # The periods are rolled up until the last compiled hour
+    assert _rollup_runs(hass, "month") == ["2022-08-01", "2022-09-01"]
+    days = _rollup_runs(hass, "day")
+    assert days[0] == "2022-08-30"
+    assert days[-1] == "2022-10-05"
+    assert len(days) == 37
+
+    zero = dt_util.as_utc(dt_util.parse_datetime("2022-08-01 00:00:00"))
+    stats = _assert_same_as_hourly(hass, zero, None, "month")
+    assert len(stats["test:carbon_dioxide"]) == 3
+    stats = _assert_same_as_hourly(hass, zero, None, "day")
+    assert len(stats["test:carbon_dioxide"]) == 41
+
+    # The days which are partially read are reduced from the hourly statistics
+    start_time = dt_util.as_utc(dt_util.parse_datetime("2022-09-02 00:00:00"))
+    end_time = dt_util.as_utc(dt_util.parse_datetime("2022-09-09 15:00:00"))
+    _assert_same_as_hourly(hass, start_time, end_time, "day")
+    _assert_same_as_hourly(hass, start_time, end_time, "month")
+    _assert_same_as_hourly(
+        hass, start_time + timedelta(hours=7), end_time, "day", ["test:carbon_dioxide"]
+    )
+    _assert_same_as_hourly(
+        hass,
+        start_time,
+        None,
+        "day",
+        ["not", "the", "test:total_energy_import", "test:carbon_dioxide"],
+    )
+
+
+@pytest.mark.freeze_time("2022-10-06 12:00:00+00:00")
+def test_rollups_changed_statistics(hass_recorder):
+    """Test the periods are rolled up again when the statistics change."""
+    hass = hass_recorder({"statistics_rollups": True})
+    instance = recorder.get_instance(hass)
+    wait_recording_done(hass)
+
+    first_hour = dt_util.as_utc(dt_util.parse_datetime("2022-09-25 00:00:00"))
+    _add_statistics(hass, first_hour, 24 * 10)
+    _wait_rollups_done(hass)
+    zero = dt_util.as_utc(dt_util.parse_datetime("2022-09-01 00:00:00"))
+    before = statistics_during_period(hass, zero, period="day")
+
+    # Adjusting the sum rolls up the days from the adjusted hour again
+    adjusted = dt_util.as_utc(dt_util.parse_datetime("2022-10-01 05:00:00"))
+    hass.add_job(
+        instance.async_adjust_statistics, "test:total_energy_import", adjusted, 100
+    )
+    _wait_rollups_done(hass)
+    assert len(_rollup_runs(hass, "day")) == 11
+    after = _assert_same_as_hourly(hass, zero, None, "day")
+    assert after["test:total_energy_import"][5]["sum"] == approx(
+        before["test:total_energy_import"][5]["sum"]
+    )
+    assert after["test:total_energy_import"][6]["sum"] == approx(
+        before["test:total_energy_import"][6]["sum"] + 100
+    )
+
+    # Importing the statistics again rolls up the days again
+    _add_statistics(hass, first_hour + timedelta(hours=1), 24 * 3)
+    _wait_rollups_done(hass)
+    assert len(_rollup_runs(hass, "day")) == 11
+    assert _rollup_runs(hass, "month") == ["2022-09-01"]
+    _assert_same_as_hourly(hass, zero, None, "day")
+    _assert_same_as_hourly(hass, zero, None, "month")
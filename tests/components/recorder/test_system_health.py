@@ -26,6 +26,8 @@ async def test_recorder_system_health(hass, recorder_mock):
         "estimated_db_size": ANY,
         "database_engine": SupportedDialect.SQLITE.value,
         "database_version": ANY,
+        "state_attributes_cache": "0 hits, 0 misses, 0 evictions",
+        "event_data_cache": ANY,
     }
 
 
@@ -50,6 +52,8 @@ async def test_recorder_system_health_alternate_dbms(hass, recorder_mock, dialec
         "estimated_db_size": "1.00 MiB",
         "database_engine": dialect_name.value,
         "database_version": ANY,
+        "state_attributes_cache": ANY,
+        "event_data_cache": ANY,
     }
 
 
@@ -81,6 +85,8 @@ async def test_recorder_system_health_db_url_missing_host(
         "estimated_db_size": "1.00 MiB",
         "database_engine": dialect_name.value,
         "database_version": ANY,
+        "state_attributes_cache": ANY,
+        "event_data_cache": ANY,
     }
 
 
@@ -99,4 +105,6 @@ async def test_recorder_system_health_crashed_recorder_runs_table(
         "estimated_db_size": ANY,
         "database_engine": SupportedDialect.SQLITE.value,
         "database_version": ANY,
+        "state_attributes_cache": ANY,
+        "event_data_cache": ANY,
     }
@@ -735,8 +735,9 @@ def test_execute_stmt_lambda_element(hass_recorder):
 
     with session_scope(hass=hass) as session:
         # No time window, we always get a list
+        metadata_ids = history._get_metadata_ids(session, ["sensor.on"])
         stmt = history._get_single_entity_states_stmt(
-            instance.schema_version, dt_util.utcnow(), "sensor.on", False
+            dt_util.utcnow(), ["sensor.on"], metadata_ids, False
         )
         rows = util.execute_stmt_lambda_element(session, stmt)
         assert isinstance(rows, list)
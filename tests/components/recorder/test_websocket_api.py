@@ -634,6 +634,7 @@ async def test_recorder_info(hass, hass_ws_client, recorder_mock):
     assert response["result"] == {
         "backlog": 0,
         "max_backlog": 40000,
+        "read_backlog": 0,
         "migration_in_progress": False,
         "migration_is_live": False,
         "recording": True,
@@ -641,6 +642,48 @@ async def test_recorder_info(hass, hass_ws_client, recorder_mock):
     }
 
 
+async def test_recorder_id_cache_stats(hass, hass_ws_client, recorder_mock):
+    """Test getting the id cache stats."""
+    client = await hass_ws_client()
+
+    for state in ("on", "off", "on"):
+        hass.states.async_set("test.recorder", state, {"attr": "value"})
+    await async_wait_recording_done(hass)
+    hass.states.async_set("test.recorder", "off", {"attr": "value"})
+    await async_wait_recording_done(hass)
+
+    await client.send_json({"id": 1, "type": "recorder/id_cache_stats"})
+    response = await client.receive_json()
+    assert response["success"]
+    assert response["result"]["state_attributes"] == {
+        "size": 1,
+        "max_size": 2048,
+        "hits": 3,
+        "misses": 1,
+        "evictions": 0,
+    }
+    assert set(response["result"]["event_data"]) == {
+        "size",
+        "max_size",
+        "hits",
+        "misses",
+        "evictions",
+    }
+
+
+async def test_recorder_id_cache_stats_requires_admin(
+    hass, hass_ws_client, hass_admin_user, recorder_mock
+):
+    """Test getting the id cache stats requires an admin."""
+    hass_admin_user.groups = []
+    client = await hass_ws_client()
+
+    await client.send_json({"id": 1, "type": "recorder/id_cache_stats"})
+    response = await client.receive_json()
+    assert not response["success"]
+    assert response["error"]["code"] == "unauthorized"
+
+
 async def test_recorder_info_no_recorder(hass, hass_ws_client):
     """Test getting recorder status when recorder is not present."""
     client = await hass_ws_client()
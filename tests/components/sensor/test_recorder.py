@@ -150,6 +150,49 @@ def test_compile_hourly_statistics(
     assert "Error while processing event StatisticsTask" not in caplog.text
 
 
+def test_compile_statistics_from_buffered_states(hass_recorder, caplog):
+    """Test compiling statistics from the states buffered by the recorder."""
+    hass = hass_recorder({"verify_statistics": True})
+    setup_component(hass, "sensor", {})
+    wait_recording_done(hass)  # Wait for the sensor recorder platform to be added
+    zero = dt_util.utcnow()
+    record_states(hass, zero, "sensor.test1", POWER_SENSOR_ATTRIBUTES)
+
+    # The state at the start of the period is buffered
+    start = zero + timedelta(seconds=10)
+    with patch.object(
+        history,
+        "get_full_significant_states_with_session",
+        wraps=history.get_full_significant_states_with_session,
+    ) as get_states:
+        get_instance(hass).verify_statistics = False
+        do_adhoc_statistics(hass, start=start)
+        wait_recording_done(hass)
+    assert get_states.call_count == 0
+
+    stats = statistics_during_period(hass, start, period="5minute")
+    assert stats["sensor.test1"] == [
+        {
+            "statistic_id": "sensor.test1",
+            "start": process_timestamp_to_utc_isoformat(start),
+            "end": process_timestamp_to_utc_isoformat(start + timedelta(minutes=5)),
+            "mean": approx(14.0),
+            "min": approx(-10.0),
+            "max": approx(30.0),
+            "last_reset": None,
+            "state": None,
+            "sum": None,
+        }
+    ]
+
+    # The buffered states are the same as the recorded states
+    get_instance(hass).verify_statistics = True
+    do_adhoc_statistics(hass, start=start + timedelta(minutes=5))
+    wait_recording_done(hass)
+    assert "differ from the database" not in caplog.text
+    assert "Error while processing event StatisticsTask" not in caplog.text
+
+
 @pytest.mark.parametrize(
     "device_class,state_unit,display_unit,statistics_unit",
     [
@@ -1053,6 +1053,90 @@ async def test_subscribe_unsubscribe_entities_specific_entities(
     }
 
 
+async def test_subscribe_entities_resume(hass, websocket_client):
+    """Test resuming a subscription only sends the state changes since."""
+    hass.states.async_set("light.kitchen", "off", {"color": "red"})
+    hass.states.async_set("light.hallway", "off")
+
+    await websocket_client.send_json(
+        {"id": 7, "type": "subscribe_entities", "resumable": True}
+    )
+    msg = await websocket_client.receive_json()
+    assert msg["result"] == {"resumed": False}
+    msg = await websocket_client.receive_json()
+    assert set(msg["event"]["a"]) == {"light.kitchen", "light.hallway"}
+
+    hass.states.async_set("light.kitchen", "on", {"color": "red"})
+    msg = await websocket_client.receive_json()
+    assert msg["event"]["c"]["light.kitchen"]["+"]["s"] == "on"
+    resume_token = msg["event"]["t"]
+
+    await websocket_client.send_json(
+        {"id": 8, "type": "unsubscribe_events", "subscription": 7}
+    )
+    msg = await websocket_client.receive_json()
+    assert msg["success"]
+
+    # The state changes while the client is away
+    hass.states.async_set("light.kitchen", "off", {"color": "blue"})
+    hass.states.async_set("light.kitchen", "on", {"color": "blue"})
+    hass.states.async_remove("light.hallway")
+    hass.states.async_set("light.attic", "on")
+
+    await websocket_client.send_json(
+        {"id": 9, "type": "subscribe_entities", "resume_token": resume_token}
+    )
+    msg = await websocket_client.receive_json()
+    assert msg["result"] == {"resumed": True}
+    msg = await websocket_client.receive_json()
+    assert msg["event"] == {
+        "c": {"light.kitchen": {"+": {"a": {"color": "blue"}, "c": ANY, "lc": ANY}}},
+        "r": ["light.hallway"],
+        "a": {"light.attic": {"s": "on", "a": {}, "c": ANY, "lc": ANY}},
+        "t": ANY,
+    }
+    resume_token = msg["event"]["t"]
+
+    hass.states.async_set("light.attic", "off")
+    msg = await websocket_client.receive_json()
+    assert msg["id"] == 9
+    assert msg["event"]["c"]["light.attic"]["+"]["s"] == "off"
+    assert msg["event"]["t"] != resume_token
+
+
+async def test_subscribe_entities_resume_wrapped(hass, websocket_client):
+    """Test resuming from a token no longer in the ring sends all the states."""
+    hass.states.async_set("light.kitchen", "off")
+
+    with patch(
+        "homeassistant.components.websocket_api.subscriptions.ENTITY_RESUME_RING_SIZE",
+        2,
+    ):
+        await websocket_client.send_json(
+            {"id": 7, "type": "subscribe_entities", "resumable": True}
+        )
+        msg = await websocket_client.receive_json()
+        assert msg["result"] == {"resumed": False}
+        msg = await websocket_client.receive_json()
+        resume_token = msg["event"]["t"]
+
+    for state in ("on", "off", "on"):
+        hass.states.async_set("light.kitchen", state)
+        msg = await websocket_client.receive_json()
+
+    for msg_id, token in ((8, resume_token), (9, "unknown-1")):
+        await websocket_client.send_json(
+            {"id": msg_id, "type": "subscribe_entities", "resume_token": token}
+        )
+        msg = await websocket_client.receive_json()
+        assert msg["result"] == {"resumed": False}
+        msg = await websocket_client.receive_json()
+        assert msg["event"] == {
+            "a": {"light.kitchen": {"s": "on", "a": {}, "c": ANY, "lc": ANY}},
+            "t": ANY,
+        }
+
+
 async def test_render_template_renders_template(hass, websocket_client):
     """Test simple template is rendered and updated."""
     hass.states.async_set("light.test", "on")
@@ -1,7 +1,9 @@
 """Test Websocket API http module."""
 import asyncio
 from datetime import timedelta
-from unittest.mock import patch
+import json
+from unittest.mock import ANY, patch
+import zlib
 
 from aiohttp import ServerDisconnectedError, WSMsgType, web
 import pytest
@@ -93,3 +95,174 @@ async def test_prepare_fail(hass, hass_ws_client, caplog):
         await hass_ws_client(hass)
 
     assert "Timeout preparing request" in caplog.text
+
+
+async def test_compressed_messages(hass, websocket_client):
+    """Test large messages are compressed for clients supporting it."""
+    for idx in range(50):
+        hass.states.async_set(f"light.kitchen_{idx}", "on", {"brightness": idx})
+
+    await websocket_client.send_json(
+        {
+            "id": 1,
+            "type": "supported_features",
+            "features": {const.FEATURE_COMPRESSED_MESSAGES: 1},
+        }
+    )
+    msg = await websocket_client.receive()
+    assert msg.type == WSMsgType.TEXT
+    assert json.loads(msg.data)["success"]
+
+    await websocket_client.send_json({"id": 2, "type": "get_states"})
+    msg = await websocket_client.receive()
+    assert msg.type == WSMsgType.BINARY
+    result = json.loads(zlib.decompress(msg.data))
+    assert result["id"] == 2
+    assert len(result["result"]) == 50
+
+    # Small messages are still sent as text
+    await websocket_client.send_json({"id": 3, "type": "ping"})
+    msg = await websocket_client.receive()
+    assert msg.type == WSMsgType.TEXT
+    assert json.loads(msg.data) == {"id": 3, "type": "pong"}
+
+
+async def test_compressed_messages_not_supported(hass, websocket_client):
+    """Test large messages are sent as text to clients not supporting it."""
+    for idx in range(50):
+        hass.states.async_set(f"light.kitchen_{idx}", "on", {"brightness": idx})
+
+    await websocket_client.send_json({"id": 1, "type": "get_states"})
+    msg = await websocket_client.receive()
+    assert msg.type == WSMsgType.TEXT
+    assert len(json.loads(msg.data)["result"]) == 50
+
+
+async def test_pending_state_diffs_merged(hass, websocket_client):
+    """Test the pending state diffs of an entity merge for slow clients."""
+    hass.states.async_set("light.permitted", "off", {"color": "red"})
+
+    await websocket_client.send_json({"id": 7, "type": "subscribe_entities"})
+    msg = await websocket_client.receive_json()
+    assert msg["success"]
+    msg = await websocket_client.receive_json()
+    assert msg["event"]["a"]["light.permitted"]["s"] == "off"
+
+    # The writer does not run until the state changes are done
+    with patch("homeassistant.components.websocket_api.http.PENDING_MSG_MERGE_MIN", 1):
+        hass.states.async_set(
+            "light.permitted", "on", {"color": "red", "brightness": 1}
+        )
+        hass.states.async_set("light.permitted", "off", {"color": "blue"})
+        hass.states.async_set("light.other", "on")
+
+    msg = await websocket_client.receive_json()
+    assert msg["id"] == 7
+    assert msg["event"] == {
+        "c": {"light.permitted": {"+": {"a": {"color": "blue"}, "c": ANY, "lc": ANY}}}
+    }
+    msg = await websocket_client.receive_json()
+    assert msg["event"] == {
+        "a": {"light.other": {"s": "on", "a": {}, "c": ANY, "lc": ANY}}
+    }
+
+    stats = list(http.async_get_write_queue_stats(hass).values())
+    assert len(stats) == 1
+    assert stats[0]["merged_state_diffs"] == 1
+    assert stats[0]["max_pending"] >= 2
+    assert stats[0]["pending"] == 0
+
+
+def test_batch_delay() -> None:
+    """Test only queues falling behind wait before they are written."""
+    assert http._batch_delay(0) == 0
+    assert http._batch_delay(const.PENDING_MSG_BATCH_MIN - 1) == 0
+    assert http._batch_delay(const.PENDING_MSG_BATCH_MIN) == pytest.approx(
+        const.PENDING_MSG_BATCH_DELAY
+    )
+    assert (
+        http._batch_delay(const.PENDING_MSG_BATCH_MIN)
+        < http._batch_delay(const.PENDING_MSG_BATCH_MIN + 10)
+        <= const.PENDING_MSG_BATCH_MAX_DELAY
+    )
+    assert http._batch_delay(const.PENDING_MSG_PEAK - 1) == (
+        const.PENDING_MSG_BATCH_MAX_DELAY
+    )
+    assert http._batch_delay(const.PENDING_MSG_PEAK) == 0
+
+
+async def test_merged_state_diffs_keep_first_resume_token(hass, websocket_client):
+    """Test a merged diff does not move its resume token past queued diffs."""
+    await websocket_client.send_json(
+        {"id": 7, "type": "subscribe_entities", "resumable": True}
+    )
+    msg = await websocket_client.receive_json()
+    assert msg["success"]
+    msg = await websocket_client.receive_json()
+    assert msg["event"]["a"] == {}
+
+    with patch("homeassistant.components.websocket_api.http.PENDING_MSG_MERGE_MIN", 1):
+        hass.states.async_set("light.kitchen", "on")
+        hass.states.async_set("light.hallway", "on")
+        hass.states.async_set("light.kitchen", "off")
+
+    kitchen = await websocket_client.receive_json()
+    assert kitchen["event"]["a"]["light.kitchen"]["s"] == "off"
+    hallway = await websocket_client.receive_json()
+    assert hallway["event"]["a"]["light.hallway"]["s"] == "on"
+
+    # Resuming after the merged diff replays the diffs queued behind it
+    kitchen_sequence = int(kitchen["event"]["t"].rpartition("-")[2])
+    hallway_sequence = int(hallway["event"]["t"].rpartition("-")[2])
+    assert kitchen_sequence < hallway_sequence
+
+    await websocket_client.send_json(
+        {"id": 8, "type": "unsubscribe_events", "subscription": 7}
+    )
+    msg = await websocket_client.receive_json()
+    assert msg["success"]
+    await websocket_client.send_json(
+        {"id": 9, "type": "subscribe_entities", "resume_token": kitchen["event"]["t"]}
+    )
+    msg = await websocket_client.receive_json()
+    assert msg["result"] == {"resumed": True}
+    msg = await websocket_client.receive_json()
+    assert set(msg["event"]["a"]) == {"light.hallway"}
+    assert set(msg["event"]["c"]) == {"light.kitchen"}
+
+
+async def test_pending_state_diffs_batched(hass, websocket_client):
+    """Test the merged state diffs are batched for clients supporting it."""
+    await websocket_client.send_json({"id": 7, "type": "subscribe_entities"})
+    msg = await websocket_client.receive_json()
+    assert msg["success"]
+    msg = await websocket_client.receive_json()
+    assert msg["event"] == {"a": {}}
+
+    await websocket_client.send_json(
+        {
+            "id": 8,
+            "type": "supported_features",
+            "features": {const.FEATURE_COALESCE_MESSAGES: 1},
+        }
+    )
+    msg = await websocket_client.receive_json()
+    assert msg["success"]
+
+    with patch(
+        "homeassistant.components.websocket_api.http.PENDING_MSG_BATCH_MIN", 1
+    ), patch("homeassistant.components.websocket_api.http.PENDING_MSG_MERGE_MIN", 1):
+        for state in ("on", "off", "on"):
+            for idx in range(3):
+                hass.states.async_set(f"light.kitchen_{idx}", state)
+        msg = json.loads(await websocket_client.receive_str())
+
+    assert [list(item["event"]["a"]) for item in msg] == [
+        ["light.kitchen_0"],
+        ["light.kitchen_1"],
+        ["light.kitchen_2"],
+    ]
+    assert all(
+        item["event"]["a"][f"light.kitchen_{idx}"]["s"] == "on"
+        for idx, item in enumerate(msg)
+    )
@@ -0,0 +1,80 @@
+"""Test the entity subscription hub of the WebSocket API."""
+import json
+import logging
+from unittest.mock import Mock, patch
+
+from homeassistant.components import websocket_api
+from homeassistant.components.websocket_api.subscriptions import (
+    async_get_entity_subscription_hub,
+)
+from homeassistant.const import EVENT_STATE_CHANGED
+
+from tests.common import MockUser
+
+
+def _connection(hass, user, sent):
+    """Return a connection collecting the messages it sends."""
+    return websocket_api.ActiveConnection(
+        logging.getLogger(__name__),
+        hass,
+        lambda message: sent.append(json.loads(message())),
+        user,
+        Mock(),
+    )
+
+
+async def test_hub_indexes_subscriptions(hass):
+    """Test state changes only go to the subscriptions following the entity."""
+    hub = async_get_entity_subscription_hub(hass)
+    user = MockUser(is_owner=True)
+    all_sent = []
+    light_sent = []
+    unsub_all = hub.async_subscribe(_connection(hass, user, all_sent), 5, set())
+    unsub_light = hub.async_subscribe(
+        _connection(hass, user, light_sent), 6, {"light.kitchen"}
+    )
+    assert hass.bus.async_listeners()[EVENT_STATE_CHANGED] == 1
+
+    hass.states.async_set("light.kitchen", "on")
+    hass.states.async_set("switch.fan", "on")
+
+    assert [list(msg["event"]["a"]) for msg in all_sent] == [
+        ["light.kitchen"],
+        ["switch.fan"],
+    ]
+    assert [msg["id"] for msg in all_sent] == [5, 5]
+    assert [msg["id"] for msg in light_sent] == [6]
+
+    unsub_light()
+    unsub_all()
+    hass.states.async_set("light.kitchen", "off")
+    assert len(all_sent) == 2
+    assert len(light_sent) == 1
+
+
+async def test_hub_caches_permission_decisions(hass):
+    """Test the permission decisions are cached until the permissions change."""
+    hub = async_get_entity_subscription_hub(hass)
+    user = MockUser()
+    user.mock_policy({"entities": {"entity_ids": {"light.permitted": True}}})
+    sent = []
+    unsub = hub.async_subscribe(_connection(hass, user, sent), 5, set())
+
+    with patch.object(
+        user.permissions, "check_entity", wraps=user.permissions.check_entity
+    ) as check_entity:
+        for state in ("on", "off", "on"):
+            hass.states.async_set("light.permitted", state)
+            hass.states.async_set("light.not_permitted", state)
+
+    assert len(check_entity.mock_calls) == 2
+    assert len(sent) == 3
+
+    user.mock_policy({"entities": {"entity_ids": {"light.not_permitted": True}}})
+    hass.states.async_set("light.permitted", "off")
+    hass.states.async_set("light.not_permitted", "off")
+    assert len(sent) == 4
+    assert "light.not_permitted" in sent[-1]["event"]["c"]
+
+    unsub()
+    assert not hub._decisions
@@ -2,6 +2,7 @@
 import time
 from unittest.mock import patch
 
+import attr
 import pytest
 
 from homeassistant import config_entries
@@ -1626,3 +1627,31 @@ async def test_only_disable_device_if_all_config_entries_are_disabled(hass, regi
 
     entry1 = registry.async_get(entry1.id)
     assert not entry1.disabled
+
+
+def test_active_device_registry_items_indexes():
+    """Test the ActiveDeviceRegistryItems container indexes the devices."""
+    devices = device_registry.ActiveDeviceRegistryItems()
+    device1 = device_registry.DeviceEntry(
+        area_id="kitchen", config_entries={"config_1", "config_2"}
+    )
+    device2 = device_registry.DeviceEntry(config_entries={"config_1"})
+    devices[device1.id] = device1
+    devices[device2.id] = device2
+
+    assert devices.get_devices_for_area_id("kitchen") == [device1]
+    assert devices.get_devices_for_config_entry_id("config_1") == [device1, device2]
+    assert devices.get_devices_for_config_entry_id("config_2") == [device1]
+    assert devices.get_devices_for_config_entry_id("config_3") == []
+
+    device1 = attr.evolve(device1, area_id="bedroom", config_entries={"config_1"})
+    devices[device1.id] = device1
+    assert devices.get_devices_for_area_id("kitchen") == []
+    assert devices.get_devices_for_area_id("bedroom") == [device1]
+    assert devices.get_devices_for_config_entry_id("config_1") == [device1, device2]
+    assert devices.get_devices_for_config_entry_id("config_2") == []
+
+    del devices[device1.id]
+    devices.pop(device2.id)
+    assert devices.get_devices_for_area_id("bedroom") == []
+    assert devices.get_devices_for_config_entry_id("config_1") == []
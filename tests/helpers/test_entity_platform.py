@@ -2,7 +2,7 @@
 import asyncio
 from datetime import timedelta
 import logging
-from unittest.mock import ANY, Mock, patch
+from unittest.mock import ANY, AsyncMock, Mock, patch
 
 import pytest
 
@@ -109,6 +109,188 @@ async def test_polling_updates_entities_with_exception(hass):
     assert len(update_err) == 1
 
 
+async def test_polling_jitter(hass):
+    """Test the first poll of a platform starts up to the jitter early."""
+    component = EntityComponent(_LOGGER, DOMAIN, hass, timedelta(seconds=20))
+
+    poll_ent = MockEntity(should_poll=True)
+    poll_ent.async_update = Mock()
+
+    with patch("homeassistant.helpers.entity_platform.random.random", return_value=1):
+        await component.async_add_entities([poll_ent])
+    poll_ent.async_update.reset_mock()
+
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=17))
+    await hass.async_block_till_done()
+    assert not poll_ent.async_update.called
+
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=18))
+    await hass.async_block_till_done()
+    assert poll_ent.async_update.called
+
+
+async def test_polling_backs_off_failing_entities(hass):
+    """Test entities failing in a row skip more and more polls."""
+    component = EntityComponent(_LOGGER, DOMAIN, hass, timedelta(seconds=20))
+
+    fail = True
+    updates = []
+
+    def update_mock():
+        """Mock an update that can fail."""
+        updates.append(None)
+        if fail:
+            raise AssertionError("Fake error update")
+
+    ent = MockEntity(should_poll=True)
+    ent.update = update_mock
+    await component.async_add_entities([ent])
+
+    polled = []
+    for _ in range(8):
+        updates.clear()
+        async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=20))
+        await hass.async_block_till_done()
+        polled.append(bool(updates))
+
+    # Backs off 1 poll after 3 failures, then 2 polls after the 4th
+    assert polled == [True, True, True, False, True, False, False, True]
+
+    fail = False
+    for _ in range(5):
+        async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=20))
+        await hass.async_block_till_done()
+
+    updates.clear()
+    for _ in range(3):
+        async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=20))
+        await hass.async_block_till_done()
+    assert len(updates) == 3
+
+
+async def test_polling_respects_parallel_updates(hass, caplog):
+    """Test polling updates no more entities at once than parallel updates."""
+    platform = MockPlatform()
+    platform.PARALLEL_UPDATES = 2
+    entity_platform = MockEntityPlatform(
+        hass, platform=platform, scan_interval=timedelta(seconds=20)
+    )
+
+    running = 0
+    max_running = 0
+    release = asyncio.Event()
+
+    async def async_update():
+        """Mock a slow update."""
+        nonlocal running, max_running
+        running += 1
+        max_running = max(max_running, running)
+        await release.wait()
+        running -= 1
+
+    entities = [MockEntity(should_poll=True) for _ in range(5)]
+    for entity in entities:
+        entity.async_update = async_update
+    await entity_platform.async_add_entities(entities)
+
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=20))
+    for _ in range(5):
+        await asyncio.sleep(0)
+    assert running == 2
+
+    # The entities still updating are skipped by the next poll
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=20))
+    for _ in range(5):
+        await asyncio.sleep(0)
+    assert "took longer than the scheduled update interval" in caplog.text
+    assert running == 2
+
+    release.set()
+    await hass.async_block_till_done()
+    assert running == 0
+    assert max_running == 2
+
+
+async def test_polling_budget_not_held_while_waiting_on_platform(hass):
+    """Test an entity waiting on its platform does not hold the polling budget."""
+    busy_entity = MockEntity(should_poll=True)
+    busy_entity.async_update = Mock()
+    idle_entity = MockEntity(should_poll=True)
+    idle_entity.async_update = Mock()
+    busy_platform = MockPlatform()
+    busy_platform.PARALLEL_UPDATES = 1
+
+    with patch.object(entity_platform, "MAX_PARALLEL_POLLING_UPDATES", 1):
+        busy_entity_platform = MockEntityPlatform(
+            hass, platform=busy_platform, scan_interval=timedelta(seconds=20)
+        )
+        idle_entity_platform = MockEntityPlatform(
+            hass,
+            platform_name="idle_platform",
+            platform=MockPlatform(),
+            scan_interval=timedelta(seconds=30),
+        )
+        await busy_entity_platform.async_add_entities([busy_entity])
+        await idle_entity_platform.async_add_entities([idle_entity])
+
+    # A service triggered update holds the slot of the busy platform
+    await busy_entity.parallel_updates.acquire()
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=20))
+    for _ in range(5):
+        await asyncio.sleep(0)
+    assert not busy_entity.async_update.called
+
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=30))
+    for _ in range(5):
+        await asyncio.sleep(0)
+    assert idle_entity.async_update.called
+    assert not busy_entity.async_update.called
+
+    busy_entity.parallel_updates.release()
+    await hass.async_block_till_done()
+    assert busy_entity.async_update.called
+
+
+async def test_polling_latency_histogram(hass):
+    """Test the latency of the polled updates is kept per platform."""
+    clock = 0.0
+
+    def _advance_clock(seconds: float) -> None:
+        nonlocal clock
+        clock += seconds
+
+    ent1 = MockEntity(should_poll=True)
+    ent1.async_update = AsyncMock(side_effect=lambda: _advance_clock(0.2))
+    ent2 = MockEntity(should_poll=True)
+
+    def _failing_update() -> None:
+        _advance_clock(3)
+        raise AssertionError("Fake error update")
+
+    ent2.update = Mock(side_effect=_failing_update)
+    # The entities are updated one at a time so each update is timed on its own
+    platform = MockPlatform()
+    platform.PARALLEL_UPDATES = 1
+    mock_entity_platform = MockEntityPlatform(
+        hass, platform=platform, scan_interval=timedelta(seconds=20)
+    )
+    await mock_entity_platform.async_add_entities([ent1, ent2])
+
+    with patch.object(entity_platform, "time") as mock_time:
+        mock_time.monotonic.side_effect = lambda: clock
+        async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=20))
+        await hass.async_block_till_done()
+
+    latencies = entity_platform.async_get_polling_scheduler(hass).async_latencies()
+    histogram = latencies[f"{DOMAIN}.{mock_entity_platform.platform_name}"]
+    assert histogram["count"] == 2
+    assert histogram["failures"] == 1
+    assert histogram["sum"] == pytest.approx(3.2)
+    assert histogram["buckets"]["0.25"] == 1
+    assert histogram["buckets"]["5"] == 1
+    assert sum(histogram["buckets"].values()) == 2
+
+
 async def test_update_state_adds_entities(hass):
     """Test if updating poll entities cause an entity to be added works."""
     component = EntityComponent(_LOGGER, DOMAIN, hass)
@@ -154,7 +336,9 @@ async def test_update_state_adds_entities_with_update_before_add_false(hass):
     assert not ent.update.called
 
 
-@patch("homeassistant.helpers.entity_platform.async_track_time_interval")
+@patch(
+    "homeassistant.helpers.entity_platform.EntityPollingScheduler.async_track_platform"
+)
 async def test_set_scan_interval_via_platform(mock_track, hass):
     """Test the setting of the scan interval via platform."""
 
@@ -173,7 +357,7 @@ async def test_set_scan_interval_via_platform(mock_track, hass):
 
     await hass.async_block_till_done()
     assert mock_track.called
-    assert timedelta(seconds=30) == mock_track.call_args[0][2]
+    assert timedelta(seconds=30) == mock_track.call_args[0][0].scan_interval
 
 
 async def test_adding_entities_with_generator_and_thread_callback(hass):
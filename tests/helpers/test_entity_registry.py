@@ -1,6 +1,7 @@
 """Tests for the Entity Registry."""
 from unittest.mock import patch
 
+import attr
 import pytest
 import voluptuous as vol
 
@@ -1256,6 +1257,46 @@ def test_entity_registry_items():
     assert entities.get_entry(entry2.id) is None
 
 
+def test_entity_registry_items_indexes():
+    """Test the EntityRegistryItems container indexes the entries."""
+    entities = er.EntityRegistryItems()
+    entry1 = er.RegistryEntry(
+        "test.entity1",
+        "1234",
+        "hue",
+        area_id="kitchen",
+        config_entry_id="config_1",
+        device_id="device_1",
+    )
+    entry2 = er.RegistryEntry(
+        "test.entity2", "2345", "hue", config_entry_id="config_1", device_id="device_1"
+    )
+    entities["test.entity1"] = entry1
+    entities["test.entity2"] = entry2
+
+    assert entities.get_entries_for_device_id("device_1") == [entry1, entry2]
+    assert entities.get_entries_for_area_id("kitchen") == [entry1]
+    assert entities.get_entries_for_config_entry_id("config_1") == [entry1, entry2]
+    assert entities.get_entries_for_device_id("device_2") == []
+
+    # Updating an entry keeps its position for the unchanged values
+    entry1 = attr.evolve(entry1, area_id=None, device_id="device_2")
+    entities["test.entity1"] = entry1
+    assert entities.get_entries_for_device_id("device_1") == [entry2]
+    assert entities.get_entries_for_device_id("device_2") == [entry1]
+    assert entities.get_entries_for_area_id("kitchen") == []
+    assert entities.get_entries_for_config_entry_id("config_1") == [entry1, entry2]
+
+    del entities["test.entity1"]
+    entities.pop("test.entity2")
+    assert entities.get_entries_for_device_id("device_1") == []
+    assert entities.get_entries_for_device_id("device_2") == []
+    assert entities.get_entries_for_config_entry_id("config_1") == []
+    assert not entities._device_id_index
+    assert not entities._area_id_index
+    assert not entities._config_entry_id_index
+
+
 async def test_disabled_by_str_not_allowed(hass):
     """Test we need to pass disabled by type."""
     reg = er.async_get(hass)
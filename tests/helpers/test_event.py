@@ -1019,6 +1019,38 @@ async def test_track_template_result(hass):
     assert len(wildercard_runs) == 4
 
 
+async def test_track_template_result_skips_unchanged_inputs(hass):
+    """Test templates are not rendered when the states they read did not change."""
+    runs = []
+    template = Template(
+        "{{ states('sensor.test') }} {{ state_attr('sensor.test', 'battery') }}", hass
+    )
+
+    @ha.callback
+    def run_callback(event, updates):
+        runs.append(updates.pop().result)
+
+    async_track_template_result(hass, [TrackTemplate(template, None)], run_callback)
+    await hass.async_block_till_done()
+
+    hass.states.async_set("sensor.test", "1", {"battery": 5})
+    await hass.async_block_till_done()
+    assert runs == ["1 5"]
+
+    with patch.object(
+        Template, "async_render_to_info", wraps=template.async_render_to_info
+    ) as render_to_info:
+        # Other attributes are not read by the template
+        hass.states.async_set("sensor.test", "1", {"battery": 5, "other": 1})
+        await hass.async_block_till_done()
+        assert render_to_info.call_count == 0
+
+        hass.states.async_set("sensor.test", "1", {"battery": 4, "other": 1})
+        await hass.async_block_till_done()
+        assert render_to_info.call_count == 1
+        assert runs == ["1 5", "1 4"]
+
+
 async def test_track_template_result_none(hass):
     """Test tracking template."""
     specific_runs = []
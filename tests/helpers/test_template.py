@@ -2842,6 +2842,77 @@ async def test_area_entities(hass):
     assert info.rate_limit is None
 
 
+async def test_state_aggregates(hass):
+    """Test the functions aggregating the numeric states of entities."""
+    hass.states.async_set("sensor.power_1", "1.5", {"device_class": "power"})
+    hass.states.async_set("sensor.power_2", "2.5", {"device_class": "power"})
+    hass.states.async_set("sensor.energy", "10", {"device_class": "energy"})
+    hass.states.async_set("sensor.unavailable", "unavailable")
+    hass.states.async_set("light.kitchen", "on")
+
+    info = render_to_info(
+        hass, "{{ state_sum(['sensor.power_1', 'sensor.power_2', 'sensor.missing']) }}"
+    )
+    assert_result_info(
+        info, 4.0, ["sensor.power_1", "sensor.power_2", "sensor.missing"]
+    )
+    assert info.rate_limit is None
+
+    info = render_to_info(
+        hass, "{{ ['sensor.power_1', 'sensor.unavailable'] | state_mean }}"
+    )
+    assert_result_info(info, 1.5, ["sensor.power_1", "sensor.unavailable"])
+
+    info = render_to_info(hass, "{{ state_max(domain='sensor') }}")
+    assert_result_info(info, 10.0, [], ["sensor"])
+    assert info.rate_limit == template.DOMAIN_STATES_RATE_LIMIT
+
+    info = render_to_info(
+        hass, "{{ state_min(domain='sensor', device_class='power') }}"
+    )
+    assert_result_info(info, 1.5, [], ["sensor"])
+
+    info = render_to_info(hass, "{{ state_count() }}")
+    assert_result_info(info, 3, [], all_states=True)
+    assert info.rate_limit == template.ALL_STATES_RATE_LIMIT
+
+    info = render_to_info(hass, "{{ state_sum('light.kitchen') }}")
+    assert_result_info(info, 0, ["light.kitchen"])
+
+    info = render_to_info(hass, "{{ state_mean('light.kitchen', default=-1) }}")
+    assert_result_info(info, -1, ["light.kitchen"])
+
+    with pytest.raises(TemplateError):
+        template.Template("{{ state_max('light.kitchen') }}", hass).async_render()
+
+    with pytest.raises(TemplateError):
+        template.Template("{{ state_sum('sensor.power_1') }}", hass).async_render(
+            limited=True
+        )
+
+
+async def test_state_aggregates_area(hass):
+    """Test aggregating the numeric states of the entities of an area."""
+    entity_registry = mock_registry(hass)
+    area_registry = mock_area_registry(hass)
+    area_entry = area_registry.async_get_or_create("kitchen")
+    for unique_id in ("1", "2"):
+        entity_entry = entity_registry.async_get_or_create("sensor", "test", unique_id)
+        entity_registry.async_update_entity(
+            entity_entry.entity_id, area_id=area_entry.id
+        )
+    hass.states.async_set("sensor.test_1", "3")
+    hass.states.async_set("sensor.test_2", "5")
+    hass.states.async_set("sensor.other", "7")
+
+    info = render_to_info(hass, "{{ state_mean(area='kitchen') }}")
+    assert_result_info(info, 4.0, ["sensor.test_1", "sensor.test_2"])
+    info = render_to_info(
+        hass, "{{ state_sum('sensor.other', area='kitchen', domain='sensor') }}"
+    )
+    assert_result_info(info, 15.0, ["sensor.other", "sensor.test_1", "sensor.test_2"])
+
+
 async def test_area_devices(hass):
     """Test area_devices function."""
     config_entry = MockConfigEntry(domain="light")
@@ -3503,35 +3574,106 @@ def test_iif(hass: HomeAssistant) -> None:
     assert tpl.async_render() == "no"
 
 
-async def test_cache_garbage_collection():
-    """Test caching a template."""
+async def test_compiled_template_cache(hass):
+    """Test the compiled templates are cached across template instances."""
     template_string = (
         "{% set dict = {'foo': 'x&y', 'bar': 42} %} {{ dict | urlencode }}"
     )
-    tpl = template.Template(
-        (template_string),
-    )
+    info = template.compiled_template_cache_info()
+    assert info["maxsize"] == template.COMPILED_TEMPLATE_CACHE_SIZE
+
+    tpl = template.Template(template_string, hass)
     tpl.ensure_valid()
-    assert template._NO_HASS_ENV.template_cache.get(
-        template_string
-    )  # pylint: disable=protected-access
+    assert template.compiled_template_cache_info()["misses"] == info["misses"] + 1
 
-    tpl2 = template.Template(
-        (template_string),
-    )
+    tpl2 = template.Template(template_string, hass)
     tpl2.ensure_valid()
-    assert template._NO_HASS_ENV.template_cache.get(
-        template_string
-    )  # pylint: disable=protected-access
-
-    del tpl
-    assert template._NO_HASS_ENV.template_cache.get(
-        template_string
-    )  # pylint: disable=protected-access
-    del tpl2
-    assert not template._NO_HASS_ENV.template_cache.get(
-        template_string
-    )  # pylint: disable=protected-access
+    assert tpl2._compiled_code is tpl._compiled_code
+    assert template.compiled_template_cache_info()["hits"] == info["hits"] + 1
+
+    # The cache outlives the templates
+    del tpl, tpl2
+    tpl = template.Template(template_string, hass)
+    assert tpl.async_render() == "foo=x%26y&bar=42"
+    assert template.compiled_template_cache_info()["hits"] == info["hits"] + 2
+
+    # Limited templates are cached separately
+    assert (
+        template.TemplateEnvironment(hass, limited=True).compile(template_string)
+        is not tpl._compiled_code
+    )
+    assert template.compiled_template_cache_info()["misses"] == info["misses"] + 2
+
+    # Environments with the same settings share the compiled templates
+    assert (
+        template.TemplateEnvironment(hass, limited=None, strict=None).compile(
+            template_string
+        )
+        is tpl._compiled_code
+    )
+    assert (
+        template.TemplateEnvironment(None).compile(template_string)
+        is not tpl._compiled_code
+    )
+    assert template.compiled_template_cache_info()["misses"] == info["misses"] + 3
+
+
+@pytest.mark.parametrize(
+    "template_string,entities,attributes",
+    [
+        ("{{ states('sensor.a') | float + x }}", {"sensor.a"}, set()),
+        (
+            "{% if is_state('light.a', 'on') %}"
+            "{{ state_attr('light.a', 'brightness') }}{% endif %}",
+            {"light.a"},
+            {("light.a", "brightness")},
+        ),
+        (
+            "{{ states.sensor.a.state }} {{ states.sensor.b.attributes.unit }}",
+            {"sensor.a"},
+            {("sensor.b", "unit")},
+        ),
+        ("{{ x + 1 }}", set(), set()),
+    ],
+)
+def test_analyze(template_string, entities, attributes):
+    """Test finding the states a template reads without rendering it."""
+    info = template.Template(template_string).async_analyze()
+    assert info.entities == entities
+    assert info.attributes == attributes
+
+
+@pytest.mark.parametrize(
+    "template_string",
+    [
+        "plain text",
+        "{{ states.sensor | list }}",
+        "{{ states.sensor.a }}",
+        "{{ states.sensor.a.last_changed }}",
+        "{{ states(entity_id) }}",
+        "{{ states('sensor.a', rounded=True) }}",
+        "{% set get_state = states %}{{ get_state('sensor.a') }}",
+        "{{ now() }}",
+        "{{ ['sensor.a'] | expand | list }}",
+        "{{ [1, 2] | random }}",
+        "{{ this.state }}",
+        "{{ states('sensor.a' }}",
+    ],
+)
+def test_analyze_not_analyzable(template_string):
+    """Test templates depending on more than the states they name aren't analyzed."""
+    assert template.Template(template_string).async_analyze() is None
+
+
+async def test_analyze_inputs(hass):
+    """Test the inputs of an analyzed template."""
+    info = template.Template(
+        "{{ states('sensor.a') }} {{ state_attr('sensor.a', 'unit') }}"
+    ).async_analyze()
+    assert info.inputs(hass) == (None, None)
+
+    hass.states.async_set("sensor.a", "1", {"unit": "W", "other": 1})
+    assert info.inputs(hass) == ("1", "W")
 
 
 def test_is_template_string():
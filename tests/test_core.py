@@ -35,11 +35,13 @@ from homeassistant.const import (
 import homeassistant.core as ha
 from homeassistant.core import State
 from homeassistant.exceptions import (
+    HomeAssistantError,
     InvalidEntityFormatError,
     InvalidStateError,
     MaxLengthExceeded,
     ServiceNotFound,
 )
+from homeassistant.helpers.json import json_bytes, json_loads
 import homeassistant.util.dt as dt_util
 from homeassistant.util.read_only_dict import ReadOnlyDict
 from homeassistant.util.unit_system import METRIC_SYSTEM
@@ -400,6 +402,65 @@ def test_state_as_dict():
     assert state.as_dict() is as_dict_1
 
 
+def test_state_as_json():
+    """Test the JSON of a State is serialized once."""
+    last_time = datetime(1984, 12, 8, 12, 0, 0, tzinfo=dt_util.UTC)
+    state = ha.State(
+        "happy.happy",
+        "on",
+        {"pig": "dog"},
+        last_updated=last_time + timedelta(seconds=1),
+        last_changed=last_time,
+        context=ha.Context(id="01G", user_id="abc"),
+    )
+    as_dict_json = state.as_dict_json()
+    assert json_loads(as_dict_json) == state.as_dict()
+    assert state.as_dict_json() is as_dict_json
+
+    compressed_state_json = state.as_compressed_state_json()
+    assert json_loads(compressed_state_json) == {
+        "s": "on",
+        "a": {"pig": "dog"},
+        "c": {"id": "01G", "parent_id": None, "user_id": "abc"},
+        "lc": last_time.timestamp(),
+        "lu": last_time.timestamp() + 1,
+    }
+    assert state.as_compressed_state_json() is compressed_state_json
+    assert state.as_compressed_state() is state.as_compressed_state()
+
+    attributes_json = state.attributes_json()
+    assert attributes_json == b'{"pig":"dog"}'
+    assert state.attributes_json() is attributes_json
+
+    # Only sends the context id when there is no user or parent
+    state = ha.State("happy.happy", "on", context=ha.Context(id="01G"))
+    assert state.as_compressed_state()["c"] == "01G"
+
+
+def test_event_as_json():
+    """Test the JSON of an Event reuses the JSON of the states."""
+    old_state = ha.State("light.kitchen", "off", {"brightness": 0})
+    new_state = ha.State("light.kitchen", "on", {"brightness": 255})
+    event = ha.Event(
+        EVENT_STATE_CHANGED,
+        {"entity_id": "light.kitchen", "old_state": old_state, "new_state": new_state},
+    )
+    new_state_json = new_state.as_dict_json()
+    as_dict_json = event.as_dict_json()
+    assert as_dict_json == json_bytes(event.as_dict())
+    assert new_state_json in as_dict_json
+    assert event.as_dict_json() is as_dict_json
+
+    for data in (
+        {"entity_id": "light.kitchen", "old_state": new_state, "new_state": None},
+        {"number": 1, "nested": {"list": [1, 2]}},
+        {1: "non string key", "state": new_state},
+        {},
+    ):
+        event = ha.Event("test_event", data)
+        assert event.as_dict_json() == json_bytes(event.as_dict())
+
+
 async def test_eventbus_add_remove_listener(hass):
     """Test remove_listener method."""
     old_count = len(hass.bus.async_listeners())
@@ -466,6 +527,91 @@ async def test_eventbus_run_immediately(hass):
     unsub()
 
 
+async def test_eventbus_batched(hass):
+    """Test batched listeners get the events fired since the batch was scheduled."""
+    calls = []
+
+    @ha.callback
+    def listener(event):
+        """Mock listener."""
+        calls.append(event.data["event"])
+
+    @ha.callback
+    def failing_listener(event):
+        """Mock listener that raises."""
+        raise ValueError
+
+    unsub = hass.bus.async_listen("test", listener, batched=True)
+    hass.bus.async_listen("test", failing_listener, batched=True)
+    hass.bus.async_listen(
+        "other", listener, event_filter=ha.callback(lambda _: False), batched=True
+    )
+
+    with patch.object(hass.loop, "call_soon", wraps=hass.loop.call_soon) as call_soon:
+        for event in range(3):
+            hass.bus.async_fire("test", {"event": event})
+        hass.bus.async_fire("other", {"event": "filtered"})
+        assert calls == []
+        assert call_soon.call_count == 1
+    await hass.async_block_till_done()
+    assert calls == [0, 1, 2]
+
+    unsub()
+    hass.bus.async_fire("test", {"event": 3})
+    await hass.async_block_till_done()
+    assert calls == [0, 1, 2]
+
+    with pytest.raises(HomeAssistantError):
+        hass.bus.async_listen("test", lambda event: None, batched=True)
+    with pytest.raises(HomeAssistantError):
+        hass.bus.async_listen("test", listener, run_immediately=True, batched=True)
+
+
+async def test_eventbus_dispatch_updated(hass):
+    """Test the listeners run follow the listeners added and removed."""
+    calls = []
+
+    @ha.callback
+    def listener(event):
+        """Mock listener."""
+        calls.append(("test", event.event_type))
+
+    @ha.callback
+    def match_all_listener(event):
+        """Mock listener."""
+        calls.append((MATCH_ALL, event.event_type))
+
+    @ha.callback
+    def unsubscribing_listener(event):
+        """Mock listener removing itself."""
+        calls.append(("unsubscribing", event.event_type))
+        unsub_unsubscribing()
+
+    unsub_unsubscribing = hass.bus.async_listen(
+        "test", unsubscribing_listener, run_immediately=True
+    )
+    unsub = hass.bus.async_listen("test", listener, run_immediately=True)
+    hass.bus.async_fire("test")
+    hass.bus.async_fire("test")
+    assert calls == [("unsubscribing", "test"), ("test", "test"), ("test", "test")]
+
+    calls.clear()
+    unsub_match_all = hass.bus.async_listen(
+        MATCH_ALL, match_all_listener, run_immediately=True
+    )
+    hass.bus.async_fire("test")
+    hass.bus.async_fire("other")
+    hass.bus.async_fire(EVENT_HOMEASSISTANT_CLOSE)
+    assert calls == [(MATCH_ALL, "test"), ("test", "test"), (MATCH_ALL, "other")]
+
+    calls.clear()
+    unsub_match_all()
+    unsub()
+    hass.bus.async_fire("test")
+    hass.bus.async_fire("other")
+    assert calls == []
+
+
 async def test_eventbus_unsubscribe_listener(hass):
     """Test unsubscribe listener from returned function."""
     calls = []
@@ -1445,6 +1591,58 @@ async def test_async_entity_ids_count(hass):
     assert hass.states.async_entity_ids_count("light") == 3
 
 
+async def test_statemachine_shares_attributes(hass):
+    """Test the states share the attributes while they do not change."""
+    hass.states.async_set("light.bowl", "on", {"brightness": 100})
+    first = hass.states.get("light.bowl")
+    attributes_json = first.attributes_json()
+
+    hass.states.async_set("light.bowl", "off", {"brightness": 100})
+    second = hass.states.get("light.bowl")
+    assert second.attributes is first.attributes
+    assert second.attributes_json() is attributes_json
+
+    # Passing the attributes of a state on shares them too
+    hass.states.async_set("light.other", "on", second.attributes)
+    assert hass.states.get("light.other").attributes is first.attributes
+
+    hass.states.async_set("light.bowl", "off", {"brightness": 50})
+    third = hass.states.get("light.bowl")
+    assert third.attributes is not first.attributes
+    assert third.attributes == {"brightness": 50}
+    assert isinstance(third.attributes, ReadOnlyDict)
+    assert third.attributes_json() == b'{"brightness":50}'
+
+
+async def test_statemachine_domain_index(hass):
+    """Test the states of a domain follow the states set and removed."""
+    hass.states.async_set("light.bowl", "on")
+    hass.states.async_set("switch.link", "on")
+    hass.states.async_set("light.frog", "on")
+
+    hass.states.async_set("light.bowl", "off")
+    assert hass.states.async_entity_ids("LIGHT") == ["light.bowl", "light.frog"]
+    assert hass.states.async_all("light") == [
+        hass.states.get("light.bowl"),
+        hass.states.get("light.frog"),
+    ]
+    assert hass.states.async_all("light")[0].state == "off"
+    assert hass.states.async_entity_ids(["switch", "light", "switch"]) == [
+        "switch.link",
+        "light.bowl",
+        "light.frog",
+    ]
+    assert hass.states.async_entity_ids_count(("light", "vacuum")) == 2
+
+    assert hass.states.async_remove("light.bowl")
+    assert hass.states.async_remove("switch.link")
+    assert hass.states.async_entity_ids("light") == ["light.frog"]
+    assert hass.states.async_entity_ids("switch") == []
+    assert hass.states.async_all(["switch"]) == []
+    assert hass.states.async_entity_ids_count("switch") == 0
+    assert hass.states.async_entity_ids_count(["light", "switch"]) == 1
+
+
 async def test_hassjob_forbid_coroutine():
     """Test hassjob forbids coroutines."""
 